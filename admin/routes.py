@@ -20,6 +20,22 @@ try:
 except ImportError:
     fetcher = None
 
+# Incremental course catalog sync for curated provider lists
+from course_sync import sync_course_list
+
+# Catalog version counter read by the per-worker course caches
+from cache_versions import CATALOG, LEARNINGS, LEARNINGS_GLOBAL, bump_version
+from learning_tags import tag_index
+
+# Neighbour-table refresh queued after courses are added
+from course_recommender import queue_index_update
+
+# Background job engine for long-running admin operations
+try:
+    from job_manager import job_manager
+except ImportError:
+    job_manager = None
+
 # Configure logging for admin operations
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -234,6 +250,8 @@ def add_course():
                         VALUES (?, ?, ?, ?, ?, ?)
                     ''', (title, source, level, link, points, description))
                     conn.commit()
+                    bump_version(CATALOG, conn=conn)
+                    queue_index_update(user_id=session.get('user_id'))
                     flash(f'Course "{title}" added successfully!', 'success')
                     return redirect(url_for('admin.courses'))
             except Exception as e:
@@ -339,55 +357,28 @@ def populate_linkedin_courses():
         }
     ]
     
-    conn = get_db_connection()
-    added_count = 0
-    duplicate_count = 0
-    error_count = 0
-    
-    # Get all existing course titles for efficient duplicate checking
-    existing_titles = set()
-    existing_courses = conn.execute('SELECT title FROM courses').fetchall()
-    for course in existing_courses:
-        title = course['title'] if course['title'] else ''
-        if title:  # Only add if title is not empty
-            existing_titles.add(title.lower().strip())
-    
     for course in linkedin_courses:
-        try:
-            # Check for duplicates (case-insensitive)
-            if course['title'].lower().strip() in existing_titles:
-                duplicate_count += 1
-                continue
-            
-            # Add the course
-            conn.execute('''
-                INSERT INTO courses (title, source, level, link, url, points, description, category, difficulty)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (course['title'], 'LinkedIn Learning', course['level'], 
-                  course['link'], course['link'], course['points'], course['description'],
-                  'AI/ML', course['level']))
-            
-            # Add to our local set to prevent duplicates within this batch
-            existing_titles.add(course['title'].lower().strip())
-            added_count += 1
-            
-        except Exception as e:
-            error_count += 1
-            print(f"Error adding course {course['title']}: {str(e)}")
+        course.update({'url': course['link'], 'category': 'AI/ML', 'difficulty': course['level']})
     
-    conn.commit()
-    conn.close()
+    # Incremental sync: an unchanged list costs one state lookup, changed courses are upserted
+    try:
+        result = sync_course_list('LinkedIn Learning', linkedin_courses)
+    except Exception as e:
+        logger.error(f"LinkedIn Learning sync failed: {e}")
+        flash(f'Error syncing LinkedIn Learning courses: {str(e)}', 'error')
+        return redirect(url_for('admin.courses'))
     
     # Provide detailed feedback
-    if added_count > 0:
-        flash(f'Successfully added {added_count} LinkedIn Learning AI courses!', 'success')
-    if duplicate_count > 0:
-        flash(f'{duplicate_count} courses were skipped (already exist)', 'info')
-    if error_count > 0:
-        flash(f'{error_count} courses had errors and were not added', 'warning')
-    
-    if added_count == 0 and duplicate_count > 0:
-        flash('All LinkedIn Learning courses already exist in the database', 'info')
+    if result['unchanged_source']:
+        flash('LinkedIn Learning course list is unchanged since the last sync', 'info')
+    if result['added'] > 0:
+        flash(f'Successfully added {result["added"]} LinkedIn Learning AI courses!', 'success')
+    if result['updated'] > 0:
+        flash(f'{result["updated"]} LinkedIn Learning courses were updated', 'success')
+    if result['duplicates'] > 0:
+        flash(f'{result["duplicates"]} courses were skipped (already exist)', 'info')
+    if result['invalid'] > 0:
+        flash(f'{result["invalid"]} courses had no title or link and were not added', 'warning')
     
     return redirect(url_for('admin.courses'))
 
@@ -405,13 +396,16 @@ def delete_user(user_id):
             flash('User not found or cannot delete admin user.', 'error')
             return redirect(url_for('admin.users'))
         
-        # Delete user's learning entries and course enrollments first
+        # Delete user's learning entries (and their tags) and course enrollments first
+        tag_index.remove_user(conn, user_id)
         conn.execute('DELETE FROM learning_entries WHERE user_id = ?', (user_id,))
         conn.execute('DELETE FROM user_courses WHERE user_id = ?', (user_id,))
         
         # Delete the user
         conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
         conn.commit()
+        # The user's entries, global ones included, just left the feed and search
+        bump_version(LEARNINGS, LEARNINGS_GLOBAL, conn=conn)
         
         flash(f'User {user["username"]} deleted successfully!', 'success')
     except Exception as e:
@@ -469,6 +463,7 @@ def delete_course(course_id):
         # Delete the course
         conn.execute('DELETE FROM courses WHERE id = ?', (course_id,))
         conn.commit()
+        bump_version(CATALOG, conn=conn)
         
         flash(f'Course "{course["title"]}" deleted successfully!', 'success')
     except Exception as e:
@@ -511,6 +506,7 @@ def edit_course(course_id):
                         WHERE id = ?
                     ''', (title, source, level, link, points, description, course_id))
                     conn.commit()
+                    bump_version(CATALOG, conn=conn)
                     flash('Course updated successfully!', 'success')
                     return redirect(url_for('admin.courses'))
             except Exception as e:
@@ -680,6 +676,9 @@ def search_and_import_courses():
                 print(f"Error adding course {course['title']}: {str(e)}")
     
     conn.commit()
+    if total_added:
+        bump_version(CATALOG, conn=conn)
+        queue_index_update(user_id=session.get('user_id'))
     conn.close()
     
     # Provide feedback
@@ -990,32 +989,21 @@ def validate_urls():
                 flash('Invalid course IDs format. Use comma-separated numbers.', 'error')
                 return redirect(url_for('admin.url_validation'))
         
-        # Filter by status if requested - temporarily disabled
-        if status_filter and status_filter != 'all':
-            # validator = CourseURLValidator()  # Temporarily disabled
-            # courses_to_validate = validator.get_courses_by_status(status_filter)
-            # course_ids = [course['id'] for course in courses_to_validate]
-            flash(f'Status filtering temporarily disabled. Validating all specified courses.', 'warning')
-            # if not course_ids:
-            #     flash(f'No courses found with status "{status_filter}".', 'info')
-            #     return redirect(url_for('admin.url_validation'))
-        
-        # Start validation in background thread - temporarily disabled
-        def run_validation():
-            try:
-                # validator = CourseURLValidator()  # Temporarily disabled
-                # stats = validator.validate_course_urls(
-                #     course_ids=course_ids,
-                #     max_courses=max_courses
-                # )
-                stats = {'validated': 0, 'errors': 0}  # Default stats
-                logger.info(f"URL validation temporarily disabled: {stats}")
-            except Exception as e:
-                logger.error(f"URL validation error: {e}")
+        # Queue validation on the background job engine
+        if not job_manager:
+            flash('Background job engine unavailable. Please try again later.', 'error')
+            return redirect(url_for('admin.url_validation'))
         
-        validation_thread = threading.Thread(target=run_validation)
-        validation_thread.daemon = True
-        validation_thread.start()
+        if status_filter == 'due':
+            # Budgeted, conditional recheck of the most overdue URLs
+            job_id = job_manager.submit('url_revalidation', {'budget': max_courses}, session.get('user_id'))
+        else:
+            job_id = job_manager.submit('url_validation', {
+                'course_ids': course_ids,
+                'max_courses': max_courses,
+                'status_filter': status_filter if status_filter and status_filter != 'all' else None
+            }, session.get('user_id'))
+        session['url_validation_job_id'] = job_id
         
         flash('URL validation started in background. Results will be updated automatically.', 'info')
         
@@ -1079,10 +1067,20 @@ def url_validation_status():
         total_checked = sum(info['count'] for status, info in summary.items() if status != 'unchecked')
         total_unchecked = summary.get('unchecked', {}).get('count', 0)
         
+        # Include progress of the most recent validation job, if any
+        validation_job = None
+        if job_manager:
+            job_id = session.get('url_validation_job_id')
+            validation_job = job_manager.get_job(job_id) if job_id else None
+            if not validation_job:
+                recent_jobs = job_manager.list_jobs(job_type='url_validation', limit=1)
+                validation_job = recent_jobs[0] if recent_jobs else None
+        
         return jsonify({
             'summary': summary,
             'total_checked': total_checked,
             'total_unchecked': total_unchecked,
+            'job': validation_job,
             'timestamp': datetime.now().isoformat()
         })
         
@@ -1104,16 +1102,14 @@ def populate_ai_courses():
                 'error': 'Fast course fetcher temporarily unavailable. Please add courses manually.'
             }), 503
         
-        # Generate unique fetch ID
-        fetch_id = str(uuid.uuid4())
-        
-        # Start background fetching
-        success = fetcher.start_fetch(fetch_id)
+        # Queue background fetching; the job ID doubles as the fetch ID
+        fetch_id = fetcher.start_fetch(session.get('user_id'))
         
-        if success:
+        if fetch_id:
             return jsonify({
                 'success': True,
                 'fetch_id': fetch_id,
+                'events_url': f'/admin/jobs/{fetch_id}/events',
                 'message': 'Course fetching started'
             })
         else:
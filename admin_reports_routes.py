@@ -5,19 +5,28 @@ Provides admin-only access to upload reports, detailed drilldown, and purging fu
 
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from datetime import datetime, timedelta
+import json
 import logging
 from upload_reports_manager import (
-    UploadReportsManager, get_upload_reports, get_report_details, 
-    purge_old_reports
+    UploadReportsManager, get_upload_reports,
+    purge_old_reports, parse_details_cursor
 )
 
 logger = logging.getLogger(__name__)
 
+# Row detail page sizes (reports can hold hundreds of thousands of rows)
+DETAILS_PAGE_SIZE = 100
+DETAILS_MAX_PAGE_SIZE = 500
+DETAIL_STATUSES = ('SUCCESS', 'ERROR', 'SKIPPED')
+
+# Keep interactive purges inside a normal request timeout; later clicks continue the work
+PURGE_REQUEST_TIME_BUDGET_SECONDS = 20
+
 # Create Blueprint
 admin_reports_bp = Blueprint('admin_reports', __name__, url_prefix='/admin/reports')
 
 def get_current_user():
-    """Get current user from g object (set by before_request handler)"""
+    """Get current user from g object (set by the before_request handler app.py adds)"""
     from flask import g
     return getattr(g, 'user', None)
 
@@ -34,7 +43,7 @@ def require_admin(f):
     def decorated_function(*args, **kwargs):
         if not is_admin():
             flash('Access denied. Admin privileges required.', 'error')
-            return redirect(url_for('dashboard.index'))
+            return redirect(url_for('dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -69,41 +78,79 @@ def upload_reports_list():
     except Exception as e:
         logger.error(f"Error loading upload reports: {e}")
         flash(f'Error loading upload reports: {str(e)}', 'error')
-        return redirect(url_for('admin.courses'))  # Fixed route name
+        return redirect(url_for('admin_courses'))
+
+def _details_page_args():
+    """Read status/cursor/limit query args shared by the details views"""
+    status = (request.args.get('status') or '').upper() or None
+    if status not in DETAIL_STATUSES:
+        status = None
+    after = parse_details_cursor(request.args.get('cursor'))
+    limit = request.args.get('limit', DETAILS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, DETAILS_MAX_PAGE_SIZE))
+    return status, after, limit
 
 @admin_reports_bp.route('/details/<int:report_id>')
 @require_admin
 def report_details(report_id):
-    """Detailed view of a specific upload report"""
+    """Detailed view of a specific upload report, one filtered page at a time"""
     try:
-        report_summary, row_details = get_report_details(report_id)
+        manager = UploadReportsManager()
+        report_summary = manager.get_report_summary(report_id)
         
         if not report_summary:
             flash('Upload report not found.', 'error')
             return redirect(url_for('admin_reports.upload_reports_list'))
         
-        # Organize row details by status for easier viewing
-        details_by_status = {
-            'SUCCESS': [],
-            'ERROR': [],
-            'SKIPPED': []
-        }
-        
-        for detail in row_details:
-            status = detail['status']
-            if status in details_by_status:
-                details_by_status[status].append(detail)
+        status_filter, after, limit = _details_page_args()
+        status_counts = manager.get_report_status_counts(report_id)
+        page = manager.get_report_details_page(report_id, status_filter, after, limit)
         
         return render_template('admin/upload_report_details.html',
                              report=report_summary,
-                             row_details=row_details,
-                             details_by_status=details_by_status)
+                             row_details=page['items'],
+                             status_counts=status_counts,
+                             status_filter=status_filter,
+                             next_cursor=page['next_cursor'],
+                             page_size=limit)
         
     except Exception as e:
         logger.error(f"Error loading report details for {report_id}: {e}")
         flash(f'Error loading report details: {str(e)}', 'error')
         return redirect(url_for('admin_reports.upload_reports_list'))
 
+@admin_reports_bp.route('/api/details/<int:report_id>')
+@require_admin
+def api_report_details(report_id):
+    """API endpoint returning one page of row details (?status=&cursor=&limit=)"""
+    try:
+        manager = UploadReportsManager()
+        report_summary = manager.get_report_summary(report_id)
+        if not report_summary:
+            return jsonify({'error': 'Upload report not found'}), 404
+        
+        status_filter, after, limit = _details_page_args()
+        page = manager.get_report_details_page(report_id, status_filter, after, limit)
+        
+        next_url = None
+        if page['next_cursor']:
+            next_url = url_for('admin_reports.api_report_details', report_id=report_id,
+                               status=status_filter, cursor=page['next_cursor'], limit=limit)
+        
+        report_summary['upload_timestamp'] = str(report_summary['upload_timestamp'])
+        return jsonify({
+            'report': report_summary,
+            'counts': manager.get_report_status_counts(report_id),
+            'status': status_filter,
+            'items': page['items'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'next_url': next_url
+        })
+    except Exception as e:
+        logger.error(f"Error getting report details page for {report_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @admin_reports_bp.route('/purge', methods=['POST'])
 @require_admin
 def purge_reports():
@@ -121,9 +168,11 @@ def purge_reports():
             return redirect(url_for('admin_reports.upload_reports_list'))
         
         # Perform purge
-        result = purge_old_reports(days_to_keep)
+        result = purge_old_reports(days_to_keep, time_budget_seconds=PURGE_REQUEST_TIME_BUDGET_SECONDS)
         
         flash(f"Purged {result['reports_purged']} reports and {result['details_purged']} detail records older than {days_to_keep} days.", 'success')
+        if not result['complete']:
+            flash(f"Purge paused after {PURGE_REQUEST_TIME_BUDGET_SECONDS}s with expired reports left. Run the purge again to continue.", 'info')
         
     except Exception as e:
         logger.error(f"Error purging reports: {e}")
@@ -153,7 +202,8 @@ def export_report(report_id):
         import csv
         from io import StringIO
         
-        report_summary, row_details = get_report_details(report_id)
+        manager = UploadReportsManager()
+        report_summary = manager.get_report_summary(report_id)
         
         if not report_summary:
             flash('Upload report not found.', 'error')
@@ -168,8 +218,8 @@ def export_report(report_id):
             'Row Number', 'Status', 'Course Title', 'Course URL', 'Message'
         ])
         
-        # Write row details
-        for detail in row_details:
+        # Write row details page by page
+        for detail in manager.iter_report_details(report_id):
             writer.writerow([
                 detail['row_number'],
                 detail['status'],
@@ -193,11 +243,35 @@ def export_report(report_id):
         flash(f'Error exporting report: {str(e)}', 'error')
         return redirect(url_for('admin_reports.report_details', report_id=report_id))
 
+@admin_reports_bp.route('/export/<int:report_id>/ndjson')
+@require_admin
+def export_report_ndjson(report_id):
+    """Stream every row detail as newline-delimited JSON without buffering the report"""
+    from flask import Response, stream_with_context
+    
+    manager = UploadReportsManager()
+    if not manager.get_report_summary(report_id):
+        flash('Upload report not found.', 'error')
+        return redirect(url_for('admin_reports.upload_reports_list'))
+    
+    status_filter, _, _ = _details_page_args()
+    
+    def generate():
+        for detail in manager.iter_report_details(report_id, status_filter):
+            yield json.dumps(detail) + '\n'
+    
+    filename = f"upload_report_{report_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 # Register error handlers
 @admin_reports_bp.errorhandler(403)
 def forbidden(error):
     flash('Admin access required.', 'error')
-    return redirect(url_for('auth.login'))  # Fixed route name
+    return redirect(url_for('login'))
 
 @admin_reports_bp.errorhandler(404)
 def not_found(error):
@@ -7,38 +7,107 @@ This module fetches top AI articles from trusted sources and stores them locally
 Designed to run weekly via scheduler and display in the frontend.
 
 Features:
-- Fetches from multiple trusted AI sources
+- Fetches from multiple trusted AI sources concurrently
+- Conditional GET (ETag / Last-Modified) so unchanged feeds are skipped
 - Filters articles from the past week
-- Stores top 10 articles in JSON format
+- Keeps article history in an indexed table and the top 10 in a JSON digest
 - No NLP processing - just clean fetching and storage
-- Handles rate limiting and error recovery
+- Handles per-domain rate limiting and error recovery
 """
 
 import requests
 import feedparser
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 import os
-from urllib.parse import urljoin
+import re
+import heapq
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 import time
 import hashlib
 
+from database_environment_manager import DatabaseEnvironmentManager
+from news_article_store import NewsArticleStore
+from news_dedup import NearDuplicateClusterer, collapse_near_duplicates
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Relevance weight per keyword: unambiguous AI terms count most, broad tech terms least
+DEFAULT_KEYWORD_WEIGHTS = {
+    'artificial intelligence': 3.0, 'machine learning': 3.0, 'deep learning': 3.0,
+    'neural network': 3.0, 'neural networks': 3.0, 'generative ai': 3.0,
+    'large language model': 3.0, 'large language models': 3.0, 'llm': 3.0, 'llms': 3.0,
+    'chatgpt': 2.5, 'openai': 2.5, 'microsoft copilot': 2.5, 'natural language processing': 2.5,
+    'computer vision': 2.0, 'ai': 2.0, 'nlp': 2.0, 'copilot': 1.5, 'cognitive computing': 1.5,
+    'ml': 1.0, 'transformer': 1.0, 'robotics': 1.0, 'data science': 1.0,
+    'automation': 0.5, 'algorithm': 0.5
+}
+
+# Keywords in the title count this many times their weight
+TITLE_WEIGHT = 2.0
+
+
+class KeywordMatcher:
+    """
+    All keywords compiled into one case-insensitive, word-bounded regex
+    A single scan of the text yields every matched keyword, so 'ai' no longer
+    matches inside words like 'email' or 'training'.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = {keyword.lower(): weight for keyword, weight in weights.items()}
+        # Longest first so 'generative ai' wins over 'ai' at the same position
+        alternatives = sorted(self.weights, key=len, reverse=True)
+        pattern = '|'.join(r'\s+'.join(map(re.escape, keyword.split())) for keyword in alternatives)
+        self.regex = re.compile(rf'\b(?:{pattern})\b', re.IGNORECASE)
+
+    def matches(self, text: str) -> set:
+        """Distinct keywords found in the text"""
+        return {' '.join(match.lower().split()) for match in self.regex.findall(text or '')}
+
+    def score(self, title: str, description: str = '') -> float:
+        """Weighted relevance: each distinct keyword counts once, title hits count more"""
+        title_hits = self.matches(title)
+        description_hits = self.matches(description) - title_hits
+        return (sum(self.weights[k] for k in title_hits) * TITLE_WEIGHT
+                + sum(self.weights[k] for k in description_hits))
+
+
 class AINewsFetcher:
     """Fetches and stores AI news articles from trusted RSS sources"""
     
-    def __init__(self, storage_file: str = "ai_articles.json"):
+    def __init__(self, storage_file: str = "ai_articles.json", keyword_weights: Dict[str, float] = None):
         self.storage_file = storage_file
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
+        # Concurrency: a bounded pool overall, and per domain a cap on in-flight
+        # requests plus a minimum gap between request starts
+        self.max_workers = int(os.environ.get('NEWS_FETCH_CONCURRENCY', 8))
+        self.per_domain_limit = int(os.environ.get('NEWS_FETCH_PER_DOMAIN', 1))
+        self.domain_interval = float(os.environ.get('NEWS_FETCH_DOMAIN_INTERVAL_SECONDS', 1.0))
+        self.request_timeout = float(os.environ.get('NEWS_FETCH_TIMEOUT_SECONDS', 20))
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.per_domain_limit)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._domain_gates: Dict[str, Dict[str, Any]] = {}
+        self._domain_lock = threading.Lock()
+        self.last_run_stats: Dict[str, Dict[str, Any]] = {}
+        
+        # Article history; the JSON digest is derived from it
+        self.store = NewsArticleStore()
+        self.clusterer = NearDuplicateClusterer()
+        self._digest_cache = None  # ((mtime_ns, size), parsed digest)
+        
         # Trusted AI news sources with RSS feeds
         self.rss_sources = [
             {
@@ -83,143 +152,271 @@ class AINewsFetcher:
             }
         ]
         
-        # Keywords for AI relevance (simple filtering)
-        self.ai_keywords = [
-            'artificial intelligence', 'ai', 'machine learning', 'ml', 'deep learning',
-            'neural network', 'chatgpt', 'openai', 'microsoft copilot', 'copilot',
-            'generative ai', 'large language model', 'llm', 'transformer',
-            'computer vision', 'nlp', 'natural language processing', 'robotics',
-            'automation', 'cognitive computing', 'data science', 'algorithm'
-        ]
+        # Weighted keywords for AI relevance; articles scoring below the minimum are dropped
+        self.keyword_weights = keyword_weights or DEFAULT_KEYWORD_WEIGHTS
+        self.matcher = KeywordMatcher(self.keyword_weights)
+        self.min_relevance = float(os.environ.get('NEWS_MIN_RELEVANCE', 2.0))
 
-    def _rate_limit(self, delay: float = 1.0):
-        """Simple rate limiting between requests"""
-        time.sleep(delay)
-
-    def _is_recent(self, published_date: str, days_back: int = 7) -> bool:
-        """Check if article is from the past week"""
+    def _published_timestamp(self, published_date) -> Optional[float]:
+        """Epoch seconds for a feed date (struct_time, its JSON list form, or a string)"""
         try:
             if not published_date:
-                return False
-                
+                return None
             # Parse the date (feedparser usually provides struct_time)
-            if hasattr(published_date, 'tm_year'):
-                article_date = datetime(*published_date[:6])
-            else:
-                # Try to parse string date
-                from dateutil import parser
-                article_date = parser.parse(published_date)
-            
-            cutoff_date = datetime.now() - timedelta(days=days_back)
-            return article_date >= cutoff_date
-            
+            if hasattr(published_date, 'tm_year') or isinstance(published_date, (list, tuple)):
+                return datetime(*published_date[:6]).timestamp()
+            # Try to parse string date
+            from dateutil import parser
+            return parser.parse(published_date).timestamp()
         except Exception as e:
             logger.debug(f"Date parsing error: {e}")
+            return None
+
+    def _is_recent(self, published_date, days_back: int = 7) -> bool:
+        """Check if article is from the past week"""
+        if not published_date:
+            return False
+        timestamp = self._published_timestamp(published_date)
+        if timestamp is None:
             # If we can't parse the date, include the article (better safe than sorry)
             return True
+        return timestamp >= time.time() - days_back * 86400
+
+    def _relevance_score(self, title: str, description: str = "") -> float:
+        """Weighted AI relevance of an article"""
+        return self.matcher.score(title, description)
 
     def _is_ai_relevant(self, title: str, description: str = "") -> bool:
         """Check if article is AI-related using keyword matching"""
-        text_to_check = f"{title} {description}".lower()
-        return any(keyword in text_to_check for keyword in self.ai_keywords)
+        return self._relevance_score(title, description) >= self.min_relevance
 
     def _generate_article_id(self, title: str, link: str) -> str:
         """Generate unique ID for article to avoid duplicates"""
         content = f"{title}{link}"
         return hashlib.md5(content.encode()).hexdigest()[:12]
 
-    def fetch_from_source(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Fetch articles from a single RSS source"""
+    def _domain_gate(self, url: str) -> Dict[str, Any]:
+        """Per-domain semaphore and request spacing shared by all fetch threads"""
+        domain = urlparse(url).netloc.lower()
+        with self._domain_lock:
+            gate = self._domain_gates.get(domain)
+            if gate is None:
+                gate = {'semaphore': threading.Semaphore(self.per_domain_limit),
+                        'lock': threading.Lock(), 'next_start': 0.0}
+                self._domain_gates[domain] = gate
+            return gate
+
+    def _request_feed(self, url: str, validators: Dict[str, Any]) -> requests.Response:
+        """GET a feed within its domain's limits, sending any stored validators"""
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        gate = self._domain_gate(url)
+        with gate['semaphore']:
+            with gate['lock']:
+                wait_for = gate['next_start'] - time.monotonic()
+                gate['next_start'] = max(gate['next_start'], time.monotonic()) + self.domain_interval
+            if wait_for > 0:
+                time.sleep(wait_for)
+            return self.session.get(url, headers=headers, timeout=self.request_timeout)
+
+    def _parse_entries(self, feed, source: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Recent, AI-relevant articles from a parsed feed"""
         articles = []
-        
+        for entry in feed.entries:
+            try:
+                # Extract article data
+                title = entry.get('title', 'No Title')
+                link = entry.get('link', '')
+                description = entry.get('description', '') or entry.get('summary', '')
+                published = entry.get('published_parsed', None)
+                author = entry.get('author', '')
+                
+                # Skip if no title or link
+                if not title or not link:
+                    continue
+                
+                # Check if article is recent (past week)
+                if not self._is_recent(published, days_back=7):
+                    logger.debug(f"Skipping old article: {title[:50]}...")
+                    continue
+                
+                # Check if article is AI-relevant
+                score = self._relevance_score(title, description)
+                if score < self.min_relevance:
+                    logger.debug(f"Skipping non-AI article: {title[:50]}...")
+                    continue
+                
+                # Create article object
+                article = {
+                    'id': self._generate_article_id(title, link),
+                    'title': title[:200],  # Limit title length
+                    'link': link,
+                    'description': description[:500] if description else '',  # Limit description
+                    'source': source['name'],
+                    'author': author,
+                    'published': published,
+                    'published_str': entry.get('published', ''),
+                    'published_ts': self._published_timestamp(published),
+                    'priority': source['priority'],
+                    'score': round(score, 2),
+                    'fetched_at': datetime.now().isoformat()
+                }
+                
+                articles.append(article)
+                logger.debug(f"✅ Added: {title[:50]}...")
+                
+            except Exception as e:
+                logger.error(f"❌ Error processing entry from {source['name']}: {e}")
+                continue
+        return articles
+
+    def _fetch_feed(self, source: Dict[str, Any], validators: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Fetch one feed with a conditional GET
+        Returns status 'ok', 'not_modified' or 'error' with the feed's articles
+        and the validators to send next time.
+        """
+        validators = validators or {}
+        started = time.monotonic()
+        result = {'status': 'error', 'articles': [], 'entries': 0, 'error': None,
+                  'etag': validators.get('etag'), 'last_modified': validators.get('last_modified')}
         try:
             logger.info(f"🔍 Fetching from {source['name']}...")
+            response = self._request_feed(source['url'], validators)
             
-            # Add rate limiting
-            self._rate_limit(1.0)
+            if response.status_code == 304:
+                logger.info(f"⏭️ {source['name']} unchanged since last fetch (304)")
+                result['status'] = 'not_modified'
+                return result
+            response.raise_for_status()
             
             # Parse RSS feed
-            feed = feedparser.parse(source['url'])
+            feed = feedparser.parse(response.content)
             
             if feed.bozo:
                 logger.warning(f"⚠️  RSS parsing warning for {source['name']}: {feed.bozo_exception}")
             
             logger.info(f"📰 Found {len(feed.entries)} entries from {source['name']}")
-            
-            for entry in feed.entries:
-                try:
-                    # Extract article data
-                    title = entry.get('title', 'No Title')
-                    link = entry.get('link', '')
-                    description = entry.get('description', '') or entry.get('summary', '')
-                    published = entry.get('published_parsed', None)
-                    author = entry.get('author', '')
-                    
-                    # Skip if no title or link
-                    if not title or not link:
-                        continue
-                    
-                    # Check if article is recent (past week)
-                    if not self._is_recent(published, days_back=7):
-                        logger.debug(f"Skipping old article: {title[:50]}...")
-                        continue
-                    
-                    # Check if article is AI-relevant
-                    if not self._is_ai_relevant(title, description):
-                        logger.debug(f"Skipping non-AI article: {title[:50]}...")
-                        continue
-                    
-                    # Create article object
-                    article = {
-                        'id': self._generate_article_id(title, link),
-                        'title': title[:200],  # Limit title length
-                        'link': link,
-                        'description': description[:500] if description else '',  # Limit description
-                        'source': source['name'],
-                        'author': author,
-                        'published': published,
-                        'published_str': entry.get('published', ''),
-                        'priority': source['priority'],
-                        'fetched_at': datetime.now().isoformat()
-                    }
-                    
-                    articles.append(article)
-                    logger.debug(f"✅ Added: {title[:50]}...")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error processing entry from {source['name']}: {e}")
-                    continue
-            
-            logger.info(f"✅ Successfully fetched {len(articles)} AI articles from {source['name']}")
+            result.update({
+                'status': 'ok',
+                'articles': self._parse_entries(feed, source),
+                'entries': len(feed.entries),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            })
+            logger.info(f"✅ Successfully fetched {len(result['articles'])} AI articles from {source['name']}")
             
         except Exception as e:
+            result['error'] = str(e)
             logger.error(f"❌ Error fetching from {source['name']}: {e}")
+        finally:
+            result['seconds'] = round(time.monotonic() - started, 3)
         
-        return articles
+        return result
+
+    def fetch_from_source(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch articles from a single RSS source (unconditionally)"""
+        return self._fetch_feed(source)['articles']
+
+    def _load_feed_state(self) -> Dict[str, Dict[str, Any]]:
+        """Stored validators for every feed, keyed by URL"""
+        try:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            try:
+                db.ensure_tables('news_feed_state')
+                cursor = db.connection.cursor()
+                cursor.execute("SELECT feed_url, etag, last_modified FROM news_feed_state")
+                return {url: {'etag': etag, 'last_modified': last_modified}
+                        for url, etag, last_modified in cursor.fetchall()}
+            finally:
+                db.disconnect()
+        except Exception as e:
+            logger.warning(f"⚠️  Feed state unavailable, fetching every feed in full: {e}")
+            return {}
+
+    def _save_feed_state(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """Store validators for feeds that returned new content"""
+        rows = [(url, r['etag'], r['last_modified'], r['status'], r['entries'], datetime.now().isoformat())
+                for url, r in results.items() if r['status'] == 'ok']
+        if not rows:
+            return
+        try:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            try:
+                cursor = db.connection.cursor()
+                if db.is_azure_sql():
+                    cursor.executemany('''
+                        MERGE news_feed_state AS target
+                        USING (SELECT ? AS feed_url, ? AS etag, ? AS last_modified, ? AS last_status,
+                                      ? AS entry_count, ? AS last_fetched) AS source
+                        ON target.feed_url = source.feed_url
+                        WHEN MATCHED THEN UPDATE SET
+                            etag = source.etag, last_modified = source.last_modified,
+                            last_status = source.last_status, entry_count = source.entry_count,
+                            last_fetched = source.last_fetched
+                        WHEN NOT MATCHED THEN INSERT
+                            (feed_url, etag, last_modified, last_status, entry_count, last_fetched)
+                        VALUES (source.feed_url, source.etag, source.last_modified, source.last_status,
+                                source.entry_count, source.last_fetched);
+                    ''', rows)
+                else:
+                    cursor.executemany('''
+                        INSERT INTO news_feed_state
+                            (feed_url, etag, last_modified, last_status, entry_count, last_fetched)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(feed_url) DO UPDATE SET
+                            etag = excluded.etag, last_modified = excluded.last_modified,
+                            last_status = excluded.last_status, entry_count = excluded.entry_count,
+                            last_fetched = excluded.last_fetched
+                    ''', rows)
+                db.connection.commit()
+            finally:
+                db.disconnect()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not save feed state: {e}")
 
     def fetch_all_articles(self) -> List[Dict[str, Any]]:
-        """Fetch articles from all RSS sources"""
+        """
+        Fetch articles from all RSS sources concurrently
+        A run takes roughly as long as the slowest feed. New content is merged
+        into the article store; feeds answering 304 reuse their stored articles.
+        """
         logger.info("🚀 Starting AI news fetch from all sources...")
+        started = time.monotonic()
         
-        all_articles = []
+        state = self._load_feed_state()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.rss_sources))),
+                                thread_name_prefix='news-fetch') as executor:
+            futures = {source['url']: executor.submit(self._fetch_feed, source, state.get(source['url']))
+                       for source in self.rss_sources}
+            results = {url: future.result() for url, future in futures.items()}
+        
+        # Articles are stored before the validators that let later runs skip their feed
+        self.store.add_articles(a for r in results.values() if r['status'] == 'ok' for a in r['articles'])
+        self._save_feed_state(results)
         
+        all_articles = []
         for source in self.rss_sources:
-            try:
-                articles = self.fetch_from_source(source)
-                all_articles.extend(articles)
-                
-                # Rate limiting between sources
-                self._rate_limit(2.0)
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to fetch from {source['name']}: {e}")
-                continue
+            result = results[source['url']]
+            if result['status'] == 'not_modified':
+                result['articles'] = self.store.recent_by_source(source['name'], days=7)
+            all_articles.extend(result['articles'])
+
+        self.last_run_stats = {source['name']: {k: results[source['url']][k]
+                                                for k in ('status', 'entries', 'seconds', 'error')}
+                               for source in self.rss_sources}
         
-        logger.info(f"📊 Total articles fetched: {len(all_articles)}")
+        logger.info(f"📊 Total articles fetched: {len(all_articles)} in {time.monotonic() - started:.2f}s")
         return all_articles
 
     def select_top_articles(self, articles: List[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
-        """Select top articles based on priority and recency"""
+        """Select top articles based on relevance score, priority and recency"""
         
         # Remove duplicates based on article ID
         unique_articles = {}
@@ -231,25 +428,22 @@ class AINewsFetcher:
         articles = list(unique_articles.values())
         logger.info(f"📊 After deduplication: {len(articles)} unique articles")
         
-        # Sort by priority (lower number = higher priority) and then by date
-        def sort_key(article):
-            priority = article.get('priority', 5)
-            # Convert published time to sortable format
-            try:
-                if article.get('published'):
-                    if hasattr(article['published'], 'tm_year'):
-                        pub_date = datetime(*article['published'][:6])
-                    else:
-                        from dateutil import parser
-                        pub_date = parser.parse(article['published_str'])
-                    return (priority, -pub_date.timestamp())  # Negative for reverse chronological
-                else:
-                    return (priority, 0)
-            except:
-                return (priority, 0)
+        # Collapse the same story from several outlets into its highest-priority report
+        articles = collapse_near_duplicates(articles, clusterer=self.clusterer)
         
-        sorted_articles = sorted(articles, key=sort_key)
-        top_articles = sorted_articles[:limit]
+        # Rank by relevance score, then priority (lower number = higher priority), then
+        # newest first. Timestamps are resolved once per article, not per comparison.
+        def rank(article):
+            timestamp = article.get('published_ts')
+            if timestamp is None:
+                timestamp = self._published_timestamp(article.get('published') or article.get('published_str'))
+            score = article.get('score')
+            if score is None:
+                score = self._relevance_score(article.get('title', ''), article.get('description', ''))
+            return (-score, article.get('priority', 5), -(timestamp or 0))
+        
+        ranked = [(rank(article), index, article) for index, article in enumerate(articles)]
+        top_articles = [article for _, _, article in heapq.nsmallest(limit, ranked)]
         
         logger.info(f"🎯 Selected top {len(top_articles)} articles")
         
@@ -260,30 +454,27 @@ class AINewsFetcher:
         return top_articles
 
     def save_articles(self, articles: List[Dict[str, Any]]):
-        """Save articles to JSON file"""
+        """Save the digest JSON file, rewriting it only when its content changed"""
         try:
-            # Prepare data for storage
-            storage_data = {
-                'last_updated': datetime.now().isoformat(),
-                'article_count': len(articles),
-                'articles': articles
-            }
-            
-            # Write to JSON file
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(storage_data, f, indent=2, ensure_ascii=False, default=str)
-            
-            logger.info(f"💾 Saved {len(articles)} articles to {self.storage_file}")
+            if self.store.write_digest(self.storage_file, articles):
+                logger.info(f"💾 Saved {len(articles)} articles to {self.storage_file}")
+            else:
+                logger.info(f"⏭️ {self.storage_file} already up to date")
             
         except Exception as e:
             logger.error(f"❌ Error saving articles: {e}")
 
     def load_articles(self) -> Dict[str, Any]:
-        """Load articles from JSON file"""
+        """Load the digest JSON file, re-parsing it only after it changes on disk"""
         try:
             if os.path.exists(self.storage_file):
+                stat = os.stat(self.storage_file)
+                key = (stat.st_mtime_ns, stat.st_size)
+                if self._digest_cache and self._digest_cache[0] == key:
+                    return self._digest_cache[1]
                 with open(self.storage_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
+                self._digest_cache = (key, data)
                 logger.info(f"📖 Loaded {data.get('article_count', 0)} articles from storage")
                 return data
             else:
@@ -306,8 +497,11 @@ class AINewsFetcher:
                 logger.warning("⚠️  No articles fetched from any source")
                 return {'success': False, 'message': 'No articles fetched', 'articles': []}
             
-            # Select top articles
-            top_articles = self.select_top_articles(all_articles, limit=limit)
+            # Apply the retention window (NEWS_RETENTION_DAYS, off by default)
+            self.store.trim_expired()
+            
+            # Select top articles of the week from the indexed store, one per story
+            top_articles = self.select_top_articles(self.store.top_articles(limit=None, days=7), limit=limit)
             
             # Save to storage
             self.save_articles(top_articles)
@@ -19,6 +19,10 @@ from collections import defaultdict
 import re
 import logging
 import traceback
+import importlib
+from cache_versions import CATALOG, LEARNINGS, LEARNINGS_GLOBAL, bump_completions, bump_version, learning_keys
+from course_catalog_cache import catalog_cache
+from learning_tags import inserted_id, tag_index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -114,13 +118,6 @@ def is_azure_sql():
     
     return all([azure_server, azure_database, azure_username, azure_password])
 
-def is_azure_non_admin(user):
-    """True only for Azure SQL + signed-in non-admin (excluding username=='admin')."""
-    try:
-        return is_azure_sql() and user and not bool(user.get('is_admin')) and user.get('username') != 'admin'
-    except Exception:
-        return False
-
 def detect_db_kind(conn=None):
     """
     Detect database kind for compatibility handling.
@@ -977,42 +974,14 @@ def dashboard():
             LIMIT 5
         ''', (user['id'],)).fetchall()
         
-        # Get courses for current level
-        # Safe fallback: prefer 'courses'; only use 'courses_app' if it exists
-        def _has_table(c, table_name):
-            try:
-                if is_azure_sql():
-                    row = c.execute("""
-                        SELECT COUNT(*)
-                        FROM INFORMATION_SCHEMA.TABLES
-                        WHERE TABLE_NAME = ?
-                    """, (table_name,)).fetchone()
-                    return bool(row[0]) if row else False
-                else:
-                    row = c.execute("""
-                        SELECT name FROM sqlite_master
-                        WHERE type='table' AND name=?
-                    """, (table_name,)).fetchone()
-                    return row is not None
-            except Exception:
-                return False
-
-        courses_table = 'courses'
-        if is_azure_sql() and _has_table(conn, 'courses_app'):
-            courses_table = 'courses_app'
-        
-        all_courses = conn.execute(f'''
-            SELECT c.*, COALESCE(uc.completed, 0) as completed 
-            FROM {courses_table} c 
-            LEFT JOIN user_courses uc ON c.id = uc.course_id AND uc.user_id = ?
-            WHERE c.level = ? 
-            ORDER BY c.created_at DESC 
-            LIMIT 10
-        ''', (user['id'], current_level)).fetchall()
-        
-        # Separate completed and available courses
-        completed_courses = [course for course in all_courses if course['completed']]
-        available_courses = [course for course in all_courses if not course['completed']]
+        # Newest courses at the user's level from the catalog snapshot, split by the user's completions
+        level_courses = list(catalog_cache.snapshot(conn).at_level(current_level)[:10])
+        completed_ids = {row['course_id'] for row in conn.execute(
+            'SELECT course_id FROM user_courses WHERE user_id = ? AND completed = 1',
+            (user['id'],)
+        ).fetchall()}
+        completed_courses = [course for course in level_courses if course['id'] in completed_ids]
+        available_courses = [course for course in level_courses if course['id'] not in completed_ids]
         
         return render_template('dashboard/index.html',
                              current_level=current_level,
@@ -1027,29 +996,38 @@ def dashboard():
 # User Learning Routes
 @app.route('/learnings')
 def learnings():
-    """Learning entries page"""
+    """Learning entries page: the user's own entries and global entries, newest first"""
     user = get_current_user()
     if not user:
         return redirect(url_for('login'))
     
-    # Get user's learning entries
+    # Keyset cursor: the (sort time, id) of the last entry on the previous page;
+    # the sort time is date_added, or created_at on Azure SQL (see learning_feed)
+    before = request.args.get('before')
+    before_id = request.args.get('before_id', type=int)
+    cursor = (before, before_id) if before and before_id is not None else None
+    
+    # Optional tag filter (links from the tag cloud and the entry badges) or ranked text search
+    tag = request.args.get('tag', '').strip()
+    search_query = request.args.get('q', '').strip()
+    search_page = max(1, request.args.get('page', 1, type=int))
+    
+    from learning_feed import learning_feed
+    from learning_search import learning_search
+    from learning_tags import tag_index
     conn = get_db_connection()
     try:
-        # Use created_at ordering specifically for Azure non-admin users
-        if is_azure_non_admin(user):
-            entries = conn.execute('''
-                SELECT * FROM learning_entries 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC
-            ''', (user['id'],)).fetchall()
+        next_cursor, has_more_results = None, False
+        if search_query:
+            entries, has_more_results = learning_search.search(user['id'], search_query, search_page, conn=conn)
+        elif tag:
+            entries, next_cursor = tag_index.tagged_page(user['id'], tag, cursor, conn=conn)
         else:
-            # Preserve original ordering for local/admin users
-            entries = conn.execute('''
-                SELECT * FROM learning_entries 
-                WHERE user_id = ? 
-                ORDER BY date_added DESC
-            ''', (user['id'],)).fetchall()
-        return render_template('learnings/index.html', entries=entries)
+            entries, next_cursor = learning_feed.page(user['id'], cursor, conn=conn)
+        tag_cloud = tag_index.tag_counts(user['id'], conn=conn)
+        return render_template('learnings/index.html', entries=entries, next_cursor=next_cursor,
+                               active_tag=tag, tag_cloud=tag_cloud, search_query=search_query,
+                               search_page=search_page, has_more_results=has_more_results)
     finally:
         conn.close()
 
@@ -1070,11 +1048,13 @@ def add_learning():
         if title:
             conn = get_db_connection()
             try:
-                conn.execute('''
+                cursor = conn.execute('''
                     INSERT INTO learning_entries (user_id, title, description, tags, custom_date, is_global)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (user['id'], title, description, tags, custom_date, is_global))
                 conn.commit()
+                tag_index.sync_entry(conn, inserted_id(conn, cursor))
+                bump_version(*learning_keys(is_global), conn=conn)
                 flash('Learning entry added successfully!', 'success')
                 return redirect(url_for('learnings'))
             finally:
@@ -1084,6 +1064,34 @@ def add_learning():
     
     return render_template('learnings/add.html')
 
+def uncompleted_courses(conn, user_id, level=None, page=1, per_page=None):
+    """Catalog courses the user has not completed, newest first, from the catalog bitmap index"""
+    from course_catalog_index import catalog_index
+    courses, _ = catalog_index.uncompleted_courses(user_id, level, page, per_page, conn=conn)
+    return courses
+
+def user_completed_courses(conn, user_id, date_filter=''):
+    """
+    The user's completed courses, latest completion first
+    Only user_courses is queried; course fields are copied from the catalog snapshot.
+    """
+    query = 'SELECT course_id, completed, completion_date FROM user_courses WHERE user_id = ? AND completed = 1'
+    if date_filter == 'today':
+        query += ' AND CONVERT(date, completion_date) = CONVERT(date, GETDATE())' if is_azure_sql() else ' AND DATE(completion_date) = DATE("now")'
+    elif date_filter == 'week':
+        query += ' AND completion_date >= DATEADD(day, -7, GETDATE())' if is_azure_sql() else ' AND DATE(completion_date) >= DATE("now", "-7 days")'
+    elif date_filter == 'month':
+        query += ' AND completion_date >= DATEADD(day, -30, GETDATE())' if is_azure_sql() else ' AND DATE(completion_date) >= DATE("now", "-30 days")'
+    query += ' ORDER BY completion_date DESC'
+    
+    completions = conn.execute(query, (user_id,)).fetchall()
+    courses = list(catalog_cache.snapshot(conn).rows_for_ids([row['course_id'] for row in completions]))
+    completion_of = {row['course_id']: row for row in completions}
+    for course in courses:
+        course['completed'] = completion_of[course['id']]['completed']
+        course['completion_date'] = completion_of[course['id']]['completion_date']
+    return courses
+
 @app.route('/my-courses')
 def my_courses():
     """My courses page - shows completed courses and recommended courses"""
@@ -1099,99 +1107,24 @@ def my_courses():
     
     conn = get_db_connection()
     try:
-        if is_azure_non_admin(user):
-            # Azure non-admin users: Use optimized UNION ALL query
-            user_level = user.get('level', 'Beginner')
-            
-            # Build UNION ALL query
-            union_query = '''
-                SELECT c.*, uc.completed, uc.completion_date, 'completed' as course_type
-                FROM courses c 
-                INNER JOIN user_courses uc ON c.id = uc.course_id AND uc.user_id = ? AND uc.completed = 1
-            '''
-            union_params = [user['id']]
-            
-            # Apply search filter to completed courses
-            if search_query:
-                union_query += ' AND (c.title LIKE ? OR c.description LIKE ?)'
-                union_params.extend([f'%{search_query}%', f'%{search_query}%'])
-            
-            # Date filtering for completed courses
-            if date_filter:
-                if date_filter == 'today':
-                    union_query += ' AND CONVERT(date, uc.completion_date) = CONVERT(date, GETDATE())' if is_azure_sql() else ' AND DATE(uc.completion_date) = DATE("now")'
-                elif date_filter == 'week':
-                    union_query += ' AND uc.completion_date >= DATEADD(day, -7, GETDATE())' if is_azure_sql() else ' AND DATE(uc.completion_date) >= DATE("now", "-7 days")'
-                elif date_filter == 'month':
-                    union_query += ' AND uc.completion_date >= DATEADD(day, -30, GETDATE())' if is_azure_sql() else ' AND DATE(uc.completion_date) >= DATE("now", "-30 days")'
-            
-            union_query += '''
-                UNION ALL
-                SELECT c.*, COALESCE(uc.completed, 0) as completed, NULL as completion_date, 'recommended' as course_type
-                FROM courses c 
-                LEFT JOIN user_courses uc ON c.id = uc.course_id AND uc.user_id = ?
-                WHERE (uc.completed IS NULL OR uc.completed = 0)
-            '''
-            union_params.append(user['id'])
-            
-            # Apply search filter to recommended courses
-            if search_query:
-                union_query += ' AND (c.title LIKE ? OR c.description LIKE ?)'
-                union_params.extend([f'%{search_query}%', f'%{search_query}%'])
-            
-            union_query += ' ORDER BY course_type, completion_date DESC, created_at DESC'
-            
-            # Execute unified query
-            all_courses = conn.execute(union_query, union_params).fetchall()
-            
-            # Separate results by course_type
-            completed_courses = [course for course in all_courses if course['course_type'] == 'completed']
-            recommended_courses = [course for course in all_courses if course['course_type'] == 'recommended']
-            
+        # Course fields come from the catalog snapshot; only the user's completions are queried
+        completed_courses = user_completed_courses(conn, user['id'], date_filter)
+        if search_query:
+            # Matches are cached for all users; the user's completions are applied afterwards
+            from course_catalog_index import catalog_index
+            from course_search_cache import search_cache
+            snapshot = catalog_cache.snapshot(conn)
+            matching_ids = set(search_cache.select(snapshot, search=search_query).ids())
+            completed_courses = [course for course in completed_courses if course['id'] in matching_ids]
+            # The level filter applies to recommendations, as without a search
+            matching = search_cache.select(snapshot, search=search_query, level=level_filter)
+            recommended_courses = list(catalog_index.uncompleted_rows(user['id'], matching, conn=conn))
         else:
-            # Preserve original code path for local/admin users
-            # Base query for completed courses
-            completed_query = '''
-                SELECT c.*, uc.completed, uc.completion_date, 'system' as course_type
-                FROM courses c 
-                INNER JOIN user_courses uc ON c.id = uc.course_id AND uc.user_id = ? AND uc.completed = 1
-            '''
-            completed_params = [user['id']]
-            
-            # Apply filters to completed courses
-            if search_query:
-                completed_query += ' AND (c.title LIKE ? OR c.description LIKE ?)'
-                completed_params.extend([f'%{search_query}%', f'%{search_query}%'])
-            
-            # Date filtering for completed courses
-            if date_filter:
-                if date_filter == 'today':
-                    completed_query += ' AND DATE(uc.completion_date) = DATE("now")'
-                elif date_filter == 'week':
-                    completed_query += ' AND DATE(uc.completion_date) >= DATE("now", "-7 days")'
-                elif date_filter == 'month':
-                    completed_query += ' AND DATE(uc.completion_date) >= DATE("now", "-30 days")'
-            
-            completed_query += ' ORDER BY uc.completion_date DESC'
-            completed_courses = conn.execute(completed_query, completed_params).fetchall()
-            
-            # Base query for recommended courses
-            user_level = user.get('level', 'Beginner')
-            recommended_query = '''
-                SELECT c.*, COALESCE(uc.completed, 0) as completed, 'recommended' as course_type
-                FROM courses c 
-                LEFT JOIN user_courses uc ON c.id = uc.course_id AND uc.user_id = ?
-                WHERE (uc.completed IS NULL OR uc.completed = 0)
-            '''
-            recommended_params = [user['id']]
-            
-            # Apply search filter to recommended courses
-            if search_query:
-                recommended_query += ' AND (c.title LIKE ? OR c.description LIKE ?)'
-                recommended_params.extend([f'%{search_query}%', f'%{search_query}%'])
-            
-            recommended_query += ' ORDER BY c.created_at DESC'
-            recommended_courses = conn.execute(recommended_query, recommended_params).fetchall()
+            recommended_courses = uncompleted_courses(conn, user['id'], level_filter)
+        
+        # Courses most similar to what the user completed come first, newest after that
+        from course_recommender import recommender
+        recommended_courses = recommender.rank_courses(user['id'], recommended_courses, conn=conn)
         
         # Get available filter options
         providers = []
@@ -1211,6 +1144,64 @@ def my_courses():
     finally:
         conn.close()
 
+@app.route('/api/my-courses/uncompleted')
+def api_uncompleted_courses():
+    """One page of the courses the user has not completed, optionally at one level (JSON)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Login required'}), 401
+    
+    level = request.args.get('level') or None
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    
+    from course_catalog_index import catalog_index
+    conn = get_db_connection()
+    try:
+        courses, total = catalog_index.uncompleted_courses(user['id'], level, page, per_page, conn=conn)
+        return jsonify({
+            'success': True,
+            'courses': [{key: course.get(key) for key in ('id', 'title', 'source', 'level', 'link', 'url', 'points')}
+                        for course in courses],
+            'page': page,
+            'per_page': per_page,
+            'total': total
+        })
+    finally:
+        conn.close()
+
+@app.route('/api/recommendations')
+def api_recommendations():
+    """Courses recommended for the current user from what they have completed (JSON)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Login required'}), 401
+
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    from course_recommender import recommender
+    return jsonify({'success': True, 'courses': recommender.recommended_courses(user['id'], limit)})
+
+@app.route('/api/courses/autocomplete')
+def api_course_autocomplete():
+    """Typeahead suggestions (titles, providers, categories) for the course search boxes (JSON)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Login required'}), 401
+
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+
+    from course_autocomplete import course_autocomplete
+    conn = get_db_connection()
+    try:
+        return jsonify({
+            'success': True,
+            'query': query,
+            'suggestions': course_autocomplete.complete(query, limit, conn=conn)
+        })
+    finally:
+        conn.close()
+
 @app.route('/profile', methods=['GET', 'POST'])
 def profile():
     """User profile page"""
@@ -1365,21 +1356,9 @@ def export_courses(course_type):
     conn = get_db_connection()
     try:
         if course_type == 'completed':
-            courses = conn.execute('''
-                SELECT c.*, uc.completion_date
-                FROM courses c 
-                INNER JOIN user_courses uc ON c.id = uc.course_id 
-                WHERE uc.user_id = ? AND uc.completed = 1
-                ORDER BY uc.completion_date DESC
-            ''', (user['id'],)).fetchall()
+            courses = user_completed_courses(conn, user['id'])
         else:
-            courses = conn.execute('''
-                SELECT c.*
-                FROM courses c 
-                LEFT JOIN user_courses uc ON c.id = uc.course_id AND uc.user_id = ?
-                WHERE uc.completed IS NULL OR uc.completed = 0
-                ORDER BY c.created_at DESC
-            ''', (user['id'],)).fetchall()
+            courses = uncompleted_courses(conn, user['id'], request.args.get('level') or None)
         
         # Create CSV response
         import io
@@ -1395,7 +1374,7 @@ def export_courses(course_type):
                 writer.writerow([
                     course['title'],
                     course['description'] or '',
-                    course['provider'] or '',
+                    course.get('source') or '',
                     course['level'] or '',
                     course['url'] or '',
                     course.get('completion_date', '')
@@ -1406,7 +1385,7 @@ def export_courses(course_type):
                 writer.writerow([
                     course['title'],
                     course['description'] or '',
-                    course['provider'] or '',
+                    course.get('source') or '',
                     course['level'] or '',
                     course['url'] or ''
                 ])
@@ -1433,7 +1412,7 @@ def complete_course(course_id):
     conn = get_db_connection()
     try:
         # Check if course exists
-        course = conn.execute('SELECT * FROM courses WHERE id = ?', (course_id,)).fetchone()
+        course = catalog_cache.get(course_id, conn)
         if not course:
             flash('Course not found.', 'error')
             return redirect(url_for('my_courses'))
@@ -1454,6 +1433,7 @@ def complete_course(course_id):
                     (user['id'], course_id)
                 )
                 conn.commit()
+                bump_completions(user['id'], conn=conn)
                 flash(f'Congratulations! You completed "{course["title"]}"!', 'success')
                 try:
                     log_completion_event(user['id'], course_id, course['title'])
@@ -1466,6 +1446,7 @@ def complete_course(course_id):
                 (user['id'], course_id)
             )
             conn.commit()
+            bump_completions(user['id'], conn=conn)
             flash(f'Congratulations! You completed "{course["title"]}"!', 'success')
             try:
                 log_completion_event(user['id'], course_id, course['title'])
@@ -1487,7 +1468,7 @@ def mark_complete(course_id):
     conn = get_db_connection()
     try:
         # Check if course exists
-        course = conn.execute('SELECT * FROM courses WHERE id = ?', (course_id,)).fetchone()
+        course = catalog_cache.get(course_id, conn)
         if not course:
             return jsonify({'success': False, 'error': 'Course not found'}), 404
         
@@ -1507,6 +1488,7 @@ def mark_complete(course_id):
                     (user['id'], course_id)
                 )
                 conn.commit()
+                bump_completions(user['id'], conn=conn)
                 try:
                     log_completion_event(user['id'], course_id, course['title'])
                 except:
@@ -1519,6 +1501,7 @@ def mark_complete(course_id):
                 (user['id'], course_id)
             )
             conn.commit()
+            bump_completions(user['id'], conn=conn)
             try:
                 log_completion_event(user['id'], course_id, course['title'])
             except:
@@ -2488,6 +2471,23 @@ def admin_security():
     finally:
         conn.close()
 
+# Points filter buckets on the admin courses page: (lowest, highest) points, inclusive
+ADMIN_POINTS_RANGES = {
+    '0-100': (0, 100),
+    '100-200': (100, 200),
+    '200-300': (200, 300),
+    '300-400': (300, 400),
+    '400+': (401, None)
+}
+
+def _points_in_range(points, low, high):
+    """Whether a course's points value falls in [low, high]; high None means no upper bound"""
+    try:
+        points = int(points)
+    except (TypeError, ValueError):
+        return False
+    return points >= low and (high is None or points <= high)
+
 @app.route('/admin/courses')
 def admin_courses():
     """Admin course management with pagination"""
@@ -2508,198 +2508,40 @@ def admin_courses():
     # Ensure per_page is within reasonable bounds
     per_page = max(10, min(100, per_page))
     
-    # Log which SQL dialect we're using and pagination params
-    using_azure = is_azure_sql()
-    app.logger.info("admin_courses: using Azure SQL = %s, page = %d, per_page = %d", 
-                    using_azure, page, per_page)
-    
-    # Get courses with pagination
     conn = get_db_connection()
     try:
-        # Detect database kind for compatibility
-        db_kind = detect_db_kind(conn)
-        app.logger.info("admin_courses: db_kind = %s, page = %d, per_page = %d", 
-                        db_kind, page, per_page)
-        
-        # Build WHERE clause for filters (use compatible column names)
-        where_conditions = []
-        params = []
-        
-        if search:
-            where_conditions.append("(title LIKE ? OR description LIKE ?)")
-            params.extend([f'%{search}%', f'%{search}%'])
-            
-        if level_filter:
-            where_conditions.append("level = ?")
-            params.append(level_filter)
-        
-        # Apply source and url_status filters only for SQLite or if columns exist
-        if db_kind == 'sqlite':
-            if source_filter:
-                where_conditions.append("source = ?")
-                params.append(source_filter)
-                
-            if url_status_filter:
-                where_conditions.append("url_status = ?")
-                params.append(url_status_filter)
-        # For sqlserver, skip source/url_status filters (not in compatibility view)
-        
-        # Points filter handling
-        if points_filter:
-            if db_kind == 'sqlserver':
-                # Azure SQL Server with TRY_CONVERT for NVARCHAR points
-                if points_filter == "0-100":
-                    where_conditions.append("TRY_CONVERT(int, points) BETWEEN 0 AND 100")
-                elif points_filter == "100-200":
-                    where_conditions.append("TRY_CONVERT(int, points) BETWEEN 100 AND 200")
-                elif points_filter == "200-300":
-                    where_conditions.append("TRY_CONVERT(int, points) BETWEEN 200 AND 300")
-                elif points_filter == "300-400":
-                    where_conditions.append("TRY_CONVERT(int, points) BETWEEN 300 AND 400")
-                elif points_filter == "400+":
-                    where_conditions.append("TRY_CONVERT(int, points) > 400")
-            else:
-                # SQLite with CAST
-                if points_filter == "0-100":
-                    where_conditions.append("CAST(points as INTEGER) BETWEEN 0 AND 100")
-                elif points_filter == "100-200":
-                    where_conditions.append("CAST(points as INTEGER) BETWEEN 100 AND 200")
-                elif points_filter == "200-300":
-                    where_conditions.append("CAST(points as INTEGER) BETWEEN 200 AND 300")
-                elif points_filter == "300-400":
-                    where_conditions.append("CAST(points as INTEGER) BETWEEN 300 AND 400")
-                elif points_filter == "400+":
-                    where_conditions.append("CAST(points as INTEGER) > 400")
-        
-        where_clause = ""
-        if where_conditions:
-            where_clause = "WHERE " + " AND ".join(where_conditions)
-        
-        app.logger.info("admin_courses: WHERE clause = '%s'", where_clause)
-        
-        # Choose table/view based on database kind
-        if db_kind == 'sqlserver':
-            table_name = "dbo.courses_app"  # Use compatibility view
-        else:
-            table_name = "courses"  # Use direct table for SQLite
-        
-        # Get total count for pagination
-        count_query = f'SELECT COUNT(*) as count FROM {table_name} {where_clause}'
-        total_courses = conn.execute(count_query, params).fetchone()['count']
+        # Filter and paginate the shared catalog snapshot; only the page's rows are materialized
+        snapshot = catalog_cache.snapshot(conn)
+        where = {}
+        if points_filter in ADMIN_POINTS_RANGES:
+            low, high = ADMIN_POINTS_RANGES[points_filter]
+            where['points'] = lambda points: _points_in_range(points, low, high)
+        from course_search_cache import search_cache
+        courses = search_cache.select(snapshot, search=search, where=where, where_key=points_filter if where else None,
+                                      level=level_filter, source=source_filter, url_status=url_status_filter)
         
         # Calculate pagination info
+        total_courses = len(courses)
         total_pages = max(1, (total_courses + per_page - 1) // per_page)  # Ceiling division
         page = max(1, min(page, total_pages))  # Ensure page is within bounds
         offset = (page - 1) * per_page
         
-        app.logger.info("admin_courses: total_courses = %d, offset = %d", total_courses, offset)
-        
-        # Build query with consistent column order for both backends
-        if db_kind == 'sqlserver':
-            # Azure SQL Server - select from compatibility view with OFFSET/FETCH
-            query = f'''
-                SELECT id, title, description, difficulty, duration_hours, 
-                       url, category, level, created_at
-                FROM {table_name}
-                {where_clause}
-                ORDER BY created_at DESC 
-                OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
-            '''
-            params.extend([offset, per_page])
-        else:
-            # SQLite - select from courses table with LIMIT/OFFSET
-            query = f'''
-                SELECT id, title, description, difficulty, duration_hours, 
-                       url, category, level, created_at
-                FROM {table_name}
-                {where_clause}
-                ORDER BY created_at DESC 
-                LIMIT ? OFFSET ?
-            '''
-            params.extend([per_page, offset])
-        
-        app.logger.info("admin_courses: executing query on %s", table_name)
-        courses = conn.execute(query, params).fetchall()
-        
-        # Convert courses to dictionaries to handle Azure SQL datetime issues
-        courses_list = []
-        for course in courses:
-            if hasattr(course, 'keys'):
-                course_dict = {}
-                for key in course.keys():
-                    value = course[key]
-                    # Convert datetime objects to strings for template compatibility
-                    if hasattr(value, 'isoformat'):
-                        course_dict[key] = value.isoformat()
-                    else:
-                        course_dict[key] = value
-                courses_list.append(course_dict)
-                
-                # Defensive logging for SQL Server duration conversion failures
-                if db_kind == 'sqlserver':
-                    if course_dict.get('duration_hours') is None and course_dict.get('id'):
-                        # Log potential TRY_CONVERT failure (duration_hours is NULL but might have duration data)
-                        app.logger.warning("Duration conversion failed for course ID %s - duration_hours is NULL", 
-                                          course_dict['id'])
-            else:
-                # Fallback for tuple-like results
-                courses_list.append(course)
+        app.logger.info("admin_courses: page = %d, per_page = %d, total_courses = %d (catalog version %d)",
+                        page, per_page, total_courses, snapshot.version)
         
-        # Get available sources and levels for filters - adapt to database kind
-        if db_kind == 'sqlserver':
-            # For SQL Server, use the view and skip source since it's not in the view
-            try:
-                levels = conn.execute('SELECT DISTINCT level FROM dbo.courses_app WHERE level IS NOT NULL ORDER BY level').fetchall()
-            except:
-                levels = [{'level': 'Beginner'}, {'level': 'Intermediate'}, {'level': 'Advanced'}]
-            sources = []  # Source not available in compatibility view
-        else:
-            # For SQLite, use the original table
-            try:
-                sources = conn.execute('SELECT DISTINCT source FROM courses WHERE source IS NOT NULL ORDER BY source').fetchall()
-            except:
-                sources = []
-                
-            try:
-                levels = conn.execute('SELECT DISTINCT level FROM courses WHERE level IS NOT NULL ORDER BY level').fetchall()
-            except:
-                levels = [{'level': 'Beginner'}, {'level': 'Intermediate'}, {'level': 'Advanced'}]
+        # Page rows, with datetime objects converted to strings for template compatibility
+        courses_list = [{key: value.isoformat() if hasattr(value, 'isoformat') else value
+                         for key, value in course.items()}
+                        for course in courses[offset:offset + per_page]]
         
-        # Calculate statistics for the dashboard - adapt to database kind
-        if db_kind == 'sqlserver':
-            # Simplified stats for SQL Server (no source/url_status in view)
-            stats_query = f'SELECT COUNT(*) as total_courses FROM {table_name}'
-            try:
-                result = conn.execute(stats_query).fetchone()
-                stats = {
-                    'total_courses': result[0] if result else 0,
-                    'manual_entries': 0,  # Not available in view
-                    'working_urls': 0,    # Not available in view
-                    'broken_urls': 0      # Not available in view
-                }
-            except:
-                stats = {'total_courses': 0, 'manual_entries': 0, 'working_urls': 0, 'broken_urls': 0}
-        else:
-            # Full stats for SQLite
-            stats_query = '''
-                SELECT 
-                    COUNT(*) as total_courses,
-                    COUNT(CASE WHEN source = 'Manual' THEN 1 END) as manual_entries,
-                    COUNT(CASE WHEN url_status = 'Working' THEN 1 END) as working_urls,
-                    COUNT(CASE WHEN url_status = 'Not Working' OR url_status = 'Broken' THEN 1 END) as broken_urls
-                FROM courses
-            '''
-            try:
-                stats = conn.execute(stats_query).fetchone()
-            except:
-                # Fallback stats if columns don't exist
-                basic_count = conn.execute('SELECT COUNT(*) as total_courses FROM courses').fetchone()
-                stats = {
-                    'total_courses': basic_count[0] if basic_count else 0,
-                    'manual_entries': 0,
-                    'working_urls': 0,
-                    'broken_urls': 0
-                }
+        # Statistics for the dashboard
+        stats = {
+            'total_courses': len(snapshot),
+            'manual_entries': len(snapshot.positions('source', 'Manual')),
+            'working_urls': len(snapshot.positions('url_status', 'Working')),
+            'broken_urls': len(snapshot.positions('url_status', 'Not Working'))
+                           + len(snapshot.positions('url_status', 'Broken'))
+        }
         
         pagination_info = {
             'page': page,
@@ -2720,8 +2562,8 @@ def admin_courses():
                              courses=courses_list, 
                              pagination=pagination_info,
                              stats=stats,
-                             sources=[row.get('source', '') if hasattr(row, 'get') else row[0] for row in sources],
-                             levels=[row.get('level', '') if hasattr(row, 'get') else row[0] for row in levels],
+                             sources=snapshot.sources(),
+                             levels=snapshot.levels(),
                              current_search=search,
                              current_source=source_filter,
                              current_level=level_filter,
@@ -2796,8 +2638,9 @@ def admin_settings():
                 conn.commit()
                 flash('Settings updated successfully!', 'success')
                 
-                # Update user levels based on new requirements
-                update_all_user_levels(conn, levels_data)
+                # Recompute user levels in the background based on new requirements
+                job_manager.submit('level_recompute', {'levels_data': levels_data}, user['id'])
+                flash('User levels are being recalculated in the background.', 'info')
                 
             except Exception as e:
                 conn.rollback()
@@ -2850,12 +2693,15 @@ def admin_settings():
     finally:
         conn.close()
 
-def update_all_user_levels(conn, levels_data):
-    """Update all user levels based on new point requirements"""
+def update_all_user_levels(conn, levels_data, progress_callback=None):
+    """
+    Update all user levels based on new point requirements
+    progress_callback(done, total) is called after each user; returns the number of users updated
+    """
     try:
         users = conn.execute('SELECT id, points FROM users').fetchall()
         
-        for user in users:
+        for index, user in enumerate(users, start=1):
             user_points = user['points'] or 0
             new_level = 'Beginner'
             
@@ -2870,12 +2716,32 @@ def update_all_user_levels(conn, levels_data):
                 'UPDATE users SET level = ?, level_updated_at = datetime("now") WHERE id = ?',
                 (new_level, user['id'])
             )
+            
+            if progress_callback:
+                progress_callback(index, len(users))
         
         conn.commit()
         logger.info(f"Updated levels for {len(users)} users based on new requirements")
+        return len(users)
         
     except Exception as e:
+        conn.rollback()
         logger.error(f"Error updating user levels: {e}")
+        raise
+
+def run_level_recompute_job(ctx):
+    """Background job handler that recomputes every user's level"""
+    def report_progress(done, total):
+        ctx.update_progress(done, total, f'Updated {done} of {total} users')
+        ctx.raise_if_cancelled()
+    
+    conn = get_db_connection()
+    try:
+        users_updated = update_all_user_levels(conn, ctx.payload['levels_data'], report_progress)
+    finally:
+        conn.close()
+    
+    return {'users_updated': users_updated}
 
 @app.route('/admin/change-password', methods=['GET', 'POST'])
 def admin_change_password():
@@ -3016,6 +2882,9 @@ def admin_add_course():
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?)
                 ''', (title, description, url, url, source, level, points, category, 'Pending'))
             conn.commit()
+            bump_version(CATALOG, conn=conn)
+            from course_recommender import queue_index_update
+            queue_index_update(user_id=session.get('user_id'))
             
             flash(f'Course "{title}" added successfully!', 'success')
             return redirect(url_for('admin_courses'))
@@ -3151,6 +3020,8 @@ def admin_bulk_delete_courses():
                 deleted_count += 1
         
         conn.commit()
+        if deleted_count:
+            bump_version(CATALOG, conn=conn)
         
         if deleted_count > 0:
             flash(f'Successfully deleted {deleted_count} course(s)!', 'success')
@@ -3226,6 +3097,9 @@ def admin_delete_user(user_id):
         
         username = user_record['username']
         
+        # Drop the user's entries from the tag index before anything is deleted
+        tag_index.remove_user(conn, user_id)
+        
         # Delete user's sessions first (to maintain referential integrity)
         session_table = get_session_table()
         conn.execute(f'DELETE FROM {session_table} WHERE user_id = ?', (user_id,))
@@ -3243,6 +3117,8 @@ def admin_delete_user(user_id):
         conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
         
         conn.commit()
+        # The user's entries, global ones included, just left the feed and search
+        bump_version(LEARNINGS, LEARNINGS_GLOBAL, conn=conn)
         flash(f'User "{username}" has been permanently deleted.', 'success')
         
     except Exception as e:
@@ -3283,9 +3159,109 @@ def create_admin_now():
     finally:
         conn.close()
 
-# Initialize database on startup
-logger.info("Initializing AI Learning Tracker...")
-initialize_database()
+# Background job engine: register handlers here; workers start in start_background_services()
+from job_manager import job_manager
+
+for handler_module in ('fast_course_fetcher', 'course_validator', 'enhanced_excel_upload', 'course_recommender',
+                       'course_cofiltering'):
+    try:
+        importlib.import_module(handler_module)
+    except ImportError as e:
+        logger.warning(f"Background jobs from {handler_module} unavailable: {e}")
+
+job_manager.register('level_recompute', run_level_recompute_job, max_attempts=3)
+
+def start_background_services():
+    """
+    Initialize the database and start this process's job workers
+    Called by the entry points (wsgi.py, main.py, application.py, python app.py)
+    rather than on import, so processes that only import the app - spawned
+    upload validation workers, scripts, tests - never claim jobs.
+    """
+    logger.info("Initializing AI Learning Tracker...")
+    initialize_database()
+    job_manager.start_workers()
+
+@app.route('/admin/jobs')
+@require_admin
+def admin_jobs():
+    """List recent background jobs (JSON)"""
+    user = validate_admin_access()
+    if not user:
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    jobs = job_manager.list_jobs(
+        job_type=request.args.get('type'),
+        status=request.args.get('status'),
+        limit=min(request.args.get('limit', 20, type=int), 100)
+    )
+    return jsonify({'jobs': jobs})
+
+@app.route('/admin/search-cache')
+@require_admin
+def admin_search_cache():
+    """Hit/miss counters and size of this worker's course search result cache (JSON)"""
+    user = validate_admin_access()
+    if not user:
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    from course_search_cache import search_cache
+    return jsonify({'search_cache': search_cache.stats(), 'pid': os.getpid()})
+
+@app.route('/admin/jobs/<job_id>')
+@require_admin
+def admin_job_status(job_id):
+    """Get status and progress of a background job (JSON)"""
+    user = validate_admin_access()
+    if not user:
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    job = job_manager.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/admin/jobs/<job_id>/cancel', methods=['POST'])
+@require_admin
+def admin_cancel_job(job_id):
+    """Request cancellation of a background job"""
+    user = validate_admin_access()
+    if not user:
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    if not job_manager.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job not found or already finished'}), 409
+    return jsonify({'success': True, 'job': job_manager.get_job(job_id)})
+
+@app.route('/admin/jobs/<job_id>/events')
+@require_admin
+def admin_job_events(job_id):
+    """
+    Stream job progress as server-sent events (authenticated once per connection)
+    Streams end after JOB_EVENTS_MAX_SECONDS, well inside the gunicorn worker timeout;
+    EventSource reconnects on its own and resumes from Last-Event-ID.
+    """
+    user = validate_admin_access()
+    if not user:
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    from flask import Response, stream_with_context
+    
+    events = job_manager.stream_events(
+        job_id,
+        last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id'),
+        poll_interval=float(os.environ.get('JOB_EVENTS_POLL_SECONDS', '1')),
+        heartbeat_interval=float(os.environ.get('JOB_EVENTS_HEARTBEAT_SECONDS', '15')),
+        max_duration=float(os.environ.get('JOB_EVENTS_MAX_SECONDS', '25'))
+    )
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 @app.route('/admin/course-configs')
 @require_admin
@@ -3334,85 +3310,64 @@ def admin_populate_ai_courses():
         return redirect(url_for('dashboard'))
     
     if request.method == 'POST':
-        def populate_courses(conn):
-            # Sample AI courses to populate
-            ai_courses = [
-                {
-                    'title': 'Introduction to Machine Learning',
-                    'description': 'Learn the fundamentals of machine learning algorithms and applications.',
-                    'points': 100,
-                    'difficulty': 'Beginner',
-                    'category': 'Machine Learning',
-                    'url': 'https://docs.microsoft.com/learn/paths/intro-to-ml-with-python/',
-                    'status': 'published'
-                },
-                {
-                    'title': 'Deep Learning with PyTorch',
-                    'description': 'Master deep learning concepts using PyTorch framework.',
-                    'points': 150,
-                    'difficulty': 'Intermediate',
-                    'category': 'Deep Learning',
-                    'url': 'https://docs.microsoft.com/learn/paths/pytorch-fundamentals/',
-                    'status': 'published'
-                },
-                {
-                    'title': 'Natural Language Processing',
-                    'description': 'Explore NLP techniques for text analysis and language understanding.',
-                    'points': 120,
-                    'difficulty': 'Intermediate',
-                    'category': 'NLP',
-                    'url': 'https://docs.microsoft.com/learn/paths/explore-natural-language-processing/',
-                    'status': 'published'
-                },
-                {
-                    'title': 'Computer Vision Fundamentals',
-                    'description': 'Learn image processing and computer vision algorithms.',
-                    'points': 130,
-                    'difficulty': 'Intermediate',
-                    'category': 'Computer Vision',
-                    'url': 'https://docs.microsoft.com/learn/paths/computer-vision-microsoft-cognitive-toolkit/',
-                    'status': 'published'
-                },
-                {
-                    'title': 'AI Ethics and Responsible AI',
-                    'description': 'Understanding ethical considerations in AI development and deployment.',
-                    'points': 80,
-                    'difficulty': 'Beginner',
-                    'category': 'AI Ethics',
-                    'url': 'https://docs.microsoft.com/learn/paths/responsible-ai-principles/',
-                    'status': 'published'
-                }
-            ]
-            
-            count = 0
-            for course in ai_courses:
-                # Check if course already exists
-                existing = conn.execute('SELECT id FROM courses WHERE title = ?', (course['title'],)).fetchone()
-                if not existing:
-                    if is_azure_sql():
-                        conn.execute('''
-                            INSERT INTO courses (title, description, points, difficulty, category, url, status, created_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, GETDATE())
-                        ''', (course['title'], course['description'], course['points'], 
-                              course['difficulty'], course['category'], course['url'], course['status']))
-                    else:
-                        conn.execute('''
-                            INSERT INTO courses (title, description, points, difficulty, category, url, status, created_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                        ''', (course['title'], course['description'], course['points'], 
-                              course['difficulty'], course['category'], course['url'], course['status']))
-                    count += 1
-            
-            return count
+        from course_sync import sync_course_list
         
-        result = handle_db_operation(
-            populate_courses,
-            success_message=None,  # We'll set custom message
-            error_message='Failed to populate AI courses'
-        )
+        ai_courses = [
+            {
+                'title': 'Introduction to Machine Learning',
+                'description': 'Learn the fundamentals of machine learning algorithms and applications.',
+                'points': 100,
+                'difficulty': 'Beginner',
+                'category': 'Machine Learning',
+                'url': 'https://docs.microsoft.com/learn/paths/intro-to-ml-with-python/'
+            },
+            {
+                'title': 'Deep Learning with PyTorch',
+                'description': 'Master deep learning concepts using PyTorch framework.',
+                'points': 150,
+                'difficulty': 'Intermediate',
+                'category': 'Deep Learning',
+                'url': 'https://docs.microsoft.com/learn/paths/pytorch-fundamentals/'
+            },
+            {
+                'title': 'Natural Language Processing',
+                'description': 'Explore NLP techniques for text analysis and language understanding.',
+                'points': 120,
+                'difficulty': 'Intermediate',
+                'category': 'NLP',
+                'url': 'https://docs.microsoft.com/learn/paths/explore-natural-language-processing/'
+            },
+            {
+                'title': 'Computer Vision Fundamentals',
+                'description': 'Learn image processing and computer vision algorithms.',
+                'points': 130,
+                'difficulty': 'Intermediate',
+                'category': 'Computer Vision',
+                'url': 'https://docs.microsoft.com/learn/paths/computer-vision-microsoft-cognitive-toolkit/'
+            },
+            {
+                'title': 'AI Ethics and Responsible AI',
+                'description': 'Understanding ethical considerations in AI development and deployment.',
+                'points': 80,
+                'difficulty': 'Beginner',
+                'category': 'AI Ethics',
+                'url': 'https://docs.microsoft.com/learn/paths/responsible-ai-principles/'
+            }
+        ]
+        
+        # Incremental sync: an unchanged list costs one state lookup, changed courses are upserted
+        try:
+            result = sync_course_list('Curated AI Courses', ai_courses)
+        except Exception as e:
+            logger.error(f"Database operation error: {e}")
+            flash('Failed to populate AI courses', 'error')
+            return redirect(url_for('admin_courses'))
         
-        if result is not None:
-            flash(f'Successfully added {result} AI courses to the database.', 'success')
+        if result['unchanged_source']:
+            flash('AI course list is unchanged since the last sync.', 'info')
+        else:
+            flash(f"Successfully added {result['added']} AI courses to the database"
+                  f" ({result['updated']} updated, {result['duplicates']} already present).", 'success')
         
         return redirect(url_for('admin_courses'))
     
@@ -3560,6 +3515,7 @@ def admin_edit_course(course_id):
             )
             
             if result:
+                bump_version(CATALOG)
                 return redirect(url_for('admin_courses'))
         
         return render_template('admin/edit_course.html', course=course)
@@ -3596,6 +3552,7 @@ def admin_delete_course(course_id):
     )
     
     if result and result[0]:
+        bump_version(CATALOG)
         flash(f'Course "{result[1]}" deleted successfully!', 'success')
     
     return redirect(url_for('admin_courses'))
@@ -3665,35 +3622,15 @@ def admin_reports():
     finally:
         conn.close()
 
-@app.route('/admin/reports/upload-reports')
-@require_admin
-def admin_reports_upload_reports_list():
-    """Admin route for upload reports list (alias for admin_reports.upload_reports_list)"""
-    user = validate_admin_access()
-    if not user:
-        return redirect(url_for('dashboard'))
-    
-    # This is a placeholder for upload reports functionality
-    # In a full implementation, this would show upload/import reports
-    flash('Upload reports feature is under development.', 'info')
-    return redirect(url_for('admin_reports'))
+# Upload reports: list, row-detail drilldown, exports and purge
+from admin_reports_routes import admin_reports_bp
 
-@app.route('/admin/reports/purge', methods=['POST'])
-@require_admin
-def admin_reports_purge_reports():
-    """Admin route to purge old reports (alias for admin_reports.purge_reports)"""
-    user = validate_admin_access()
-    if not user:
-        return redirect(url_for('dashboard'))
-    
-    # This is a placeholder for purging old reports
-    # In a full implementation, this would clean up old log/report data
-    flash('Report purge functionality is under development.', 'info')
-    return redirect(url_for('admin_reports'))
+@admin_reports_bp.before_request
+def _load_admin_reports_user():
+    """admin_reports_routes reads the signed-in user from g.user"""
+    g.user = get_current_user()
 
-# Create Blueprint-style route aliases for template compatibility
-app.add_url_rule('/admin/reports/upload-reports-list', 'admin_reports.upload_reports_list', admin_reports_upload_reports_list, methods=['GET'])
-app.add_url_rule('/admin/reports/purge-reports', 'admin_reports.purge_reports', admin_reports_purge_reports, methods=['POST'])
+app.register_blueprint(admin_reports_bp)
 
 @app.route('/debug/env')
 def debug_environment():
@@ -4378,6 +4315,7 @@ def debug_fix_admin_column():
         }), 500
 
 if __name__ == '__main__':
+    start_background_services()
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') != 'production'
     app.run(debug=debug, host='0.0.0.0', port=port)
@@ -14,10 +14,11 @@ os.environ['FLASK_ENV'] = 'production'
 os.environ['FLASK_DEBUG'] = 'False'
 
 # Import and configure the app
-from app import app
+from app import app, start_background_services
 
 app.config['DEBUG'] = False
 app.config['ENV'] = 'production'
+start_background_services()
 
 # This is what Azure will look for
 application = app
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+News Near-Duplicate Benchmark - AI Learning Tracker
+Clusters a synthetic corpus where every story is re-reported by several outlets
+with reworded titles, and compares MinHash + LSH clustering against the
+all-pairs Jaccard comparison on a sample. No network or database access.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Add the current directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from news_dedup import NearDuplicateClusterer, article_tokens
+
+OUTLETS = ['TechCrunch AI', 'VentureBeat AI', 'The Verge AI', 'AI News', 'MIT Technology Review - AI']
+
+
+def synthetic_articles(stories: int, variants: int, seed: int = 1) -> Tuple[List[Dict], List[int]]:
+    """Articles plus the story each one reports; variants reword about a fifth of the text"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{n}" for n in range(20000)]
+    articles, truth = [], []
+    for story in range(stories):
+        title = rng.sample(vocabulary, 10)
+        description = rng.sample(vocabulary, 25)
+        for variant in range(variants):
+            words = title + description
+            reworded = [rng.choice(vocabulary) if rng.random() < 0.1 else word for word in words]
+            rng.shuffle(reworded)
+            articles.append({
+                'id': f"{story}-{variant}",
+                'title': ' '.join(reworded[:10]),
+                'description': ' '.join(reworded[10:]),
+                'source': OUTLETS[variant % len(OUTLETS)],
+                'priority': 1 + variant % 3,
+            })
+            truth.append(story)
+    return articles, truth
+
+
+def pairwise_clusters(articles: List[Dict], threshold: float) -> int:
+    """All-pairs exact Jaccard comparison (the quadratic baseline); returns merged pair count"""
+    token_sets = [set(article_tokens(article)) for article in articles]
+    merged = 0
+    for i in range(len(token_sets)):
+        for j in range(i + 1, len(token_sets)):
+            union = len(token_sets[i] | token_sets[j])
+            if union and len(token_sets[i] & token_sets[j]) / union >= threshold:
+                merged += 1
+    return merged
+
+
+def score_clusters(clusters: List[List[int]], truth: List[int]) -> Dict[str, float]:
+    """Purity (no unrelated stories merged) and completeness (variants found together)"""
+    pure = sum(1 for members in clusters if len({truth[i] for i in members}) == 1)
+    largest_share = Counter()
+    for members in clusters:
+        for story, count in Counter(truth[i] for i in members).items():
+            largest_share[story] = max(largest_share[story], count)
+    per_story = Counter(truth)
+    return {
+        'purity': pure / len(clusters),
+        'completeness': sum(largest_share[s] / n for s, n in per_story.items()) / len(per_story),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark near-duplicate news clustering')
+    parser.add_argument('--articles', type=int, default=50000)
+    parser.add_argument('--variants', type=int, default=5, help='Outlets reporting each story (default: 5)')
+    parser.add_argument('--pairwise-sample', type=int, default=2000,
+                        help='Articles used for the all-pairs baseline (default: 2000)')
+    args = parser.parse_args()
+
+    articles, truth = synthetic_articles(args.articles // args.variants, args.variants)
+    clusterer = NearDuplicateClusterer()
+
+    start = time.perf_counter()
+    clusters = clusterer.cluster(articles)
+    elapsed = time.perf_counter() - start
+    quality = score_clusters(clusters, truth)
+    print(f"Corpus: {len(articles)} articles, {len(set(truth))} stories x {args.variants} outlets")
+    print(f"MinHash + LSH ({clusterer.num_perm} perms, {clusterer.bands} bands): {elapsed:.2f}s, "
+          f"{len(clusters)} clusters, purity {quality['purity']:.3f}, "
+          f"completeness {quality['completeness']:.3f}")
+
+    sample = articles[:args.pairwise_sample]
+    start = time.perf_counter()
+    sample_clusters = clusterer.cluster(sample)
+    lsh_sample = time.perf_counter() - start
+    start = time.perf_counter()
+    pairwise_clusters(sample, clusterer.threshold)
+    pairwise = time.perf_counter() - start
+    pairs = len(sample) * (len(sample) - 1) // 2
+    print(f"\n{len(sample)}-article sample: LSH {lsh_sample:.2f}s ({len(sample_clusters)} clusters) vs "
+          f"all-pairs {pairwise:.2f}s ({pairs} comparisons)")
+    print(f"All-pairs extrapolated to {len(articles)} articles: "
+          f"~{pairwise * (len(articles) / len(sample)) ** 2 / 60:.0f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+URL Validation Benchmark - AI Learning Tracker
+Compares the legacy one-at-a-time URL check loop with the concurrent
+validation engine against local stub hosts that are fast, slow or failing.
+No external network traffic and no database writes.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+# Add the current directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from course_validator import CourseURLValidator
+
+
+class StubHost:
+    """A local HTTP server standing in for one course provider"""
+
+    def __init__(self, name: str, delay: float = 0.0, status: int = 200, etag: str = None,
+                 body: bytes = b''):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.etag = etag
+        self.body = body  # served to GET requests (e.g. an RSS feed)
+        self.requests = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler_class(self):
+        host = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def setup(self):
+                super().setup()
+                with host.lock:
+                    host.connections += 1
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def _respond(self, send_body: bool):
+                with host.lock:
+                    host.requests += 1
+                    host.active += 1
+                    host.max_active = max(host.max_active, host.active)
+                try:
+                    if host.delay:
+                        time.sleep(host.delay)
+                    status = 404 if self.path.startswith('/missing') else host.status
+                    if status == 200 and host.etag and self.headers.get('If-None-Match') == host.etag:
+                        status = 304
+                    body = host.body if send_body and status == 200 else b''
+                    self.send_response(status)
+                    if host.etag:
+                        self.send_header('ETag', host.etag)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    if body:
+                        self.wfile.write(body)
+                finally:
+                    with host.lock:
+                        host.active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def build_catalog(hosts: List[StubHost], courses_per_host: int, duplicate_ratio: float) -> List[str]:
+    """Course URLs spread across hosts; a share of courses reuse another course's URL"""
+    urls = []
+    for host in hosts:
+        unique = max(1, int(courses_per_host * (1 - duplicate_ratio)))
+        for i in range(courses_per_host):
+            path = f"/missing/{i}" if i % 10 == 9 else f"/course/{i % unique}"
+            urls.append(f"{host.base_url}{path}")
+    return urls
+
+
+def run_sequential(validator: CourseURLValidator, urls: List[str], delay: float) -> Dict:
+    """The old loop: every course checked in turn with a fixed politeness sleep"""
+    start = time.perf_counter()
+    for url in urls:
+        validator.check_url(url)
+        time.sleep(delay)
+    return {'seconds': time.perf_counter() - start}
+
+
+def run_concurrent(validator: CourseURLValidator, urls: List[str]) -> Dict:
+    start = time.perf_counter()
+    results = validator.check_urls(urls)
+    return {'seconds': time.perf_counter() - start, 'checked': len(results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark course URL validation against local stub hosts')
+    parser.add_argument('--courses-per-host', type=int, default=40)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.25,
+                        help='Share of courses whose URL duplicates another course (default: 0.25)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--skip-sequential', action='store_true',
+                        help='Only run the concurrent engine')
+    args = parser.parse_args()
+
+    hosts = [
+        StubHost('fast').start(),
+        StubHost('fast-2').start(),
+        StubHost('slow', delay=0.2).start(),
+        StubHost('failing', status=503).start(),
+        StubHost('slow-failing', delay=0.1, status=500).start(),
+    ]
+    urls = build_catalog(hosts, args.courses_per_host, args.duplicate_ratio)
+
+    try:
+        print(f"Catalog: {len(urls)} courses, {len(set(urls))} unique URLs across {len(hosts)} hosts")
+
+        if not args.skip_sequential:
+            sequential = run_sequential(CourseURLValidator(), urls, delay=0.1)
+            print(f"Sequential (legacy loop):  {sequential['seconds']:.2f}s")
+
+        for host in hosts:
+            host.requests = host.connections = host.max_active = 0
+
+        validator = CourseURLValidator(max_concurrent=args.concurrency, per_host_limit=args.per_host)
+        concurrent = run_concurrent(validator, urls)
+        print(f"Concurrent engine:         {concurrent['seconds']:.2f}s "
+              f"({concurrent['checked']} requests, {len(urls) / concurrent['seconds']:.0f} courses/sec)")
+
+        print("\nPer host (concurrent run):")
+        for host in hosts:
+            print(f"  {host.name:<13} requests={host.requests:<4} connections={host.connections:<3} "
+                  f"peak_in_flight={host.max_active} (limit {args.per_host})")
+    finally:
+        for host in hosts:
+            host.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Cache Versions - AI Learning Tracker
+Named version counters kept in the database so every gunicorn worker sees the
+same value. Writers bump a counter after committing a change to the data it
+guards; in-process caches remember the version they were built from and reload
+when the counter has moved.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from database_environment_manager import DatabaseEnvironmentManager
+
+logger = logging.getLogger(__name__)
+
+# Bumped by every write to the courses table
+CATALOG = 'catalog'
+
+# Bumped by every write to learning_entries
+LEARNINGS = 'learnings'
+
+# Bumped by every write that adds, changes or removes a global learning entry
+LEARNINGS_GLOBAL = 'learnings_global'
+
+# Sequence the per-user completion counters take their values from (see bump_completions)
+COMPLETIONS = 'completions'
+
+
+def completions_key(user_id: int) -> str:
+    """Counter bumped (by bump_completions) whenever the user's set of completed courses changes"""
+    return f"completions:{int(user_id)}"
+
+
+def learning_keys(is_global) -> tuple:
+    """Counters to bump after writing a learning entry"""
+    return (LEARNINGS, LEARNINGS_GLOBAL) if is_global else (LEARNINGS,)
+
+
+_tables_ready = False
+
+
+def _connect() -> DatabaseEnvironmentManager:
+    global _tables_ready
+    db = DatabaseEnvironmentManager()
+    db.connect()
+    if not _tables_ready:
+        db.ensure_tables('cache_versions')
+        _tables_ready = True
+    return db
+
+
+def get_versions(names: Iterable[str], conn=None) -> Dict[str, int]:
+    """
+    Current value of each counter (0 for counters never bumped)
+    `conn` may be any open connection with an execute() method, so routes can
+    reuse the connection they already hold.
+    """
+    if not _tables_ready:
+        _connect().disconnect()
+    names = list(names)
+    placeholders = ', '.join('?' for _ in names)
+    sql = f"SELECT name, version FROM cache_versions WHERE name IN ({placeholders})"
+    if conn is not None:
+        rows = conn.execute(sql, names).fetchall()
+    else:
+        db = _connect()
+        try:
+            cursor = db.connection.cursor()
+            cursor.execute(sql, names)
+            rows = cursor.fetchall()
+        finally:
+            db.disconnect()
+    versions = dict.fromkeys(names, 0)
+    versions.update({row[0]: row[1] for row in rows})
+    return versions
+
+
+def _advance(conn, name: str, now: datetime):
+    updated = conn.execute("UPDATE cache_versions SET version = version + 1, updated_at = ? WHERE name = ?",
+                           (now, name)).rowcount
+    if not updated:
+        conn.execute("INSERT INTO cache_versions (name, version, updated_at) VALUES (?, 1, ?)", (name, now))
+
+
+def _set(conn, name: str, version: int, now: datetime):
+    updated = conn.execute("UPDATE cache_versions SET version = ?, updated_at = ? WHERE name = ?",
+                           (version, now, name)).rowcount
+    if not updated:
+        conn.execute("INSERT INTO cache_versions (name, version, updated_at) VALUES (?, ?, ?)", (name, version, now))
+
+
+def _bump(names: tuple, conn, write) -> None:
+    db = None
+    if conn is None or not _tables_ready:
+        db = _connect()
+        conn = conn if conn is not None else db.connection
+    try:
+        write(conn, datetime.now())
+        conn.commit()
+    except Exception as e:
+        # A missed bump leaves caches stale until the next write, never breaks the write itself
+        logger.warning(f"⚠️ Could not bump cache version {names}: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+    finally:
+        if db is not None:
+            db.disconnect()
+
+
+def bump_version(*names: str, conn=None) -> None:
+    """
+    Advance the given counters and commit
+    Call after the guarded write has been committed: a reader that sees the
+    new version is then guaranteed to read the new data.
+    """
+    def write(conn, now):
+        for name in names:
+            _advance(conn, name, now)
+    _bump(names, conn, write)
+
+
+def bump_completions(user_id: int, conn=None) -> None:
+    """
+    Advance the user's completions counter and commit (same rules as bump_version)
+    The counter is set to the next value of the shared COMPLETIONS sequence,
+    so every change gets a database-wide increasing number and
+    completion_changes() can find the users changed since any point.
+    """
+    key = completions_key(user_id)
+
+    def write(conn, now):
+        _advance(conn, COMPLETIONS, now)
+        sequence = conn.execute("SELECT version FROM cache_versions WHERE name = ?", (COMPLETIONS,)).fetchone()[0]
+        _set(conn, key, int(sequence), now)
+    _bump((key,), conn, write)
+
+
+def completion_changes(since: int, conn) -> Tuple[int, List[int]]:
+    """
+    The current COMPLETIONS sequence value, and the users whose completed
+    courses changed after sequence value `since`
+    """
+    sequence = get_versions([COMPLETIONS], conn)[COMPLETIONS]
+    rows = conn.execute("SELECT name FROM cache_versions WHERE name LIKE 'completions:%' AND version > ?",
+                        (int(since),)).fetchall()
+    return sequence, [int(row[0].split(':', 1)[1]) for row in rows]
@@ -0,0 +1,129 @@
+"""
+Course Autocomplete - AI Learning Tracker
+Typeahead suggestions for the course search boxes. Normalized course titles,
+providers and categories are held in sorted lists, so the completions of a
+prefix are one bisect plus a short forward scan. Titles are also indexed from
+every word start, so "learn" completes "Deep Learning Basics". The index is
+built per worker from the catalog snapshot and rebuilt when its version moves.
+"""
+
+import re
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from course_catalog_cache import CatalogSnapshot, catalog_cache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Word-start keys are cut to this length; longer queries are checked against the full title
+KEY_LENGTH = 40
+MAX_SUGGESTIONS = 20
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lower-case words without accents or punctuation, single-spaced"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(TOKEN_PATTERN.findall(text.lower()))
+
+
+class PrefixIndex:
+    """Sorted-key completion index over one catalog snapshot"""
+
+    def __init__(self, titles: List[Tuple[int, str]], providers: List[str], categories: List[str],
+                 version: int):
+        self.version = version
+        # Providers and categories: few, whole-value keys
+        facets = sorted((normalize(value), kind, value) for kind, values in
+                        (('provider', providers), ('category', categories)) for value in values)
+        facets = [facet for facet in facets if facet[0]]
+        self.facet_keys = [facet[0] for facet in facets]
+        self.facets = [(kind, value) for _, kind, value in facets]
+
+        # Titles: one key per word start; word 0 is the whole-title completion
+        self.titles = [title for _, title in titles]
+        self.course_ids = [course_id for course_id, _ in titles]
+        self.normalized = [normalize(title) for title in self.titles]
+        whole, words = [], []
+        for n, text in enumerate(self.normalized):
+            if not text:
+                continue
+            whole.append((text[:KEY_LENGTH], n, 0))
+            for match in re.finditer(r' ', text):
+                words.append((text[match.end():match.end() + KEY_LENGTH], n, match.end()))
+        whole.sort()
+        words.sort()
+        self.whole_keys = [key for key, _, _ in whole]
+        self.whole = [(n, start) for _, n, start in whole]
+        self.word_keys = [key for key, _, _ in words]
+        self.words = [(n, start) for _, n, start in words]
+
+    def __len__(self) -> int:
+        return len(self.whole_keys) + len(self.word_keys)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` suggestions for a typed prefix: matching providers and
+        categories first, then titles starting with it, then titles with a
+        word starting with it (alphabetical within each group)
+        """
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        suggestions = []
+        for n in range(bisect_left(self.facet_keys, prefix), len(self.facet_keys)):
+            if len(suggestions) >= limit or not self.facet_keys[n].startswith(prefix):
+                break
+            kind, value = self.facets[n]
+            suggestions.append({'type': kind, 'value': value})
+
+        seen = set()
+        key_prefix = prefix[:KEY_LENGTH]
+        for keys, positions in ((self.whole_keys, self.whole), (self.word_keys, self.words)):
+            for n in range(bisect_left(keys, key_prefix), len(keys)):
+                if len(suggestions) >= limit or not keys[n].startswith(key_prefix):
+                    break
+                title, start = positions[n]
+                if title in seen or (len(prefix) > KEY_LENGTH and
+                                     not self.normalized[title].startswith(prefix, start)):
+                    continue
+                seen.add(title)
+                suggestions.append({'type': 'title', 'value': self.titles[title], 'id': self.course_ids[title]})
+        return suggestions
+
+
+class CourseAutocomplete:
+    """Per-worker prefix index that follows the catalog snapshot"""
+
+    def __init__(self):
+        self._index: Optional[PrefixIndex] = None
+        self._index_snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    def complete(self, prefix: str, limit: int = 10, conn=None) -> List[Dict[str, Any]]:
+        """Suggestions for a typed prefix (see PrefixIndex.complete); limit is capped at MAX_SUGGESTIONS"""
+        limit = min(max(int(limit), 1), MAX_SUGGESTIONS)
+        return self._prefix_index(catalog_cache.snapshot(conn)).complete(prefix, limit)
+
+    def _prefix_index(self, snapshot: CatalogSnapshot) -> PrefixIndex:
+        index = self._index
+        if index is not None and self._index_snapshot is snapshot:
+            return index
+        with self._lock:
+            if self._index is not None and self._index_snapshot is snapshot:
+                return self._index
+            categories = snapshot.distinct('category') if 'category' in snapshot.columns else []
+            index = PrefixIndex(list(zip(snapshot.ids.tolist(), snapshot.values('title'))),
+                                snapshot.sources(), categories, snapshot.version)
+            self._index, self._index_snapshot = index, snapshot
+        logger.info(f"🔤 Course autocomplete index rebuilt: {len(index)} keys (version {snapshot.version})")
+        return index
+
+
+# Global autocomplete instance (one per worker process)
+course_autocomplete = CourseAutocomplete()
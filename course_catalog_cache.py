@@ -0,0 +1,478 @@
+"""
+Course Catalog Cache - AI Learning Tracker
+Read-through snapshot of the whole courses table, shared by every gunicorn
+worker on the host. A snapshot is built once per catalog version (the
+"catalog" counter in cache_versions, bumped by every course write) into a
+compact column file: fixed-width numeric columns, an interned string table for
+low-cardinality text (level, source, url_status, ...) and offsets into UTF-8
+blobs for titles, descriptions and other free text. Workers map the file
+read-only and read it in place, so the OS page cache holds one copy however
+many workers run; a new version is written beside it and swapped in with an
+atomic rename. Course dicts are materialized only for the rows a request reads.
+On SQL Server the rows come from the dbo.courses_app compatibility view, so
+columns it lacks (source, url_status, points, ...) read as missing.
+"""
+
+import os
+import json
+import mmap
+import sqlite3
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from cache_versions import CATALOG, get_versions
+from database_environment_manager import DatabaseEnvironmentManager
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builds simply race to the atomic rename
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ALTCAT01'
+HEADER_PREFIX = len(MAGIC) + 8  # magic + header length
+ALIGN = 8
+
+# Text columns with at most max(INTERN_MIN_DISTINCT, INTERN_RATIO * rows) distinct values are interned
+INTERN_MIN_DISTINCT = 64
+INTERN_RATIO = 0.25
+
+# Matched by CatalogSnapshot.matching(), like the former "title LIKE ? OR description LIKE ?"
+SEARCH_COLUMNS = ('title', 'description')
+
+# The Azure courses table does not match SQLite's (url rather than link, difficulty, ...), so on
+# SQL Server the snapshot is read through the dbo.courses_app compatibility view
+SQLSERVER_COURSES_VIEW = 'dbo.courses_app'
+SQLSERVER_COLUMNS = ('id', 'title', 'description', 'difficulty', 'duration_hours',
+                     'url', 'category', 'level', 'created_at')
+
+# Everything that decides which database the app talks to; part of the snapshot file name
+DATABASE_ENV_VARS = ('ENV', 'ENVIRONMENT', 'AZURE_WEBAPP_NAME', 'WEBSITE_SITE_NAME',
+                     'AZURE_SQL_SERVER', 'AZURE_SQL_DATABASE', 'DATABASE_URL', 'DATABASE_PATH')
+
+# Rows materialized per batch when iterating a CourseRows view
+ROW_BATCH = 1000
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _as_text(value: Any) -> str:
+    """Text form of a non-numeric value; datetimes match SQLite's 'YYYY-MM-DD HH:MM:SS'"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return str(value)
+
+
+def _text_arrays(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets (len + 1) into one UTF-8 blob holding every text back to back"""
+    encoded = [text.encode('utf-8') for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _column_kind(values: List[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, (bool, int)) for value in present):
+        return 'int'
+    if all(isinstance(value, (bool, int, float)) for value in present):
+        return 'float'
+    distinct = len({_as_text(value) for value in present})
+    return 'interned' if distinct <= max(INTERN_MIN_DISTINCT, INTERN_RATIO * len(values)) else 'text'
+
+
+def snapshot_arrays(columns: List[str], rows: List[Any]) -> Tuple[List[Dict[str, str]], Dict[str, np.ndarray]]:
+    """
+    Column metadata and named arrays for a snapshot file
+    Every column gets a null mask plus, by kind: int64/float64 values,
+    int32 codes into an interned string table (with per-value postings in
+    row order), or offsets into a text blob.
+    """
+    count = len(rows)
+    meta, arrays = [], {}
+    for index, name in enumerate(columns):
+        values = [row[index] for row in rows]
+        kind = _column_kind(values)
+        meta.append({'name': name, 'kind': kind})
+        arrays[f'{name}.nulls'] = np.fromiter((value is None for value in values), dtype=bool, count=count)
+        if kind == 'int':
+            arrays[f'{name}.values'] = np.array([0 if value is None else int(value) for value in values],
+                                                dtype=np.int64)
+        elif kind == 'float':
+            arrays[f'{name}.values'] = np.array([np.nan if value is None else float(value) for value in values],
+                                                dtype=np.float64)
+        elif kind == 'interned':
+            texts = [None if value is None else _as_text(value) for value in values]
+            table = sorted({text for text in texts if text is not None})
+            code_of = {text: code for code, text in enumerate(table)}
+            codes = np.array([-1 if text is None else code_of[text] for text in texts], dtype=np.int32)
+            arrays[f'{name}.codes'] = codes
+            arrays[f'{name}.table_offsets'], arrays[f'{name}.table_blob'] = _text_arrays(table)
+            # Row positions grouped by value; the stable sort keeps display order inside each group
+            order = np.argsort(codes, kind='stable')
+            arrays[f'{name}.postings'] = order[codes[order] >= 0].astype(np.int32)
+            arrays[f'{name}.posting_ptr'] = np.concatenate(
+                ([0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(table))))).astype(np.int64)
+        else:
+            arrays[f'{name}.offsets'], arrays[f'{name}.blob'] = _text_arrays(
+                ['' if value is None else _as_text(value) for value in values])
+
+    # O(1) id -> row position (course ids are dense autoincrement keys)
+    ids = arrays['id.values']
+    positions = np.full(int(ids.max()) + 1 if count else 0, -1, dtype=np.int32)
+    positions[ids] = np.arange(count, dtype=np.int32)
+    arrays['_id_positions'] = positions
+
+    # Lower-cased search fields, each terminated by NUL so a match never spans two fields
+    search_columns = [columns.index(name) for name in SEARCH_COLUMNS if name in columns]
+    arrays['_search.offsets'], arrays['_search.blob'] = _text_arrays(
+        [''.join(_as_text(row[index] or '').lower() + '\0' for index in search_columns) for row in rows])
+    return meta, arrays
+
+
+def write_snapshot(path: str, columns: List[str], rows: List[Any], version: int) -> str:
+    """
+    Write a snapshot file next to `path` and atomically rename it into place
+    Returns the path actually written: if the rename is refused (Windows will
+    not replace a file another process has mapped) the worker keeps its own
+    copy under the temporary name.
+    """
+    meta, arrays = snapshot_arrays(columns, rows)
+    layout, position = {}, 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, position, int(array.size)]
+        position = _align(position + array.nbytes)
+    header = json.dumps({'version': version, 'rows': len(rows), 'columns': meta,
+                         'arrays': layout}).encode('utf-8')
+    data_start = _align(HEADER_PREFIX + len(header))
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as handle:
+        handle.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, array in arrays.items():
+            handle.write(b'\0' * (data_start + layout[name][1] - handle.tell()))
+            handle.write(np.ascontiguousarray(array).tobytes())
+        handle.write(b'\0' * (data_start + position - handle.tell()))
+        handle.flush()
+        os.fsync(handle.fileno())
+    try:
+        os.replace(temp_path, path)
+        return path
+    except OSError as e:
+        logger.warning(f"⚠️ Could not swap catalog snapshot into {path}, using a private copy: {e}")
+        return temp_path
+
+
+class CatalogSnapshot:
+    """
+    Read-only, memory-mapped view of every course at one catalog version,
+    newest first
+    Lookups return plain course dicts built on demand; they belong to the
+    caller and may be modified freely.
+    """
+
+    def __init__(self, file_path: str, source: str = None):
+        self.file_path = file_path
+        self.source = source or file_path
+        with open(file_path, 'rb') as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{file_path} is not a catalog snapshot")
+        header_length = struct.unpack_from('<Q', self._map, len(MAGIC))[0]
+        header = json.loads(self._map[HEADER_PREFIX:HEADER_PREFIX + header_length].decode('utf-8'))
+        data_start = _align(HEADER_PREFIX + header_length)
+
+        self.version = header['version']
+        self._rows = header['rows']
+        self._view = memoryview(self._map)
+        self._arrays = {}
+        self._starts = {}
+        for name, (dtype, offset, count) in header['arrays'].items():
+            self._arrays[name] = np.frombuffer(self._map, dtype=np.dtype(dtype), count=count,
+                                               offset=data_start + offset)
+            self._starts[name] = data_start + offset
+        self.columns = [column['name'] for column in header['columns']]
+        self._kinds = {column['name']: column['kind'] for column in header['columns']}
+        self.ids = self._arrays['id.values']
+
+        # Interned tables are tiny; decode them once for value <-> code lookups
+        self._tables = {name: self._texts(f'{name}.table_offsets', f'{name}.table_blob')
+                        for name, kind in self._kinds.items() if kind == 'interned'}
+        self._codes = {name: {text: code for code, text in enumerate(table)}
+                       for name, table in self._tables.items()}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def courses(self) -> 'CourseRows':
+        return CourseRows(self, np.arange(self._rows))
+
+    def get(self, course_id: int) -> Optional[Dict[str, Any]]:
+        positions = self._arrays['_id_positions']
+        if not 0 <= course_id < len(positions) or positions[course_id] < 0:
+            return None
+        return self.materialize(positions[course_id:course_id + 1])[0]
+
+    def rows_for_ids(self, course_ids: List[int]) -> 'CourseRows':
+        """Courses with the given ids, in the order given (unknown ids are skipped)"""
+        positions = self._arrays['_id_positions']
+        found = [positions[course_id] for course_id in course_ids if 0 <= course_id < len(positions)]
+        found = np.array(found, dtype=np.int64)
+        return CourseRows(self, found[found >= 0])
+
+    def positions(self, column: str, value: Any) -> np.ndarray:
+        """Row positions (display order) whose column equals value"""
+        kind = self._kinds.get(column)
+        if kind is None:  # not provided by this backend (e.g. source on the SQL Server view)
+            return np.empty(0, dtype=np.int32)
+        if kind == 'interned':
+            code = self._codes[column].get(_as_text(value))
+            if code is None:
+                return np.empty(0, dtype=np.int32)
+            pointers = self._arrays[f'{column}.posting_ptr']
+            return self._arrays[f'{column}.postings'][pointers[code]:pointers[code + 1]]
+        if kind in ('int', 'float'):
+            return np.flatnonzero((self._arrays[f'{column}.values'] == value) & ~self._arrays[f'{column}.nulls'])
+        return np.array([n for n, text in enumerate(self.values(column)) if text == value], dtype=np.int64)
+
+    def at_level(self, level: str) -> 'CourseRows':
+        return CourseRows(self, self.positions('level', level))
+
+    def from_source(self, source: str) -> 'CourseRows':
+        return CourseRows(self, self.positions('source', source))
+
+    def distinct(self, column: str) -> List[Any]:
+        """Sorted non-empty values of a column"""
+        if column in self._tables:
+            return [text for text in self._tables[column] if text]
+        return sorted({value for value in self.values(column) if value not in (None, '')})
+
+    def levels(self) -> List[str]:
+        return self.distinct('level')
+
+    def sources(self) -> List[str]:
+        return self.distinct('source')
+
+    def matching(self, text: str) -> np.ndarray:
+        """Row positions whose title or description contains text, ignoring case"""
+        if '\0' in text:
+            return np.empty(0, dtype=np.int64)
+        needle = text.lower().encode('utf-8')
+        if not needle:
+            return np.arange(self._rows)
+        offsets = self._arrays['_search.offsets']
+        blob_start = self._starts['_search.blob']
+        blob_end = blob_start + int(offsets[-1])
+        found, start = [], blob_start
+        while True:
+            hit = self._map.find(needle, start, blob_end)
+            if hit < 0:
+                break
+            row = int(np.searchsorted(offsets, hit - blob_start, side='right')) - 1
+            found.append(row)
+            start = blob_start + int(offsets[row + 1])  # next row; one hit per row is enough
+        return np.array(found, dtype=np.int64)
+
+    def select(self, search: str = None, where: Dict[str, Callable[[Any], bool]] = None,
+               **equals: Any) -> 'CourseRows':
+        """
+        Courses matching every given condition, newest first
+        equals: column=value filters (empty values are ignored); search:
+        substring of title or description; where: column -> predicate on the
+        column's value.
+        """
+        positions = None
+        for column, value in equals.items():
+            if value in (None, ''):
+                continue
+            found = self.positions(column, value)
+            positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+        if search:
+            found = self.matching(search)
+            positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+        if positions is None:
+            positions = np.arange(self._rows)
+        for column, predicate in (where or {}).items():
+            keep = [bool(predicate(value)) for value in self.values(column, positions)]
+            positions = positions[np.array(keep, dtype=bool)]
+        return CourseRows(self, positions)
+
+    def values(self, column: str, positions: np.ndarray = None) -> List[Any]:
+        """One column's values for the given row positions (all rows by default)"""
+        if positions is None:
+            positions = np.arange(self._rows)
+        positions = np.asarray(positions, dtype=np.int64)
+        kind = self._kinds.get(column)
+        if kind is None:
+            return [None] * len(positions)
+        if kind == 'interned':
+            table = self._tables[column]
+            return [table[code] if code >= 0 else None for code in self._arrays[f'{column}.codes'][positions].tolist()]
+        if kind == 'text':
+            values = self._texts(f'{column}.offsets', f'{column}.blob', positions)
+        else:
+            values = self._arrays[f'{column}.values'][positions].tolist()
+        nulls = self._arrays[f'{column}.nulls'][positions]
+        if nulls.any():
+            values = [None if null else value for value, null in zip(values, nulls.tolist())]
+        return values
+
+    def materialize(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        """Course dicts for the given row positions, column by column"""
+        columns = [self.values(column, positions) for column in self.columns]
+        return [dict(zip(self.columns, row)) for row in zip(*columns)]
+
+    def _texts(self, offsets_name: str, blob_name: str, positions: np.ndarray = None) -> List[str]:
+        offsets = self._arrays[offsets_name]
+        blob_start = self._starts[blob_name]
+        if positions is None:
+            starts, ends = offsets[:-1].tolist(), offsets[1:].tolist()
+        else:
+            starts, ends = offsets[positions].tolist(), offsets[positions + 1].tolist()
+        view = self._view
+        return [str(view[blob_start + start:blob_start + end], 'utf-8') for start, end in zip(starts, ends)]
+
+
+class CourseRows(Sequence):
+    """Lazy, ordered selection of snapshot rows; indexing or iterating builds course dicts"""
+
+    def __init__(self, snapshot: CatalogSnapshot, positions: np.ndarray):
+        self.snapshot = snapshot
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CourseRows(self.snapshot, self.positions[index])
+        return self.snapshot.materialize(self.positions[[index]])[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for start in range(0, len(self.positions), ROW_BATCH):
+            yield from self.snapshot.materialize(self.positions[start:start + ROW_BATCH])
+
+    def ids(self) -> List[int]:
+        return self.snapshot.ids[self.positions].tolist()
+
+
+@contextmanager
+def _build_lock(path: str):
+    """Serialize snapshot builds across the workers of one host"""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class CourseCatalogCache:
+    """Maps the host's shared catalog snapshot, rebuilding the file when the catalog version moves"""
+
+    def __init__(self, path: str = None):
+        self._path = path
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._load_lock = threading.Lock()
+
+    def snapshot_path(self) -> str:
+        """Snapshot file for the database this process is configured for"""
+        if self._path:
+            return self._path
+        directory = os.getenv('CATALOG_SNAPSHOT_DIR') or tempfile.gettempdir()
+        target = '|'.join([os.getcwd()] + [os.getenv(name, '') for name in DATABASE_ENV_VARS])
+        return os.path.join(directory, f"ai_learning_catalog_{hashlib.sha1(target.encode()).hexdigest()[:16]}.snap")
+
+    def snapshot(self, conn=None, version: int = None) -> CatalogSnapshot:
+        """
+        The catalog as of the current version
+        `conn` may be an open route connection; pass `version` when the caller
+        has already read the catalog counter.
+        """
+        if version is None:
+            version = get_versions([CATALOG], conn)[CATALOG]
+        path = self.snapshot_path()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version and snapshot.source == path:
+            return snapshot
+        with self._load_lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version or snapshot.source != path:
+                snapshot = self._snapshot = self._shared_snapshot(conn, path, version)
+        return snapshot
+
+    def get(self, course_id: int, conn=None) -> Optional[Dict[str, Any]]:
+        """One course by id, or None"""
+        return self.snapshot(conn).get(course_id)
+
+    def _shared_snapshot(self, conn, path: str, version: int) -> CatalogSnapshot:
+        snapshot = self._open_current(path, version)
+        if snapshot is not None:
+            return snapshot
+        # One worker per host rebuilds; the others wait and map its file
+        with _build_lock(path):
+            snapshot = self._open_current(path, version)
+            if snapshot is not None:
+                return snapshot
+            columns, rows = self._load(conn)
+            snapshot = CatalogSnapshot(write_snapshot(path, columns, rows, version), source=path)
+        logger.info(f"📚 Catalog snapshot written: {len(snapshot)} courses, "
+                    f"{os.path.getsize(snapshot.file_path)} bytes (version {version})")
+        return snapshot
+
+    @staticmethod
+    def _open_current(path: str, version: int) -> Optional[CatalogSnapshot]:
+        """The mapped file if it is at least as new as version"""
+        try:
+            snapshot = CatalogSnapshot(path)
+        except (OSError, ValueError):
+            return None
+        return snapshot if snapshot.version >= version else None
+
+    def _load(self, conn) -> Tuple[List[str], List[Any]]:
+        db = None
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+        try:
+            connection = db.connection if db is not None else conn
+            if isinstance(connection, sqlite3.Connection):
+                sql = "SELECT * FROM courses ORDER BY created_at DESC, id DESC"
+            else:
+                sql = (f"SELECT {', '.join(SQLSERVER_COLUMNS)} FROM {SQLSERVER_COURSES_VIEW} "
+                       f"ORDER BY created_at DESC, id DESC")
+            if db is not None:
+                cursor = connection.cursor()
+                cursor.execute(sql)
+            else:
+                cursor = conn.execute(sql)
+            columns = [column[0] for column in cursor.description]
+            rows = [[row[n] for n in range(len(columns))] for row in cursor.fetchall()]
+        finally:
+            if db is not None:
+                db.disconnect()
+        return columns, rows
+
+
+# Global catalog cache (maps the host-wide snapshot file)
+catalog_cache = CourseCatalogCache()
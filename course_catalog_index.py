@@ -0,0 +1,175 @@
+"""
+Course Catalog Index - AI Learning Tracker
+Answers "which courses has this user not completed yet" without the
+courses x user_courses anti-join. Courses get dense ordinals in display order
+(newest first), each level has a precomputed bitmap over those ordinals and a
+user's completions are one more bitmap, so the uncompleted courses at a level
+are `level_bits & ~completed_bits` and a page is a slice of its set bits.
+Bitmaps are Python ints cached per worker and rebuilt when the catalog or the
+user's completion version changes.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from cache_versions import CATALOG, completions_key, get_versions
+from course_catalog_cache import CatalogSnapshot, CourseRows, catalog_cache
+from database_environment_manager import DatabaseEnvironmentManager
+
+logger = logging.getLogger(__name__)
+
+
+def bits_from_ordinals(ordinals: Iterable[int]) -> int:
+    """Bitmap with the given bit positions set"""
+    ordinals = np.fromiter(ordinals, dtype=np.int64)
+    if not len(ordinals):
+        return 0
+    flags = np.zeros(int(ordinals.max()) + 1, dtype=bool)
+    flags[ordinals] = True
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+
+def ordinals_of(bits: int) -> np.ndarray:
+    """Positions of the set bits, ascending"""
+    if bits <= 0:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+
+class CatalogIndex:
+    """Immutable ordinal and per-level bitmap view of the catalog at one version"""
+
+    def __init__(self, rows: List[Tuple[int, Optional[str]]], version: int):
+        self.version = version
+        self.ids = [row[0] for row in rows]
+        self.ordinals = {course_id: n for n, course_id in enumerate(self.ids)}
+        self.all_bits = (1 << len(self.ids)) - 1
+
+        by_level = {}
+        for n, (_, level) in enumerate(rows):
+            by_level.setdefault(level or '', []).append(n)
+        self.level_bits = {level: bits_from_ordinals(ordinals) for level, ordinals in by_level.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def bits_for(self, course_ids: Iterable[int]) -> int:
+        """Bitmap of the given courses (ids no longer in the catalog are ignored)"""
+        return bits_from_ordinals(self.ordinals[course_id] for course_id in course_ids
+                                  if course_id in self.ordinals)
+
+    def uncompleted(self, completed_bits: int, level: str = None) -> int:
+        """Courses (optionally at one level) whose bit is not in completed_bits"""
+        base = self.level_bits.get(level, 0) if level else self.all_bits
+        return base & ~completed_bits
+
+    def page(self, bits: int, page: int = 1, per_page: int = None) -> Tuple[List[int], int]:
+        """Course ids of one page of the set bits in display order, plus the total count"""
+        ordinals = ordinals_of(bits)
+        if per_page:
+            start = (max(page, 1) - 1) * per_page
+            selected = ordinals[start:start + per_page]
+        else:
+            selected = ordinals
+        return [self.ids[n] for n in selected.tolist()], len(ordinals)
+
+
+class CourseCatalogIndexCache:
+    """Per-worker cache of the catalog index and of recent users' completion bitmaps"""
+
+    def __init__(self, max_users: int = None):
+        self.max_users = max_users or int(os.getenv('COURSE_INDEX_MAX_USERS', '5000'))
+        self._index: Optional[CatalogIndex] = None
+        self._index_snapshot: Optional[CatalogSnapshot] = None
+        self._user_bits: 'OrderedDict[int, Tuple[int, int, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def uncompleted_ids(self, user_id: int, level: str = None, page: int = 1, per_page: int = None,
+                        conn=None) -> Tuple[List[int], int]:
+        """
+        Ids of courses the user has not completed (newest first), optionally
+        at one level and one page, plus the total matching count.
+        `conn` may be an open route connection; otherwise one is opened.
+        """
+        _, index, completed = self._lookup(user_id, conn)
+        return index.page(index.uncompleted(completed, level), page, per_page)
+
+    def uncompleted_courses(self, user_id: int, level: str = None, page: int = 1, per_page: int = None,
+                            conn=None) -> Tuple[List[Dict[str, Any]], int]:
+        """Like uncompleted_ids, but resolved to course dicts from the catalog snapshot"""
+        snapshot, index, completed = self._lookup(user_id, conn)
+        course_ids, total = index.page(index.uncompleted(completed, level), page, per_page)
+        return list(snapshot.rows_for_ids(course_ids)), total
+
+    def uncompleted_rows(self, user_id: int, rows: CourseRows, conn=None) -> CourseRows:
+        """The given snapshot rows without the courses the user has completed, order kept"""
+        db = None
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            conn = db.connection
+        try:
+            user_key = completions_key(user_id)
+            version = get_versions([user_key], conn)[user_key]
+            # Ordinals are snapshot row positions, so the bitmap applies to rows.positions directly
+            index = self._catalog_index(rows.snapshot)
+            completed = self._completed_bits(conn, index, user_id, version)
+        finally:
+            if db is not None:
+                db.disconnect()
+        keep = ~np.isin(rows.positions, ordinals_of(completed))
+        return CourseRows(rows.snapshot, rows.positions[keep])
+
+    def _lookup(self, user_id: int, conn) -> Tuple[CatalogSnapshot, CatalogIndex, int]:
+        db = None
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            conn = db.connection
+        try:
+            user_key = completions_key(user_id)
+            versions = get_versions([CATALOG, user_key], conn)
+            snapshot = catalog_cache.snapshot(conn, versions[CATALOG])
+            index = self._catalog_index(snapshot)
+            return snapshot, index, self._completed_bits(conn, index, user_id, versions[user_key])
+        finally:
+            if db is not None:
+                db.disconnect()
+
+    def _catalog_index(self, snapshot: CatalogSnapshot) -> CatalogIndex:
+        index = self._index
+        if index is not None and self._index_snapshot is snapshot:
+            return index
+        index = CatalogIndex(list(zip(snapshot.ids.tolist(), snapshot.values('level'))), snapshot.version)
+        with self._lock:
+            self._index, self._index_snapshot = index, snapshot
+            self._user_bits.clear()  # ordinals moved
+        logger.info(f"🗂️ Catalog index rebuilt: {len(index)} courses, {len(index.level_bits)} levels "
+                    f"(version {snapshot.version})")
+        return index
+
+    def _completed_bits(self, conn, index: CatalogIndex, user_id: int, version: int) -> int:
+        with self._lock:
+            cached = self._user_bits.get(user_id)
+            if cached and cached[0] == version and cached[1] == index.version:
+                self._user_bits.move_to_end(user_id)
+                return cached[2]
+        rows = conn.execute("SELECT course_id FROM user_courses WHERE user_id = ? AND completed = 1",
+                            (user_id,)).fetchall()
+        bits = index.bits_for(row[0] for row in rows)
+        with self._lock:
+            self._user_bits[user_id] = (version, index.version, bits)
+            self._user_bits.move_to_end(user_id)
+            while len(self._user_bits) > self.max_users:
+                self._user_bits.popitem(last=False)
+        return bits
+
+
+# Global index cache (one per worker process)
+catalog_index = CourseCatalogIndexCache()
@@ -0,0 +1,187 @@
+"""
+Course Co-Completion Filtering - AI Learning Tracker
+"People who completed X also completed Y": item-item cosine similarity over the
+user x course completion matrix in user_courses. The matrix is held as numpy
+CSR/CSC index arrays, co-completion counts for a block of courses come from one
+bincount, and each course's top-k neighbours are stored in course_neighbors
+next to the content-based lists so both are served by the same lookup.
+Completions recorded since the last run are folded in by recomputing only the
+courses their users touched; those users are found through the completions
+change sequence in cache_versions, never through user-editable dates.
+"""
+
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from cache_versions import completion_changes
+from course_recommender import (MODEL_COLLABORATIVE, SCORE_BLOCK, insert_neighbor_lists,
+                                load_model_state, replace_neighbor_lists, save_model_state,
+                                top_neighbors)
+from database_environment_manager import DatabaseEnvironmentManager
+from job_manager import job_manager
+
+logger = logging.getLogger(__name__)
+
+
+def concat_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + length) for every pair, without a Python loop"""
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return offsets + np.arange(int(lengths.sum()))
+
+
+class CompletionMatrix:
+    """
+    Sparse binary user x course completion matrix
+    Stored both course-major (the users who completed each course) and
+    user-major (the courses each user completed); duplicate pairs count once.
+    """
+
+    def __init__(self, user_ids: np.ndarray, course_ids: np.ndarray):
+        self.user_ids, users = np.unique(np.asarray(user_ids, dtype=np.int64), return_inverse=True)
+        self.course_ids, courses = np.unique(np.asarray(course_ids, dtype=np.int64), return_inverse=True)
+        pairs = np.unique(users.astype(np.int64) * len(self.course_ids) + courses)
+        users, courses = pairs // len(self.course_ids), pairs % len(self.course_ids)
+
+        # pairs are sorted by user, so this is already user-major
+        self.user_ptr = np.concatenate(([0], np.cumsum(np.bincount(users, minlength=len(self.user_ids)))))
+        self.user_courses = courses
+        order = np.argsort(courses, kind='stable')
+        self.course_ptr = np.concatenate(([0], np.cumsum(np.bincount(courses, minlength=len(self.course_ids)))))
+        self.course_users = users[order]
+        self.completions = np.diff(self.course_ptr)
+
+    def __len__(self) -> int:
+        return len(self.course_ids)
+
+    def co_counts(self, block: np.ndarray) -> np.ndarray:
+        """Users who completed both courses, for each (block course, course) pair"""
+        size = len(self.course_ids)
+        starts = self.course_ptr[block]
+        lengths = self.course_ptr[block + 1] - starts
+        users = self.course_users[concat_ranges(starts, lengths)]
+        query = np.repeat(np.arange(len(block)), lengths)
+
+        user_starts = self.user_ptr[users]
+        user_lengths = self.user_ptr[users + 1] - user_starts
+        cells = np.repeat(query, user_lengths) * size + self.user_courses[concat_ranges(user_starts, user_lengths)]
+        return np.bincount(cells, minlength=len(block) * size).reshape(len(block), size)
+
+    def cosine(self, block: np.ndarray, min_common: int = 1) -> np.ndarray:
+        """Cosine similarity of block courses to every course; pairs below min_common users score 0"""
+        counts = self.co_counts(block)
+        norms = np.sqrt(self.completions[block].astype(np.float64)[:, None] * self.completions[None, :])
+        scores = np.where(counts >= min_common, counts / np.maximum(norms, 1.0), 0.0)
+        return scores.astype(np.float32)
+
+
+class CollaborativeRecommender:
+    """Builds co-completion neighbour lists from user_courses"""
+
+    def __init__(self, top_k: int = None):
+        self.top_k = top_k or int(os.getenv('RECOMMENDER_TOP_K', '20'))
+        self.min_similarity = float(os.getenv('COFILTER_MIN_SIMILARITY', '0.01'))
+        # Pairs completed together by fewer users than this are treated as noise
+        self.min_common = int(os.getenv('COFILTER_MIN_COMMON_USERS', '2'))
+        # Full rebuild once new completions exceed this share of the last full build
+        self.rebuild_ratio = float(os.getenv('COFILTER_REBUILD_RATIO', '0.1'))
+        self._tables_ready = False
+
+    def _connect(self) -> DatabaseEnvironmentManager:
+        db = DatabaseEnvironmentManager()
+        db.connect()
+        if not self._tables_ready:
+            db.ensure_tables('course_neighbors', 'recommender_state')
+            self._tables_ready = True
+        return db
+
+    def neighbors(self, matrix: CompletionMatrix, block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k neighbour positions and scores for the given course positions"""
+        scores = matrix.cosine(block, self.min_common)
+        return top_neighbors(scores, block, self.top_k, self.min_similarity)
+
+    def update_index(self, full: bool = False, ctx=None) -> Dict[str, Any]:
+        """
+        Bring the co-completion lists up to date with user_courses
+        The watermark is the completions change sequence at the last run;
+        only courses completed by users changed after it are recomputed.
+        Lists of other courses that mention a touched course keep their old
+        scores until the next full rebuild, which runs on request, on first
+        build, when completions were removed, or past the rebuild ratio.
+        """
+        started = datetime.now()
+        db = self._connect()
+        try:
+            cursor = db.connection.cursor()
+            state = load_model_state(cursor, MODEL_COLLABORATIVE)
+            try:
+                previous = int(state.get('watermark'))
+            except (TypeError, ValueError):
+                previous = None  # first build, or a watermark from before the change sequence
+            # Read before the rows: a change committed in between is picked up again next run
+            watermark, changed_users = completion_changes(previous or 0, db.connection)
+            cursor.execute("SELECT user_id, course_id FROM user_courses WHERE completed = 1")
+            rows = cursor.fetchall()
+
+            grown = len(rows) - (state.get('indexed_items') or 0)
+            if not full and previous is not None and not grown and not changed_users:
+                return {'mode': 'unchanged', 'completions': len(rows), 'lists_written': 0}
+
+            full = (full or not state or grown < 0 or previous is None
+                    or max(grown, 1) > self.rebuild_ratio * max(state.get('built_items') or 0, 1))
+            matrix = CompletionMatrix(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+                                      np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)))
+            if full:
+                touched = np.arange(len(matrix))
+            else:
+                # Users whose completions were all removed have no row (and grown < 0 forced a full build)
+                new_users = np.intersect1d(matrix.user_ids, np.asarray(changed_users, dtype=np.int64))
+                user_rows = np.searchsorted(matrix.user_ids, new_users)
+                touched = np.unique(matrix.user_courses[concat_ranges(
+                    matrix.user_ptr[user_rows], np.diff(matrix.user_ptr)[user_rows])])
+
+            # Score everything before writing: progress updates use their own connection
+            # and would wait on an open write transaction (SQLite)
+            lists = []
+            for start in range(0, len(touched), SCORE_BLOCK):
+                block = touched[start:start + SCORE_BLOCK]
+                lists.append((block, *self.neighbors(matrix, block)))
+                if ctx:
+                    ctx.update_progress(start + len(block), len(touched), 'Scoring co-completions')
+                    ctx.raise_if_cancelled()
+
+            if full:
+                cursor.execute("DELETE FROM course_neighbors WHERE model = ?", (MODEL_COLLABORATIVE,))
+            write = insert_neighbor_lists if full else replace_neighbor_lists
+            for block, top, top_scores in lists:
+                write(cursor, MODEL_COLLABORATIVE, matrix.course_ids[block], matrix.course_ids[top], top_scores)
+
+            save_model_state(cursor, MODEL_COLLABORATIVE, state, datetime.now(), full,
+                             indexed_max_id=int(matrix.course_ids.max()) if len(matrix) else 0,
+                             indexed_items=len(rows),
+                             built_items=len(rows) if full else state.get('built_items') or 0,
+                             watermark=str(watermark))
+            db.connection.commit()
+        finally:
+            db.disconnect()
+
+        result = {'mode': 'full' if full else 'incremental', 'completions': len(rows),
+                  'users': len(matrix.user_ids), 'lists_written': len(touched),
+                  'seconds': round((datetime.now() - started).total_seconds(), 3)}
+        logger.info(f"👥 Co-completion {result['mode']} update: {result['completions']} completions, "
+                    f"{len(touched)} neighbour lists written in {result['seconds']}s")
+        return result
+
+    def run_update_job(self, ctx) -> Dict[str, Any]:
+        """Background job handler that refreshes the co-completion lists"""
+        return self.update_index(full=bool(ctx.payload.get('full')), ctx=ctx)
+
+
+# Global collaborative recommender instance
+collaborative = CollaborativeRecommender()
+
+# Register with the background job engine
+job_manager.register('collaborative_update', collaborative.run_update_job, max_attempts=2)
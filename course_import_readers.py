@@ -0,0 +1,123 @@
+"""
+Course Import Readers - Pluggable file readers for the bulk course upload pipeline
+Detects the upload format from the file signature and parses it into a DataFrame
+that the upload validator and writer stages consume unchanged.
+"""
+
+import os
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Registered readers: format name -> {'reader': callable, 'extensions': [...]}
+READERS: Dict[str, Dict[str, Any]] = {}
+
+# Leading bytes that identify binary formats
+ZIP_SIGNATURE = b'PK\x03\x04'               # .xlsx (Office Open XML is a zip archive)
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # legacy .xls
+PARQUET_SIGNATURE = b'PAR1'
+
+
+def register_reader(format_name: str, extensions: List[str]) -> Callable:
+    """Decorator registering a reader function for a file format"""
+    def decorator(func: Callable[[str], Any]) -> Callable[[str], Any]:
+        READERS[format_name] = {'reader': func, 'extensions': extensions}
+        return func
+    return decorator
+
+
+def supported_extensions() -> List[str]:
+    """File extensions accepted by the registered readers"""
+    return sorted({ext for info in READERS.values() for ext in info['extensions']})
+
+
+def detect_format(path: str) -> Optional[str]:
+    """
+    Detect the upload format from the file signature
+    Falls back to the file extension for text formats with no magic bytes
+    """
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+
+    if head.startswith(ZIP_SIGNATURE):
+        return 'xlsx'
+    if head.startswith(OLE_SIGNATURE):
+        return 'xls'
+    if head.startswith(PARQUET_SIGNATURE):
+        return 'parquet'
+
+    text = head.lstrip(b'\xef\xbb\xbf').lstrip()
+    if not text:
+        return None
+    if text.startswith(b'{'):
+        return 'jsonl'
+
+    extension = os.path.splitext(path)[1].lower()
+    for format_name, info in READERS.items():
+        if extension in info['extensions']:
+            return format_name
+
+    # Delimited text is the only remaining text format
+    return 'csv'
+
+
+def read_course_file(path: str, file_format: str = None):
+    """
+    Parse an upload into a DataFrame using the reader for its format
+    Returns: (format_name, dataframe)
+    """
+    file_format = file_format or detect_format(path)
+    if not file_format:
+        raise ValueError("File is empty or its format could not be detected.")
+
+    reader_info = READERS.get(file_format)
+    if not reader_info:
+        raise ValueError(
+            f"Unsupported file format '{file_format}'. Supported formats: {', '.join(sorted(READERS))}"
+        )
+
+    df = reader_info['reader'](path)
+    logger.info(f"📥 Parsed {file_format} upload: {len(df)} rows")
+    return file_format, df
+
+
+@register_reader('xlsx', ['.xlsx'])
+def read_xlsx(path: str):
+    """Read an Office Open XML workbook (first sheet)"""
+    import pandas as pd
+    return pd.read_excel(path)
+
+
+@register_reader('xls', ['.xls'])
+def read_xls(path: str):
+    """Read a legacy Excel workbook (first sheet)"""
+    import pandas as pd
+    return pd.read_excel(path)
+
+
+@register_reader('csv', ['.csv', '.txt'])
+def read_csv(path: str):
+    """Read comma separated values with a header row"""
+    import pandas as pd
+    return pd.read_csv(path, encoding='utf-8-sig', skipinitialspace=True)
+
+
+@register_reader('jsonl', ['.jsonl', '.ndjson'])
+def read_jsonl(path: str):
+    """Read JSON Lines: one course object per line"""
+    import pandas as pd
+    return pd.read_json(path, lines=True, dtype=False)
+
+
+try:
+    import pyarrow  # noqa: F401 - only needed to enable the Parquet reader
+
+    @register_reader('parquet', ['.parquet'])
+    def read_parquet(path: str):
+        """Read a Parquet file"""
+        import pandas as pd
+        return pd.read_parquet(path)
+
+except ImportError:
+    logger.info("pyarrow not installed - Parquet uploads disabled")
@@ -0,0 +1,492 @@
+"""
+Course Recommender - AI Learning Tracker
+Content-based recommendations from TF-IDF vectors over each course's title,
+description, category and level (co-completion neighbours are built by
+course_cofiltering.py). Every course's top-k most similar courses are
+precomputed into the course_neighbors table, so serving a user's
+recommendations is one indexed lookup over the neighbours of the courses they
+completed. New courses are folded in incrementally; a full rebuild runs when
+the catalog has grown enough for the term weights to drift.
+"""
+
+import os
+import re
+import math
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from database_environment_manager import DatabaseEnvironmentManager
+from job_manager import job_manager
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONTENT = 'content'
+MODEL_COLLABORATIVE = 'collaborative'
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9\+#\.]*[a-z0-9\+#]|[a-z0-9]')
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the this to was were
+    will with you your how what into about using use learn course courses introduction intro
+""".split())
+
+# Field weights: titles say most about a course, category and level add a shared signal
+TITLE_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.5
+LEVEL_WEIGHT = 0.5
+
+# Terms in more than this share of courses are scored with a dense matrix product
+DENSE_TERM_SHARE = 0.01
+MAX_DENSE_TERMS = 1024
+
+# Courses scored against the catalog per block (bounds the block x catalog score array)
+SCORE_BLOCK = 256
+
+# Keeps IN (...) lists well under the SQL Server parameter limit
+ID_CHUNK_SIZE = 500
+
+
+def course_terms(course: Dict[str, Any]) -> Counter:
+    """Weighted term counts for a course; category and level become their own terms"""
+    terms = Counter()
+    for token in TOKEN_PATTERN.findall((course.get('title') or '').lower()):
+        if token not in STOPWORDS:
+            terms[token] += TITLE_WEIGHT
+    for token in TOKEN_PATTERN.findall((course.get('description') or '').lower()):
+        if token not in STOPWORDS:
+            terms[token] += 1.0
+    if course.get('category'):
+        terms[f"category:{course['category'].strip().lower()}"] += CATEGORY_WEIGHT
+    if course.get('level'):
+        terms[f"level:{course['level'].strip().lower()}"] += LEVEL_WEIGHT
+    return terms
+
+
+class TfidfIndex:
+    """
+    L2-normalised TF-IDF vectors for a set of courses, without scipy
+    Rows are kept as an inverted index (postings per term) for rare terms and
+    as a small dense matrix for the few terms shared by many courses, so a
+    block of courses is scored against the whole catalog with one matrix
+    product plus one bincount.
+    """
+
+    def __init__(self, courses: List[Dict[str, Any]]):
+        self.ids = np.array([int(course['id']) for course in courses], dtype=np.int64)
+        term_counts = [course_terms(course) for course in courses]
+
+        vocabulary: Dict[str, int] = {}
+        rows, cols, weights = [], [], []
+        for row, terms in enumerate(term_counts):
+            for term, count in terms.items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                weights.append(1.0 + math.log(count))  # sublinear tf
+        self.vocabulary = vocabulary
+
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        weights = np.array(weights, dtype=np.float32)
+        size = len(courses)
+        df = np.bincount(cols, minlength=len(vocabulary))
+        idf = (np.log((1.0 + size) / (1.0 + df)) + 1.0).astype(np.float32)
+        weights *= idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=size))
+        weights /= np.where(norms > 0, norms, 1.0)[rows].astype(np.float32)
+
+        # Row-major (CSR) arrays: one course's terms are indices[indptr[r]:indptr[r + 1]]
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=size))))
+        self.indices, self.data = cols, weights
+
+        # Dense columns for common terms, postings for the rest
+        dense_terms = np.flatnonzero(df > max(1, size * DENSE_TERM_SHARE))
+        if len(dense_terms) > MAX_DENSE_TERMS:
+            dense_terms = dense_terms[np.argsort(-df[dense_terms], kind='stable')[:MAX_DENSE_TERMS]]
+        self.dense_slot = np.full(len(vocabulary), -1, dtype=np.int64)
+        self.dense_slot[dense_terms] = np.arange(len(dense_terms))
+        self.dense = np.zeros((size, len(dense_terms)), dtype=np.float32)
+        is_dense = self.dense_slot[cols] >= 0
+        self.dense[rows[is_dense], self.dense_slot[cols[is_dense]]] = weights[is_dense]
+
+        sparse = np.flatnonzero(~is_dense)
+        order = sparse[np.argsort(cols[sparse], kind='stable')]
+        self.posting_ptr = np.concatenate(([0], np.cumsum(np.bincount(cols[sparse], minlength=len(vocabulary)))))
+        self.posting_rows, self.posting_data = rows[order], weights[order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, block: np.ndarray) -> np.ndarray:
+        """Cosine similarities (len(block) x catalog) for the given row positions"""
+        size = len(self.ids)
+        result = self.dense[block] @ self.dense.T
+
+        # Rare terms: expand every (query row, term) into the term's postings
+        starts, ends = self.indptr[block], self.indptr[block + 1]
+        entry = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) if len(block) else \
+            np.empty(0, dtype=np.int64)
+        query = np.repeat(np.arange(len(block)), ends - starts)
+        rare = self.dense_slot[self.indices[entry]] < 0
+        entry, query = entry[rare], query[rare]
+        terms = self.indices[entry]
+        lengths = self.posting_ptr[terms + 1] - self.posting_ptr[terms]
+        if lengths.sum():
+            offsets = np.repeat(self.posting_ptr[terms] - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+            postings = offsets + np.arange(lengths.sum())
+            cells = np.repeat(query, lengths) * size + self.posting_rows[postings]
+            products = np.repeat(self.data[entry], lengths) * self.posting_data[postings]
+            result += np.bincount(cells, weights=products, minlength=len(block) * size) \
+                .reshape(len(block), size).astype(np.float32)
+        return result
+
+
+def top_neighbors(scores: np.ndarray, exclude: np.ndarray, k: int,
+                  min_score: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row top-k column positions and scores (best first), excluding each row's own column"""
+    scores[np.arange(len(exclude)), exclude] = -1.0
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((len(scores), 0))
+        return empty.astype(np.int64), empty
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+    top_scores[top_scores < min_score] = np.nan  # callers skip these slots
+    return top, top_scores
+
+
+def replace_neighbor_lists(cursor, model: str, course_ids: np.ndarray, neighbor_ids: np.ndarray,
+                           neighbor_scores: np.ndarray) -> None:
+    """Overwrite the stored lists of the given courses (NaN scores mark empty slots)"""
+    ids = [int(course_id) for course_id in course_ids]
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor.execute(f"DELETE FROM course_neighbors WHERE model = ? AND course_id IN ({placeholders})",
+                       [model] + chunk)
+    insert_neighbor_lists(cursor, model, course_ids, neighbor_ids, neighbor_scores)
+
+
+def insert_neighbor_lists(cursor, model: str, course_ids: np.ndarray, neighbor_ids: np.ndarray,
+                          neighbor_scores: np.ndarray) -> None:
+    rows = [(model, int(course_id), int(neighbor), float(score), rank)
+            for course_id, neighbors, scores in zip(course_ids, neighbor_ids, neighbor_scores)
+            for rank, (neighbor, score) in enumerate(zip(neighbors, scores)) if not np.isnan(score)]
+    if rows:
+        cursor.executemany('''
+            INSERT INTO course_neighbors (model, course_id, neighbor_id, score, neighbor_rank)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def load_neighbor_lists(cursor, model: str, course_ids: List[int]) -> Dict[int, List[Tuple[float, int]]]:
+    """Stored neighbour lists as (score, neighbour id), best first"""
+    lists: Dict[int, List[Tuple[float, int]]] = {}
+    for start in range(0, len(course_ids), ID_CHUNK_SIZE):
+        chunk = course_ids[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor.execute(f'''
+            SELECT course_id, neighbor_id, score FROM course_neighbors
+            WHERE model = ? AND course_id IN ({placeholders})
+            ORDER BY course_id, neighbor_rank
+        ''', [model] + chunk)
+        for course_id, neighbor_id, score in cursor.fetchall():
+            lists.setdefault(course_id, []).append((score, neighbor_id))
+    return lists
+
+
+def load_model_state(cursor, model: str) -> Dict[str, Any]:
+    """Build bookkeeping for one model ({} before its first build)"""
+    cursor.execute('''
+        SELECT indexed_max_id, indexed_items, built_items, watermark, last_full_build, last_update
+        FROM recommender_state WHERE model = ?
+    ''', (model,))
+    row = cursor.fetchone()
+    if not row:
+        return {}
+    columns = [column[0] for column in cursor.description]
+    return dict(zip(columns, row))
+
+
+def save_model_state(cursor, model: str, state: Dict[str, Any], now: datetime, full: bool,
+                     indexed_max_id: int = 0, indexed_items: int = 0, built_items: int = 0,
+                     watermark: str = None) -> None:
+    last_full_build = now if full else state.get('last_full_build')
+    values = (indexed_max_id, indexed_items, built_items, watermark, last_full_build, now, model)
+    if state:
+        cursor.execute('''
+            UPDATE recommender_state
+            SET indexed_max_id = ?, indexed_items = ?, built_items = ?, watermark = ?,
+                last_full_build = ?, last_update = ?
+            WHERE model = ?
+        ''', values)
+    else:
+        cursor.execute('''
+            INSERT INTO recommender_state
+                (indexed_max_id, indexed_items, built_items, watermark, last_full_build, last_update, model)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', values)
+
+
+class CourseRecommender:
+    """Builds the course neighbour table and serves per-user recommendations from it"""
+
+    def __init__(self, top_k: int = None):
+        self.top_k = top_k or int(os.getenv('RECOMMENDER_TOP_K', '20'))
+        self.min_similarity = float(os.getenv('RECOMMENDER_MIN_SIMILARITY', '0.05'))
+        # Full rebuild once new courses exceed this share of the last full build
+        self.rebuild_ratio = float(os.getenv('RECOMMENDER_REBUILD_RATIO', '0.25'))
+        # Serving blends the neighbour lists of every model with a non-zero weight
+        self.model_weights = {
+            MODEL_CONTENT: float(os.getenv('RECOMMENDER_CONTENT_WEIGHT', '1.0')),
+            MODEL_COLLABORATIVE: float(os.getenv('RECOMMENDER_COLLABORATIVE_WEIGHT', '1.0')),
+        }
+        self._tables_ready = False
+
+    def _connect(self) -> DatabaseEnvironmentManager:
+        db = DatabaseEnvironmentManager()
+        db.connect()
+        if not self._tables_ready:
+            db.ensure_tables('course_neighbors', 'recommender_state')
+            self._tables_ready = True
+        return db
+
+    # ------------------------------------------------------------------
+    # Offline build
+    # ------------------------------------------------------------------
+
+    def update_index(self, full: bool = False, ctx=None) -> Dict[str, Any]:
+        """
+        Bring the neighbour table up to date with the catalog
+        Courses added since the last run are scored against the catalog and
+        merged into existing neighbour lists; everything is recomputed when
+        `full` is set, on first build, or when the catalog grew past the
+        rebuild ratio.
+        """
+        started = datetime.now()
+        db = self._connect()
+        try:
+            cursor = db.connection.cursor()
+            cursor.execute("SELECT id, title, description, category, level FROM courses ORDER BY id")
+            columns = [column[0] for column in cursor.description]
+            courses = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            state = load_model_state(cursor, MODEL_CONTENT)
+
+            indexed_max_id = state.get('indexed_max_id') or 0
+            new_count = sum(1 for course in courses if course['id'] > indexed_max_id)
+            if not full and state and not new_count:
+                return {'mode': 'unchanged', 'courses': len(courses), 'new_courses': 0, 'lists_written': 0}
+
+            full = full or not state or new_count > self.rebuild_ratio * max(state.get('built_items') or 0, 1)
+            index = TfidfIndex(courses)
+            if full:
+                lists_written = self._full_build(db, index, ctx)
+                built_items = len(courses)
+            else:
+                new_rows = np.flatnonzero(index.ids > indexed_max_id)
+                lists_written = self._fold_in(db, index, new_rows)
+                built_items = state.get('built_items') or 0
+
+            save_model_state(cursor, MODEL_CONTENT, state, datetime.now(), full,
+                             indexed_max_id=int(index.ids.max()) if len(index) else 0,
+                             indexed_items=len(courses), built_items=built_items)
+            db.connection.commit()
+        finally:
+            db.disconnect()
+
+        result = {'mode': 'full' if full else 'incremental', 'courses': len(courses), 'new_courses': new_count,
+                  'lists_written': lists_written,
+                  'seconds': round((datetime.now() - started).total_seconds(), 3)}
+        logger.info(f"🧭 Recommendations {result['mode']} update: {new_count} new courses, "
+                    f"{lists_written} neighbour lists written in {result['seconds']}s")
+        return result
+
+    def _full_build(self, db: DatabaseEnvironmentManager, index: TfidfIndex, ctx=None) -> int:
+        """
+        Recompute every course's neighbour list
+        All blocks are scored before the write transaction opens: progress
+        updates go through their own connection and would wait on it (SQLite).
+        """
+        lists = []
+        for start in range(0, len(index), SCORE_BLOCK):
+            block = np.arange(start, min(start + SCORE_BLOCK, len(index)))
+            lists.append((block, *top_neighbors(index.scores(block), block, self.top_k, self.min_similarity)))
+            if ctx:
+                ctx.update_progress(int(block[-1]) + 1, len(index), 'Scoring course similarities')
+                ctx.raise_if_cancelled()
+
+        cursor = db.connection.cursor()
+        cursor.execute("DELETE FROM course_neighbors WHERE model = ?", (MODEL_CONTENT,))
+        for block, top, top_scores in lists:
+            insert_neighbor_lists(cursor, MODEL_CONTENT, index.ids[block], index.ids[top], top_scores)
+        return len(index)
+
+    def _fold_in(self, db: DatabaseEnvironmentManager, index: TfidfIndex, new_rows: np.ndarray) -> int:
+        """
+        Add new courses: each gets its own list, and existing courses whose
+        list a new course now beats are rewritten with the merged list.
+        """
+        cursor = db.connection.cursor()
+        # A new course only matters to an existing list if it beats that list's weakest entry
+        floors = np.full(len(index), self.min_similarity, dtype=np.float32)
+        position = {int(course_id): row for row, course_id in enumerate(index.ids)}
+        cursor.execute('''
+            SELECT course_id, COUNT(*), MIN(score) FROM course_neighbors
+            WHERE model = ? GROUP BY course_id
+        ''', (MODEL_CONTENT,))
+        for course_id, count, weakest in cursor.fetchall():
+            if count >= self.top_k and course_id in position:
+                floors[position[course_id]] = max(weakest, self.min_similarity)
+
+        best_new = {}  # existing course id -> [(score, new course id)]
+        for start in range(0, len(new_rows), SCORE_BLOCK):
+            block = new_rows[start:start + SCORE_BLOCK]
+            scores = index.scores(block)
+            scores[np.arange(len(block)), block] = -1.0
+            for row, column in zip(*np.nonzero(scores >= floors)):
+                best_new.setdefault(int(index.ids[column]), []).append(
+                    (float(scores[row, column]), int(index.ids[block[row]])))
+            top, top_scores = top_neighbors(scores, block, self.top_k, self.min_similarity)
+            replace_neighbor_lists(cursor, MODEL_CONTENT, index.ids[block], index.ids[top], top_scores)
+
+        new_ids = set(index.ids[new_rows].tolist())
+        candidates = [course_id for course_id in best_new if course_id not in new_ids]
+        existing = load_neighbor_lists(cursor, MODEL_CONTENT, candidates)
+        rewrite_ids, rewrite_lists = [], []
+        for course_id in candidates:
+            current = existing.get(course_id, [])
+            merged = sorted(current + best_new[course_id], key=lambda entry: -entry[0])[:self.top_k]
+            rewrite_ids.append(course_id)
+            rewrite_lists.append(merged)
+
+        if rewrite_ids:
+            width = max(len(entries) for entries in rewrite_lists)
+            neighbor_ids = np.zeros((len(rewrite_ids), width), dtype=np.int64)
+            neighbor_scores = np.full((len(rewrite_ids), width), np.nan)
+            for row, entries in enumerate(rewrite_lists):
+                neighbor_ids[row, :len(entries)] = [neighbor for _, neighbor in entries]
+                neighbor_scores[row, :len(entries)] = [score for score, _ in entries]
+            replace_neighbor_lists(cursor, MODEL_CONTENT, np.array(rewrite_ids), neighbor_ids, neighbor_scores)
+        return len(new_rows) + len(rewrite_ids)
+
+    def run_update_job(self, ctx) -> Dict[str, Any]:
+        """Background job handler that refreshes the neighbour table"""
+        return self.update_index(full=bool(ctx.payload.get('full')), ctx=ctx)
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+
+    def scores_for_user(self, user_id: int, conn=None) -> Dict[int, float]:
+        """
+        Recommendation score per course for a user: the similarity of the
+        course to everything the user completed, summed over the models
+        (content and co-completion) by their weights. Completed courses and
+        courses no longer in the catalog are left out. Reads through `conn`
+        when given (a route's connection), otherwise opens its own.
+        """
+        models = [model for model, weight in self.model_weights.items() if weight]
+        db = None
+        if conn is None or not self._tables_ready:
+            db = self._connect()
+            conn = conn if conn is not None else db.connection
+        try:
+            completed = [row[0] for row in conn.execute(
+                "SELECT course_id FROM user_courses WHERE user_id = ? AND completed = 1", (user_id,)).fetchall()]
+            scores: Dict[int, float] = {}
+            for start in range(0, len(completed), ID_CHUNK_SIZE):
+                chunk = completed[start:start + ID_CHUNK_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                model_placeholders = ', '.join('?' for _ in models)
+                rows = conn.execute(f'''
+                    SELECT n.model, n.neighbor_id, SUM(n.score) FROM course_neighbors n
+                    INNER JOIN courses c ON c.id = n.neighbor_id
+                    WHERE n.model IN ({model_placeholders}) AND n.course_id IN ({placeholders})
+                    GROUP BY n.model, n.neighbor_id
+                ''', models + chunk).fetchall()
+                for row in rows:
+                    model, neighbor_id, score = row[0], row[1], row[2]
+                    scores[neighbor_id] = scores.get(neighbor_id, 0.0) + self.model_weights[model] * score
+        finally:
+            if db is not None:
+                db.disconnect()
+
+        for course_id in completed:
+            scores.pop(course_id, None)
+        return scores
+
+    def recommend(self, user_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+        """Top (course id, score) recommendations for a user, best first"""
+        scores = self.scores_for_user(user_id)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def recommended_courses(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Course details for a user's top recommendations; users with no
+        completions (or no similar courses yet) get the newest courses instead.
+        """
+        ranked = self.recommend(user_id, limit)
+        db = self._connect()
+        try:
+            cursor = db.connection.cursor()
+            columns = 'id, title, source, level, link, url, points, category'
+            if ranked:
+                placeholders = ', '.join('?' for _ in ranked)
+                cursor.execute(f"SELECT {columns} FROM courses WHERE id IN ({placeholders})",
+                               [course_id for course_id, _ in ranked])
+            else:
+                top = f"TOP {int(limit)} " if db.is_azure_sql() else ''
+                tail = '' if db.is_azure_sql() else f" LIMIT {int(limit)}"
+                cursor.execute(f'''
+                    SELECT {top}{columns} FROM courses c
+                    WHERE NOT EXISTS (SELECT 1 FROM user_courses uc
+                                      WHERE uc.course_id = c.id AND uc.user_id = ? AND uc.completed = 1)
+                    ORDER BY created_at DESC, id DESC{tail}
+                ''', (user_id,))
+            names = [column[0] for column in cursor.description]
+            courses = {row[0]: dict(zip(names, row)) for row in cursor.fetchall()}
+        finally:
+            db.disconnect()
+
+        if not ranked:
+            return [dict(course, score=0.0) for course in courses.values()]
+        return [dict(courses[course_id], score=round(score, 4))
+                for course_id, score in ranked if course_id in courses]
+
+    def rank_courses(self, user_id: int, courses: Iterable[Any], conn=None) -> List[Any]:
+        """
+        Order course rows by the user's recommendation score; courses with no
+        score keep their original relative order after the scored ones.
+        """
+        courses = list(courses)
+        try:
+            scores = self.scores_for_user(user_id, conn)
+        except Exception as e:
+            logger.warning(f"⚠️ Recommendations unavailable, keeping default order: {e}")
+            return courses
+        return sorted(courses, key=lambda course: -scores.get(course['id'], 0.0))
+
+
+def queue_index_update(full: bool = False, user_id: int = None) -> Optional[str]:
+    """
+    Queue a background neighbour-table refresh after catalog changes
+    A refresh that is still queued already covers the change, so bursts of
+    edits share one job.
+    """
+    try:
+        return job_manager.submit('recommendation_update', {'full': full}, user_id, coalesce=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not queue recommendation update: {e}")
+        return None
+
+
+# Global recommender instance
+recommender = CourseRecommender()
+
+# Register with the background job engine
+job_manager.register('recommendation_update', recommender.run_update_job, max_attempts=2)
@@ -0,0 +1,188 @@
+"""
+Course Row Validation - AI Learning Tracker
+Validation of uploaded course rows, shared by the upload manager and the
+worker processes of parallel dry runs. Spawned workers import only this
+module, so it must stay free of Flask, the job engine and the recommender.
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RowProcessingResult:
+    """Represents the processing result for a single Excel row"""
+    
+    def __init__(self, row_number: int, raw_data: Dict[str, Any]):
+        self.row_number = row_number
+        self.raw_data = raw_data
+        self.status = 'pending'  # pending, success, skipped, error
+        self.action = None  # inserted, skipped_duplicate, skipped_invalid, error
+        self.error_message = None
+        self.processed_data = {}
+        self.validation_warnings = []
+    
+    def mark_success(self, action: str, processed_data: Dict[str, Any]):
+        """Mark row as successfully processed"""
+        self.status = 'success'
+        self.action = action
+        self.processed_data = processed_data
+    
+    def mark_skipped(self, reason: str):
+        """Mark row as skipped with reason"""
+        self.status = 'skipped'
+        self.action = f'skipped_{reason}'
+        self.error_message = reason
+    
+    def mark_error(self, error_message: str):
+        """Mark row as failed with error"""
+        self.status = 'error'
+        self.action = 'error'
+        self.error_message = error_message
+    
+    def add_warning(self, warning: str):
+        """Add a validation warning"""
+        self.validation_warnings.append(warning)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON response"""
+        return {
+            'row_number': self.row_number,
+            'status': self.status,
+            'action': self.action,
+            'error_message': self.error_message,
+            'processed_data': {
+                'title': self.processed_data.get('title', ''),
+                'url': self.processed_data.get('url', ''),
+                'source': self.processed_data.get('source', ''),
+                'level': self.processed_data.get('level', ''),
+                'points': self.processed_data.get('points', 0)
+            } if self.processed_data else {},
+            'warnings': self.validation_warnings,
+            'raw_data_preview': {
+                'title': str(self.raw_data.get('title', ''))[:50],
+                'url': str(self.raw_data.get('url', ''))[:50],
+                'source': str(self.raw_data.get('source', ''))[:20],
+                'level': str(self.raw_data.get('level', ''))[:20]
+            }
+        }
+
+
+def validate_course_row(row_data: Dict[str, Any], existing_courses: Dict[Tuple[str, str], bool],
+                        valid_levels: List[str]) -> RowProcessingResult:
+    """
+    Validate and process a single uploaded row
+    Returns: RowProcessingResult object
+    """
+    import pandas as pd
+    
+    row_number = row_data.get('_row_number', 0)
+    result = RowProcessingResult(row_number, row_data)
+    
+    try:
+        # Extract and clean required fields
+        title = str(row_data.get('title', '')).strip() if pd.notna(row_data.get('title')) else ''
+        url = str(row_data.get('url', '')).strip() if pd.notna(row_data.get('url')) else ''
+        source = str(row_data.get('source', '')).strip() if pd.notna(row_data.get('source')) else ''
+        level = str(row_data.get('level', '')).strip() if pd.notna(row_data.get('level')) else ''
+        
+        # Validate required fields
+        if not title:
+            result.mark_error("Missing or empty title")
+            return result
+        if not url:
+            result.mark_error("Missing or empty URL")
+            return result
+        if not source:
+            result.mark_error("Missing or empty source")
+            return result
+        if not level:
+            result.mark_error("Missing or empty level")
+            return result
+        
+        # Validate level
+        if level not in valid_levels:
+            result.mark_error(f"Invalid level '{level}'. Must be one of: {', '.join(valid_levels)}")
+            return result
+        
+        # Validate URL format
+        if not url.startswith(('http://', 'https://')):
+            result.mark_error(f"Invalid URL format. Must start with http:// or https://")
+            return result
+        
+        # Check for duplicates
+        duplicate_key = (title.lower().strip(), url.lower().strip())
+        if duplicate_key in existing_courses:
+            result.mark_skipped("duplicate - course with same title and URL already exists")
+            return result
+        
+        # Process optional fields
+        description = str(row_data.get('description', '')).strip() if pd.notna(row_data.get('description')) else ''
+        category = str(row_data.get('category', '')).strip() if pd.notna(row_data.get('category')) else None
+        difficulty = str(row_data.get('difficulty', '')).strip() if pd.notna(row_data.get('difficulty')) else None
+        
+        # Handle points
+        points = 0
+        if 'points' in row_data and pd.notna(row_data['points']):
+            try:
+                points = int(float(row_data['points']))
+                if points < 0:
+                    result.add_warning("Negative points converted to 0")
+                    points = 0
+                elif points > 1000:
+                    result.add_warning("Points over 1000 may be unusually high")
+            except (ValueError, TypeError):
+                result.add_warning("Invalid points value, using 0")
+                points = 0
+        
+        # Auto-assign level based on points if points are provided
+        original_level = level
+        if points > 0:
+            if points < 150:
+                level = 'Beginner'
+            elif points < 250:
+                level = 'Intermediate'
+            else:
+                level = 'Advanced'
+            
+            if level != original_level:
+                result.add_warning(f"Level auto-adjusted from '{original_level}' to '{level}' based on points ({points})")
+        
+        # Prepare processed data
+        processed_data = {
+            'title': title,
+            'description': description,
+            'url': url,
+            'source': source,
+            'level': level,
+            'points': points,
+            'category': category,
+            'difficulty': difficulty
+        }
+        
+        result.processed_data = processed_data
+        return result
+        
+    except Exception as e:
+        logger.error(f"❌ Row processing error for row {row_number}: {e}")
+        result.mark_error(f"Processing failed: {str(e)}")
+        return result
+
+
+# Per-process state for parallel dry-run validation (set by the pool initializer)
+_worker_existing_courses: Dict[Tuple[str, str], bool] = {}
+_worker_valid_levels: List[str] = []
+
+
+def init_validation_worker(existing_courses: Dict[Tuple[str, str], bool], valid_levels: List[str]) -> None:
+    """Ship the dedupe index to each worker process once instead of once per chunk"""
+    global _worker_existing_courses, _worker_valid_levels
+    _worker_existing_courses = existing_courses
+    _worker_valid_levels = valid_levels
+
+
+def validate_chunk(records: List[Dict[str, Any]]) -> List[RowProcessingResult]:
+    """Validate one chunk of rows against the worker's copy of the dedupe index"""
+    return [validate_course_row(record, _worker_existing_courses, _worker_valid_levels)
+            for record in records]
@@ -0,0 +1,115 @@
+"""
+Course Search Cache - AI Learning Tracker
+LRU cache of catalog search and filter results for the course pages. A result
+is the array of matching snapshot row positions, keyed on the normalized
+query, the filters and the catalog version, so it holds no user data and one
+entry serves every user; callers overlay per-user completion state after the
+lookup. Entries are bounded by total bytes, and hit/miss counters are kept for
+the admin stats endpoint.
+"""
+
+import os
+import sys
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from course_catalog_cache import CatalogSnapshot, CourseRows
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry overhead (key tuple, dict slot, array header) added to the array size
+ENTRY_OVERHEAD = 256
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Search text as matched: lower-case, trimmed, single-spaced"""
+    return ' '.join((query or '').lower().split())
+
+
+class SearchResultCache:
+    """Byte-bounded LRU of snapshot.select() results"""
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes or int(os.getenv('COURSE_SEARCH_CACHE_BYTES', str(16 * 1024 * 1024)))
+        self._entries: 'OrderedDict[Tuple, Tuple[np.ndarray, int]]' = OrderedDict()
+        self._catalog: Dict[str, int] = {}  # snapshot source -> newest version seen
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def select(self, snapshot: CatalogSnapshot, search: str = None,
+               where: Dict[str, Callable[[Any], bool]] = None, where_key: Hashable = None,
+               **equals: Any) -> CourseRows:
+        """
+        snapshot.select(...) through the cache
+        `where` predicates cannot be compared, so a caller passing them must
+        also pass a where_key that identifies them (e.g. the raw filter
+        value); without one the query is not cached.
+        """
+        search = normalize_query(search)
+        equals = {column: value for column, value in equals.items() if value not in (None, '')}
+        if where and where_key is None:
+            return snapshot.select(search=search, where=where, **equals)
+
+        key = (snapshot.source, snapshot.version, search, tuple(sorted(equals.items())), where_key)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return CourseRows(snapshot, cached[0])
+            self.misses += 1
+
+        rows = snapshot.select(search=search, where=where, **equals)
+        positions = np.asarray(rows.positions, dtype=np.int32)
+        positions.setflags(write=False)  # shared by every user of the entry
+        self._store(key, positions, snapshot)
+        return CourseRows(snapshot, positions)
+
+    def _store(self, key: Tuple, positions: np.ndarray, snapshot: CatalogSnapshot):
+        size = positions.nbytes + sys.getsizeof(key[2]) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if self._catalog.get(snapshot.source, -1) < snapshot.version:
+                # Results of older catalog versions can never be hit again
+                self._catalog[snapshot.source] = snapshot.version
+                for stale in [k for k in self._entries if k[0] == snapshot.source and k[1] < snapshot.version]:
+                    self._bytes -= self._entries.pop(stale)[1]
+            if key in self._entries:
+                return
+            self._entries[key] = (positions, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Global search result cache (one per worker process)
+search_cache = SearchResultCache()
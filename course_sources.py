@@ -0,0 +1,216 @@
+"""
+Course Sources - Pluggable catalog sources for the background course fetcher
+Each source declares its own rate limit, page size, time budget and incremental
+cursor so the fetcher can run every registered source concurrently.
+"""
+
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from course_sync import catalog_hash
+
+logger = logging.getLogger(__name__)
+
+# Registered sources: source name -> CourseSource instance
+SOURCES: Dict[str, 'CourseSource'] = {}
+
+
+def register_source(cls: Callable[[], 'CourseSource']) -> Callable[[], 'CourseSource']:
+    """Class decorator registering a course source under its name"""
+    source = cls()
+    SOURCES[source.name] = source
+    return cls
+
+
+def enabled_sources(names: List[str] = None) -> List['CourseSource']:
+    """Registered sources that are enabled, optionally restricted to the given names"""
+    return [source for name, source in SOURCES.items()
+            if source.enabled and (names is None or name in names)]
+
+
+class SourceTimeout(Exception):
+    """Raised when a source exceeds its time budget for one fetch run"""
+    pass
+
+
+class SourcePage:
+    """One page of courses plus the tokens needed to continue from it"""
+
+    def __init__(self, courses: List[Dict[str, Any]], next_page_token: Optional[str] = None,
+                 cursor: Optional[str] = None, etag: Optional[str] = None, not_modified: bool = False):
+        self.courses = courses
+        self.next_page_token = next_page_token
+        self.cursor = cursor
+        self.etag = etag
+        self.not_modified = not_modified
+
+
+class CourseSource:
+    """
+    Base class for a course catalog source
+    Subclasses set a name and implement fetch_page; iter_pages handles
+    pagination, rate limiting and the per-source time budget.
+    """
+
+    name = ''
+    requests_per_second = 2.0   # 0 disables the rate limit
+    timeout_seconds = 60.0      # budget for the whole source within one fetch run
+    request_timeout = 10.0      # cap for a single HTTP request
+    page_size = 50
+    enabled = True
+
+    def fetch_page(self, session, page_token: Optional[str], cursor: Optional[str],
+                   timeout: float, etag: Optional[str] = None) -> SourcePage:
+        """
+        Fetch one page of courses
+        page_token continues the current listing; cursor is the value returned
+        by the previous run and lets the source return only newer courses.
+        etag (first page only) allows a conditional request: a source whose
+        listing is unchanged returns a page with not_modified set.
+        """
+        raise NotImplementedError
+
+    def iter_pages(self, session, cursor: Optional[str] = None, deadline: Optional[float] = None,
+                   etag: Optional[str] = None) -> Iterator[SourcePage]:
+        """Yield pages until the listing ends, respecting the rate limit and deadline"""
+        interval = 1.0 / self.requests_per_second if self.requests_per_second else 0.0
+        page_token = None
+        last_request = None
+
+        while True:
+            if last_request is not None and interval:
+                wait_for = last_request + interval - time.monotonic()
+                if wait_for > 0:
+                    if deadline is not None and time.monotonic() + wait_for >= deadline:
+                        raise SourceTimeout(f"{self.name} exceeded its {self.timeout_seconds}s budget")
+                    time.sleep(wait_for)
+
+            timeout = self.request_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SourceTimeout(f"{self.name} exceeded its {self.timeout_seconds}s budget")
+                timeout = min(timeout, remaining)
+
+            last_request = time.monotonic()
+            page = self.fetch_page(session, page_token, cursor, timeout,
+                                   etag=etag if page_token is None else None)
+            yield page
+
+            if page.not_modified or not page.next_page_token:
+                return
+            page_token = page.next_page_token
+
+
+class StaticCatalogSource(CourseSource):
+    """
+    Source backed by a fixed, append-only course list
+    The cursor is the number of courses already seen, so later runs only
+    return courses appended since; the ETag is the hash of the whole list.
+    """
+
+    catalog: List[Dict[str, Any]] = []
+
+    def fetch_page(self, session, page_token, cursor, timeout, etag=None) -> SourcePage:
+        current_etag = f'"{catalog_hash(self.catalog)}"'
+        if etag == current_etag:
+            return SourcePage([], None, cursor=cursor, etag=current_etag, not_modified=True)
+
+        start = int(page_token or cursor or 0)
+        courses = self.catalog[start:start + self.page_size]
+        end = start + len(courses)
+        next_page_token = str(end) if end < len(self.catalog) else None
+        return SourcePage(courses, next_page_token, cursor=str(end), etag=current_etag)
+
+
+@register_source
+class MicrosoftLearnSource(StaticCatalogSource):
+    """Microsoft Learn learning paths (simulated - replace with the Learn catalog API)"""
+
+    name = 'Microsoft Learn'
+    timeout_seconds = float(os.environ.get('MS_LEARN_FETCH_TIMEOUT_SECONDS', 60))
+    catalog = [
+        {
+            'title': 'Introduction to AI with Python',
+            'level': 'Beginner',
+            'description': 'Learn the basics of artificial intelligence using Python programming.',
+            'link': 'https://docs.microsoft.com/learn/paths/intro-to-ai-python',
+            'points': 100
+        },
+        {
+            'title': 'Machine Learning Fundamentals',
+            'level': 'Intermediate',
+            'description': 'Understand core machine learning concepts and algorithms.',
+            'link': 'https://docs.microsoft.com/learn/paths/ml-fundamentals',
+            'points': 150
+        },
+        {
+            'title': 'GitHub Copilot for Developers',
+            'level': 'Intermediate',
+            'description': 'Master AI-powered coding with GitHub Copilot.',
+            'link': 'https://docs.microsoft.com/learn/paths/github-copilot',
+            'points': 120
+        },
+        {
+            'title': 'Azure OpenAI Service',
+            'level': 'Expert',
+            'description': 'Build AI applications using Azure OpenAI Service.',
+            'link': 'https://docs.microsoft.com/learn/paths/azure-openai',
+            'points': 200
+        },
+        {
+            'title': 'Computer Vision with Azure',
+            'level': 'Intermediate',
+            'description': 'Develop computer vision solutions using Azure Cognitive Services.',
+            'link': 'https://docs.microsoft.com/learn/paths/computer-vision-azure',
+            'points': 180
+        }
+    ]
+
+
+@register_source
+class GitHubSource(StaticCatalogSource):
+    """AI/ML learning repositories on GitHub (simulated - replace with the GitHub search API)"""
+
+    name = 'GitHub'
+    requests_per_second = 1.0   # unauthenticated GitHub API calls are tightly limited
+    timeout_seconds = float(os.environ.get('GITHUB_FETCH_TIMEOUT_SECONDS', 60))
+    catalog = [
+        {
+            'title': 'Machine Learning with TensorFlow',
+            'level': 'Expert',
+            'description': 'Advanced machine learning techniques using TensorFlow.',
+            'link': 'https://github.com/tensorflow/tensorflow/tree/master/tensorflow/examples',
+            'points': 220
+        },
+        {
+            'title': 'Natural Language Processing Basics',
+            'level': 'Beginner',
+            'description': 'Learn NLP fundamentals with practical examples.',
+            'link': 'https://github.com/microsoft/nlp-recipes',
+            'points': 90
+        },
+        {
+            'title': 'Deep Learning with PyTorch',
+            'level': 'Expert',
+            'description': 'Master deep learning using PyTorch framework.',
+            'link': 'https://github.com/pytorch/tutorials',
+            'points': 250
+        },
+        {
+            'title': 'AI Ethics and Responsible AI',
+            'level': 'Learner',
+            'description': 'Understanding ethical considerations in AI development.',
+            'link': 'https://github.com/microsoft/responsible-ai-toolbox',
+            'points': 80
+        },
+        {
+            'title': 'Automated Machine Learning (AutoML)',
+            'level': 'Intermediate',
+            'description': 'Streamline ML workflows with automated tools.',
+            'link': 'https://github.com/microsoft/nni',
+            'points': 160
+        }
+    ]
@@ -0,0 +1,333 @@
+"""
+Course Catalog Sync - AI Learning Tracker
+Incremental sync of provider course lists into the courses table. Per-source
+state (last cursor, ETag, list hash) lets repeat runs skip unchanged sources
+entirely, and per-item content hashes let unchanged courses be skipped in
+memory while new or changed ones are applied as upserts.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from database_environment_manager import DatabaseEnvironmentManager
+from cache_versions import CATALOG, bump_version
+from course_recommender import queue_index_update
+
+logger = logging.getLogger(__name__)
+
+SYNC_TABLES = ('course_sync_state', 'course_sync_items')
+
+# Course fields that make up an item's content hash
+HASHED_FIELDS = ('title', 'level', 'link', 'url', 'points', 'description', 'category', 'difficulty')
+
+
+def content_hash(course: Dict[str, Any]) -> str:
+    """Stable hash of the course fields the catalog stores"""
+    values = [course.get(field) for field in HASHED_FIELDS]
+    return hashlib.sha1(json.dumps(values, default=str).encode('utf-8')).hexdigest()
+
+
+def catalog_hash(courses: Iterable[Dict[str, Any]]) -> str:
+    """Hash of a whole course list; equal hashes mean nothing in the list changed"""
+    digest = hashlib.sha1()
+    for course in courses:
+        digest.update(content_hash(course).encode('ascii'))
+    return digest.hexdigest()
+
+
+def item_key(course: Dict[str, Any]) -> Optional[str]:
+    """Identity of a course within its source: its link, or its title when it has none"""
+    link = (course.get('link') or course.get('url') or '').strip()
+    if link:
+        return link
+    title = (course.get('title') or '').strip().lower()
+    return f"title:{title}" if title else None
+
+
+class CatalogKeys:
+    """
+    Titles and links already in the catalog, loaded on first use
+    Shared by every writer in a sync run so the catalog is read at most once,
+    and not at all when no source has new courses.
+    """
+
+    def __init__(self, db: DatabaseEnvironmentManager):
+        self.db = db
+        self.titles = None
+        self.links = None
+
+    def _load(self) -> None:
+        cursor = self.db.connection.cursor()
+        cursor.execute("SELECT title, link, url FROM courses")
+        self.titles, self.links = set(), set()
+        for title, link, url in cursor.fetchall():
+            self.add(title, link or url)
+
+    def contains(self, title: str, link: str) -> bool:
+        if self.titles is None:
+            self._load()
+        return title.lower() in self.titles or bool(link and link in self.links)
+
+    def add(self, title: Optional[str], link: Optional[str]) -> None:
+        if title:
+            self.titles.add(title.strip().lower())
+        if link:
+            self.links.add(link.strip())
+
+
+class CatalogSyncWriter:
+    """
+    Applies one source's courses to the catalog
+    Unchanged items cost a dict lookup; new courses are inserted, changed
+    ones updated, and item hashes upserted, in batches with one commit each.
+    """
+
+    STATE_UPSERT_SQLITE = '''
+        INSERT INTO course_sync_state
+            (source, last_cursor, etag, content_hash, items_tracked, last_synced_at, last_changed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            last_cursor = excluded.last_cursor,
+            etag = excluded.etag,
+            content_hash = excluded.content_hash,
+            items_tracked = excluded.items_tracked,
+            last_synced_at = excluded.last_synced_at,
+            last_changed_at = COALESCE(excluded.last_changed_at, course_sync_state.last_changed_at)
+    '''
+
+    STATE_UPSERT_AZURE = '''
+        MERGE course_sync_state AS target
+        USING (SELECT ? AS source, ? AS last_cursor, ? AS etag, ? AS content_hash,
+                      ? AS items_tracked, ? AS last_synced_at, ? AS last_changed_at) AS src
+        ON target.source = src.source
+        WHEN MATCHED THEN UPDATE SET
+            last_cursor = src.last_cursor,
+            etag = src.etag,
+            content_hash = src.content_hash,
+            items_tracked = src.items_tracked,
+            last_synced_at = src.last_synced_at,
+            last_changed_at = COALESCE(src.last_changed_at, target.last_changed_at)
+        WHEN NOT MATCHED THEN INSERT
+            (source, last_cursor, etag, content_hash, items_tracked, last_synced_at, last_changed_at)
+        VALUES (src.source, src.last_cursor, src.etag, src.content_hash,
+                src.items_tracked, src.last_synced_at, src.last_changed_at);
+    '''
+
+    ITEM_UPSERT_SQLITE = '''
+        INSERT INTO course_sync_items (source, item_key, content_hash, owned, synced_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(source, item_key) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            synced_at = excluded.synced_at
+    '''
+
+    ITEM_UPSERT_AZURE = '''
+        MERGE course_sync_items AS target
+        USING (SELECT ? AS source, ? AS item_key, ? AS content_hash, ? AS owned, ? AS synced_at) AS src
+        ON target.source = src.source AND target.item_key = src.item_key
+        WHEN MATCHED THEN UPDATE SET
+            content_hash = src.content_hash,
+            synced_at = src.synced_at
+        WHEN NOT MATCHED THEN INSERT (source, item_key, content_hash, owned, synced_at)
+        VALUES (src.source, src.item_key, src.content_hash, src.owned, src.synced_at);
+    '''
+
+    COURSE_INSERT_SQL = '''
+        INSERT INTO courses (title, source, level, link, url, points, description, category,
+                             difficulty, created_at, url_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+    '''
+
+    COURSE_UPDATE_BY_LINK_SQL = '''
+        UPDATE courses
+        SET title = ?, level = ?, url = ?, points = ?, description = ?, category = ?, difficulty = ?
+        WHERE source = ? AND COALESCE(link, url) = ?
+    '''
+
+    COURSE_UPDATE_BY_TITLE_SQL = '''
+        UPDATE courses
+        SET title = ?, level = ?, url = ?, points = ?, description = ?, category = ?, difficulty = ?
+        WHERE source = ? AND LOWER(title) = ?
+    '''
+
+    def __init__(self, db: DatabaseEnvironmentManager, source: str,
+                 catalog_keys: CatalogKeys = None, batch_size: int = None):
+        self.db = db
+        self.source = source
+        self.catalog_keys = catalog_keys or CatalogKeys(db)
+        self.batch_size = batch_size or int(os.environ.get('COURSE_SYNC_WRITE_BATCH', 200))
+        self.state = self._load_state()
+        self.items = None
+        self.inserts: List[tuple] = []
+        self.updates_by_link: List[tuple] = []
+        self.updates_by_title: List[tuple] = []
+        self.item_rows: List[tuple] = []
+        self.counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'invalid': 0}
+
+    def _load_state(self) -> Dict[str, Any]:
+        cursor = self.db.connection.cursor()
+        cursor.execute('''
+            SELECT last_cursor, etag, content_hash, items_tracked, last_synced_at, last_changed_at
+            FROM course_sync_state WHERE source = ?
+        ''', (self.source,))
+        row = cursor.fetchone()
+        if not row:
+            return {}
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def _load_items(self) -> None:
+        """Item hashes for this source, read once on the first course of the run"""
+        cursor = self.db.connection.cursor()
+        cursor.execute("SELECT item_key, content_hash, owned FROM course_sync_items WHERE source = ?",
+                       (self.source,))
+        self.items = {key: [digest, bool(owned)] for key, digest, owned in cursor.fetchall()}
+
+    def add(self, course: Dict[str, Any]) -> str:
+        """
+        Apply one course from the source
+        Returns: 'added', 'updated', 'unchanged', 'duplicate' or 'invalid'
+        """
+        if self.items is None:
+            self._load_items()
+
+        key = item_key(course)
+        title = (course.get('title') or '').strip()
+        if not key or not title:
+            self.counts['invalid'] += 1
+            return 'invalid'
+
+        digest = content_hash(course)
+        known = self.items.get(key)
+        if known and known[0] == digest:
+            self.counts['unchanged'] += 1
+            return 'unchanged'
+
+        now = datetime.now().isoformat()
+        link = (course.get('link') or '').strip() or None
+        address = link or (course.get('url') or '').strip() or None
+        fields = (title, course.get('level'), course.get('url'), course.get('points') or 0,
+                  course.get('description'), course.get('category'), course.get('difficulty'))
+
+        if known:
+            outcome = 'updated' if known[1] else 'duplicate'
+            if known[1] and address:
+                self.updates_by_link.append(fields + (self.source, address))
+            elif known[1]:
+                self.updates_by_title.append(fields + (self.source, title.lower()))
+            owned = known[1]
+        elif self.catalog_keys.contains(title, address):
+            # Already in the catalog from another source or an admin; track it but leave it alone
+            outcome, owned = 'duplicate', False
+        else:
+            outcome, owned = 'added', True
+            self.inserts.append((title, self.source, course.get('level'), link, course.get('url'),
+                                 course.get('points') or 0, course.get('description'),
+                                 course.get('category'), course.get('difficulty'), now))
+            self.catalog_keys.add(title, address)
+
+        self.items[key] = [digest, owned]
+        self.item_rows.append((self.source, key, digest, 1 if owned else 0, now))
+        self.counts['duplicates' if outcome == 'duplicate' else outcome] += 1
+
+        if len(self.item_rows) >= self.batch_size:
+            self.flush()
+        return outcome
+
+    def flush(self) -> None:
+        """Write queued inserts, updates and item hashes with one commit"""
+        if not self.item_rows:
+            return
+        cursor = self.db.connection.cursor()
+        if self.inserts:
+            cursor.executemany(self.COURSE_INSERT_SQL, self.inserts)
+        if self.updates_by_link:
+            cursor.executemany(self.COURSE_UPDATE_BY_LINK_SQL, self.updates_by_link)
+        if self.updates_by_title:
+            cursor.executemany(self.COURSE_UPDATE_BY_TITLE_SQL, self.updates_by_title)
+        upsert = self.ITEM_UPSERT_AZURE if self.db.is_azure_sql() else self.ITEM_UPSERT_SQLITE
+        cursor.executemany(upsert, self.item_rows)
+        self.db.connection.commit()
+        if self.inserts or self.updates_by_link or self.updates_by_title:
+            bump_version(CATALOG, conn=self.db.connection)
+        self.inserts, self.updates_by_link, self.updates_by_title, self.item_rows = [], [], [], []
+
+    def finish(self, cursor: str = None, etag: str = None, list_hash: str = None) -> Dict[str, Any]:
+        """
+        Flush remaining writes and record the sync state
+        None keeps the stored cursor, ETag or list hash (e.g. after a partial run).
+        """
+        self.flush()
+        now = datetime.now().isoformat()
+        changed = self.counts['added'] + self.counts['updated'] > 0
+        state = {
+            'last_cursor': cursor if cursor is not None else self.state.get('last_cursor'),
+            'etag': etag if etag is not None else self.state.get('etag'),
+            'content_hash': list_hash if list_hash is not None else self.state.get('content_hash'),
+            'items_tracked': len(self.items) if self.items is not None else self.state.get('items_tracked') or 0,
+            'last_synced_at': now,
+            'last_changed_at': now if changed else None,
+        }
+        upsert = self.STATE_UPSERT_AZURE if self.db.is_azure_sql() else self.STATE_UPSERT_SQLITE
+        self.db.connection.cursor().execute(upsert, (
+            self.source, state['last_cursor'], state['etag'], state['content_hash'],
+            state['items_tracked'], state['last_synced_at'], state['last_changed_at']
+        ))
+        self.db.connection.commit()
+        self.state.update({k: v for k, v in state.items() if v is not None})
+        return dict(self.counts)
+
+
+def connect_for_sync() -> DatabaseEnvironmentManager:
+    """Connection through the shared DB layer with the sync tables in place"""
+    db = DatabaseEnvironmentManager()
+    db.connect()
+    db.ensure_tables(*SYNC_TABLES)
+    return db
+
+
+def sync_course_list(source: str, courses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sync a complete course list (curated providers with no paging or cursor)
+    When the list hash matches the last run nothing beyond the state row is read.
+    """
+    list_hash = catalog_hash(courses)
+    db = connect_for_sync()
+    try:
+        writer = CatalogSyncWriter(db, source)
+        if writer.state.get('content_hash') == list_hash:
+            result = writer.finish()
+            result.update({'unchanged_source': True, 'unchanged': len(courses)})
+            logger.info(f"⏭️ {source}: course list unchanged since last sync")
+            return result
+
+        for course in courses:
+            writer.add(course)
+        result = writer.finish(list_hash=list_hash)
+        result['unchanged_source'] = False
+        logger.info(f"🔄 {source}: {result['added']} added, {result['updated']} updated, "
+                    f"{result['unchanged']} unchanged, {result['duplicates']} duplicates")
+        if result['added']:
+            queue_index_update()
+        return result
+    finally:
+        db.disconnect()
+
+
+def get_sync_states() -> Dict[str, Dict[str, Any]]:
+    """Stored sync state for every source, keyed by source name"""
+    db = connect_for_sync()
+    try:
+        cursor = db.connection.cursor()
+        cursor.execute('''
+            SELECT source, last_cursor, etag, content_hash, items_tracked, last_synced_at, last_changed_at
+            FROM course_sync_state
+        ''')
+        columns = [column[0] for column in cursor.description]
+        return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+    finally:
+        db.disconnect()
@@ -3,36 +3,239 @@ Course URL Validator - AI Learning Tracker
 Validates course URLs and manages URL status tracking
 """
 
+import os
 import requests
-import sqlite3
 import logging
+import heapq
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import threading
 import time
-from urllib.parse import urlparse
+from urllib.parse import urldefrag, urlparse
+from requests.adapters import HTTPAdapter
+from job_manager import job_manager
+from cache_versions import CATALOG, bump_version
+from database_environment_manager import DatabaseEnvironmentManager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Checks newer than this count towards 'recent_checks' in the validation summary
+RECENT_CHECK_WINDOW = timedelta(days=7)
+
+def normalize_url(url: str) -> str:
+    """Canonical form used to check each distinct URL once (fragments never reach the server)"""
+    return urldefrag((url or '').strip())[0]
+
+def _summary_bucket(status: Optional[str]) -> Optional[str]:
+    """Validation summary bucket a course url_status is counted in"""
+    if status is None or status == 'pending':
+        return 'unchecked'
+    return {'working': 'working', 'not working': 'not_working', 'broken': 'broken'}.get(status.lower())
+
+def _as_datetime(value) -> Optional[datetime]:
+    """Timestamps come back as datetime (SQL Server) or text (SQLite)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def _fetch_dicts(cursor) -> List[Dict]:
+    """Rows from the shared DB layer as dicts keyed by column name"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+class ValidationResultWriter:
+    """
+    Buffers validation outcomes and writes them back in batches through the
+    shared DB layer: one executemany for URL state, one for course statuses,
+    one commit per batch. Summary count deltas are applied after each commit.
+    """
+    
+    STATE_UPSERT_SQLITE = '''
+        INSERT INTO url_validation_state
+            (url, status, response_code, error, response_time, etag, last_modified,
+             consecutive_failures, check_count, last_checked, next_check_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            status = excluded.status,
+            response_code = excluded.response_code,
+            error = excluded.error,
+            response_time = excluded.response_time,
+            etag = excluded.etag,
+            last_modified = excluded.last_modified,
+            consecutive_failures = excluded.consecutive_failures,
+            check_count = url_validation_state.check_count + 1,
+            last_checked = excluded.last_checked,
+            next_check_at = excluded.next_check_at
+    '''
+    
+    STATE_UPSERT_AZURE = '''
+        MERGE url_validation_state AS target
+        USING (SELECT ? AS url, ? AS status, ? AS response_code, ? AS error, ? AS response_time,
+                      ? AS etag, ? AS last_modified, ? AS consecutive_failures,
+                      ? AS last_checked, ? AS next_check_at) AS source
+        ON target.url = source.url
+        WHEN MATCHED THEN UPDATE SET
+            status = source.status,
+            response_code = source.response_code,
+            error = source.error,
+            response_time = source.response_time,
+            etag = source.etag,
+            last_modified = source.last_modified,
+            consecutive_failures = source.consecutive_failures,
+            check_count = target.check_count + 1,
+            last_checked = source.last_checked,
+            next_check_at = source.next_check_at
+        WHEN NOT MATCHED THEN INSERT
+            (url, status, response_code, error, response_time, etag, last_modified,
+             consecutive_failures, check_count, last_checked, next_check_at)
+        VALUES (source.url, source.status, source.response_code, source.error, source.response_time,
+                source.etag, source.last_modified, source.consecutive_failures, 1,
+                source.last_checked, source.next_check_at);
+    '''
+    
+    COURSE_STATUS_UPDATE = '''
+        UPDATE courses
+        SET url_status = ?, last_url_check = ?
+        WHERE id = ?
+    '''
+    
+    def __init__(self, validator: 'CourseURLValidator', db: DatabaseEnvironmentManager, batch_size: int):
+        self.validator = validator
+        self.db = db
+        self.batch_size = batch_size
+        self.state_rows: List[Tuple] = []
+        self.course_rows: List[Tuple] = []
+        self.summary_delta: Dict[str, int] = defaultdict(int)
+        self.rows_written = 0
+    
+    def add(self, url: str, result: Dict, previous: Dict = None, courses: List[Dict] = ()):
+        """Queue one URL outcome and the status of every course that links to it"""
+        now = datetime.now()
+        failures = 0
+        if result['status'] != 'Working':
+            failures = ((previous or {}).get('consecutive_failures') or 0) + 1
+        next_check_at = now + self.validator.next_check_delay(result['status'], failures)
+        
+        self.state_rows.append((
+            url, result['status'], result['response_code'], result['error'], result['response_time'],
+            result.get('etag'), result.get('last_modified'), failures, now, next_check_at
+        ))
+        
+        for course in courses:
+            self.course_rows.append((result['status'], now, course['id']))
+            
+            # Move the course between summary buckets
+            old_bucket = _summary_bucket(course.get('url_status'))
+            if old_bucket:
+                self.summary_delta[old_bucket] -= 1
+            new_bucket = _summary_bucket(result['status'])
+            if new_bucket:
+                self.summary_delta[new_bucket] += 1
+            last_check = _as_datetime(course.get('last_url_check'))
+            if course.get('url_status') is None or not last_check or last_check < now - RECENT_CHECK_WINDOW:
+                self.summary_delta['recent_checks'] += 1
+            course['url_status'] = result['status']
+            course['last_url_check'] = now
+        
+        if len(self.state_rows) >= self.batch_size or len(self.course_rows) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Write buffered rows in one transaction"""
+        if not self.state_rows and not self.course_rows:
+            return
+        
+        cursor = self.db.connection.cursor()
+        try:
+            if self.state_rows:
+                upsert_sql = self.STATE_UPSERT_AZURE if self.db.is_azure_sql() else self.STATE_UPSERT_SQLITE
+                cursor.executemany(upsert_sql, self.state_rows)
+            if self.course_rows:
+                cursor.executemany(self.COURSE_STATUS_UPDATE, self.course_rows)
+            self.db.connection.commit()
+        except Exception:
+            self.db.connection.rollback()
+            raise
+        
+        if self.course_rows:
+            # url_status is part of the cached catalog snapshot
+            bump_version(CATALOG, conn=self.db.connection)
+        self.rows_written += len(self.state_rows) + len(self.course_rows)
+        self.validator._apply_summary_delta(self.summary_delta)
+        self.state_rows, self.course_rows = [], []
+        self.summary_delta = defaultdict(int)
+
 class CourseURLValidator:
-    def __init__(self, db_path: str = 'ai_learning.db', timeout: int = 10):
-        self.db_path = db_path
+    def __init__(self, timeout: int = 10, max_concurrent: int = None, per_host_limit: int = None):
         self.timeout = timeout
+        self.max_concurrent = max_concurrent or int(os.getenv('URL_VALIDATION_CONCURRENCY', '16'))
+        self.per_host_limit = per_host_limit or int(os.getenv('URL_VALIDATION_PER_HOST', '2'))
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Revalidation schedule: healthy URLs are rechecked rarely, failing ones back off
+        self.healthy_recheck_hours = float(os.getenv('URL_RECHECK_HEALTHY_HOURS', '336'))
+        self.retry_base_hours = float(os.getenv('URL_RECHECK_RETRY_BASE_HOURS', '1'))
+        self.retry_max_hours = float(os.getenv('URL_RECHECK_MAX_BACKOFF_HOURS', '168'))
+        self.revalidation_budget = int(os.getenv('URL_REVALIDATION_BUDGET', '200'))
+        # Result write-back and the incrementally maintained summary
+        self.write_batch_size = int(os.getenv('URL_VALIDATION_WRITE_BATCH', '200'))
+        self.summary_resync_seconds = float(os.getenv('URL_SUMMARY_RESYNC_SECONDS', '300'))
+        self._summary: Optional[Dict[str, int]] = None
+        self._summary_synced_at = 0.0
+        self._summary_lock = threading.Lock()
+        self._state_table_ready = False
+        # Keep-alive pools: one per host, sized to the per-host concurrency limit
+        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=self.per_host_limit)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
-    def get_db_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def get_db_connection(self) -> DatabaseEnvironmentManager:
+        """
+        Open a connection through the shared DB layer (SQLite locally, Azure SQL in production)
+        Each call returns its own manager so concurrent validation jobs never share a connection
+        """
+        db = DatabaseEnvironmentManager()
+        db.connect()
+        if not self._state_table_ready:
+            db.ensure_tables('url_validation_state')
+            self._state_table_ready = True
+        return db
+    
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict]:
+        """Run a read query on a short-lived connection"""
+        db = self.get_db_connection()
+        try:
+            cursor = db.connection.cursor()
+            cursor.execute(sql, params)
+            return _fetch_dicts(cursor)
+        finally:
+            db.disconnect()
     
     def validate_single_url(self, url: str, course_id: int = None) -> Dict:
         """Validate a single URL and return status"""
+        result = self.check_url(url)
+        
+        # Update database if course_id provided
+        if course_id:
+            self.update_course_url_status(course_id, result, normalize_url(url))
+        
+        return result
+    
+    def check_url(self, url: str, etag: str = None, last_modified: str = None) -> Dict:
+        """
+        Issue the HTTP check for one URL; safe to call from worker threads
+        With a stored ETag/Last-Modified the request is conditional and an
+        unchanged page answers 304 Not Modified
+        """
         try:
             # Parse URL
             parsed = urlparse(url)
@@ -45,14 +248,22 @@ class CourseURLValidator:
                 }
             
             # Make request
+            headers = {}
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
             start_time = time.time()
-            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True, headers=headers)
             response_time = round((time.time() - start_time) * 1000, 2)  # ms
             
             # Determine status
             if response.status_code == 200:
                 status = 'Working'
                 error = None
+            elif response.status_code == 304:
+                status = 'Working'  # Unchanged since the last check
+                error = None
             elif 300 <= response.status_code < 400:
                 status = 'Working'  # Redirects are generally OK
                 error = f'Redirect: {response.status_code}'
@@ -69,121 +280,214 @@ class CourseURLValidator:
                 status = 'Broken'
                 error = f'HTTP {response.status_code}'
             
-            result = {
+            return {
                 'status': status,
                 'response_code': response.status_code,
                 'error': error,
-                'response_time': response_time
+                'response_time': response_time,
+                'etag': response.headers.get('ETag') or etag,
+                'last_modified': response.headers.get('Last-Modified') or last_modified
             }
             
-            # Update database if course_id provided
-            if course_id:
-                self.update_course_url_status(course_id, result)
-            
-            return result
-            
         except requests.exceptions.Timeout:
-            result = {
+            return {
                 'status': 'Broken',
                 'response_code': None,
                 'error': 'Request timeout',
                 'response_time': None
             }
-            if course_id:
-                self.update_course_url_status(course_id, result)
-            return result
             
         except requests.exceptions.ConnectionError:
-            result = {
+            return {
                 'status': 'Broken',
                 'response_code': None,
                 'error': 'Connection failed',
                 'response_time': None
             }
-            if course_id:
-                self.update_course_url_status(course_id, result)
-            return result
             
         except Exception as e:
-            result = {
+            return {
                 'status': 'Broken',
                 'response_code': None,
                 'error': f'Validation error: {str(e)}',
                 'response_time': None
             }
-            if course_id:
-                self.update_course_url_status(course_id, result)
-            return result
     
-    def update_course_url_status(self, course_id: int, validation_result: Dict):
-        """Update course URL status in database"""
+    def check_urls(self, urls: Iterable[str], max_concurrent: int = None,
+                   progress_callback: Callable[[str, Dict], Optional[bool]] = None,
+                   validators: Dict[str, Tuple[str, str]] = None) -> Dict[str, Dict]:
+        """
+        Check many URLs concurrently; each distinct URL is requested once
+        
+        At most `max_concurrent` requests run in total and at most
+        `per_host_limit` against any single host. Work is only handed to the
+        thread pool when its host has a free slot, so a slow host never ties up
+        workers that other hosts could use.
+        progress_callback(url, result) runs on the calling thread after each
+        check; returning False stops dispatching (in-flight checks still finish).
+        validators maps url -> (etag, last_modified) for conditional requests.
+        Returns: {url: result}
+        """
+        max_concurrent = max_concurrent or self.max_concurrent
+        validators = validators or {}
+        
+        # Queue unique URLs per host
+        host_queues: Dict[str, deque] = {}
+        seen = set()
+        for url in urls:
+            if url in seen:
+                continue
+            seen.add(url)
+            host = urlparse(url).netloc.lower()
+            host_queues.setdefault(host, deque()).append(url)
+        
+        results: Dict[str, Dict] = {}
+        in_flight: Dict[str, int] = defaultdict(int)
+        pending = {}
+        
+        with ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='url-check') as executor:
+            
+            def dispatch():
+                # Round-robin across hosts that still have capacity
+                while len(pending) < max_concurrent:
+                    dispatched = False
+                    for host in list(host_queues):
+                        if len(pending) >= max_concurrent:
+                            break
+                        if in_flight[host] >= self.per_host_limit:
+                            continue
+                        queue = host_queues[host]
+                        url = queue.popleft()
+                        if not queue:
+                            del host_queues[host]
+                        pending[executor.submit(self.check_url, url, *validators.get(url, (None, None)))] = (url, host)
+                        in_flight[host] += 1
+                        dispatched = True
+                    if not dispatched:
+                        return
+            
+            dispatch()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, host = pending.pop(future)
+                    in_flight[host] -= 1
+                    results[url] = future.result()
+                    if progress_callback and progress_callback(url, results[url]) is False:
+                        host_queues.clear()
+                dispatch()
+        
+        return results
+    
+    def get_url_states(self) -> Dict[str, Dict]:
+        """Stored validation state for every checked URL"""
+        try:
+            rows = self._query('''
+                SELECT url, status, etag, last_modified, consecutive_failures, last_checked, next_check_at
+                FROM url_validation_state
+            ''')
+            return {row['url']: row for row in rows}
+        except Exception as e:
+            logger.error(f"Error loading URL validation state: {e}")
+            return {}
+    
+    def next_check_delay(self, status: str, consecutive_failures: int) -> timedelta:
+        """How long until a URL is due again, given its latest outcome"""
+        if status == 'Working':
+            return timedelta(hours=self.healthy_recheck_hours)
+        backoff = self.retry_base_hours * (2 ** max(consecutive_failures - 1, 0))
+        return timedelta(hours=min(backoff, self.retry_max_hours))
+    
+    def update_course_url_status(self, course_id: int, validation_result: Dict, url: str = None):
+        """Update one course's URL status (bulk runs use ValidationResultWriter directly)"""
         try:
-            conn = self.get_db_connection()
-            conn.execute('''
-                UPDATE courses 
-                SET url_status = ?, 
-                    last_url_check = ?,
-                    url_response_code = ?,
-                    url_error = ?,
-                    url_response_time = ?
-                WHERE id = ?
-            ''', (
-                validation_result['status'],
-                datetime.now().isoformat(),
-                validation_result['response_code'],
-                validation_result['error'],
-                validation_result['response_time'],
-                course_id
-            ))
-            conn.commit()
-            conn.close()
+            rows = self._query('SELECT id, link, url_status, last_url_check FROM courses WHERE id = ?', (course_id,))
+            if not rows:
+                return
+            db = self.get_db_connection()
+            try:
+                writer = ValidationResultWriter(self, db, self.write_batch_size)
+                writer.add(url or normalize_url(rows[0]['link']), validation_result, courses=rows)
+                writer.flush()
+            finally:
+                db.disconnect()
         except Exception as e:
             logger.error(f"Error updating course URL status: {e}")
     
     def get_courses_by_status(self, status: str) -> List[Dict]:
         """Get courses by URL status"""
         try:
-            conn = self.get_db_connection()
             if status.lower() == 'unchecked':
-                courses = conn.execute('''
+                return self._query('''
                     SELECT id, title, link, url_status, last_url_check
                     FROM courses 
                     WHERE url_status IS NULL OR url_status = 'pending'
                     ORDER BY created_at DESC
-                ''').fetchall()
-            else:
-                courses = conn.execute('''
-                    SELECT id, title, link, url_status, last_url_check, url_response_code, url_error
-                    FROM courses 
-                    WHERE LOWER(url_status) = LOWER(?)
-                    ORDER BY last_url_check DESC
-                ''', (status,)).fetchall()
-            
-            conn.close()
-            return [dict(course) for course in courses]
+                ''')
+            courses = self._query('''
+                SELECT id, title, link, url_status, last_url_check
+                FROM courses
+                WHERE LOWER(url_status) = LOWER(?)
+                ORDER BY last_url_check DESC
+            ''', (status,))
+            # URL state is keyed on the normalized link, which SQL cannot derive, so join here
+            urls = sorted({normalize_url(course['link']) for course in courses if course['link']})
+            states = {}
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ','.join(['?' for _ in chunk])
+                for row in self._query(f'''
+                    SELECT url, response_code, error FROM url_validation_state
+                    WHERE url IN ({placeholders})
+                ''', tuple(chunk)):
+                    states[row['url']] = row
+            for course in courses:
+                state = states.get(normalize_url(course['link'])) or {}
+                course['url_response_code'] = state.get('response_code')
+                course['url_error'] = state.get('error')
+            return courses
         except Exception as e:
             logger.error(f"Error getting courses by status: {e}")
             return []
     
+    def _count_summary(self) -> Dict[str, int]:
+        """Count every summary bucket in a single pass over courses"""
+        rows = self._query('''
+            SELECT
+                SUM(CASE WHEN LOWER(url_status) = 'working' THEN 1 ELSE 0 END) AS working,
+                SUM(CASE WHEN LOWER(url_status) = 'not working' THEN 1 ELSE 0 END) AS not_working,
+                SUM(CASE WHEN LOWER(url_status) = 'broken' THEN 1 ELSE 0 END) AS broken,
+                SUM(CASE WHEN url_status IS NULL OR url_status = 'pending' THEN 1 ELSE 0 END) AS unchecked,
+                SUM(CASE WHEN last_url_check >= ? AND url_status IS NOT NULL THEN 1 ELSE 0 END) AS recent_checks
+            FROM courses
+        ''', (datetime.now() - RECENT_CHECK_WINDOW,))
+        return {key: int(value or 0) for key, value in rows[0].items()}
+    
+    def _apply_summary_delta(self, delta: Dict[str, int]):
+        """Fold the effect of written results into the cached summary counts"""
+        with self._summary_lock:
+            if self._summary is None:
+                return
+            for key, change in delta.items():
+                self._summary[key] = self._summary.get(key, 0) + change
+    
     def get_validation_summary(self) -> Dict:
-        """Get summary of URL validation status"""
+        """
+        Get summary of URL validation status
+        Counts are kept up to date by validation write-back and re-counted from
+        the database every URL_SUMMARY_RESYNC_SECONDS to pick up other writers
+        """
         try:
-            conn = self.get_db_connection()
-            
-            # Count by status
-            working = conn.execute("SELECT COUNT(*) FROM courses WHERE LOWER(url_status) = 'working'").fetchone()[0]
-            not_working = conn.execute("SELECT COUNT(*) FROM courses WHERE LOWER(url_status) = 'not working'").fetchone()[0]
-            broken = conn.execute("SELECT COUNT(*) FROM courses WHERE LOWER(url_status) = 'broken'").fetchone()[0]
-            unchecked = conn.execute("SELECT COUNT(*) FROM courses WHERE url_status IS NULL OR url_status = 'pending'").fetchone()[0]
-            
-            # Recent checks
-            recent_checks = conn.execute('''
-                SELECT COUNT(*) FROM courses 
-                WHERE last_url_check >= ? AND url_status IS NOT NULL
-            ''', (datetime.now() - timedelta(days=7),)).fetchone()[0]
-            
-            conn.close()
+            with self._summary_lock:
+                if self._summary is None or time.monotonic() - self._summary_synced_at > self.summary_resync_seconds:
+                    self._summary = self._count_summary()
+                    self._summary_synced_at = time.monotonic()
+                counts = dict(self._summary)
             
+            working = counts['working']
+            not_working = counts['not_working']
+            broken = counts['broken']
+            unchecked = counts['unchecked']
             total_courses = working + not_working + broken + unchecked
             
             return {
@@ -192,7 +496,7 @@ class CourseURLValidator:
                 'broken': {'count': broken, 'percentage': round((broken/total_courses)*100, 1) if total_courses > 0 else 0},
                 'unchecked': {'count': unchecked, 'percentage': round((unchecked/total_courses)*100, 1) if total_courses > 0 else 0},
                 'total_courses': total_courses,
-                'recent_checks': recent_checks,
+                'recent_checks': counts['recent_checks'],
                 'last_updated': datetime.now().isoformat()
             }
         except Exception as e:
@@ -207,65 +511,97 @@ class CourseURLValidator:
                 'last_updated': datetime.now().isoformat()
             }
     
-    def validate_course_urls(self, course_ids: List[int] = None, status_filter: str = None, max_concurrent: int = 5) -> Dict:
-        """Validate multiple course URLs"""
+    def validate_course_urls(self, course_ids: List[int] = None, status_filter: str = None, max_concurrent: int = None,
+                             max_courses: int = None, progress_callback: Callable[[int, int], Optional[bool]] = None) -> Dict:
+        """
+        Validate multiple course URLs concurrently (see check_urls for the limits)
+        progress_callback(done, total) is called as courses complete; returning False stops the run early
+        """
         try:
-            conn = self.get_db_connection()
+            columns = 'id, title, link, url_status, last_url_check'
             
             # Build query based on filters
             if course_ids:
-                placeholders = ','.join(['?' for _ in course_ids])
-                courses = conn.execute(f'''
-                    SELECT id, title, link FROM courses 
-                    WHERE id IN ({placeholders})
-                ''', course_ids).fetchall()
+                # Chunk explicit ids to stay well under SQL Server's parameter limit
+                courses = []
+                for start in range(0, len(course_ids), 500):
+                    chunk = course_ids[start:start + 500]
+                    placeholders = ','.join(['?' for _ in chunk])
+                    courses.extend(self._query(f'''
+                        SELECT {columns} FROM courses 
+                        WHERE id IN ({placeholders})
+                    ''', tuple(chunk)))
             elif status_filter:
                 if status_filter.lower() == 'unchecked':
-                    courses = conn.execute('''
-                        SELECT id, title, link FROM courses 
+                    courses = self._query(f'''
+                        SELECT {columns} FROM courses 
                         WHERE url_status IS NULL OR url_status = 'pending'
-                    ''').fetchall()
+                    ''')
                 else:
-                    courses = conn.execute('''
-                        SELECT id, title, link FROM courses 
+                    courses = self._query(f'''
+                        SELECT {columns} FROM courses 
                         WHERE LOWER(url_status) = LOWER(?)
-                    ''', (status_filter,)).fetchall()
+                    ''', (status_filter,))
             else:
-                courses = conn.execute('SELECT id, title, link FROM courses').fetchall()
+                courses = self._query(f'SELECT {columns} FROM courses')
             
-            conn.close()
+            if max_courses:
+                courses = courses[:max_courses]
+            
+            # Courses sharing a URL are checked once and all get the result
+            courses_by_url: Dict[str, List] = defaultdict(list)
+            for course in courses:
+                courses_by_url[normalize_url(course['link'])].append(course)
+            position = {course['id']: index for index, course in enumerate(courses)}
+            states = self.get_url_states()
             
             # Validate URLs
             results = {
                 'total_checked': len(courses),
+                'unique_urls': len(courses_by_url),
                 'working': 0,
                 'not_working': 0,
                 'broken': 0,
                 'start_time': datetime.now().isoformat(),
                 'details': []
             }
+            done = 0
+            db = self.get_db_connection()
+            writer = ValidationResultWriter(self, db, self.write_batch_size)
             
-            for course in courses:
-                result = self.validate_single_url(course['link'], course['id'])
-                
-                # Update counters
-                if result['status'] == 'Working':
-                    results['working'] += 1
-                elif result['status'] == 'Not Working':
-                    results['not_working'] += 1
-                else:
-                    results['broken'] += 1
+            def record(url: str, result: Dict) -> bool:
+                nonlocal done
+                for course in courses_by_url[url]:
+                    # Update counters
+                    if result['status'] == 'Working':
+                        results['working'] += 1
+                    elif result['status'] == 'Not Working':
+                        results['not_working'] += 1
+                    else:
+                        results['broken'] += 1
+                    
+                    # Add details
+                    results['details'].append({
+                        'course_id': course['id'],
+                        'title': course['title'],
+                        'url': course['link'],
+                        **result
+                    })
+                writer.add(url, result, states.get(url), courses_by_url[url])
                 
-                # Add details
-                results['details'].append({
-                    'course_id': course['id'],
-                    'title': course['title'],
-                    'url': course['link'],
-                    **result
-                })
-                
-                # Small delay to be respectful
-                time.sleep(0.1)
+                done += len(courses_by_url[url])
+                if progress_callback and progress_callback(done, len(courses)) is False:
+                    results['stopped_early'] = True
+                    return False
+                return True
+            
+            try:
+                self.check_urls(courses_by_url.keys(), max_concurrent=max_concurrent, progress_callback=record,
+                                validators=self._conditional_validators(courses_by_url, states))
+                writer.flush()
+            finally:
+                db.disconnect()
+            results['details'].sort(key=lambda detail: position[detail['course_id']])
             
             results['end_time'] = datetime.now().isoformat()
             return results
@@ -283,25 +619,164 @@ class CourseURLValidator:
                 'details': []
             }
     
+    def _conditional_validators(self, urls: Iterable[str], states: Dict[str, Dict]) -> Dict[str, Tuple[str, str]]:
+        """ETag/Last-Modified pairs for URLs that last answered successfully"""
+        validators = {}
+        for url in urls:
+            state = states.get(url)
+            if state and state['status'] == 'Working' and (state['etag'] or state['last_modified']):
+                validators[url] = (state['etag'], state['last_modified'])
+        return validators
+    
+    def plan_revalidation(self, budget: int = None) -> Dict:
+        """
+        Pick the URLs most in need of a recheck, at most `budget` of them
+        
+        URLs never checked come first, then overdue failing URLs, then overdue
+        healthy ones; within each tier the longest-overdue URL wins.
+        """
+        budget = budget or self.revalidation_budget
+        now = datetime.now()
+        
+        courses = self._query('''
+            SELECT id, title, link, url_status, last_url_check FROM courses WHERE link IS NOT NULL
+        ''')
+        
+        courses_by_url: Dict[str, List] = defaultdict(list)
+        for course in courses:
+            courses_by_url[normalize_url(course['link'])].append(course)
+        states = self.get_url_states()
+        
+        heap = []
+        for url in courses_by_url:
+            state = states.get(url)
+            if not state or not state['next_check_at']:
+                heapq.heappush(heap, (0, 0.0, url))
+                continue
+            next_check_at = _as_datetime(state['next_check_at'])
+            if next_check_at > now:
+                continue
+            tier = 2 if state['status'] == 'Working' else 1
+            heapq.heappush(heap, (tier, -(now - next_check_at).total_seconds(), url))
+        
+        due = len(heap)
+        selected = [heapq.heappop(heap)[2] for _ in range(min(budget, due))]
+        
+        return {
+            'catalog_urls': len(courses_by_url),
+            'due': due,
+            'selected': selected,
+            'courses_by_url': {url: courses_by_url[url] for url in selected},
+            'states': states
+        }
+    
+    def revalidate_due_urls(self, budget: int = None,
+                            progress_callback: Callable[[int, int], Optional[bool]] = None) -> Dict:
+        """
+        Recheck the most overdue URLs with conditional requests
+        Only a budgeted number of URLs is checked per run; the rest stay due for later runs
+        """
+        plan = self.plan_revalidation(budget)
+        states = plan['states']
+        summary = {
+            'catalog_urls': plan['catalog_urls'],
+            'due': plan['due'],
+            'checked': 0,
+            'not_modified': 0,
+            'working': 0,
+            'not_working': 0,
+            'broken': 0,
+            'deferred': plan['due'] - len(plan['selected']),
+            'start_time': datetime.now().isoformat()
+        }
+        
+        db = self.get_db_connection()
+        writer = ValidationResultWriter(self, db, self.write_batch_size)
+        
+        def record(url: str, result: Dict) -> Optional[bool]:
+            writer.add(url, result, states.get(url), plan['courses_by_url'][url])
+            summary['checked'] += 1
+            if result['response_code'] == 304:
+                summary['not_modified'] += 1
+            if result['status'] == 'Working':
+                summary['working'] += 1
+            elif result['status'] == 'Not Working':
+                summary['not_working'] += 1
+            else:
+                summary['broken'] += 1
+            
+            if progress_callback:
+                return progress_callback(summary['checked'], len(plan['selected']))
+            return None
+        
+        try:
+            self.check_urls(plan['selected'], progress_callback=record,
+                            validators=self._conditional_validators(plan['selected'], states))
+            writer.flush()
+        finally:
+            db.disconnect()
+        
+        summary['end_time'] = datetime.now().isoformat()
+        logger.info(f"🔁 Revalidated {summary['checked']} of {summary['due']} due URLs "
+                    f"({summary['not_modified']} not modified, {summary['deferred']} deferred)")
+        return summary
+    
     def cleanup_old_validation_data(self, days_old: int = 30):
-        """Clean up old validation data"""
+        """Make URLs not checked for `days_old` days due for revalidation, keeping their last known status"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days_old)
-            conn = self.get_db_connection()
+            now = datetime.now()
+            cutoff_date = now - timedelta(days=days_old)
+            db = self.get_db_connection()
+            try:
+                db.connection.cursor().execute('''
+                    UPDATE url_validation_state
+                    SET next_check_at = ?
+                    WHERE last_checked < ? AND next_check_at > ?
+                ''', (now, cutoff_date, now))
+                db.connection.commit()
+            finally:
+                db.disconnect()
             
-            # Reset old checks to pending
-            conn.execute('''
-                UPDATE courses 
-                SET url_status = 'pending', url_response_code = NULL, url_error = NULL 
-                WHERE last_url_check < ?
-            ''', (cutoff_date.isoformat(),))
-            
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"Cleaned up validation data older than {days_old} days")
+            logger.info(f"Scheduled revalidation for URLs not checked in {days_old} days")
         except Exception as e:
             logger.error(f"Error cleaning up old validation data: {e}")
 
+    def run_validation_job(self, ctx) -> Dict:
+        """Background job handler for bulk URL validation"""
+        payload = ctx.payload
+        
+        def report_progress(done: int, total: int) -> bool:
+            ctx.update_progress(done, total, f'Validated {done} of {total} URLs')
+            return not ctx.cancel_requested
+        
+        results = self.validate_course_urls(
+            course_ids=payload.get('course_ids'),
+            status_filter=payload.get('status_filter'),
+            max_courses=payload.get('max_courses'),
+            progress_callback=report_progress
+        )
+        
+        if results.get('error'):
+            raise RuntimeError(results['error'])
+        ctx.raise_if_cancelled()
+        
+        # Per-URL details are already persisted on the courses table
+        results.pop('details', None)
+        return results
+
+    def run_revalidation_job(self, ctx) -> Dict:
+        """Background job handler for a budgeted revalidation run"""
+        def report_progress(done: int, total: int) -> bool:
+            ctx.update_progress(done, total, f'Revalidated {done} of {total} due URLs')
+            return not ctx.cancel_requested
+        
+        summary = self.revalidate_due_urls(ctx.payload.get('budget'), progress_callback=report_progress)
+        ctx.raise_if_cancelled()
+        return summary
+
 # Global validator instance
 validator = CourseURLValidator()
+
+# Register with the background job engine
+job_manager.register('url_validation', validator.run_validation_job, max_attempts=2)
+job_manager.register('url_revalidation', validator.run_revalidation_job, max_attempts=2)
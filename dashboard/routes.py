@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, session, redirect, url_for, flash, request, g
 import sqlite3
 from level_manager import LevelManager
+from cache_versions import bump_completions
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -161,6 +162,7 @@ def complete_course(course_id):
             ''', (user_id, course_id))
         
         conn.commit()
+        bump_completions(user_id, conn=conn)
         
         # Update user points and level
         update_user_points_from_courses(user_id)
@@ -65,7 +65,9 @@ class DatabaseSchemaManager:
             'indexes': [
                 'CREATE INDEX IF NOT EXISTS idx_learning_user_id ON learning_entries(user_id)',
                 'CREATE INDEX IF NOT EXISTS idx_learning_date_added ON learning_entries(date_added)',
-                'CREATE INDEX IF NOT EXISTS idx_learning_is_global ON learning_entries(is_global)'
+                'CREATE INDEX IF NOT EXISTS idx_learning_is_global ON learning_entries(is_global)',
+                'CREATE INDEX IF NOT EXISTS idx_learning_user_feed ON learning_entries(user_id, date_added, id)',
+                'CREATE INDEX IF NOT EXISTS idx_learning_global_feed ON learning_entries(is_global, date_added, id)'
             ]
         },
         'courses': {
@@ -317,7 +319,174 @@ class DatabaseSchemaManager:
             ],
             'indexes': [
                 'CREATE INDEX IF NOT EXISTS idx_excel_row_details_report_id ON excel_upload_row_details(report_id)',
-                'CREATE INDEX IF NOT EXISTS idx_excel_row_details_status ON excel_upload_row_details(status)'
+                'CREATE INDEX IF NOT EXISTS idx_excel_row_details_status ON excel_upload_row_details(status)',
+                'CREATE INDEX IF NOT EXISTS idx_excel_row_details_report_row ON excel_upload_row_details(report_id, row_number, id)',
+                'CREATE INDEX IF NOT EXISTS idx_excel_row_details_report_status ON excel_upload_row_details(report_id, status, row_number, id)'
+            ]
+        },
+        'background_jobs': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'job_id VARCHAR(36) UNIQUE NOT NULL',
+                'job_type VARCHAR(50) NOT NULL',
+                'status VARCHAR(20) DEFAULT "queued"',
+                'payload TEXT',
+                'result TEXT',
+                'checkpoint TEXT',
+                'error_message TEXT',
+                'progress_current INTEGER DEFAULT 0',
+                'progress_total INTEGER DEFAULT 0',
+                'progress_message VARCHAR(500)',
+                'attempts INTEGER DEFAULT 0',
+                'max_attempts INTEGER DEFAULT 1',
+                'cancel_requested BOOLEAN DEFAULT 0',
+                'created_by INTEGER',
+                'worker_id VARCHAR(100)',
+                'run_after TIMESTAMP',
+                'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+                'started_at TIMESTAMP',
+                'heartbeat_at TIMESTAMP',
+                'finished_at TIMESTAMP'
+            ],
+            'indexes': [
+                'CREATE INDEX IF NOT EXISTS idx_background_jobs_status ON background_jobs(status, run_after)',
+                'CREATE INDEX IF NOT EXISTS idx_background_jobs_type ON background_jobs(job_type, created_at)'
+            ]
+        },
+        'url_validation_state': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'url VARCHAR(500) UNIQUE NOT NULL',
+                'status VARCHAR(50)',
+                'response_code INTEGER',
+                'error VARCHAR(500)',
+                'response_time REAL',
+                'etag VARCHAR(255)',
+                'last_modified VARCHAR(100)',
+                'consecutive_failures INTEGER DEFAULT 0',
+                'check_count INTEGER DEFAULT 0',
+                'last_checked TIMESTAMP',
+                'next_check_at TIMESTAMP'
+            ],
+            'indexes': [
+                'CREATE INDEX IF NOT EXISTS idx_url_validation_state_next ON url_validation_state(next_check_at)'
+            ]
+        },
+        'course_sync_state': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'source VARCHAR(100) UNIQUE NOT NULL',
+                'last_cursor VARCHAR(500)',
+                'etag VARCHAR(255)',
+                'content_hash VARCHAR(64)',
+                'items_tracked INTEGER DEFAULT 0',
+                'last_synced_at TIMESTAMP',
+                'last_changed_at TIMESTAMP'
+            ]
+        },
+        'course_sync_items': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'source VARCHAR(100) NOT NULL',
+                'item_key VARCHAR(500) NOT NULL',
+                'content_hash VARCHAR(64) NOT NULL',
+                'owned BOOLEAN DEFAULT 1',
+                'synced_at TIMESTAMP'
+            ],
+            'indexes': [
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_course_sync_items_key ON course_sync_items(source, item_key)'
+            ]
+        },
+        'news_feed_state': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'feed_url VARCHAR(500) UNIQUE NOT NULL',
+                'etag VARCHAR(255)',
+                'last_modified VARCHAR(100)',
+                'last_status VARCHAR(20)',
+                'entry_count INTEGER DEFAULT 0',
+                'last_fetched TIMESTAMP'
+            ]
+        },
+        'news_articles': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'article_id VARCHAR(32) UNIQUE NOT NULL',
+                'title VARCHAR(300) NOT NULL',
+                'link VARCHAR(1000) NOT NULL',
+                'description TEXT',
+                'source VARCHAR(100)',
+                'author VARCHAR(200)',
+                'priority INTEGER DEFAULT 5',
+                'score REAL DEFAULT 0',
+                'published_ts REAL',
+                'published_str VARCHAR(100)',
+                'content_hash VARCHAR(40)',
+                'fetched_at TIMESTAMP',
+                'updated_at TIMESTAMP'
+            ],
+            'indexes': [
+                'CREATE INDEX IF NOT EXISTS idx_news_articles_published ON news_articles(published_ts)',
+                'CREATE INDEX IF NOT EXISTS idx_news_articles_source ON news_articles(source, published_ts)'
+            ]
+        },
+        'course_neighbors': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'model VARCHAR(20) NOT NULL',
+                'course_id INTEGER NOT NULL',
+                'neighbor_id INTEGER NOT NULL',
+                'score REAL NOT NULL',
+                'neighbor_rank INTEGER NOT NULL'
+            ],
+            'indexes': [
+                'CREATE INDEX IF NOT EXISTS idx_course_neighbors_course ON course_neighbors(model, course_id)'
+            ]
+        },
+        'recommender_state': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'model VARCHAR(20) UNIQUE NOT NULL',
+                'indexed_max_id INTEGER DEFAULT 0',
+                'indexed_items INTEGER DEFAULT 0',
+                'built_items INTEGER DEFAULT 0',
+                'watermark VARCHAR(50)',
+                'last_full_build TIMESTAMP',
+                'last_update TIMESTAMP'
+            ]
+        },
+        'cache_versions': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'name VARCHAR(100) UNIQUE NOT NULL',
+                'version INTEGER DEFAULT 0',
+                'updated_at TIMESTAMP'
+            ]
+        },
+        'learning_tags': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'entry_id INTEGER NOT NULL',
+                'owner_id INTEGER NOT NULL',
+                'tag VARCHAR(100) NOT NULL'
+            ],
+            'foreign_keys': [
+                'FOREIGN KEY (entry_id) REFERENCES learning_entries(id) ON DELETE CASCADE'
+            ],
+            'indexes': [
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_learning_tags_entry ON learning_tags(entry_id, tag)',
+                'CREATE INDEX IF NOT EXISTS idx_learning_tags_tag ON learning_tags(tag, owner_id, entry_id)'
+            ]
+        },
+        'learning_tag_counts': {
+            'columns': [
+                'id INTEGER PRIMARY KEY AUTOINCREMENT',
+                'owner_id INTEGER NOT NULL',
+                'tag VARCHAR(100) NOT NULL',
+                'entries INTEGER DEFAULT 0'
+            ],
+            'indexes': [
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_learning_tag_counts_owner ON learning_tag_counts(owner_id, tag)'
             ]
         }
     }
@@ -358,6 +527,7 @@ class DatabaseSchemaManager:
             azure_column = azure_column.replace('DEFAULT "Beginner"', "DEFAULT 'Beginner'")
             azure_column = azure_column.replace('DEFAULT "active"', "DEFAULT 'active'")
             azure_column = azure_column.replace('DEFAULT "unknown"', "DEFAULT 'unknown'")
+            azure_column = azure_column.replace('DEFAULT "queued"', "DEFAULT 'queued'")
             
             converted_columns.append(azure_column)
         
@@ -570,6 +740,30 @@ class DatabaseEnvironmentManager:
                 logger.warning("⚠️ Consider backing up your data and running schema migration")
             raise
 
+    def ensure_tables(self, *table_names: str):
+        """Create the given tables and their indexes if they are missing"""
+        if not self.connection:
+            raise RuntimeError("No database connection established")
+
+        cursor = self.connection.cursor()
+
+        for table_name in table_names:
+            if self.environment == 'production':
+                cursor.execute(self.schema_manager.get_azure_sql_create_table_sql(table_name))
+                for index_sql in self.schema_manager.get_table_indexes(table_name):
+                    azure_index_sql = index_sql.replace('IF NOT EXISTS', '')
+                    index_name = azure_index_sql.split(' ON ')[0].split()[-1]
+                    cursor.execute(f"""
+                    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = '{index_name}' AND object_id = OBJECT_ID('{table_name}'))
+                    {azure_index_sql}
+                    """)
+            else:
+                cursor.execute(self.schema_manager.get_sqlite_create_table_sql(table_name))
+                for index_sql in self.schema_manager.get_table_indexes(table_name):
+                    cursor.execute(index_sql)
+
+        self.connection.commit()
+
     def _create_sqlite_schema(self):
         """Create schema for SQLite database"""
         cursor = self.connection.cursor()
@@ -591,7 +785,18 @@ class DatabaseEnvironmentManager:
             'points_log',
             'admin_actions',
             'excel_upload_reports',
-            'excel_upload_row_details'
+            'excel_upload_row_details',
+            'background_jobs',
+            'url_validation_state',
+            'course_sync_state',
+            'course_sync_items',
+            'news_feed_state',
+            'news_articles',
+            'course_neighbors',
+            'recommender_state',
+            'cache_versions',
+            'learning_tags',
+            'learning_tag_counts'
         ]
         
         for table_name in table_order:
@@ -630,7 +835,18 @@ class DatabaseEnvironmentManager:
             'points_log',
             'admin_actions',
             'excel_upload_reports',
-            'excel_upload_row_details'
+            'excel_upload_row_details',
+            'background_jobs',
+            'url_validation_state',
+            'course_sync_state',
+            'course_sync_items',
+            'news_feed_state',
+            'news_articles',
+            'course_neighbors',
+            'recommender_state',
+            'cache_versions',
+            'learning_tags',
+            'learning_tag_counts'
         ]
         
         for table_name in table_order:
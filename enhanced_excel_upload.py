@@ -1,21 +1,28 @@
 #!/usr/bin/env python3
 """
 Enhanced Excel Upload Manager
-Provides cross-environment Excel file upload functionality with comprehensive feedback,
-row-by-row processing details, and production-safe error handling.
+Provides cross-environment bulk course upload (Excel, CSV, JSON Lines, Parquet) with
+comprehensive feedback, row-by-row processing details, and production-safe error handling.
+Uploads flow through reader -> validator -> writer stages.
 """
 
 import os
 import sys
 import logging
 import tempfile
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Callable, Dict, List, Tuple, Optional, Any
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from flask import request, jsonify
+from flask import request, jsonify, has_request_context, url_for
 
 # Import the upload reports manager for persistent reporting
 from upload_reports_manager import create_upload_report, add_row_detail
+from database_environment_manager import DatabaseEnvironmentManager
+from cache_versions import CATALOG, bump_version
+from course_recommender import queue_index_update
+from job_manager import job_manager, JobCancelled
+from course_import_readers import read_course_file, supported_extensions
+from course_row_validation import RowProcessingResult, validate_course_row, init_validation_worker, validate_chunk
 
 # Set up logging
 logging.basicConfig(
@@ -24,64 +31,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class RowProcessingResult:
-    """Represents the processing result for a single Excel row"""
-    
-    def __init__(self, row_number: int, raw_data: Dict[str, Any]):
-        self.row_number = row_number
-        self.raw_data = raw_data
-        self.status = 'pending'  # pending, success, skipped, error
-        self.action = None  # inserted, skipped_duplicate, skipped_invalid, error
-        self.error_message = None
-        self.processed_data = {}
-        self.validation_warnings = []
-    
-    def mark_success(self, action: str, processed_data: Dict[str, Any]):
-        """Mark row as successfully processed"""
-        self.status = 'success'
-        self.action = action
-        self.processed_data = processed_data
-    
-    def mark_skipped(self, reason: str):
-        """Mark row as skipped with reason"""
-        self.status = 'skipped'
-        self.action = f'skipped_{reason}'
-        self.error_message = reason
-    
-    def mark_error(self, error_message: str):
-        """Mark row as failed with error"""
-        self.status = 'error'
-        self.action = 'error'
-        self.error_message = error_message
-    
-    def add_warning(self, warning: str):
-        """Add a validation warning"""
-        self.validation_warnings.append(warning)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON response"""
-        return {
-            'row_number': self.row_number,
-            'status': self.status,
-            'action': self.action,
-            'error_message': self.error_message,
-            'processed_data': {
-                'title': self.processed_data.get('title', ''),
-                'url': self.processed_data.get('url', ''),
-                'source': self.processed_data.get('source', ''),
-                'level': self.processed_data.get('level', ''),
-                'points': self.processed_data.get('points', 0)
-            } if self.processed_data else {},
-            'warnings': self.validation_warnings,
-            'raw_data_preview': {
-                'title': str(self.raw_data.get('title', ''))[:50],
-                'url': str(self.raw_data.get('url', ''))[:50],
-                'source': str(self.raw_data.get('source', ''))[:20],
-                'level': str(self.raw_data.get('level', ''))[:20]
-            }
-        }
-
-
 class ExcelUploadManager:
     """Manages Excel file uploads with environment-aware database operations"""
     
@@ -95,8 +44,14 @@ class ExcelUploadManager:
         self.required_columns = ['title', 'url', 'source', 'level']
         self.optional_columns = ['description', 'points', 'category', 'difficulty']
         self.valid_levels = ['Beginner', 'Intermediate', 'Advanced']
-        self.max_file_size_mb = 10
-        self.allowed_extensions = {'.xlsx', '.xls'}
+        self.max_file_size_mb = int(os.getenv('UPLOAD_MAX_FILE_MB', '10'))
+        self.max_rows = int(os.getenv('UPLOAD_MAX_ROWS', '1000'))
+        self.allowed_extensions = set(supported_extensions())
+        self.write_batch_size = int(os.getenv('UPLOAD_WRITE_BATCH_SIZE', '500'))
+        self.validation_chunk_size = int(os.getenv('UPLOAD_VALIDATION_CHUNK_SIZE', '5000'))
+        self.validation_workers = int(os.getenv('UPLOAD_VALIDATION_WORKERS', str(os.cpu_count() or 1)))
+        self.dry_run_max_rows = int(os.getenv('UPLOAD_DRY_RUN_MAX_ROWS', '100000'))
+        self.response_row_preview = int(os.getenv('UPLOAD_RESPONSE_ROW_PREVIEW', '50'))
         
         logger.info(f"🚀 ExcelUploadManager initialized for {db_manager.environment} environment")
     
@@ -107,24 +62,25 @@ class ExcelUploadManager:
         """
         try:
             # Check if file was uploaded
-            if 'excel_file' not in request_files:
-                return False, "No file uploaded. Please select an Excel file.", None
+            file_field = next((name for name in ('excel_file', 'course_file') if name in request_files), None)
+            if not file_field:
+                return False, "No file uploaded. Please select a course file.", None
             
-            file = request_files['excel_file']
+            file = request_files[file_field]
             
             # Check if filename is empty
             if not file.filename or file.filename == '':
-                return False, "No file selected. Please choose an Excel file to upload.", None
+                return False, "No file selected. Please choose a course file to upload.", None
             
             # Secure the filename
             filename = secure_filename(file.filename)
             if not filename:
-                return False, "Invalid filename. Please use a valid Excel file name.", None
+                return False, "Invalid filename. Please use a valid course file name.", None
             
             # Check file extension
             file_ext = os.path.splitext(filename)[1].lower()
             if file_ext not in self.allowed_extensions:
-                return False, f"Invalid file type '{file_ext}'. Please upload an Excel file (.xlsx or .xls).", None
+                return False, f"Invalid file type '{file_ext}'. Supported types: {', '.join(sorted(self.allowed_extensions))}.", None
             
             # Check file size (read content length if available)
             file.seek(0, 2)  # Seek to end
@@ -142,33 +98,20 @@ class ExcelUploadManager:
             logger.error(f"❌ File validation error: {e}")
             return False, f"File validation failed: {str(e)}", None
     
-    def read_excel_file(self, file) -> Tuple[bool, str, Any]:
+    def read_excel_file(self, file, max_rows: int = None) -> Tuple[bool, str, Any]:
         """
-        Read and validate Excel file content
+        Read and validate uploaded file content (any supported format)
         Returns: (is_valid, error_message, dataframe)
         """
         try:
-            import pandas as pd
-            
             # Create temporary file for secure processing
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
+            suffix = os.path.splitext(secure_filename(file.filename or ''))[1] or '.xlsx'
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
                 file.save(temp_file.name)
                 temp_path = temp_file.name
             
             try:
-                # Read Excel file
-                df = pd.read_excel(temp_path)
-                logger.info(f"📊 Excel file read successfully: {len(df)} rows, columns: {list(df.columns)}")
-                
-                # Basic validation
-                if df.empty:
-                    return False, "Excel file is empty. Please provide a file with course data.", None
-                
-                if len(df) > 1000:
-                    return False, f"File too large ({len(df)} rows). Maximum 1000 rows allowed for safety.", None
-                
-                return True, "", df
-                
+                return self.read_upload_path(temp_path, max_rows)
             finally:
                 # Clean up temporary file
                 try:
@@ -176,11 +119,35 @@ class ExcelUploadManager:
                 except Exception as cleanup_error:
                     logger.warning(f"⚠️ Failed to cleanup temp file: {cleanup_error}")
                 
+        except Exception as e:
+            logger.error(f"❌ File read error: {e}")
+            return False, f"Failed to read uploaded file: {str(e)}", None
+    
+    def read_upload_path(self, path: str, max_rows: int = None) -> Tuple[bool, str, Any]:
+        """
+        Reader stage: detect the format from the file signature and parse it
+        Returns: (is_valid, error_message, dataframe)
+        """
+        max_rows = max_rows or self.max_rows
+        try:
+            file_format, df = read_course_file(path)
+            df.attrs['file_format'] = file_format
+            logger.info(f"📊 {file_format} file read successfully: {len(df)} rows, columns: {list(df.columns)}")
+            
+            # Basic validation
+            if df.empty:
+                return False, "Uploaded file is empty. Please provide a file with course data.", None
+            
+            if len(df) > max_rows:
+                return False, f"File too large ({len(df)} rows). Maximum {max_rows} rows allowed for safety.", None
+            
+            return True, "", df
+                
         except ImportError:
-            return False, "pandas library is not available. Cannot process Excel files.", None
+            return False, "pandas library is not available. Cannot process uploaded files.", None
         except Exception as e:
-            logger.error(f"❌ Excel read error: {e}")
-            return False, f"Failed to read Excel file: {str(e)}", None
+            logger.error(f"❌ File read error: {e}")
+            return False, f"Failed to read uploaded file: {str(e)}", None
     
     def validate_columns(self, df) -> Tuple[bool, str]:
         """
@@ -239,102 +206,32 @@ class ExcelUploadManager:
     
     def validate_and_process_row(self, row_data: Dict[str, Any], existing_courses: Dict[Tuple[str, str], bool]) -> RowProcessingResult:
         """
-        Validate and process a single row from the Excel file
+        Validate and process a single row from the uploaded file
         Returns: RowProcessingResult object
         """
-        import pandas as pd
-        
-        row_number = row_data.get('_row_number', 0)
-        result = RowProcessingResult(row_number, row_data)
-        
-        try:
-            # Extract and clean required fields
-            title = str(row_data.get('title', '')).strip() if pd.notna(row_data.get('title')) else ''
-            url = str(row_data.get('url', '')).strip() if pd.notna(row_data.get('url')) else ''
-            source = str(row_data.get('source', '')).strip() if pd.notna(row_data.get('source')) else ''
-            level = str(row_data.get('level', '')).strip() if pd.notna(row_data.get('level')) else ''
-            
-            # Validate required fields
-            if not title:
-                result.mark_error("Missing or empty title")
-                return result
-            if not url:
-                result.mark_error("Missing or empty URL")
-                return result
-            if not source:
-                result.mark_error("Missing or empty source")
-                return result
-            if not level:
-                result.mark_error("Missing or empty level")
-                return result
-            
-            # Validate level
-            if level not in self.valid_levels:
-                result.mark_error(f"Invalid level '{level}'. Must be one of: {', '.join(self.valid_levels)}")
-                return result
-            
-            # Validate URL format
-            if not url.startswith(('http://', 'https://')):
-                result.mark_error(f"Invalid URL format. Must start with http:// or https://")
-                return result
-            
-            # Check for duplicates
-            duplicate_key = (title.lower().strip(), url.lower().strip())
-            if duplicate_key in existing_courses:
-                result.mark_skipped("duplicate - course with same title and URL already exists")
-                return result
-            
-            # Process optional fields
-            description = str(row_data.get('description', '')).strip() if pd.notna(row_data.get('description')) else ''
-            category = str(row_data.get('category', '')).strip() if pd.notna(row_data.get('category')) else None
-            difficulty = str(row_data.get('difficulty', '')).strip() if pd.notna(row_data.get('difficulty')) else None
-            
-            # Handle points
-            points = 0
-            if 'points' in row_data and pd.notna(row_data['points']):
-                try:
-                    points = int(float(row_data['points']))
-                    if points < 0:
-                        result.add_warning("Negative points converted to 0")
-                        points = 0
-                    elif points > 1000:
-                        result.add_warning("Points over 1000 may be unusually high")
-                except (ValueError, TypeError):
-                    result.add_warning("Invalid points value, using 0")
-                    points = 0
-            
-            # Auto-assign level based on points if points are provided
-            original_level = level
-            if points > 0:
-                if points < 150:
-                    level = 'Beginner'
-                elif points < 250:
-                    level = 'Intermediate'
-                else:
-                    level = 'Advanced'
-                
-                if level != original_level:
-                    result.add_warning(f"Level auto-adjusted from '{original_level}' to '{level}' based on points ({points})")
-            
-            # Prepare processed data
-            processed_data = {
-                'title': title,
-                'description': description,
-                'url': url,
-                'source': source,
-                'level': level,
-                'points': points,
-                'category': category,
-                'difficulty': difficulty
-            }
-            
-            result.processed_data = processed_data
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Row processing error for row {row_number}: {e}")
-            result.mark_error(f"Processing failed: {str(e)}")
-            return result
+        return validate_course_row(row_data, existing_courses, self.valid_levels)
+    
+    COURSE_INSERT_SQL = """
+        INSERT INTO courses 
+        (title, description, url, link, source, level, points, category, difficulty, created_at, url_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    def _course_insert_params(self, processed_data: Dict[str, Any]) -> Tuple:
+        """Parameters for COURSE_INSERT_SQL (same statement on SQLite and Azure SQL)"""
+        return (
+            processed_data['title'],
+            processed_data['description'],
+            processed_data['url'],
+            processed_data['url'],  # Use same URL for both url and link
+            processed_data['source'],
+            processed_data['level'],
+            processed_data['points'],
+            processed_data['category'],
+            processed_data['difficulty'],
+            datetime.now().isoformat(),
+            'unknown'
+        )
     
     def insert_course_to_database(self, processed_data: Dict[str, Any]) -> Tuple[bool, str]:
         """
@@ -346,65 +243,49 @@ class ExcelUploadManager:
                 raise RuntimeError("No database connection available")
             
             cursor = self.db_manager.connection.cursor()
-            
-            # Prepare SQL based on environment
-            if self.db_manager.environment == 'production':
-                # Azure SQL - use parameterized query
-                sql = """
-                    INSERT INTO courses 
-                    (title, description, url, link, source, level, points, category, difficulty, created_at, url_status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                params = (
-                    processed_data['title'],
-                    processed_data['description'],
-                    processed_data['url'],
-                    processed_data['url'],  # Use same URL for both url and link
-                    processed_data['source'],
-                    processed_data['level'],
-                    processed_data['points'],
-                    processed_data['category'],
-                    processed_data['difficulty'],
-                    datetime.now().isoformat(),
-                    'unknown'
-                )
-            else:
-                # SQLite - use parameterized query
-                sql = """
-                    INSERT INTO courses 
-                    (title, description, url, link, source, level, points, category, difficulty, created_at, url_status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                params = (
-                    processed_data['title'],
-                    processed_data['description'],
-                    processed_data['url'],
-                    processed_data['url'],  # Use same URL for both url and link
-                    processed_data['source'],
-                    processed_data['level'],
-                    processed_data['points'],
-                    processed_data['category'],
-                    processed_data['difficulty'],
-                    datetime.now().isoformat(),
-                    'unknown'
-                )
-            
-            cursor.execute(sql, params)
+            cursor.execute(self.COURSE_INSERT_SQL, self._course_insert_params(processed_data))
             return True, ""
             
         except Exception as e:
             logger.error(f"❌ Database insert error: {e}")
             return False, str(e)
     
-    def process_excel_upload(self, request_files, user_info: Dict[str, Any]) -> Dict[str, Any]:
+    def insert_courses_batch(self, results: List[RowProcessingResult]) -> None:
         """
-        Main method to process Excel file upload
-        Returns: Dictionary with processing results and detailed feedback
+        Insert a batch of validated rows with a single executemany
+        If the batch fails it is rolled back to a savepoint and retried row by row
+        so each failing row gets its own error message
         """
-        import pandas as pd
+        cursor = self.db_manager.connection.cursor()
+        if self.db_manager.is_azure_sql():
+            savepoint, rollback = "SAVE TRANSACTION upload_batch", "ROLLBACK TRANSACTION upload_batch"
+        else:
+            savepoint, rollback = "SAVEPOINT upload_batch", "ROLLBACK TO upload_batch"
         
+        try:
+            cursor.execute(savepoint)
+            cursor.executemany(self.COURSE_INSERT_SQL,
+                               [self._course_insert_params(result.processed_data) for result in results])
+            if not self.db_manager.is_azure_sql():
+                cursor.execute("RELEASE upload_batch")
+            for result in results:
+                result.mark_success('inserted', result.processed_data)
+            return
+        except Exception as batch_error:
+            logger.warning(f"⚠️ Batch insert of {len(results)} rows failed, retrying row by row: {batch_error}")
+            cursor.execute(rollback)
+        
+        for result in results:
+            success, db_error = self.insert_course_to_database(result.processed_data)
+            if success:
+                result.mark_success('inserted', result.processed_data)
+            else:
+                result.mark_error(f"Database insert failed: {db_error}")
+    
+    def _new_response(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the response structure shared by direct and background uploads"""
         # Initialize response structure
-        response = {
+        return {
             'success': False,
             'message': '',
             'environment': self.db_manager.environment,
@@ -426,6 +307,12 @@ class ExcelUploadManager:
             }
         }
         
+    def process_excel_upload(self, request_files, user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Main method to process Excel file upload
+        Returns: Dictionary with processing results and detailed feedback
+        """
+        response = self._new_response(user_info)
         start_time = datetime.now()
         
         try:
@@ -450,144 +337,116 @@ class ExcelUploadManager:
                 response['summary']['primary_error'] = 'file_reading'
                 return response
             
-            # Step 3: Validate columns
+            # Steps 3-9: Validate, insert and report
+            self.process_dataframe(df, response, user_info)
+            
+        except Exception as e:
+            logger.error(f"❌ Unexpected error during Excel processing: {e}")
+            response['message'] = f"Unexpected error occurred: {str(e)}"
+            response['summary']['primary_error'] = 'unexpected_error'
+            
+        finally:
+            self._record_processing_time(response, start_time)
+        
+        return response
+    
+    def dry_run_upload(self, request_files, user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate an upload without writing anything
+        Chunks are validated in parallel and checked against the existing-course
+        dedupe index; returns the full per-row report a real upload would produce
+        """
+        response = self._new_response(user_info)
+        response['dry_run'] = True
+        start_time = datetime.now()
+        
+        try:
+            logger.info(f"🔍 Starting dry-run validation for user: {user_info.get('username')}")
+            
+            is_valid, error_msg, file = self.validate_file_upload(request_files)
+            if not is_valid:
+                response['message'] = error_msg
+                response['summary']['primary_error'] = 'file_validation'
+                return response
+            
+            response['summary']['file_info'] = {
+                'filename': secure_filename(file.filename),
+                'size_kb': round(file.content_length / 1024, 2) if file.content_length else 'unknown'
+            }
+            
+            is_valid, error_msg, df = self.read_excel_file(file, max_rows=self.dry_run_max_rows)
+            if not is_valid:
+                response['message'] = error_msg
+                response['summary']['primary_error'] = 'file_reading'
+                return response
+            
+            response['summary']['file_info']['format'] = df.attrs.get('file_format')
+            
             is_valid, error_msg = self.validate_columns(df)
             if not is_valid:
                 response['message'] = error_msg
                 response['summary']['primary_error'] = 'column_validation'
-                response['summary']['recommendations'] = [
-                    "Ensure your Excel file has the required columns: title, url, source, level",
-                    "Download the template file for the correct format",
-                    "Check column names for typos or extra spaces"
-                ]
                 return response
             
-            # Step 4: Connect to database
             if not self.db_manager.connection:
-                try:
-                    self.db_manager.connect_to_database()
-                except Exception as db_error:
-                    response['message'] = f"Database connection failed: {str(db_error)}"
-                    response['summary']['primary_error'] = 'database_connection'
-                    return response
-            
-            # Step 5: Get existing courses for duplicate checking
+                self.db_manager.connect_to_database()
             existing_courses = self.get_existing_courses()
             
-            # Step 6: Process each row
-            response['stats']['total_processed'] = len(df)
-            row_results = []
+            results = self.validate_rows(df, existing_courses, parallel=True)
             
-            for index, row in df.iterrows():
-                # Add row number for tracking
-                row_dict = row.to_dict()
-                row_dict['_row_number'] = index + 2  # +2 because Excel rows start at 1 and we skip header
-                
-                # Validate and process row
-                result = self.validate_and_process_row(row_dict, existing_courses)
-                
-                # Attempt database insertion if validation passed
+            row_results = []
+            for result in results:
                 if result.status == 'pending':
-                    success, db_error = self.insert_course_to_database(result.processed_data)
-                    if success:
-                        result.mark_success('inserted', result.processed_data)
-                        # Add to existing courses to prevent duplicates within same upload
-                        key = (result.processed_data['title'].lower(), result.processed_data['url'].lower())
-                        existing_courses[key] = True
-                        response['stats']['successful'] += 1
-                    else:
-                        result.mark_error(f"Database insert failed: {db_error}")
-                        response['stats']['errors'] += 1
+                    result.mark_success('would_insert', result.processed_data)
+                    response['stats']['successful'] += 1
                 elif result.status == 'skipped':
                     response['stats']['skipped'] += 1
-                elif result.status == 'error':
+                else:
                     response['stats']['errors'] += 1
-                
-                # Count warnings
-                if result.validation_warnings:
-                    response['stats']['warnings'] += len(result.validation_warnings)
-                
+                response['stats']['warnings'] += len(result.validation_warnings)
                 row_results.append(result.to_dict())
             
-            # Step 7: Commit transaction
-            try:
-                self.db_manager.connection.commit()
-                logger.info(f"✅ Transaction committed successfully")
-            except Exception as commit_error:
-                logger.error(f"❌ Commit error: {commit_error}")
-                response['message'] = f"Failed to save changes to database: {str(commit_error)}"
-                response['summary']['primary_error'] = 'database_commit'
-                return response
-            
-            # Step 8: Create persistent upload report
-            report_id = None
-            try:
-                report_id = create_upload_report(
-                    user_id=user_info.get('id'),
-                    filename=response['summary']['file_info']['filename'],
-                    total_rows=len(df),
-                    processed_rows=response['stats']['total_processed'],
-                    success_count=response['stats']['successful'],
-                    error_count=response['stats']['errors'],
-                    warnings_count=response['stats']['warnings']
-                )
-                
-                # Add row details to the persistent report
-                for result in row_results:
-                    status_map = {
-                        'success': 'SUCCESS',
-                        'skipped': 'SKIPPED', 
-                        'error': 'ERROR'
-                    }
-                    
-                    message = result.get('error_message', result.get('action', 'Processed'))
-                    if result.get('validation_warnings'):
-                        message += f" (Warnings: {', '.join(result['validation_warnings'])})"
-                    
-                    add_row_detail(
-                        report_id=report_id,
-                        row_number=result['row_number'],
-                        status=status_map.get(result['status'], 'UNKNOWN'),
-                        message=message,
-                        course_title=result.get('processed_data', {}).get('title'),
-                        course_url=result.get('processed_data', {}).get('url')
-                    )
-                
-                logger.info(f"📊 Created persistent upload report: {report_id}")
-                response['report_id'] = report_id
-                
-            except Exception as report_error:
-                logger.error(f"⚠️ Failed to create upload report: {report_error}")
-                # Don't fail the upload due to reporting issues
-                response['report_warning'] = f"Upload succeeded but reporting failed: {str(report_error)}"
-            
-            # Step 9: Prepare final response
+            stats = response['stats']
+            stats['total_processed'] = len(results)
             response['success'] = True
             response['row_results'] = row_results
+            response['message'] = (f"Dry run complete: {stats['successful']} courses would be uploaded, "
+                                   f"{stats['skipped']} skipped, {stats['errors']} with errors. Nothing was saved.")
             
-            # Generate summary message
-            if response['stats']['successful'] > 0:
-                if response['stats']['errors'] == 0 and response['stats']['skipped'] == 0:
-                    response['message'] = f"Perfect! All {response['stats']['successful']} courses uploaded successfully."
-                elif response['stats']['errors'] > 0:
-                    response['message'] = f"Partial success: {response['stats']['successful']} courses uploaded, {response['stats']['errors']} failed, {response['stats']['skipped']} skipped."
-                else:
-                    response['message'] = f"Upload completed: {response['stats']['successful']} courses uploaded, {response['stats']['skipped']} duplicates skipped."
-            else:
-                response['success'] = False
-                response['message'] = f"No courses were uploaded. {response['stats']['errors']} errors, {response['stats']['skipped']} skipped."
-                response['summary']['primary_error'] = 'no_valid_data'
+        except Exception as e:
+            logger.error(f"❌ Unexpected error during dry-run validation: {e}")
+            response['message'] = f"Unexpected error occurred: {str(e)}"
+            response['summary']['primary_error'] = 'unexpected_error'
+            
+        finally:
+            self._record_processing_time(response, start_time)
+        
+        return response
+    
+    def process_saved_upload(self, path: str, filename: str, user_info: Dict[str, Any],
+                             progress_callback: Callable[[int, int], Optional[bool]] = None) -> Dict[str, Any]:
+        """
+        Process an Excel file that was saved to disk for background processing
+        Returns the same structure as process_excel_upload
+        """
+        response = self._new_response(user_info)
+        start_time = datetime.now()
+        
+        try:
+            logger.info(f"🚀 Starting background Excel upload processing for user: {user_info.get('username')}")
             
-            # Add recommendations based on results
-            recommendations = []
-            if response['stats']['errors'] > 0:
-                recommendations.append("Review the detailed error messages below to fix data issues")
-            if response['stats']['skipped'] > 0:
-                recommendations.append("Skipped items are likely duplicates - check for existing courses")
-            if response['stats']['warnings'] > 0:
-                recommendations.append("Review warnings for data quality improvements")
+            response['summary']['file_info'] = {
+                'filename': filename,
+                'size_kb': round(os.path.getsize(path) / 1024, 2)
+            }
             
-            response['summary']['recommendations'] = recommendations
+            is_valid, error_msg, df = self.read_upload_path(path)
+            if not is_valid:
+                response['message'] = error_msg
+                response['summary']['primary_error'] = 'file_reading'
+                return response
+            
+            self.process_dataframe(df, response, user_info, progress_callback)
             
         except Exception as e:
             logger.error(f"❌ Unexpected error during Excel processing: {e}")
@@ -595,16 +454,319 @@ class ExcelUploadManager:
             response['summary']['primary_error'] = 'unexpected_error'
             
         finally:
-            # Calculate processing time
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds() * 1000
-            response['summary']['processing_time_ms'] = round(processing_time, 2)
+            self._record_processing_time(response, start_time)
+        
+        return response
+    
+    def validate_rows(self, df, existing_courses: Dict[Tuple[str, str], bool],
+                      parallel: bool = False) -> List[RowProcessingResult]:
+        """
+        Validator stage: validate every row and flag duplicates
+        Rows that pass are left 'pending' for the writer stage.
+        With parallel=True chunks are validated in a process pool; duplicates within
+        the file are always resolved afterwards in row order so results are deterministic.
+        """
+        # Tabular formats have a header line; JSON Lines starts with data
+        row_offset = 1 if df.attrs.get('file_format') == 'jsonl' else 2
+        
+        records = df.to_dict('records')
+        for index, record in zip(df.index, records):
+            # Add row number for tracking
+            record['_row_number'] = index + row_offset
+        
+        chunks = [records[start:start + self.validation_chunk_size]
+                  for start in range(0, len(records), self.validation_chunk_size)]
+        
+        if parallel and len(chunks) > 1 and self.validation_workers > 1:
+            results = self._validate_chunks_in_pool(chunks, existing_courses)
+        else:
+            results = [validate_course_row(record, existing_courses, self.valid_levels) for record in records]
+        
+        # Prevent duplicates within the same upload
+        for result in results:
+            if result.status == 'pending':
+                key = (result.processed_data['title'].lower(), result.processed_data['url'].lower())
+                if key in existing_courses:
+                    result.mark_skipped("duplicate - same title and URL appear earlier in this file")
+                else:
+                    existing_courses[key] = True
+        
+        return results
+    
+    def _validate_chunks_in_pool(self, chunks: List[List[Dict[str, Any]]],
+                                 existing_courses: Dict[Tuple[str, str], bool]) -> List[RowProcessingResult]:
+        """
+        Validate chunks across worker processes, falling back to in-process validation
+        Workers are spawned rather than forked: this runs inside threaded gunicorn
+        workers, and a fork would copy locks held by the other threads. They
+        import only course_row_validation, never the app.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        workers = min(self.validation_workers, len(chunks))
+        try:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=init_validation_worker,
+                                     initargs=(dict(existing_courses), list(self.valid_levels))) as pool:
+                results = []
+                # map preserves chunk order, so results stay in row order
+                for chunk_results in pool.map(validate_chunk, chunks):
+                    results.extend(chunk_results)
+            logger.info(f"🧮 Validated {len(results)} rows in {len(chunks)} chunks across {workers} processes")
+            return results
+        except Exception as pool_error:
+            logger.warning(f"⚠️ Process pool unavailable, validating in-process: {pool_error}")
+            return [validate_course_row(record, existing_courses, self.valid_levels)
+                    for chunk in chunks for record in chunk]
+    
+    def _preview_row_results(self, row_results: List[Dict]) -> List[Dict]:
+        """Bounded slice of row results for the HTTP response, errors and skips first"""
+        if len(row_results) <= self.response_row_preview:
+            return row_results
+        priority = {'error': 0, 'skipped': 1}
+        preview = sorted(row_results, key=lambda r: priority.get(r['status'], 2))[:self.response_row_preview]
+        return sorted(preview, key=lambda r: r['row_number'])
+    
+    def process_dataframe(self, df, response: Dict[str, Any], user_info: Dict[str, Any],
+                          progress_callback: Callable[[int, int], Optional[bool]] = None) -> None:
+        """
+        Validate, insert and report every row of an uploaded file (steps 3-9)
+        Results are written into the response structure in place;
+        progress_callback(written, total) is called after each write batch and
+        returning False stops before the next batch
+        """
+        response['summary']['file_info']['format'] = df.attrs.get('file_format')
+        
+        # Step 3: Validate columns
+        is_valid, error_msg = self.validate_columns(df)
+        if not is_valid:
+            response['message'] = error_msg
+            response['summary']['primary_error'] = 'column_validation'
+            response['summary']['recommendations'] = [
+                "Ensure your file has the required columns: title, url, source, level",
+                "Download the template file for the correct format",
+                "Check column names for typos or extra spaces"
+            ]
+            return
+        
+        # Step 4: Connect to database
+        if not self.db_manager.connection:
+            try:
+                self.db_manager.connect_to_database()
+            except Exception as db_error:
+                response['message'] = f"Database connection failed: {str(db_error)}"
+                response['summary']['primary_error'] = 'database_connection'
+                return
+        
+        # Step 5: Get existing courses for duplicate checking
+        existing_courses = self.get_existing_courses()
+        
+        # Step 6a: Validator stage - every row is validated before anything is written
+        results = self.validate_rows(df, existing_courses)
+        response['stats']['total_processed'] = len(results)
+        
+        # Step 6b: Writer stage - validated rows are inserted in batches
+        pending = [result for result in results if result.status == 'pending']
+        for start in range(0, len(pending), self.write_batch_size):
+            self.insert_courses_batch(pending[start:start + self.write_batch_size])
             
-            logger.info(f"📊 Excel upload completed in {processing_time:.0f}ms: {response['stats']}")
+            if progress_callback:
+                # Commit completed batches so progress writes never wait on this transaction
+                self.db_manager.connection.commit()
+                written = min(start + self.write_batch_size, len(pending))
+                if progress_callback(written, len(pending)) is False:
+                    response['cancelled'] = True
+                    for result in pending[written:]:
+                        result.mark_skipped("cancelled - upload stopped before this row was written")
+                    logger.info(f"🛑 Upload stopped after writing {written} of {len(pending)} rows")
+                    break
+        
+        row_results = []
+        for result in results:
+            if result.status == 'success':
+                response['stats']['successful'] += 1
+            elif result.status == 'skipped':
+                response['stats']['skipped'] += 1
+            elif result.status == 'error':
+                response['stats']['errors'] += 1
+            
+            # Count warnings
+            if result.validation_warnings:
+                response['stats']['warnings'] += len(result.validation_warnings)
+            
+            row_results.append(result.to_dict())
         
+        # Step 7: Commit transaction
+        try:
+            self.db_manager.connection.commit()
+            logger.info(f"✅ Transaction committed successfully")
+            if response['stats']['successful']:
+                bump_version(CATALOG, conn=self.db_manager.connection)
+                queue_index_update(user_id=user_info.get('id'))
+        except Exception as commit_error:
+            logger.error(f"❌ Commit error: {commit_error}")
+            response['message'] = f"Failed to save changes to database: {str(commit_error)}"
+            response['summary']['primary_error'] = 'database_commit'
+            return
+        
+        # Step 8: Create persistent upload report
+        report_id = None
+        try:
+            report_id = create_upload_report(
+                user_id=user_info.get('id'),
+                filename=response['summary']['file_info']['filename'],
+                total_rows=len(df),
+                processed_rows=response['stats']['total_processed'],
+                success_count=response['stats']['successful'],
+                error_count=response['stats']['errors'],
+                warnings_count=response['stats']['warnings']
+            )
+            
+            # Add row details to the persistent report
+            for result in row_results:
+                status_map = {
+                    'success': 'SUCCESS',
+                    'skipped': 'SKIPPED', 
+                    'error': 'ERROR'
+                }
+                
+                message = result.get('error_message', result.get('action', 'Processed'))
+                if result.get('validation_warnings'):
+                    message += f" (Warnings: {', '.join(result['validation_warnings'])})"
+                
+                add_row_detail(
+                    report_id=report_id,
+                    row_number=result['row_number'],
+                    status=status_map.get(result['status'], 'UNKNOWN'),
+                    message=message,
+                    course_title=result.get('processed_data', {}).get('title'),
+                    course_url=result.get('processed_data', {}).get('url')
+                )
+            
+            logger.info(f"📊 Created persistent upload report: {report_id}")
+            response['report_id'] = report_id
+            
+        except Exception as report_error:
+            logger.error(f"⚠️ Failed to create upload report: {report_error}")
+            # Don't fail the upload due to reporting issues
+            response['report_warning'] = f"Upload succeeded but reporting failed: {str(report_error)}"
+        
+        # Step 9: Prepare final response
+        # The full row-by-row outcome lives in the upload report; only return a preview
+        response['success'] = True
+        response['row_results'] = self._preview_row_results(row_results)
+        response['row_results_truncated'] = len(row_results) > len(response['row_results'])
+        if report_id and has_request_context():
+            # Background jobs have no request to build URLs from; their result carries report_id
+            response['details_url'] = url_for('admin_reports.api_report_details', report_id=report_id)
+            response['details_download_url'] = url_for('admin_reports.export_report_ndjson', report_id=report_id)
+        
+        # Generate summary message
+        if response['stats']['successful'] > 0:
+            if response['stats']['errors'] == 0 and response['stats']['skipped'] == 0:
+                response['message'] = f"Perfect! All {response['stats']['successful']} courses uploaded successfully."
+            elif response['stats']['errors'] > 0:
+                response['message'] = f"Partial success: {response['stats']['successful']} courses uploaded, {response['stats']['errors']} failed, {response['stats']['skipped']} skipped."
+            else:
+                response['message'] = f"Upload completed: {response['stats']['successful']} courses uploaded, {response['stats']['skipped']} duplicates skipped."
+        else:
+            response['success'] = False
+            response['message'] = f"No courses were uploaded. {response['stats']['errors']} errors, {response['stats']['skipped']} skipped."
+            response['summary']['primary_error'] = 'no_valid_data'
+        
+        # Add recommendations based on results
+        recommendations = []
+        if response['stats']['errors'] > 0:
+            recommendations.append("Review the detailed error messages below to fix data issues")
+        if response['stats']['skipped'] > 0:
+            recommendations.append("Skipped items are likely duplicates - check for existing courses")
+        if response['stats']['warnings'] > 0:
+            recommendations.append("Review warnings for data quality improvements")
+        
+        response['summary']['recommendations'] = recommendations
+        
+    def _record_processing_time(self, response: Dict[str, Any], start_time: datetime) -> None:
+        """Calculate processing time"""
+        end_time = datetime.now()
+        processing_time = (end_time - start_time).total_seconds() * 1000
+        response['summary']['processing_time_ms'] = round(processing_time, 2)
+        
+        logger.info(f"📊 Excel upload completed in {processing_time:.0f}ms: {response['stats']}")
+    
+    def queue_excel_upload(self, request_files, user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate the uploaded file, save it and queue it on the background job engine
+        Returns a response with the job_id to poll instead of row results
+        """
+        response = self._new_response(user_info)
+        
+        is_valid, error_msg, file = self.validate_file_upload(request_files)
+        if not is_valid:
+            response['message'] = error_msg
+            response['summary']['primary_error'] = 'file_validation'
+            return response
+        
+        filename = secure_filename(file.filename)
+        upload_dir = os.getenv('UPLOAD_JOB_DIR', os.path.join(tempfile.gettempdir(), 'excel_upload_jobs'))
+        os.makedirs(upload_dir, exist_ok=True)
+        
+        with tempfile.NamedTemporaryFile(delete=False, dir=upload_dir, suffix=os.path.splitext(filename)[1]) as saved_file:
+            file.save(saved_file.name)
+            saved_path = saved_file.name
+        
+        job_id = job_manager.submit('excel_upload', {
+            'path': saved_path,
+            'filename': filename,
+            'user': {'id': user_info.get('id'), 'username': user_info.get('username')}
+        }, user_info.get('id'))
+        
+        response['success'] = True
+        response['queued'] = True
+        response['job_id'] = job_id
+        response['events_url'] = f'/admin/jobs/{job_id}/events'
+        response['message'] = f"Upload of {filename} queued for background processing."
+        response['summary']['file_info'] = {'filename': filename}
+        logger.info(f"📥 Upload queued as job {job_id}: {filename}")
         return response
 
 
+def run_excel_upload_job(ctx) -> Dict[str, Any]:
+    """Background job handler for queued Excel uploads"""
+    payload = ctx.payload
+    db_manager = DatabaseEnvironmentManager()
+    
+    def report_progress(done: int, total: int) -> bool:
+        ctx.update_progress(done, total, f"Processed {done} of {total} rows")
+        return not ctx.cancel_requested
+    
+    try:
+        upload_manager = ExcelUploadManager(db_manager)
+        result = upload_manager.process_saved_upload(
+            payload['path'], payload['filename'], payload.get('user') or {}, report_progress
+        )
+    finally:
+        db_manager.disconnect()
+        try:
+            os.unlink(payload['path'])
+        except OSError as cleanup_error:
+            logger.warning(f"⚠️ Failed to cleanup queued upload file: {cleanup_error}")
+    
+    if result.get('cancelled'):
+        raise JobCancelled(f"Excel upload stopped; partial report {result.get('report_id')}")
+    if result['summary']['primary_error'] == 'unexpected_error':
+        raise RuntimeError(result['message'])
+    
+    # Row-level results live in the persistent upload report
+    result.pop('row_results', None)
+    return result
+
+
+# Register with the background job engine
+job_manager.register('excel_upload', run_excel_upload_job)
+
+
 def handle_excel_upload_request(db_manager, get_current_user_func, request_obj):
     """
     Flask route handler for Excel upload requests
@@ -631,10 +793,19 @@ def handle_excel_upload_request(db_manager, get_current_user_func, request_obj):
         
         # Create upload manager and process file
         upload_manager = ExcelUploadManager(db_manager)
-        result = upload_manager.process_excel_upload(request_obj.files, user)
+        background = str(request_obj.values.get('background', '')).lower() in ('1', 'true', 'yes')
+        dry_run = str(request_obj.values.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        if dry_run:
+            result = upload_manager.dry_run_upload(request_obj.files, user)
+        elif background:
+            result = upload_manager.queue_excel_upload(request_obj.files, user)
+        else:
+            result = upload_manager.process_excel_upload(request_obj.files, user)
         
         # Determine HTTP status code
-        if result['success']:
+        if result.get('queued'):
+            status_code = 202
+        elif result['success']:
             status_code = 200
         elif result['summary']['primary_error'] in ['authentication', 'file_validation']:
             status_code = 400
@@ -7,6 +7,8 @@ This file provides the enhanced Excel upload route that can be integrated into a
 from flask import request, jsonify
 from datetime import datetime
 import logging
+from cache_versions import CATALOG, bump_version
+from course_recommender import queue_index_update
 
 logger = logging.getLogger(__name__)
 
@@ -189,6 +191,9 @@ def admin_upload_excel_courses_fallback(get_current_user_func):
                     stats['errors'] += 1
             
             conn.commit()
+            if stats['successful']:
+                bump_version(CATALOG, conn=conn)
+                queue_index_update()
             
             # Return response
             if stats['successful'] > 0:
@@ -1,224 +1,175 @@
 """
 Fast Course Fetcher - AI Learning Tracker
-Fetches AI/ML courses from various APIs (Microsoft Learn, GitHub, etc.)
+Fetches AI/ML courses from the registered course sources (Microsoft Learn, GitHub, etc.)
+concurrently and streams them into an incremental catalog sync: each source
+resumes from its stored cursor and ETag, and only new or changed courses are written.
 """
 
-import requests
-import time
-import json
-import sqlite3
-from datetime import datetime
+import os
+import queue
+import logging
 import threading
-from typing import Dict, List, Any
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from job_manager import job_manager
+from course_sources import CourseSource, SourceTimeout, enabled_sources
+from course_sync import CatalogKeys, CatalogSyncWriter, connect_for_sync
+from course_recommender import queue_index_update
+
+logger = logging.getLogger(__name__)
+
 
 class FastCourseFetcher:
-    def __init__(self, db_path: str = 'ai_learning.db'):
-        self.db_path = db_path
-        self.fetch_status = {}
+    def __init__(self, max_workers: int = None, write_batch_size: int = None):
+        self.max_workers = max_workers or int(os.environ.get('COURSE_FETCH_CONCURRENCY', 8))
+        self.write_batch_size = write_batch_size or int(os.environ.get('COURSE_FETCH_WRITE_BATCH', 200))
         
-    def start_fetch(self, fetch_id: str) -> bool:
-        """Start asynchronous course fetching"""
-        try:
-            # Initialize status
-            self.fetch_status[fetch_id] = {
-                'status': 'fetching',
-                'message': 'Starting course fetch...',
-                'courses_added': 0,
-                'apis_used': 0,
-                'start_time': time.time()
-            }
-            
-            # Start background thread
-            thread = threading.Thread(target=self._fetch_courses_background, args=(fetch_id,))
-            thread.daemon = True
-            thread.start()
-            
-            return True
-        except Exception as e:
-            self.fetch_status[fetch_id] = {
-                'status': 'error',
-                'message': f'Failed to start fetch: {str(e)}'
-            }
-            return False
+    def start_fetch(self, user_id: int = None) -> str:
+        """Queue a background course fetch and return its fetch ID (the job ID)"""
+        return job_manager.submit('course_fetch', {}, user_id)
     
     def get_status(self, fetch_id: str) -> Dict[str, Any]:
-        """Get current fetch status"""
-        return self.fetch_status.get(fetch_id, {'status': 'not_found'})
-    
-    def _fetch_courses_background(self, fetch_id: str):
-        """Background thread to fetch courses"""
-        try:
-            courses_added = 0
-            apis_used = 0
-            
-            # Update status
-            self.fetch_status[fetch_id]['message'] = 'Fetching from Microsoft Learn...'
-            
-            # Fetch from Microsoft Learn API
-            ms_courses = self._fetch_microsoft_learn_courses()
-            if ms_courses:
-                added = self._save_courses_to_db(ms_courses, 'Microsoft Learn')
-                courses_added += added
-                apis_used += 1
-                
-            self.fetch_status[fetch_id]['message'] = 'Fetching from GitHub...'
-            
-            # Fetch from GitHub (mock implementation)
-            github_courses = self._fetch_github_courses()
-            if github_courses:
-                added = self._save_courses_to_db(github_courses, 'GitHub')
-                courses_added += added
-                apis_used += 1
-            
-            # Calculate total time
-            total_time = round(time.time() - self.fetch_status[fetch_id]['start_time'], 2)
-            
-            # Update final status
-            self.fetch_status[fetch_id] = {
-                'status': 'complete',
-                'result': {
-                    'courses_added': courses_added,
-                    'apis_used': apis_used,
-                    'total_time': total_time
-                }
-            }
-            
-        except Exception as e:
-            self.fetch_status[fetch_id] = {
+        """Get current fetch status in the format polled by the admin UI"""
+        job = job_manager.get_job(fetch_id)
+        if not job or job['job_type'] != 'course_fetch':
+            return {'status': 'not_found'}
+        
+        if job['status'] == 'succeeded':
+            return {'status': 'complete', 'result': job['result'] or {}}
+        if job['status'] in ('failed', 'cancelled'):
+            return {
                 'status': 'error',
-                'message': f'Fetch failed: {str(e)}'
+                'message': f"Fetch {job['status']}: {job['error_message'] or 'unknown error'}"
             }
+        return {
+            'status': 'fetching',
+            'message': job['progress_message'] or 'Waiting for an available worker...'
+        }
     
-    def _fetch_microsoft_learn_courses(self) -> List[Dict]:
-        """Fetch courses from Microsoft Learn API"""
-        try:
-            # Simulated Microsoft Learn courses (replace with real API)
-            courses = [
-                {
-                    'title': 'Introduction to AI with Python',
-                    'level': 'Beginner',
-                    'description': 'Learn the basics of artificial intelligence using Python programming.',
-                    'link': 'https://docs.microsoft.com/learn/paths/intro-to-ai-python',
-                    'points': 100
-                },
-                {
-                    'title': 'Machine Learning Fundamentals',
-                    'level': 'Intermediate', 
-                    'description': 'Understand core machine learning concepts and algorithms.',
-                    'link': 'https://docs.microsoft.com/learn/paths/ml-fundamentals',
-                    'points': 150
-                },
-                {
-                    'title': 'GitHub Copilot for Developers',
-                    'level': 'Intermediate',
-                    'description': 'Master AI-powered coding with GitHub Copilot.',
-                    'link': 'https://docs.microsoft.com/learn/paths/github-copilot',
-                    'points': 120
-                },
-                {
-                    'title': 'Azure OpenAI Service',
-                    'level': 'Expert',
-                    'description': 'Build AI applications using Azure OpenAI Service.',
-                    'link': 'https://docs.microsoft.com/learn/paths/azure-openai',
-                    'points': 200
-                },
-                {
-                    'title': 'Computer Vision with Azure',
-                    'level': 'Intermediate',
-                    'description': 'Develop computer vision solutions using Azure Cognitive Services.',
-                    'link': 'https://docs.microsoft.com/learn/paths/computer-vision-azure',
-                    'points': 180
-                }
-            ]
-            return courses
-        except Exception as e:
-            print(f"Error fetching Microsoft Learn courses: {e}")
-            return []
+    def run_fetch_job(self, ctx) -> Dict[str, Any]:
+        """Background job handler that syncs courses from all enabled sources"""
+        result = self.fetch_and_store(enabled_sources(ctx.payload.get('sources')),
+                                      full_sync=bool(ctx.payload.get('full_sync')), ctx=ctx)
+        if result['courses_added']:
+            queue_index_update()
+        return result
     
-    def _fetch_github_courses(self) -> List[Dict]:
-        """Fetch courses from GitHub repositories"""
-        try:
-            # Simulated GitHub courses
-            courses = [
-                {
-                    'title': 'Machine Learning with TensorFlow',
-                    'level': 'Expert',
-                    'description': 'Advanced machine learning techniques using TensorFlow.',
-                    'link': 'https://github.com/tensorflow/tensorflow/tree/master/tensorflow/examples',
-                    'points': 220
-                },
-                {
-                    'title': 'Natural Language Processing Basics',
-                    'level': 'Beginner',
-                    'description': 'Learn NLP fundamentals with practical examples.',
-                    'link': 'https://github.com/microsoft/nlp-recipes',
-                    'points': 90
-                },
-                {
-                    'title': 'Deep Learning with PyTorch',
-                    'level': 'Expert',
-                    'description': 'Master deep learning using PyTorch framework.',
-                    'link': 'https://github.com/pytorch/tutorials',
-                    'points': 250
-                },
-                {
-                    'title': 'AI Ethics and Responsible AI',
-                    'level': 'Learner',
-                    'description': 'Understanding ethical considerations in AI development.',
-                    'link': 'https://github.com/microsoft/responsible-ai-toolbox',
-                    'points': 80
-                },
-                {
-                    'title': 'Automated Machine Learning (AutoML)',
-                    'level': 'Intermediate',
-                    'description': 'Streamline ML workflows with automated tools.',
-                    'link': 'https://github.com/microsoft/nni',
-                    'points': 160
-                }
-            ]
-            return courses
-        except Exception as e:
-            print(f"Error fetching GitHub courses: {e}")
-            return []
+    def create_session(self, source_count: int) -> requests.Session:
+        """One HTTP session shared by all sources, with a keep-alive pool per host"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(source_count, 1), pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'User-Agent': 'AI-Learning-Tracker-Course-Fetcher/1.0'})
+        return session
     
-    def _save_courses_to_db(self, courses: List[Dict], source: str) -> int:
-        """Save courses to database, avoiding duplicates"""
-        added_count = 0
+    def fetch_and_store(self, sources: List[CourseSource], full_sync: bool = False,
+                        ctx=None) -> Dict[str, Any]:
+        """
+        Fetch every source concurrently and stream pages into per-source sync writers
+        Wall-clock time is bounded by the slowest source (or its time budget),
+        not the sum of all sources. full_sync ignores stored cursors and ETags.
+        Returns totals plus per-source stats.
+        """
+        start_time = time.time()
+        pages: queue.Queue = queue.Queue()
+        stop = threading.Event()
         
+        if ctx:
+            ctx.update_progress(0, len(sources), f'Fetching from {len(sources)} sources...', force=True)
+        
+        db = connect_for_sync()
+        session = self.create_session(len(sources))
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources))),
+                                      thread_name_prefix='course-fetch')
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            catalog_keys = CatalogKeys(db)
+            writers = {source.name: CatalogSyncWriter(db, source.name, catalog_keys, self.write_batch_size)
+                       for source in sources}
+            stats = {}
+            for source in sources:
+                state = {} if full_sync else writers[source.name].state
+                stats[source.name] = {'pages': 0, 'fetched': 0, 'status': 'pending', 'error': None,
+                                      'not_modified': False, 'cursor': None, 'etag': None, 'seconds': 0.0}
+                executor.submit(self._drain_source, source, session, state.get('last_cursor'),
+                                state.get('etag'), pages, stop)
             
-            for course in courses:
-                # Check for duplicates
-                existing = conn.execute(
-                    'SELECT id FROM courses WHERE LOWER(title) = LOWER(?) OR link = ?',
-                    (course['title'], course['link'])
-                ).fetchone()
+            remaining = len(sources)
+            while remaining:
+                if ctx:
+                    ctx.raise_if_cancelled()
+                try:
+                    kind, name, value = pages.get(timeout=0.5)
+                except queue.Empty:
+                    continue
                 
-                if not existing:
-                    conn.execute('''
-                        INSERT INTO courses (title, source, level, link, points, description, created_at, url_status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        course['title'],
-                        source,
-                        course['level'],
-                        course['link'],
-                        course['points'],
-                        course['description'],
-                        datetime.now().isoformat(),
-                        'pending'
-                    ))
-                    added_count += 1
-            
-            conn.commit()
-            conn.close()
-            
+                source_stats = stats[name]
+                writer = writers[name]
+                if kind == 'page':
+                    source_stats['pages'] += 1
+                    source_stats['fetched'] += len(value.courses)
+                    source_stats['not_modified'] = value.not_modified
+                    source_stats['cursor'] = value.cursor or source_stats['cursor']
+                    source_stats['etag'] = source_stats['etag'] or value.etag
+                    for course in value.courses:
+                        writer.add(course)
+                    continue
+                
+                remaining -= 1
+                source_stats.update(value)
+                # Only a completed listing moves the cursor and ETag forward
+                if source_stats['status'] == 'ok':
+                    source_stats.update(writer.finish(cursor=source_stats['cursor'], etag=source_stats['etag']))
+                else:
+                    source_stats.update(writer.finish())
+                if ctx:
+                    ctx.update_progress(len(sources) - remaining, len(sources),
+                                        f'{name}: {source_stats["added"]} new, '
+                                        f'{source_stats["updated"]} updated', force=True)
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+            session.close()
+            db.disconnect()
+        
+        if ctx:
+            ctx.update_progress(len(sources), len(sources), 'Course fetch complete', force=True)
+        
+        return {
+            'courses_added': sum(s['added'] for s in stats.values()),
+            'courses_updated': sum(s['updated'] for s in stats.values()),
+            'apis_used': sum(1 for s in stats.values() if s['status'] != 'error' and s['pages']),
+            'total_time': round(time.time() - start_time, 2),
+            'sources': stats
+        }
+    
+    def _drain_source(self, source: CourseSource, session: requests.Session, cursor: Optional[str],
+                      etag: Optional[str], pages: queue.Queue, stop: threading.Event) -> None:
+        """Worker: page through one source within its time budget, handing pages to the writer"""
+        started = time.monotonic()
+        outcome = {'status': 'ok', 'error': None}
+        try:
+            for page in source.iter_pages(session, cursor, deadline=started + source.timeout_seconds,
+                                          etag=etag):
+                pages.put(('page', source.name, page))
+                if stop.is_set():
+                    outcome['status'] = 'stopped'
+                    break
+        except SourceTimeout as e:
+            outcome = {'status': 'timeout', 'error': str(e)}
+            logger.warning(f"⏱️ {e}")
         except Exception as e:
-            print(f"Error saving courses to database: {e}")
+            outcome = {'status': 'error', 'error': str(e)}
+            logger.error(f"❌ Error fetching {source.name} courses: {e}")
         
-        return added_count
+        outcome['seconds'] = round(time.monotonic() - started, 3)
+        pages.put(('done', source.name, outcome))
 
 # Global fetcher instance
 fetcher = FastCourseFetcher()
+
+# Register with the background job engine
+job_manager.register('course_fetch', fetcher.run_fetch_job, max_attempts=2)
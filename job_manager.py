@@ -0,0 +1,711 @@
+"""
+Background Job Manager - Persistent job queue for long-running admin operations
+Jobs are stored in the background_jobs table so any gunicorn worker can report
+status, while a small pool of worker threads claims and executes queued jobs.
+"""
+
+import os
+import json
+import uuid
+import socket
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from database_environment_manager import DatabaseEnvironmentManager
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler when cancellation has been requested"""
+    pass
+
+
+class JobContext:
+    """
+    Handle passed to job handlers for progress, checkpoints and cancellation
+    Writes go through the worker's connection when one is given, so a progress
+    tick costs a statement rather than a new database login.
+    """
+
+    def __init__(self, manager: 'JobManager', job: Dict, db_manager: DatabaseEnvironmentManager = None):
+        self.manager = manager
+        self.db_manager = db_manager
+        self._owner_thread = threading.get_ident()
+        self.job_id = job['job_id']
+        self.job_type = job['job_type']
+        self.payload = job.get('payload') or {}
+        self.checkpoint = job.get('checkpoint')
+        self.attempt = job.get('attempts') or 1
+        self.cancel_requested = False
+        self._last_write = 0.0
+
+    def update_progress(self, current: int = None, total: int = None,
+                        message: str = None, force: bool = False) -> None:
+        """
+        Record progress and refresh the heartbeat
+        Writes are throttled so tight loops can call this on every item
+        """
+        now = datetime.now().timestamp()
+        if not force and now - self._last_write < self.manager.progress_interval:
+            return
+        self._last_write = now
+        self.cancel_requested = self.manager._write_progress(
+            self.job_id, current, total, message, self._connection()
+        )
+
+    def save_checkpoint(self, state: Any) -> None:
+        """Persist resumable state; a retried attempt receives it as ctx.checkpoint"""
+        self.checkpoint = state
+        self.cancel_requested = self.manager._write_checkpoint(self.job_id, state, self._connection())
+
+    def raise_if_cancelled(self) -> None:
+        """Abort the handler if an admin cancelled the job"""
+        if self.cancel_requested or self.manager._is_cancel_requested(self.job_id, self._connection()):
+            self.cancel_requested = True
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def _connection(self) -> Optional[DatabaseEnvironmentManager]:
+        """The worker's connection, if called on the worker thread (connections are not shared across threads)"""
+        return self.db_manager if threading.get_ident() == self._owner_thread else None
+
+
+class JobManager:
+    """Manages submission, execution and status of persistent background jobs"""
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[JobContext], Any]] = {}
+        self.max_attempts: Dict[str, int] = {}
+        self.poll_interval = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+        self.progress_interval = float(os.getenv('JOB_PROGRESS_INTERVAL', '1'))
+        self.stale_after = int(os.getenv('JOB_STALE_SECONDS', '300'))
+        # Stale recovery is a cross-process sweep, so it runs far less often than the claim poll
+        self.stale_check_interval = float(os.getenv('JOB_STALE_CHECK_SECONDS', '60'))
+        # Running jobs beat at least three times per stale window, even if the handler is silent
+        self.heartbeat_interval = min(float(os.getenv('JOB_HEARTBEAT_SECONDS', '30')), self.stale_after / 3)
+        self.retry_delay = int(os.getenv('JOB_RETRY_DELAY', '30'))
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._workers: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._stale_lock = threading.Lock()
+        self._last_stale_check = 0.0
+
+    # ------------------------------------------------------------------
+    # Registration and submission
+    # ------------------------------------------------------------------
+
+    def register(self, job_type: str, handler: Callable[[JobContext], Any],
+                 max_attempts: int = 1) -> None:
+        """Register the handler that executes jobs of the given type"""
+        self.handlers[job_type] = handler
+        self.max_attempts[job_type] = max(1, max_attempts)
+        logger.info(f"🧩 Registered job handler: {job_type}")
+
+    def submit(self, job_type: str, payload: Dict = None, user_id: int = None,
+               max_attempts: int = None, coalesce: bool = False) -> str:
+        """
+        Queue a new job
+        Returns the job_id used for status polling and cancellation. With
+        coalesce=True a job of the same type and payload that is still queued
+        is returned instead of queueing another; running jobs do not count,
+        since they may have read their input before the caller's change.
+        """
+        job_id = str(uuid.uuid4())
+        attempts_allowed = max_attempts or self.max_attempts.get(job_type, 1)
+        payload_json = json.dumps(payload or {})
+
+        db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            if coalesce:
+                cursor.execute("""
+                    SELECT job_id FROM background_jobs
+                    WHERE job_type = ? AND status = ? AND payload = ?
+                """, (job_type, STATUS_QUEUED, payload_json))
+                row = cursor.fetchone()
+                if row:
+                    logger.info(f"🔁 Job {row[0]} ({job_type}) already queued")
+                    return row[0]
+            cursor.execute("""
+                INSERT INTO background_jobs
+                (job_id, job_type, status, payload, max_attempts, created_by, created_at, run_after)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (job_id, job_type, STATUS_QUEUED, payload_json,
+                  attempts_allowed, user_id, datetime.now(), datetime.now()))
+            db_manager.connection.commit()
+            logger.info(f"📥 Queued job {job_id} ({job_type})")
+        except Exception as e:
+            logger.error(f"❌ Error queueing job {job_type}: {e}")
+            db_manager.connection.rollback()
+            raise
+        finally:
+            db_manager.disconnect()
+
+        # Wake idle workers in this process so the job starts promptly
+        self._wakeup.set()
+        return job_id
+
+    # ------------------------------------------------------------------
+    # Status API
+    # ------------------------------------------------------------------
+
+    def get_job(self, job_id: str, db_manager: DatabaseEnvironmentManager = None) -> Optional[Dict]:
+        """Get a job by id, or None if it does not exist; reads through db_manager when given"""
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute("SELECT * FROM background_jobs WHERE job_id = ?", (job_id,))
+            row = cursor.fetchone()
+            return self._row_to_job(cursor, row) if row else None
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    def list_jobs(self, job_type: str = None, status: str = None,
+                  limit: int = 20) -> List[Dict]:
+        """List the most recent jobs, newest first"""
+        db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            conditions = []
+            params: List[Any] = []
+            if job_type:
+                conditions.append("job_type = ?")
+                params.append(job_type)
+            if status:
+                conditions.append("status = ?")
+                params.append(status)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            if db_manager.is_azure_sql():
+                sql = f"SELECT TOP {int(limit)} * FROM background_jobs {where} ORDER BY created_at DESC, id DESC"
+            else:
+                sql = f"SELECT * FROM background_jobs {where} ORDER BY created_at DESC, id DESC LIMIT {int(limit)}"
+
+            cursor.execute(sql, params)
+            return [self._row_to_job(cursor, row) for row in cursor.fetchall()]
+        finally:
+            db_manager.disconnect()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a job
+        Queued jobs are cancelled immediately; running jobs stop at their next checkpoint
+        """
+        db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute("""
+                UPDATE background_jobs
+                SET status = ?, cancel_requested = 1, finished_at = ?
+                WHERE job_id = ? AND status = ?
+            """, (STATUS_CANCELLED, datetime.now(), job_id, STATUS_QUEUED))
+            cancelled = cursor.rowcount == 1
+
+            if not cancelled:
+                cursor.execute("""
+                    UPDATE background_jobs SET cancel_requested = 1
+                    WHERE job_id = ? AND status = ?
+                """, (job_id, STATUS_RUNNING))
+                cancelled = cursor.rowcount == 1
+
+            db_manager.connection.commit()
+            if cancelled:
+                logger.info(f"🛑 Cancellation requested for job {job_id}")
+            return cancelled
+        finally:
+            db_manager.disconnect()
+
+    def stream_events(self, job_id: str, last_event_id: str = None,
+                      poll_interval: float = 1.0, heartbeat_interval: float = 15.0,
+                      max_duration: float = 25.0) -> Iterator[str]:
+        """
+        Yield server-sent events describing a job's progress
+        A 'progress' event is emitted whenever the job state changes, comments keep the
+        connection alive, and the stream ends after the job finishes or max_duration
+        elapses (clients reconnect with Last-Event-ID and skip the state they already saw).
+        Each stream occupies a sync gunicorn worker, so max_duration stays well below
+        the worker timeout; one connection is reused for every poll of the stream.
+        """
+        started = time.monotonic()
+        last_sent = time.monotonic()
+        sent_id = last_event_id
+
+        yield f"retry: {int(poll_interval * 3000)}\n\n"
+
+        db_manager = self._connect()
+        try:
+            while True:
+                job = self.get_job(job_id, db_manager)
+                if job is None:
+                    yield self._format_event('error', {'error': 'Job not found', 'job_id': job_id})
+                    return
+
+                event_id = f"{job['status']}:{job.get('progress_current') or 0}:{job.get('heartbeat_at') or ''}"
+                if event_id != sent_id:
+                    yield self._format_event('progress', self._progress_snapshot(job), event_id)
+                    sent_id = event_id
+                    last_sent = time.monotonic()
+
+                if job['is_finished']:
+                    yield self._format_event('end', {'status': job['status']}, event_id)
+                    return
+
+                if time.monotonic() - started >= max_duration:
+                    return
+
+                if time.monotonic() - last_sent >= heartbeat_interval:
+                    yield ": heartbeat\n\n"
+                    last_sent = time.monotonic()
+
+                # Close the read transaction between polls (pyodbc keeps one open otherwise)
+                db_manager.connection.commit()
+                time.sleep(poll_interval)
+        finally:
+            db_manager.disconnect()
+
+    @staticmethod
+    def _progress_snapshot(job: Dict) -> Dict:
+        """Compact progress payload with an ETA derived from the run rate so far"""
+        current = job.get('progress_current') or 0
+        total = job.get('progress_total') or 0
+        eta_seconds = None
+
+        if job['status'] == STATUS_RUNNING and job.get('started_at') and 0 < current < total:
+            started_at = job['started_at']
+            if isinstance(started_at, str):
+                started_at = datetime.fromisoformat(started_at)
+            elapsed = (datetime.now() - started_at).total_seconds()
+            eta_seconds = round(elapsed / current * (total - current), 1)
+
+        return {
+            'job_id': job['job_id'],
+            'job_type': job['job_type'],
+            'status': job['status'],
+            'current': current,
+            'total': total,
+            'percent': job['percent'],
+            'message': job.get('progress_message'),
+            'eta_seconds': eta_seconds,
+            'attempts': job.get('attempts'),
+            'error_message': job.get('error_message'),
+            'result': job.get('result') if job['is_finished'] else None
+        }
+
+    @staticmethod
+    def _format_event(event: str, data: Dict, event_id: str = None) -> str:
+        """Serialize one text/event-stream message"""
+        lines = []
+        if event_id:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {event}")
+        lines.append(f"data: {json.dumps(data, default=str)}")
+        return '\n'.join(lines) + '\n\n'
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start_workers(self, concurrency: int = None) -> None:
+        """Start daemon worker threads in this process (idempotent)"""
+        if any(worker.is_alive() for worker in self._workers):
+            return
+
+        if concurrency is None:
+            concurrency = int(os.getenv('JOB_WORKER_CONCURRENCY', '2'))
+        if concurrency <= 0:
+            logger.info("⏸️ Background job workers disabled")
+            return
+
+        self._stop_event.clear()
+        self._workers = []
+        for index in range(concurrency):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(f"{self.worker_prefix}:{index}",),
+                name=f"job-worker-{index}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"🚀 Started {concurrency} background job worker(s)")
+
+    def stop_workers(self, timeout: float = 5.0) -> None:
+        """Signal worker threads to exit and wait for them"""
+        self._stop_event.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def run_pending(self, max_jobs: int = None) -> int:
+        """
+        Execute queued jobs synchronously in the calling thread
+        Useful for CLI scripts and tests; returns the number of jobs run
+        """
+        worker_id = f"{self.worker_prefix}:sync"
+        processed = 0
+        db_manager = self._connect()
+        try:
+            while max_jobs is None or processed < max_jobs:
+                job = self._claim_next_job(worker_id, db_manager)
+                if not job:
+                    break
+                self._execute(job, db_manager)
+                processed += 1
+        finally:
+            db_manager.disconnect()
+        return processed
+
+    def _worker_loop(self, worker_id: str) -> None:
+        """Poll for due jobs until stopped, on one connection kept for the thread's lifetime"""
+        db_manager = None
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    if db_manager is None:
+                        db_manager = self._connect()
+                    if self._stale_check_due():
+                        self._recover_stale_jobs(db_manager)
+                    job = self._claim_next_job(worker_id, db_manager)
+                    if job:
+                        self._execute(job, db_manager)
+                        continue
+                except Exception as e:
+                    logger.error(f"❌ Job worker {worker_id} error: {e}")
+                    # Reconnect on the next poll in case the connection itself failed
+                    if db_manager is not None:
+                        db_manager.disconnect()
+                        db_manager = None
+
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+        finally:
+            if db_manager is not None:
+                db_manager.disconnect()
+
+    def _stale_check_due(self) -> bool:
+        """True for one worker in this process once every stale_check_interval"""
+        with self._stale_lock:
+            now = time.monotonic()
+            if now - self._last_stale_check < self.stale_check_interval:
+                return False
+            self._last_stale_check = now
+            return True
+
+    def _claim_next_job(self, worker_id: str,
+                        db_manager: DatabaseEnvironmentManager = None) -> Optional[Dict]:
+        """Atomically move the oldest due queued job to running; claims through db_manager when given"""
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            now = datetime.now()
+
+            for _ in range(5):
+                if db_manager.is_azure_sql():
+                    cursor.execute("""
+                        SELECT TOP 1 job_id FROM background_jobs
+                        WHERE status = ? AND (run_after IS NULL OR run_after <= ?)
+                        ORDER BY created_at, id
+                    """, (STATUS_QUEUED, now))
+                else:
+                    cursor.execute("""
+                        SELECT job_id FROM background_jobs
+                        WHERE status = ? AND (run_after IS NULL OR run_after <= ?)
+                        ORDER BY created_at, id
+                        LIMIT 1
+                    """, (STATUS_QUEUED, now))
+                row = cursor.fetchone()
+                if not row:
+                    db_manager.connection.commit()
+                    return None
+
+                # Conditional update: only one worker across all processes wins the claim
+                cursor.execute("""
+                    UPDATE background_jobs
+                    SET status = ?, attempts = attempts + 1, worker_id = ?,
+                        started_at = ?, heartbeat_at = ?, error_message = NULL
+                    WHERE job_id = ? AND status = ?
+                """, (STATUS_RUNNING, worker_id, now, now, row[0], STATUS_QUEUED))
+                claimed = cursor.rowcount == 1
+                db_manager.connection.commit()
+
+                if claimed:
+                    cursor.execute("SELECT * FROM background_jobs WHERE job_id = ?", (row[0],))
+                    job = self._row_to_job(cursor, cursor.fetchone())
+                    db_manager.connection.commit()
+                    return job
+
+            return None
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    def _execute(self, job: Dict, db_manager: DatabaseEnvironmentManager = None) -> None:
+        """Run a claimed job and record its outcome; job bookkeeping goes through db_manager when given"""
+        handler = self.handlers.get(job['job_type'])
+        if handler is None:
+            self._finish(job['job_id'], STATUS_FAILED,
+                         error_message=f"No handler registered for job type '{job['job_type']}'",
+                         db_manager=db_manager)
+            return
+
+        context = JobContext(self, job, db_manager)
+        logger.info(f"⚙️ Running job {job['job_id']} ({job['job_type']}), attempt {context.attempt}")
+
+        try:
+            context.raise_if_cancelled()
+            result = self._run_with_heartbeat(handler, context)
+            self._finish(job['job_id'], STATUS_SUCCEEDED, result=result, db_manager=db_manager)
+            logger.info(f"✅ Job {job['job_id']} succeeded")
+        except JobCancelled:
+            self._finish(job['job_id'], STATUS_CANCELLED, error_message="Cancelled by request",
+                         db_manager=db_manager)
+            logger.info(f"🛑 Job {job['job_id']} cancelled")
+        except Exception as e:
+            logger.error(f"❌ Job {job['job_id']} failed on attempt {context.attempt}: {e}")
+            if context.attempt < (job.get('max_attempts') or 1):
+                self._requeue(job['job_id'], context.attempt, str(e), db_manager)
+            else:
+                self._finish(job['job_id'], STATUS_FAILED, error_message=str(e), db_manager=db_manager)
+
+    def _run_with_heartbeat(self, handler: Callable[[JobContext], Any], context: JobContext) -> Any:
+        """
+        Call the handler while a background thread keeps the job's heartbeat fresh
+        Handlers that never report progress would otherwise look stale after
+        stale_after seconds and be requeued while still running.
+        """
+        done = threading.Event()
+        beater = threading.Thread(target=self._heartbeat_loop, args=(context, done),
+                                  name=f"job-heartbeat-{context.job_id[:8]}", daemon=True)
+        beater.start()
+        try:
+            return handler(context)
+        finally:
+            done.set()
+            beater.join()
+
+    def _heartbeat_loop(self, context: JobContext, done: threading.Event) -> None:
+        """Refresh the heartbeat whenever the handler has not written progress for a while"""
+        while not done.wait(self.heartbeat_interval):
+            if datetime.now().timestamp() - context._last_write < self.heartbeat_interval:
+                continue
+            try:
+                # Own connection: the worker's belongs to the handler's thread
+                if self._write_progress(context.job_id):
+                    context.cancel_requested = True
+            except Exception as e:
+                # The handler may hold the SQLite write lock; the next beat retries
+                logger.warning(f"⚠️ Heartbeat for job {context.job_id} failed: {e}")
+
+    def _requeue(self, job_id: str, attempt: int, error_message: str,
+                 db_manager: DatabaseEnvironmentManager = None) -> None:
+        """Put a failed job back on the queue with exponential backoff"""
+        run_after = datetime.now() + timedelta(seconds=self.retry_delay * (2 ** (attempt - 1)))
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute("""
+                UPDATE background_jobs
+                SET status = ?, run_after = ?, error_message = ?, worker_id = NULL
+                WHERE job_id = ? AND status = ?
+            """, (STATUS_QUEUED, run_after, error_message[:4000], job_id, STATUS_RUNNING))
+            db_manager.connection.commit()
+            logger.info(f"🔁 Job {job_id} requeued, next attempt after {run_after:%H:%M:%S}")
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    def _finish(self, job_id: str, status: str, result: Any = None,
+                error_message: str = None, db_manager: DatabaseEnvironmentManager = None) -> None:
+        """Record the terminal state of a job"""
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute("""
+                UPDATE background_jobs
+                SET status = ?, result = ?, error_message = ?, finished_at = ?, heartbeat_at = ?
+                WHERE job_id = ?
+            """, (status, json.dumps(result, default=str) if result is not None else None,
+                  error_message[:4000] if error_message else None,
+                  datetime.now(), datetime.now(), job_id))
+            db_manager.connection.commit()
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    def _recover_stale_jobs(self, db_manager: DatabaseEnvironmentManager = None) -> None:
+        """Requeue or fail running jobs whose worker stopped sending heartbeats"""
+        cutoff = datetime.now() - timedelta(seconds=self.stale_after)
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute("""
+                UPDATE background_jobs
+                SET status = ?, worker_id = NULL, run_after = ?,
+                    error_message = 'Worker stopped responding'
+                WHERE status = ? AND heartbeat_at < ? AND attempts < max_attempts
+                  AND cancel_requested = 0
+            """, (STATUS_QUEUED, datetime.now(), STATUS_RUNNING, cutoff))
+            cursor.execute("""
+                UPDATE background_jobs
+                SET status = ?, finished_at = ?,
+                    error_message = 'Worker stopped responding'
+                WHERE status = ? AND heartbeat_at < ?
+            """, (STATUS_FAILED, datetime.now(), STATUS_RUNNING, cutoff))
+            db_manager.connection.commit()
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    # ------------------------------------------------------------------
+    # Writes issued by JobContext
+    # ------------------------------------------------------------------
+
+    def _write_progress(self, job_id: str, current: int = None, total: int = None,
+                        message: str = None, db_manager: DatabaseEnvironmentManager = None) -> bool:
+        """Update progress columns and heartbeat; returns the cancel_requested flag"""
+        update_fields = ["heartbeat_at = ?"]
+        params: List[Any] = [datetime.now()]
+
+        if current is not None:
+            update_fields.append("progress_current = ?")
+            params.append(int(current))
+        if total is not None:
+            update_fields.append("progress_total = ?")
+            params.append(int(total))
+        if message is not None:
+            update_fields.append("progress_message = ?")
+            params.append(str(message)[:500])
+
+        params.append(job_id)
+        return self._update_running_job(update_fields, params, db_manager)
+
+    def _write_checkpoint(self, job_id: str, state: Any,
+                          db_manager: DatabaseEnvironmentManager = None) -> bool:
+        """Persist checkpoint state; returns the cancel_requested flag"""
+        return self._update_running_job(
+            ["checkpoint = ?", "heartbeat_at = ?"],
+            [json.dumps(state, default=str), datetime.now(), job_id],
+            db_manager
+        )
+
+    def _update_running_job(self, update_fields: List[str], params: List[Any],
+                            db_manager: DatabaseEnvironmentManager = None) -> bool:
+        """Apply an update to a job row and read back its cancellation flag"""
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute(f"""
+                UPDATE background_jobs
+                SET {', '.join(update_fields)}
+                WHERE job_id = ?
+            """, params)
+            cursor.execute("SELECT cancel_requested FROM background_jobs WHERE job_id = ?",
+                           (params[-1],))
+            row = cursor.fetchone()
+            db_manager.connection.commit()
+            return bool(row and row[0])
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    def _is_cancel_requested(self, job_id: str, db_manager: DatabaseEnvironmentManager = None) -> bool:
+        """Check the persisted cancellation flag"""
+        own_connection = db_manager is None
+        if own_connection:
+            db_manager = self._connect()
+        try:
+            cursor = db_manager.connection.cursor()
+            cursor.execute("SELECT cancel_requested FROM background_jobs WHERE job_id = ?",
+                           (job_id,))
+            row = cursor.fetchone()
+            # End the read transaction so the worker's connection does not pin an old snapshot
+            db_manager.connection.commit()
+            return bool(row and row[0])
+        finally:
+            if own_connection:
+                db_manager.disconnect()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> DatabaseEnvironmentManager:
+        """Open a fresh connection, creating the jobs table on first use"""
+        db_manager = DatabaseEnvironmentManager()
+        db_manager.connect()
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    db_manager.ensure_tables('background_jobs')
+                    self._schema_ready = True
+        return db_manager
+
+    @staticmethod
+    def _row_to_job(cursor, row) -> Dict:
+        """Convert a background_jobs row into a JSON-friendly dict"""
+        columns = [column[0] for column in cursor.description]
+        job = dict(zip(columns, row))
+
+        for field in ('payload', 'result', 'checkpoint'):
+            if job.get(field):
+                try:
+                    job[field] = json.loads(job[field])
+                except (TypeError, ValueError):
+                    pass
+
+        for field in ('created_at', 'started_at', 'heartbeat_at', 'finished_at', 'run_after'):
+            if isinstance(job.get(field), datetime):
+                job[field] = job[field].isoformat()
+
+        job['cancel_requested'] = bool(job.get('cancel_requested'))
+        total = job.get('progress_total') or 0
+        job['percent'] = round(100.0 * (job.get('progress_current') or 0) / total, 1) if total else None
+        job['is_finished'] = job.get('status') in FINISHED_STATUSES
+        return job
+
+
+# Global job manager shared by all modules in this process
+job_manager = JobManager()
+
+
+# Convenience functions for use in Flask routes
+def submit_job(job_type: str, payload: Dict = None, user_id: int = None) -> str:
+    """Convenience function to queue a background job"""
+    return job_manager.submit(job_type, payload, user_id)
+
+def get_job(job_id: str) -> Optional[Dict]:
+    """Convenience function to read job status"""
+    return job_manager.get_job(job_id)
+
+def cancel_job(job_id: str) -> bool:
+    """Convenience function to cancel a job"""
+    return job_manager.cancel(job_id)
@@ -0,0 +1,186 @@
+"""
+Learning Feed - AI Learning Tracker
+The learnings page shows a user's own entries merged with everyone's global
+entries, newest first. The two streams are read separately, each walking its
+composite index ((user_id, date_added, id) and (is_global, date_added, id))
+instead of the OR scan, and pages are cut with a keyset on (date_added, id)
+rather than OFFSET. The newest global entries are held per worker and shared
+by all users until the learnings_global counter moves; pages older than that
+window fall back to one UNION query.
+
+On Azure SQL the feed is ordered by created_at, as the page was before: the
+learning_entries tables created by the Azure setup paths always fill
+created_at, while date_added was added to them later and can be NULL.
+Matching (user_id, created_at, id) / (is_global, created_at, id) indexes are
+created there on first use.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache_versions import LEARNINGS_GLOBAL, get_versions
+from database_environment_manager import DatabaseEnvironmentManager
+
+logger = logging.getLogger(__name__)
+
+# Keyset position: (sort time, id) of the last entry on the previous page
+Cursor = Tuple[Any, int]
+
+FEED_COLUMNS = 'id, user_id, title, description, date_added, tags, custom_date, is_global'
+
+AZURE_FEED_INDEXES = {
+    'idx_learning_user_feed_created': 'user_id, created_at, id',
+    'idx_learning_global_feed_created': 'is_global, created_at, id',
+}
+
+
+def order_column(azure: bool) -> str:
+    """Column the feed is ordered and paged by on this backend"""
+    return 'created_at' if azure else 'date_added'
+
+
+def _sort_key(entry: Dict[str, Any]) -> Tuple[str, int]:
+    sort_time = entry['feed_sort']
+    return (str(sort_time) if sort_time is not None else '', entry['id'])
+
+
+def _before(entry: Dict[str, Any], cursor: Optional[Cursor]) -> bool:
+    return cursor is None or _sort_key(entry) < (str(cursor[0]), int(cursor[1]))
+
+
+def feed_entry(row, entry_type: str = None) -> Dict[str, Any]:
+    """Template dict of a mapping row (dict, sqlite3.Row), labelled Global or Personal"""
+    entry = {key: row[key] for key in row.keys()}
+    entry['entry_type'] = entry_type or ('Global' if entry.get('is_global') else 'Personal')
+    return entry
+
+
+def fetch_entries(conn, sql: str, params=(), entry_type: str = None) -> List[Dict[str, Any]]:
+    """
+    Run an entry query and return template dicts
+    Columns come from the cursor description, so route connections and raw
+    DatabaseEnvironmentManager connections (plain tuple rows) both work.
+    """
+    cursor = conn.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    return [feed_entry(dict(zip(columns, row)), entry_type) for row in cursor.fetchall()]
+
+
+class LearningFeed:
+    """Keyset-paginated personal + global learning entries with a shared global window"""
+
+    def __init__(self, per_page: int = None, global_window: int = None):
+        self.per_page = per_page or int(os.getenv('LEARNINGS_PAGE_SIZE', '20'))
+        # Newest global entries kept per worker; deeper pages query the database
+        self.global_window = global_window or int(os.getenv('LEARNINGS_GLOBAL_CACHE_SIZE', '500'))
+        self._global: Optional[Tuple[int, List[Dict[str, Any]], bool]] = None
+        self._lock = threading.Lock()
+        self._tables_ready = False
+        self._azure = False
+
+    def page(self, user_id: int, cursor: Optional[Cursor] = None, per_page: int = None,
+             conn=None) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        """
+        One page of the user's feed older than `cursor`, plus the cursor of the
+        next page (None on the last page)
+        `conn` may be an open route connection; otherwise one is opened.
+        """
+        per_page = per_page or self.per_page
+        db = None
+        if conn is None or not self._tables_ready:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            if not self._tables_ready:
+                # Adds the composite feed indexes to databases created before they existed
+                db.ensure_tables('learning_entries')
+                self._azure = db.is_azure_sql()
+                if self._azure:
+                    self._ensure_azure_indexes(db)
+                self._tables_ready = True
+            if conn is None:
+                conn = db.connection
+            else:
+                db.disconnect()
+                db = None
+        try:
+            version = get_versions([LEARNINGS_GLOBAL], conn)[LEARNINGS_GLOBAL]
+            candidates = self._global_entries(conn, version, cursor, per_page + 1)
+            if candidates is None:
+                candidates = self._union(conn, user_id, cursor, per_page + 1)
+            else:
+                candidates += self._personal(conn, user_id, cursor, per_page + 1)
+        finally:
+            if db is not None:
+                db.disconnect()
+
+        # The user's own global entries arrive from both streams
+        entries = sorted({entry['id']: entry for entry in candidates}.values(), key=_sort_key, reverse=True)
+        if len(entries) > per_page:
+            entries = entries[:per_page]
+            return entries, (entries[-1]['feed_sort'], entries[-1]['id'])
+        return entries, None
+
+    @staticmethod
+    def _ensure_azure_indexes(db: DatabaseEnvironmentManager):
+        try:
+            cursor = db.connection.cursor()
+            for name, columns in AZURE_FEED_INDEXES.items():
+                cursor.execute(f"""
+                    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = '{name}'
+                                   AND object_id = OBJECT_ID('learning_entries'))
+                    CREATE INDEX {name} ON learning_entries({columns})
+                """)
+            db.connection.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create the Azure learnings feed indexes: {e}")
+
+    def _global_entries(self, conn, version: int, cursor: Optional[Cursor],
+                        limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Up to `limit` global entries older than cursor from the cached window, or None past its end"""
+        cached = self._global
+        if cached is None or cached[0] != version:
+            query = self._stream_sql('is_global = 1', None, self.global_window)
+            rows = fetch_entries(conn, query, entry_type='Global')
+            cached = (version, rows, len(rows) < self.global_window)
+            with self._lock:
+                self._global = cached
+            logger.info(f"🌐 Global learnings window loaded: {len(rows)} entries (version {version})")
+
+        _, rows, complete = cached
+        older = [entry for entry in rows if _before(entry, cursor)]
+        if len(older) < limit and not complete:
+            return None
+        return [dict(entry) for entry in older[:limit]]
+
+    def _stream_sql(self, where: str, cursor: Optional[Cursor], limit: int) -> str:
+        """Newest `limit` entries matching `where` older than cursor, in index order"""
+        order = order_column(self._azure)
+        keyset = f" AND {order} <= ? AND ({order} < ? OR id < ?)" if cursor else ''
+        columns = f"{FEED_COLUMNS}, {order} AS feed_sort"
+        if self._azure:
+            return (f"SELECT TOP ({int(limit)}) {columns} FROM learning_entries "
+                    f"WHERE {where}{keyset} ORDER BY {order} DESC, id DESC")
+        return (f"SELECT {columns} FROM learning_entries "
+                f"WHERE {where}{keyset} ORDER BY {order} DESC, id DESC LIMIT {int(limit)}")
+
+    @staticmethod
+    def _keyset_params(cursor: Optional[Cursor]) -> list:
+        return [cursor[0], cursor[0], int(cursor[1])] if cursor else []
+
+    def _personal(self, conn, user_id: int, cursor: Optional[Cursor], limit: int):
+        sql = self._stream_sql('user_id = ?', cursor, limit)
+        return fetch_entries(conn, sql, [user_id] + self._keyset_params(cursor))
+
+    def _union(self, conn, user_id: int, cursor: Optional[Cursor], limit: int):
+        """Both streams in one statement, each branch a bounded index range scan"""
+        personal = self._stream_sql('user_id = ?', cursor, limit)
+        global_ = self._stream_sql('is_global = 1', cursor, limit)
+        sql = f"SELECT * FROM ({personal}) personal UNION ALL SELECT * FROM ({global_}) global_feed"
+        params = [user_id] + self._keyset_params(cursor) * 2
+        return fetch_entries(conn, sql, params)
+
+
+# Global feed instance (one per worker process)
+learning_feed = LearningFeed()
@@ -0,0 +1,239 @@
+"""
+Learning Search - AI Learning Tracker
+Ranked full-text search over the title, description and tags of the learning
+entries a user can see (their own plus global ones). Every query term is a
+prefix match and all terms must match.
+- SQLite: an external-content FTS5 table kept in sync by triggers, ranked by bm25
+- Azure SQL: a full-text index with automatic change tracking, ranked by CONTAINSTABLE
+- Otherwise: an in-process inverted index per worker, rebuilt when the
+  learnings counter moves
+"""
+
+import re
+import logging
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache_versions import LEARNINGS, get_versions
+from database_environment_manager import DatabaseEnvironmentManager
+from learning_feed import FEED_COLUMNS, fetch_entries, learning_feed
+
+logger = logging.getLogger(__name__)
+
+ENGINE_FTS5 = 'fts5'
+ENGINE_SQLSERVER = 'sqlserver'
+ENGINE_MEMORY = 'memory'
+
+# Relative weight of a match in each searched column
+FIELD_WEIGHTS = {'title': 10.0, 'description': 1.0, 'tags': 5.0}
+MAX_TERMS = 8
+FULLTEXT_CATALOG = 'learning_catalog'
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+FTS5_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS learning_entries_fts USING fts5(
+        title, description, tags,
+        content='learning_entries', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS learning_entries_fts_insert AFTER INSERT ON learning_entries BEGIN
+        INSERT INTO learning_entries_fts (rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS learning_entries_fts_delete AFTER DELETE ON learning_entries BEGIN
+        INSERT INTO learning_entries_fts (learning_entries_fts, rowid, title, description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS learning_entries_fts_update AFTER UPDATE ON learning_entries BEGIN
+        INSERT INTO learning_entries_fts (learning_entries_fts, rowid, title, description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.tags);
+        INSERT INTO learning_entries_fts (rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, new.tags);
+    END""",
+]
+
+
+def query_terms(query: Optional[str]) -> List[str]:
+    """Lower-cased word tokens of a search box query, first MAX_TERMS distinct ones"""
+    terms = []
+    for term in TOKEN_PATTERN.findall((query or '').lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+class MemorySearchIndex:
+    """Inverted index over the entries at one learnings version"""
+
+    def __init__(self, entries: List[Dict[str, Any]], version: int):
+        self.version = version
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        for entry in entries:
+            self.entries[entry['id']] = entry
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in TOKEN_PATTERN.findall((entry.get(field) or '').lower()):
+                    scores = self.postings.setdefault(token, {})
+                    scores[entry['id']] = scores.get(entry['id'], 0.0) + weight
+        # Sorted vocabulary: the tokens starting with a prefix are one contiguous run
+        self.tokens = sorted(self.postings)
+
+    def search(self, terms: List[str], user_id: int) -> List[Dict[str, Any]]:
+        """Visible entries matching every term as a prefix, best score first"""
+        scores = None
+        for term in terms:
+            term_scores: Dict[int, float] = {}
+            for token in self.tokens[bisect_left(self.tokens, term):]:
+                if not token.startswith(term):
+                    break
+                for entry_id, score in self.postings[token].items():
+                    term_scores[entry_id] = term_scores.get(entry_id, 0.0) + score
+            scores = term_scores if scores is None else {
+                entry_id: score + term_scores[entry_id] for entry_id, score in scores.items()
+                if entry_id in term_scores}
+            if not scores:
+                return []
+        visible = [(score, entry_id) for entry_id, score in scores.items()
+                   if self.entries[entry_id]['user_id'] == user_id or self.entries[entry_id]['is_global']]
+        visible.sort(reverse=True)
+        return [self.entries[entry_id] for _, entry_id in visible]
+
+
+class LearningSearch:
+    """Chooses the search engine for the database and runs paginated searches"""
+
+    def __init__(self, engine: str = None):
+        self.engine = engine
+        self._memory: Optional[MemorySearchIndex] = None
+        self._lock = threading.Lock()
+
+    def _ready(self):
+        if self.engine:
+            return
+        db = DatabaseEnvironmentManager()
+        db.connect()
+        try:
+            if db.is_azure_sql():
+                engine = ENGINE_SQLSERVER if self._ensure_fulltext(db) else ENGINE_MEMORY
+            else:
+                engine = ENGINE_FTS5 if self._ensure_fts5(db) else ENGINE_MEMORY
+        finally:
+            db.disconnect()
+        self.engine = engine
+        logger.info(f"🔎 Learning search engine: {engine}")
+
+    @staticmethod
+    def _ensure_fts5(db: DatabaseEnvironmentManager) -> bool:
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'learning_entries_fts'")
+            exists = cursor.fetchone()[0]
+            for statement in FTS5_SCHEMA:
+                cursor.execute(statement)
+            if not exists:
+                # Index the entries written before the triggers existed
+                cursor.execute("INSERT INTO learning_entries_fts (learning_entries_fts) VALUES ('rebuild')")
+            db.connection.commit()
+            return True
+        except Exception as e:
+            db.connection.rollback()
+            logger.warning(f"⚠️ SQLite FTS5 unavailable, using in-process learning search: {e}")
+            return False
+
+    @staticmethod
+    def _ensure_fulltext(db: DatabaseEnvironmentManager) -> bool:
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("SELECT CAST(FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') AS INT)")
+            if not cursor.fetchone()[0]:
+                raise RuntimeError('full-text search is not installed')
+            cursor.execute("SELECT COUNT(*) FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('learning_entries')")
+            if not cursor.fetchone()[0]:
+                cursor.execute("SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID('learning_entries') "
+                               "AND is_primary_key = 1")
+                key_index = cursor.fetchone()[0]
+                # Full-text DDL cannot run inside a user transaction
+                db.connection.autocommit = True
+                cursor.execute(f"IF NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name = '{FULLTEXT_CATALOG}') "
+                               f"CREATE FULLTEXT CATALOG {FULLTEXT_CATALOG}")
+                cursor.execute(f"CREATE FULLTEXT INDEX ON learning_entries (title, description, tags) "
+                               f"KEY INDEX {key_index} ON {FULLTEXT_CATALOG} WITH CHANGE_TRACKING AUTO")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ SQL Server full-text search unavailable, using in-process learning search: {e}")
+            return False
+
+    def search(self, user_id: int, query: str, page: int = 1, per_page: int = None,
+               conn=None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        One page of the user's own and global entries matching `query`, best
+        match first, plus whether a further page exists
+        `conn` may be an open route connection; otherwise one is opened.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return [], False
+        self._ready()
+        per_page = per_page or learning_feed.per_page
+        offset = (max(int(page), 1) - 1) * per_page
+
+        db = None
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            conn = db.connection
+        try:
+            if self.engine == ENGINE_FTS5:
+                entries = self._search_fts5(conn, terms, user_id, offset, per_page + 1)
+            elif self.engine == ENGINE_SQLSERVER:
+                entries = self._search_sqlserver(conn, terms, user_id, offset, per_page + 1)
+            else:
+                entries = [dict(entry) for entry in
+                           self._memory_index(conn).search(terms, user_id)[offset:offset + per_page + 1]]
+        finally:
+            if db is not None:
+                db.disconnect()
+        return entries[:per_page], len(entries) > per_page
+
+    @staticmethod
+    def _columns() -> str:
+        return ', '.join(f'le.{column.strip()}' for column in FEED_COLUMNS.split(','))
+
+    def _search_fts5(self, conn, terms: List[str], user_id: int, offset: int, limit: int):
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in ('title', 'description', 'tags'))
+        return fetch_entries(conn, f"""
+            SELECT {self._columns()} FROM learning_entries_fts
+            JOIN learning_entries le ON le.id = learning_entries_fts.rowid
+            WHERE learning_entries_fts MATCH ? AND (le.user_id = ? OR le.is_global = 1)
+            ORDER BY bm25(learning_entries_fts, {weights}), le.id DESC
+            LIMIT {int(limit)} OFFSET {int(offset)}
+        """, (match, user_id))
+
+    def _search_sqlserver(self, conn, terms: List[str], user_id: int, offset: int, limit: int):
+        condition = ' AND '.join(f'"{term}*"' for term in terms)
+        return fetch_entries(conn, f"""
+            SELECT {self._columns()} FROM CONTAINSTABLE(learning_entries, (title, description, tags), ?) ft
+            JOIN learning_entries le ON le.id = ft.[KEY]
+            WHERE le.user_id = ? OR le.is_global = 1
+            ORDER BY ft.RANK DESC, le.id DESC
+            OFFSET {int(offset)} ROWS FETCH NEXT {int(limit)} ROWS ONLY
+        """, (condition, user_id))
+
+    def _memory_index(self, conn) -> MemorySearchIndex:
+        version = get_versions([LEARNINGS], conn)[LEARNINGS]
+        index = self._memory
+        if index is not None and index.version == version:
+            return index
+        index = MemorySearchIndex(fetch_entries(conn, f"SELECT {FEED_COLUMNS} FROM learning_entries"), version)
+        with self._lock:
+            self._memory = index
+        logger.info(f"🔎 Learning search index rebuilt: {len(index.entries)} entries, "
+                    f"{len(index.tokens)} tokens (version {version})")
+        return index
+
+
+# Global search instance (one per worker process)
+learning_search = LearningSearch()
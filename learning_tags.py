@@ -0,0 +1,261 @@
+"""
+Learning Tags - AI Learning Tracker
+learning_entries.tags is a free-text comma list. Each entry's tags are kept
+normalized in learning_tags (one row per entry and tag), so "entries tagged X
+that this user can see" is a seek on (tag, owner_id) instead of a LIKE scan,
+and learning_tag_counts holds per-owner tag frequencies for tag clouds.
+Global entries belong to GLOBAL_OWNER, so a user sees owner IN (user, 0).
+Entries written before the index existed are backfilled by
+scripts/rebuild_learning_tags.py --if-empty (run by startup.sh before the
+workers start), not by the workers themselves.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_environment_manager import DatabaseEnvironmentManager
+from learning_feed import FEED_COLUMNS, Cursor, fetch_entries, learning_feed, order_column
+
+logger = logging.getLogger(__name__)
+
+# Owner of global entries' tags; user ids start at 1
+GLOBAL_OWNER = 0
+MAX_TAG_LENGTH = 100
+
+
+def parse_tags(text: Optional[str]) -> List[str]:
+    """Normalized (trimmed, single-spaced, lower-case) distinct tags of a comma-separated string"""
+    tags = []
+    for part in (text or '').split(','):
+        tag = ' '.join(part.split()).lower()[:MAX_TAG_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def inserted_id(conn, cursor) -> int:
+    """Id of the row just inserted through `cursor` (lastrowid, or @@IDENTITY on SQL Server)"""
+    row_id = getattr(cursor, 'lastrowid', None)
+    if row_id:
+        return int(row_id)
+    return int(conn.execute('SELECT @@IDENTITY').fetchone()[0])
+
+
+class LearningTagIndex:
+    """Maintains and queries the normalized tag rows and the tag frequency rollup"""
+
+    def __init__(self):
+        self._tables_ready = False
+        self._azure = False
+
+    def _ready(self):
+        if self._tables_ready:
+            return
+        db = DatabaseEnvironmentManager()
+        db.connect()
+        try:
+            db.ensure_tables('learning_tags', 'learning_tag_counts')
+            self._azure = db.is_azure_sql()
+            if self._needs_backfill(db.connection):
+                logger.warning("⚠️ learning_tags is empty but entries have tags - "
+                               "run scripts/rebuild_learning_tags.py --if-empty")
+        finally:
+            db.disconnect()
+        self._tables_ready = True
+
+    @staticmethod
+    def _needs_backfill(conn) -> bool:
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM learning_tags')
+        indexed = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM learning_entries WHERE tags IS NOT NULL AND tags <> ''")
+        return not indexed and bool(cursor.fetchone()[0])
+
+    def backfill_if_empty(self, conn=None) -> Optional[Dict[str, int]]:
+        """
+        Rebuild the index only when it is empty while entries have tags
+        (first deploy of the index); returns the rebuild counts, or None when
+        nothing was done. Same transaction rules as rebuild().
+        """
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            try:
+                db.ensure_tables('learning_tags', 'learning_tag_counts')
+                result = self.backfill_if_empty(db.connection)
+                db.connection.commit()
+                return result
+            finally:
+                db.disconnect()
+        if not self._needs_backfill(conn):
+            return None
+        return self.rebuild(conn)
+
+    def rebuild(self, conn=None) -> Dict[str, int]:
+        """
+        Recreate learning_tags and learning_tag_counts from learning_entries
+        Runs in the given connection's transaction (the caller commits);
+        without one, a connection is opened and committed.
+        """
+        if conn is None:
+            self._ready()
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            try:
+                result = self.rebuild(db.connection)
+                db.connection.commit()
+                return result
+            finally:
+                db.disconnect()
+
+        entries = conn.execute("SELECT id, user_id, is_global, tags FROM learning_entries "
+                               "WHERE tags IS NOT NULL AND tags <> ''").fetchall()
+        tag_rows, counts = [], {}
+        for entry in entries:
+            owner = GLOBAL_OWNER if entry[2] else entry[1]
+            for tag in parse_tags(entry[3]):
+                tag_rows.append((entry[0], owner, tag))
+                counts[(owner, tag)] = counts.get((owner, tag), 0) + 1
+
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM learning_tags')
+        cursor.execute('DELETE FROM learning_tag_counts')
+        if tag_rows:
+            cursor.executemany('INSERT INTO learning_tags (entry_id, owner_id, tag) VALUES (?, ?, ?)', tag_rows)
+            cursor.executemany('INSERT INTO learning_tag_counts (owner_id, tag, entries) VALUES (?, ?, ?)',
+                               [(owner, tag, count) for (owner, tag), count in counts.items()])
+        logger.info(f"🏷️ Learning tags rebuilt: {len(tag_rows)} tags on {len(entries)} entries, "
+                    f"{len(counts)} distinct per owner")
+        return {'entries': len(entries), 'tags': len(tag_rows), 'counts': len(counts)}
+
+    def sync_entry(self, conn, entry_id: int):
+        """
+        Bring one entry's tag rows and counts in line with learning_entries and commit
+        Call after the entry insert or update has been committed; an entry
+        that no longer exists loses its tags.
+        """
+        self._ready()
+        entry = conn.execute('SELECT user_id, is_global, tags FROM learning_entries WHERE id = ?',
+                             (entry_id,)).fetchone()
+        current = conn.execute('SELECT owner_id, tag FROM learning_tags WHERE entry_id = ?',
+                               (entry_id,)).fetchall()
+        old_owner = current[0][0] if current else None
+        old_tags = {row[1] for row in current}
+        new_owner = (GLOBAL_OWNER if entry[1] else entry[0]) if entry else None
+        new_tags = parse_tags(entry[2]) if entry else []
+
+        if old_owner is not None and old_owner != new_owner:
+            removed, added = old_tags, new_tags
+        else:
+            removed, added = old_tags - set(new_tags), [tag for tag in new_tags if tag not in old_tags]
+        if not removed and not added:
+            return
+
+        try:
+            for tag in removed:
+                conn.execute('DELETE FROM learning_tags WHERE entry_id = ? AND tag = ?', (entry_id, tag))
+            for tag in added:
+                conn.execute('INSERT INTO learning_tags (entry_id, owner_id, tag) VALUES (?, ?, ?)',
+                             (entry_id, new_owner, tag))
+            deltas = {(old_owner, tag): -1 for tag in removed}
+            deltas.update({(new_owner, tag): deltas.get((new_owner, tag), 0) + 1 for tag in added})
+            self._adjust_counts(conn, deltas)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def remove_entry(self, conn, entry_id: int):
+        """Drop one entry's tags from the index; call before deleting the entry, the caller commits"""
+        self._remove(conn, 'entry_id = ?', (entry_id,))
+
+    def remove_user(self, conn, user_id: int):
+        """Drop the tags of every entry a user wrote; call before deleting them, the caller commits"""
+        self._remove(conn, 'entry_id IN (SELECT id FROM learning_entries WHERE user_id = ?)', (user_id,))
+
+    def _remove(self, conn, where: str, params: tuple):
+        self._ready()
+        rows = conn.execute(f'SELECT owner_id, tag, COUNT(*) FROM learning_tags WHERE {where} GROUP BY owner_id, tag',
+                            params).fetchall()
+        if rows:
+            conn.execute(f'DELETE FROM learning_tags WHERE {where}', params)
+            self._adjust_counts(conn, {(row[0], row[1]): -row[2] for row in rows})
+
+    @staticmethod
+    def _adjust_counts(conn, deltas: Dict[Tuple[int, str], int]):
+        for (owner, tag), delta in deltas.items():
+            if not delta:
+                continue
+            updated = conn.execute('UPDATE learning_tag_counts SET entries = entries + ? WHERE owner_id = ? AND tag = ?',
+                                   (delta, owner, tag)).rowcount
+            if not updated and delta > 0:
+                conn.execute('INSERT INTO learning_tag_counts (owner_id, tag, entries) VALUES (?, ?, ?)',
+                             (owner, tag, delta))
+        if any(delta < 0 for delta in deltas.values()):
+            owners = sorted({owner for (owner, _), delta in deltas.items() if delta < 0})
+            conn.execute(f"DELETE FROM learning_tag_counts WHERE entries <= 0 AND owner_id IN "
+                         f"({', '.join('?' for _ in owners)})", owners)
+
+    def tagged_page(self, user_id: int, tag: str, cursor: Optional[Cursor] = None, per_page: int = None,
+                    conn=None) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        """
+        One page of the entries the user can see carrying `tag`, newest first,
+        plus the cursor of the next page (same keyset as the learnings feed)
+        """
+        self._ready()
+        per_page = per_page or learning_feed.per_page
+        tags = parse_tags(tag)
+        if not tags:
+            return [], None
+        db = None
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            conn = db.connection
+        try:
+            order = f'le.{order_column(self._azure)}'
+            columns = ', '.join(f'le.{column.strip()}' for column in FEED_COLUMNS.split(','))
+            columns += f', {order} AS feed_sort'
+            keyset = f" AND {order} <= ? AND ({order} < ? OR le.id < ?)" if cursor else ''
+            top = f'TOP ({per_page + 1}) ' if self._azure else ''
+            limit = '' if self._azure else f' LIMIT {per_page + 1}'
+            params = [tags[0], user_id, GLOBAL_OWNER] + ([cursor[0], cursor[0], int(cursor[1])] if cursor else [])
+            entries = fetch_entries(conn, f"""
+                SELECT {top}{columns} FROM learning_tags lt
+                JOIN learning_entries le ON le.id = lt.entry_id
+                WHERE lt.tag = ? AND lt.owner_id IN (?, ?){keyset}
+                ORDER BY {order} DESC, le.id DESC{limit}
+            """, params)
+        finally:
+            if db is not None:
+                db.disconnect()
+
+        if len(entries) > per_page:
+            entries = entries[:per_page]
+            return entries, (entries[-1]['feed_sort'], entries[-1]['id'])
+        return entries, None
+
+    def tag_counts(self, user_id: int, limit: int = 30, conn=None) -> List[Tuple[str, int]]:
+        """The most used tags across the user's own and global entries, with their entry counts"""
+        self._ready()
+        db = None
+        if conn is None:
+            db = DatabaseEnvironmentManager()
+            db.connect()
+            conn = db.connection
+        try:
+            top = f'TOP ({int(limit)}) ' if self._azure else ''
+            rows = conn.execute(f"""
+                SELECT {top}tag, SUM(entries) AS entries FROM learning_tag_counts
+                WHERE owner_id IN (?, ?)
+                GROUP BY tag
+                ORDER BY SUM(entries) DESC, tag{'' if self._azure else f' LIMIT {int(limit)}'}
+            """, (user_id, GLOBAL_OWNER)).fetchall()
+        finally:
+            if db is not None:
+                db.disconnect()
+        return [(row[0], int(row[1])) for row in rows]
+
+
+# Global tag index instance
+tag_index = LearningTagIndex()
@@ -1,6 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, g
 import sqlite3
 from datetime import datetime
+from cache_versions import bump_version, learning_keys
+from learning_feed import learning_feed
+from learning_search import learning_search
+from learning_tags import inserted_id, tag_index
 
 learnings_bp = Blueprint('learnings', __name__)
 
@@ -27,17 +31,30 @@ def index():
     user_id = user['id']
     conn = get_db_connection()
     
-    # Get user's own entries + global entries
-    entries = conn.execute('''
-        SELECT *, 
-               CASE WHEN is_global = 1 THEN 'Global' ELSE 'Personal' END as entry_type
-        FROM learning_entries 
-        WHERE user_id = ? OR is_global = 1
-        ORDER BY date_added DESC
-    ''', (user_id,)).fetchall()
-    conn.close()
-    
-    return render_template('learnings/index.html', entries=entries)
+    # Keyset cursor: the (date_added, id) of the last entry on the previous page
+    before = request.args.get('before')
+    before_id = request.args.get('before_id', type=int)
+    cursor = (before, before_id) if before and before_id is not None else None
+    
+    # Get user's own entries + global entries, one page at a time, optionally for one tag or search
+    tag = request.args.get('tag', '').strip()
+    search_query = request.args.get('q', '').strip()
+    search_page = request.args.get('page', 1, type=int)
+    next_cursor, has_more_results = None, False
+    try:
+        if search_query:
+            entries, has_more_results = learning_search.search(user_id, search_query, search_page, conn=conn)
+        elif tag:
+            entries, next_cursor = tag_index.tagged_page(user_id, tag, cursor, conn=conn)
+        else:
+            entries, next_cursor = learning_feed.page(user_id, cursor, conn=conn)
+        tag_cloud = tag_index.tag_counts(user_id, conn=conn)
+    finally:
+        conn.close()
+    
+    return render_template('learnings/index.html', entries=entries, next_cursor=next_cursor,
+                           active_tag=tag, tag_cloud=tag_cloud, search_query=search_query,
+                           search_page=search_page, has_more_results=has_more_results)
 
 @learnings_bp.route('/learnings/add', methods=['GET', 'POST'])
 def add():
@@ -73,11 +90,13 @@ def add():
         
         if title:
             conn = get_db_connection()
-            conn.execute('''
+            cursor = conn.execute('''
                 INSERT INTO learning_entries (user_id, title, description, tags, custom_date, is_global)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (user_id, title, description, tags, custom_date, is_global))
             conn.commit()
+            tag_index.sync_entry(conn, inserted_id(conn, cursor))
+            bump_version(*learning_keys(is_global), conn=conn)
             conn.close()
             
             if is_global:
@@ -121,6 +140,8 @@ def edit(entry_id):
                 WHERE id = ? AND user_id = ?
             ''', (title, description, tags, entry_id, user_id))
             conn.commit()
+            tag_index.sync_entry(conn, entry_id)
+            bump_version(*learning_keys(entry['is_global']), conn=conn)
             conn.close()
             
             flash('Learning entry updated successfully!', 'success')
@@ -140,6 +161,11 @@ def delete(entry_id):
     user_id = user['id']
     conn = get_db_connection()
     
+    entry = conn.execute('SELECT is_global FROM learning_entries WHERE id = ? AND user_id = ?',
+                         (entry_id, user_id)).fetchone()
+    if entry:
+        tag_index.remove_entry(conn, entry_id)
+    
     # Verify ownership before deletion
     result = conn.execute('''
         DELETE FROM learning_entries 
@@ -152,6 +178,8 @@ def delete(entry_id):
         flash('Entry not found or access denied', 'error')
     
     conn.commit()
+    if entry:
+        bump_version(*learning_keys(entry['is_global']), conn=conn)
     conn.close()
     
     return redirect(url_for('learnings.index'))
@@ -47,9 +47,10 @@ try:
         # Continue - app will handle initialization
     
     # Import the Flask app
-    from app import app
+    from app import app, start_background_services
     
     logger.info("App imported successfully")
+    start_background_services()
     
     # Configure for production
     app.config['DEBUG'] = False
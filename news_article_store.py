@@ -0,0 +1,223 @@
+"""
+News Article Store - Indexed history of fetched AI news articles
+Articles are kept in the app database keyed by article id, merged incrementally
+on every fetch, and read back by index for the weekly digest. The JSON digest
+is rewritten only when its content changes.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from database_environment_manager import DatabaseEnvironmentManager
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_COLUMNS = ('article_id', 'title', 'link', 'description', 'source', 'author',
+                   'priority', 'score', 'published_ts', 'published_str', 'fetched_at')
+
+# Keeps IN (...) lists well under the SQL Server parameter limit
+ID_CHUNK_SIZE = 500
+
+
+def article_content_hash(article: Dict[str, Any]) -> str:
+    """Hash of the stored fields; an unchanged hash means the row needs no write"""
+    values = [article.get(field) for field in
+              ('title', 'link', 'description', 'source', 'author', 'priority', 'score', 'published_ts')]
+    return hashlib.sha1(json.dumps(values, default=str).encode('utf-8')).hexdigest()
+
+
+def _row_to_article(columns: List[str], row) -> Dict[str, Any]:
+    """Stored row in the article dict shape the fetcher and digest use"""
+    article = dict(zip(columns, row))
+    article['id'] = article.pop('article_id')
+    return article
+
+
+class NewsArticleStore:
+    """Manages the indexed news article history and the JSON digest derived from it"""
+
+    def __init__(self):
+        self.retention_days = int(os.getenv('NEWS_RETENTION_DAYS', '0'))  # 0 keeps everything
+        self.trim_batch_size = int(os.getenv('NEWS_TRIM_BATCH_SIZE', '1000'))
+        self._tables_ready = False
+
+    def _connect(self) -> DatabaseEnvironmentManager:
+        db = DatabaseEnvironmentManager()
+        db.connect()
+        if not self._tables_ready:
+            db.ensure_tables('news_articles')
+            self._tables_ready = True
+        return db
+
+    def _select(self, db: DatabaseEnvironmentManager, where: str, params: tuple,
+                order_by: str = None, limit: int = None) -> List[Dict[str, Any]]:
+        columns = ', '.join(ARTICLE_COLUMNS)
+        top = f"TOP {int(limit)} " if limit and db.is_azure_sql() else ''
+        sql = f"SELECT {top}{columns} FROM news_articles WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit and not db.is_azure_sql():
+            sql += f" LIMIT {int(limit)}"
+        cursor = db.connection.cursor()
+        cursor.execute(sql, params)
+        return [_row_to_article(list(ARTICLE_COLUMNS), row) for row in cursor.fetchall()]
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Merge fetched articles into the store
+        New ids are inserted and changed ones updated; unchanged articles cost
+        only their share of one batched id lookup.
+        """
+        batch = {}
+        for article in articles:
+            batch.setdefault(article['id'], article)
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not batch:
+            return counts
+
+        db = self._connect()
+        try:
+            cursor = db.connection.cursor()
+            ids = list(batch)
+            existing = {}
+            for start in range(0, len(ids), ID_CHUNK_SIZE):
+                chunk = ids[start:start + ID_CHUNK_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor.execute(f"SELECT article_id, content_hash FROM news_articles "
+                               f"WHERE article_id IN ({placeholders})", chunk)
+                existing.update(cursor.fetchall())
+
+            now = datetime.now().isoformat()
+            inserts, updates = [], []
+            for article_id, article in batch.items():
+                digest = article_content_hash(article)
+                if existing.get(article_id) == digest:
+                    counts['unchanged'] += 1
+                    continue
+                values = (article['title'][:300], article['link'], article.get('description'),
+                          article.get('source'), article.get('author'), article.get('priority', 5),
+                          article.get('score') or 0, article.get('published_ts'),
+                          article.get('published_str'), digest)
+                if article_id in existing:
+                    updates.append(values + (now, article_id))
+                else:
+                    inserts.append((article_id,) + values + (article.get('fetched_at') or now, now))
+
+            if inserts:
+                cursor.executemany('''
+                    INSERT INTO news_articles
+                        (article_id, title, link, description, source, author, priority, score,
+                         published_ts, published_str, content_hash, fetched_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', inserts)
+            if updates:
+                cursor.executemany('''
+                    UPDATE news_articles
+                    SET title = ?, link = ?, description = ?, source = ?, author = ?, priority = ?,
+                        score = ?, published_ts = ?, published_str = ?, content_hash = ?, updated_at = ?
+                    WHERE article_id = ?
+                ''', updates)
+            db.connection.commit()
+            counts['inserted'], counts['updated'] = len(inserts), len(updates)
+        finally:
+            db.disconnect()
+
+        logger.info(f"🗄️ Article store: {counts['inserted']} new, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged")
+        return counts
+
+    def top_articles(self, limit: Optional[int] = 10, days: int = 7) -> List[Dict[str, Any]]:
+        """Highest scoring recent articles: score, then priority, then newest first (limit None: all)"""
+        db = self._connect()
+        try:
+            return self._select(db, "published_ts >= ?", (time.time() - days * 86400,),
+                                order_by="score DESC, priority ASC, published_ts DESC", limit=limit)
+        finally:
+            db.disconnect()
+
+    def recent_by_source(self, source: str, days: int = 7) -> List[Dict[str, Any]]:
+        """A source's articles from the last `days` days, newest first"""
+        db = self._connect()
+        try:
+            return self._select(db, "source = ? AND published_ts >= ?",
+                                (source, time.time() - days * 86400), order_by="published_ts DESC")
+        finally:
+            db.disconnect()
+
+    def count_articles(self) -> int:
+        db = self._connect()
+        try:
+            cursor = db.connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM news_articles")
+            return cursor.fetchone()[0]
+        finally:
+            db.disconnect()
+
+    def trim_expired(self, retention_days: int = None) -> int:
+        """
+        Delete articles published more than retention_days ago, in bounded batches
+        Returns the number of articles removed; a retention of 0 removes nothing.
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        if retention_days <= 0:
+            return 0
+
+        cutoff = time.time() - retention_days * 86400
+        limit = int(self.trim_batch_size)
+        removed = 0
+        db = self._connect()
+        try:
+            cursor = db.connection.cursor()
+            while True:
+                if db.is_azure_sql():
+                    cursor.execute(f"DELETE TOP ({limit}) FROM news_articles WHERE published_ts < ?", (cutoff,))
+                else:
+                    cursor.execute(f"""
+                        DELETE FROM news_articles WHERE id IN (
+                            SELECT id FROM news_articles WHERE published_ts < ? LIMIT {limit}
+                        )
+                    """, (cutoff,))
+                deleted = cursor.rowcount
+                db.connection.commit()
+                removed += max(deleted, 0)
+                if deleted < limit:
+                    break
+        finally:
+            db.disconnect()
+
+        logger.info(f"🧹 Trimmed {removed} articles older than {retention_days} days")
+        return removed
+
+    def write_digest(self, path: str, articles: List[Dict[str, Any]]) -> bool:
+        """
+        Write the JSON digest for the given articles if its content changed
+        Returns True when the file was rewritten.
+        """
+        version = hashlib.sha1(json.dumps(
+            [(a['id'], article_content_hash(a)) for a in articles], default=str
+        ).encode('utf-8')).hexdigest()
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if json.load(f).get('digest_version') == version:
+                        return False
+            except (OSError, ValueError):
+                pass  # unreadable digest: regenerate it
+
+        storage_data = {
+            'last_updated': datetime.now().isoformat(),
+            'digest_version': version,
+            'article_count': len(articles),
+            'articles': articles
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(storage_data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return True
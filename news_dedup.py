@@ -0,0 +1,156 @@
+"""
+News Near-Duplicate Clustering - AI Learning Tracker
+Groups articles that report the same story under different titles and links.
+MinHash signatures over title/description tokens are bucketed with LSH banding,
+so only articles sharing a band are compared and clustering stays roughly
+linear in the number of articles. Each cluster keeps one representative.
+"""
+
+import os
+import re
+import zlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9\-\.]*[a-z0-9]|[a-z0-9]')
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the this to was were
+    will with new today says said how why what after about into over more than their they our we
+""".split())
+
+# Description characters used alongside the title (leads repeat the headline facts)
+DESCRIPTION_CHARS = 300
+
+# Articles are hashed in chunks to bound the (tokens x permutations) work array
+SIGNATURE_CHUNK = 2000
+
+
+def article_tokens(article: Dict[str, Any]) -> List[str]:
+    """Distinct content words of an article's title and description lead"""
+    text = f"{article.get('title', '')} {(article.get('description') or '')[:DESCRIPTION_CHARS]}".lower()
+    return sorted({token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS})
+
+
+class NearDuplicateClusterer:
+    """MinHash + LSH clustering of near-duplicate articles"""
+
+    def __init__(self, num_perm: int = None, bands: int = None, threshold: float = None, seed: int = 7):
+        self.num_perm = num_perm or int(os.environ.get('NEWS_MINHASH_PERMUTATIONS', 128))
+        self.bands = bands or int(os.environ.get('NEWS_LSH_BANDS', 32))
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.rows = self.num_perm // self.bands
+        self.threshold = threshold if threshold is not None else \
+            float(os.environ.get('NEWS_DUPLICATE_THRESHOLD', 0.5))
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, wrapping uint64 arithmetic
+        self.multipliers = (rng.integers(1, 2 ** 63, self.num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self.offsets = rng.integers(0, 2 ** 63, self.num_perm, dtype=np.uint64)
+        self.band_mixers = rng.integers(1, 2 ** 63, self.rows, dtype=np.uint64) | np.uint64(1)
+
+    def signatures(self, token_lists: List[List[str]]) -> np.ndarray:
+        """MinHash signature matrix (articles x permutations); empty articles get all-max rows"""
+        signatures = np.full((len(token_lists), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, len(token_lists), SIGNATURE_CHUNK):
+            chunk = token_lists[start:start + SIGNATURE_CHUNK]
+            lengths = np.fromiter((len(tokens) for tokens in chunk), dtype=np.int64, count=len(chunk))
+            present = np.flatnonzero(lengths)
+            if not len(present):
+                continue
+            hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for tokens in chunk for token in tokens),
+                                 dtype=np.uint64, count=int(lengths.sum()))
+            # Permutations x tokens, so each article's tokens are a contiguous run per row
+            with np.errstate(over='ignore'):
+                permuted = ((self.multipliers[:, None] * hashes + self.offsets[:, None])
+                            >> np.uint64(32)).astype(np.uint32)
+            bounds = np.concatenate(([0], np.cumsum(lengths)[:-1]))[present]
+            signatures[start + present] = np.minimum.reduceat(permuted, bounds, axis=1).T
+        return signatures
+
+    def candidate_pairs(self, signatures: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """
+        Index pairs sharing at least one LSH band
+        Each bucket contributes (first member, other member) pairs, so the work
+        per band is linear in the number of articles.
+        """
+        pairs = []
+        candidates = np.flatnonzero(valid)
+        for band in range(self.bands):
+            block = signatures[candidates, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+            with np.errstate(over='ignore'):
+                keys = (block * self.band_mixers).sum(axis=1, dtype=np.uint64) ^ np.uint64(band)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+            group_of = np.repeat(starts, np.diff(np.concatenate((starts, [len(order)]))))
+            others = np.flatnonzero(group_of != np.arange(len(order)))
+            if len(others):
+                pairs.append(np.stack((candidates[order[group_of[others]]], candidates[order[others]]), axis=1))
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(pairs), axis=0)
+
+    def cluster(self, articles: List[Dict[str, Any]]) -> List[List[int]]:
+        """Clusters as lists of article indexes (singletons included), in first-seen order"""
+        if not articles:
+            return []
+        token_lists = [article_tokens(article) for article in articles]
+        signatures = self.signatures(token_lists)
+        valid = np.fromiter((bool(tokens) for tokens in token_lists), dtype=bool, count=len(token_lists))
+        pairs = self.candidate_pairs(signatures, valid)
+
+        if len(pairs):
+            agreement = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+            pairs = pairs[agreement >= self.threshold]
+
+        parent = list(range(len(articles)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for a, b in pairs.tolist():
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        clusters: Dict[int, List[int]] = {}
+        for index in range(len(articles)):
+            clusters.setdefault(find(index), []).append(index)
+        return list(clusters.values())
+
+
+def collapse_near_duplicates(articles: List[Dict[str, Any]],
+                             preference: Callable[[Dict[str, Any]], Tuple] = None,
+                             clusterer: Optional[NearDuplicateClusterer] = None) -> List[Dict[str, Any]]:
+    """
+    One representative per story: the article with the smallest preference key
+    (by default highest priority, then highest score). The representative is
+    annotated with the other sources that carried the story.
+    """
+    if preference is None:
+        preference = lambda a: (a.get('priority', 5), -(a.get('score') or 0))
+    clusterer = clusterer or NearDuplicateClusterer()
+
+    representatives = []
+    for members in clusterer.cluster(articles):
+        best = min(members, key=lambda i: preference(articles[i]))
+        representative = articles[best]
+        if len(members) > 1:
+            representative = dict(representative)
+            representative['duplicate_count'] = len(members) - 1
+            representative['also_reported_by'] = sorted({articles[i].get('source') for i in members
+                                                         if i != best and articles[i].get('source')})
+        representatives.append(representative)
+
+    if len(representatives) < len(articles):
+        logger.info(f"🧬 Collapsed {len(articles)} articles into {len(representatives)} stories")
+    return representatives
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Scheduled Course Catalog Sync
+Runs the incremental course sync outside the web app (e.g. hourly from cron).
+Sources whose listing is unchanged cost one conditional request and one state read.
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Add the current directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from course_sources import enabled_sources
+from fast_course_fetcher import fetcher
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point for the sync script"""
+    parser = argparse.ArgumentParser(description='Incrementally sync the course catalog from all sources')
+    parser.add_argument('--source', action='append', default=None,
+                        help='Only sync this source (repeatable; default: all enabled sources)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore stored cursors and ETags and re-read every source')
+    args = parser.parse_args()
+
+    sources = enabled_sources(args.source)
+    if not sources:
+        logger.error("❌ No matching course sources are enabled")
+        return 1
+
+    result = fetcher.fetch_and_store(sources, full_sync=args.full)
+    for name, stats in result['sources'].items():
+        state = 'not modified' if stats['not_modified'] else stats['status']
+        logger.info(f"📚 {name}: {state}, {stats['added']} added, {stats['updated']} updated, "
+                    f"{stats['unchanged']} unchanged in {stats['seconds']}s")
+    logger.info(f"✅ Sync complete in {result['total_time']}s")
+    return 0 if all(s['status'] != 'error' for s in result['sources'].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,10 @@ Scheduled task to automatically purge old upload reports and maintain database s
 import os
 import sys
 import logging
+import json
 import argparse
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Optional
 
 # Add the current directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -33,13 +34,18 @@ class AutomatedPurgeManager:
     def __init__(self):
         self.reports_manager = UploadReportsManager()
     
-    def purge_reports(self, days_to_keep: int = 90, dry_run: bool = False) -> Dict[str, int]:
+    def purge_reports(self, days_to_keep: int = 90, dry_run: bool = False,
+                      batch_size: int = None, time_budget_seconds: float = None,
+                      state_file: str = None) -> Dict:
         """
         Purge old upload reports
         
         Args:
             days_to_keep: Number of days of reports to retain
-            dry_run: If True, only count what would be purged without deleting
+            dry_run: If True, walk the same batches and count what would be purged
+            batch_size: Reports per batch (defaults to PURGE_BATCH_SIZE)
+            time_budget_seconds: Stop after this many seconds; rerun to resume
+            state_file: JSON file holding the checkpoint of an unfinished run
         
         Returns:
             Dictionary with purge statistics
@@ -47,49 +53,29 @@ class AutomatedPurgeManager:
         logger.info(f"🧹 Starting {'DRY RUN' if dry_run else 'LIVE'} purge of reports older than {days_to_keep} days")
         
         try:
+            resume_from = None if dry_run else self._load_checkpoint(state_file)
+            if resume_from:
+                logger.info(f"↩️ Resuming purge from report id {resume_from['after_id']} (cutoff {resume_from['cutoff']})")
+            
+            result = self.reports_manager.purge_old_reports(
+                days_to_keep,
+                dry_run=dry_run,
+                batch_size=batch_size,
+                time_budget_seconds=time_budget_seconds,
+                resume_from=resume_from,
+                checkpoint_callback=lambda checkpoint: self._save_checkpoint(state_file, checkpoint)
+            )
+            
+            if not dry_run:
+                # Finished runs clear their state; unfinished ones leave the latest checkpoint
+                self._save_checkpoint(state_file, result['checkpoint'])
+            
             if dry_run:
-                # Count what would be purged
-                cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-                
-                # Get counts without deleting
-                from database_environment_manager import DatabaseEnvironmentManager
-                db_manager = DatabaseEnvironmentManager()
-                db_manager.connect()
-                cursor = db_manager.connection.cursor()
-                
-                # Count reports
-                cursor.execute("""
-                    SELECT COUNT(*) FROM excel_upload_reports 
-                    WHERE upload_timestamp < ?
-                """, (cutoff_date,))
-                reports_count = cursor.fetchone()[0]
-                
-                # Count details
-                cursor.execute("""
-                    SELECT COUNT(*) FROM excel_upload_row_details 
-                    WHERE report_id IN (
-                        SELECT id FROM excel_upload_reports 
-                        WHERE upload_timestamp < ?
-                    )
-                """, (cutoff_date,))
-                details_count = cursor.fetchone()[0]
-                
-                db_manager.disconnect()
-                
-                result = {
-                    'reports_purged': reports_count,
-                    'details_purged': details_count,
-                    'dry_run': True
-                }
-                
-                logger.info(f"📊 DRY RUN: Would purge {reports_count} reports and {details_count} details")
-                
+                logger.info(f"📊 DRY RUN: Would purge {result['reports_purged']} reports and {result['details_purged']} details "
+                            f"({result['rows_per_second']} rows/sec scanned)")
             else:
-                # Perform actual purge
-                result = self.reports_manager.purge_old_reports(days_to_keep)
-                result['dry_run'] = False
-                
-                logger.info(f"✅ LIVE PURGE: Purged {result['reports_purged']} reports and {result['details_purged']} details")
+                logger.info(f"✅ LIVE PURGE: Purged {result['reports_purged']} reports and {result['details_purged']} details "
+                            f"({result['rows_per_second']} rows/sec)")
             
             return result
             
@@ -97,6 +83,26 @@ class AutomatedPurgeManager:
             logger.error(f"❌ Error during purge operation: {e}")
             raise
     
+    def _load_checkpoint(self, state_file: str) -> Optional[Dict]:
+        """Read the checkpoint left by an unfinished purge run"""
+        if not state_file or not os.path.exists(state_file):
+            return None
+        with open(state_file) as f:
+            return json.load(f) or None
+    
+    def _save_checkpoint(self, state_file: str, checkpoint: Optional[Dict]):
+        """Persist (or clear, when None) the purge checkpoint"""
+        if not state_file:
+            return
+        if checkpoint is None:
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            return
+        tmp_path = f"{state_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, state_file)
+    
     def get_purge_recommendations(self) -> Dict:
         """
         Analyze the upload reports and provide purging recommendations
@@ -182,6 +188,12 @@ def main():
                        help='Number of days of reports to keep (default: 90)')
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be purged without actually deleting')
+    parser.add_argument('--batch-size', type=int, default=None,
+                       help='Reports deleted per batch (default: PURGE_BATCH_SIZE or 200)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                       help='Stop after this many seconds; rerun to resume (default: no limit)')
+    parser.add_argument('--state-file', default=None,
+                       help='Checkpoint file used to resume an unfinished purge')
     parser.add_argument('--recommendations', action='store_true',
                        help='Show purging recommendations based on current data')
     parser.add_argument('--quiet', action='store_true',
@@ -233,7 +245,10 @@ def main():
             
             result = purge_manager.purge_reports(
                 days_to_keep=args.days,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                batch_size=args.batch_size,
+                time_budget_seconds=args.time_budget,
+                state_file=args.state_file
             )
             
             # Log results
@@ -241,6 +256,8 @@ def main():
                 logger.info(f"📊 DRY RUN completed: Would purge {result['reports_purged']} reports, {result['details_purged']} details")
             else:
                 logger.info(f"✅ Purge completed: Removed {result['reports_purged']} reports, {result['details_purged']} details")
+            if not result['complete']:
+                logger.info("⏸️ Time budget reached before all expired reports were processed - run again to continue")
         
         return 0
         
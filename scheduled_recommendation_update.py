@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Scheduled Recommendation Update
+Refreshes the course neighbour lists outside the web app (e.g. nightly from cron):
+content similarity for new courses and co-completion scores for new completions.
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Add the current directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from course_recommender import recommender
+from course_cofiltering import collaborative
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point for the update script"""
+    parser = argparse.ArgumentParser(description='Refresh course recommendation neighbour lists')
+    parser.add_argument('--model', choices=('content', 'collaborative'), action='append', default=None,
+                        help='Only update this model (repeatable; default: both)')
+    parser.add_argument('--full', action='store_true',
+                        help='Recompute every neighbour list instead of folding in changes')
+    args = parser.parse_args()
+
+    builders = {'content': recommender, 'collaborative': collaborative}
+    for name in args.model or builders:
+        result = builders[name].update_index(full=args.full)
+        logger.info(f"✅ {name}: {result['mode']} update, {result['lists_written']} lists written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Scheduled URL Revalidation
+Rechecks the course URLs that are due outside the web app (e.g. hourly from cron).
+Each run checks at most the budgeted number of URLs, failing ones first, with
+conditional requests; healthy URLs are not due again for days.
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Add the current directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from course_validator import validator
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point for the revalidation script"""
+    parser = argparse.ArgumentParser(description='Recheck the course URLs that are due for revalidation')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Most URLs to check this run (default: URL_REVALIDATION_BUDGET)')
+    args = parser.parse_args()
+
+    summary = validator.revalidate_due_urls(budget=args.budget)
+    logger.info(f"✅ {summary['working']} working, {summary['not_working']} not working, "
+                f"{summary['broken']} broken of {summary['checked']} checked")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Rebuild the Learning Tag Index
+Recreate learning_tags and learning_tag_counts from learning_entries.tags,
+e.g. after entries were edited directly in the database.
+
+With --if-empty it only fills an empty index (the migration for databases
+created before the index existed); startup.sh runs it that way once before
+the gunicorn workers start.
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rebuild_learning_tags(if_empty: bool = False):
+    """Rebuild the tag index (or fill it when empty) and print what was indexed"""
+    load_dotenv()
+
+    from learning_tags import tag_index
+
+    print("🏷️ Rebuilding Learning Tag Index")
+    print("=" * 35)
+    result = tag_index.backfill_if_empty() if if_empty else tag_index.rebuild()
+    if result is None:
+        print("✅ Tag index already populated - nothing to do")
+        return
+    print(f"✅ {result['tags']} tags indexed on {result['entries']} entries "
+          f"({result['counts']} tag counts)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--if-empty', action='store_true',
+                        help='only fill the index when it is empty but entries have tags')
+    rebuild_learning_tags(parser.parse_args().if_empty)
@@ -62,7 +62,13 @@ except Exception as e:
 "
 }
 
+# One-off data migrations, run here once instead of racing in each worker
+echo "Backfilling learning tag index if needed..."
+python scripts/rebuild_learning_tags.py --if-empty || echo "WARNING: learning tag backfill failed"
+
 # Start the application with gunicorn
+# Sync workers: job event streams (/admin/jobs/<id>/events) hold a worker each, so they
+# end after JOB_EVENTS_MAX_SECONDS (default 25) and the browser reconnects
 echo "Starting gunicorn server..."
 echo "Command: gunicorn --bind 0.0.0.0:$PORT --workers 2 --timeout 300 --max-requests 1000 --max-requests-jitter 100 --access-logfile - --error-logfile - wsgi:application"
 
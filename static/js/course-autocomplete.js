@@ -0,0 +1,41 @@
+// Course search typeahead: fills a <datalist> from /api/courses/autocomplete
+// Attach by giving a search input data-autocomplete-url="{{ url_for('api_course_autocomplete') }}"
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('input[data-autocomplete-url]').forEach(function (input) {
+        const list = document.createElement('datalist');
+        list.id = input.id + 'Suggestions';
+        input.setAttribute('list', list.id);
+        input.setAttribute('autocomplete', 'off');
+        input.parentNode.appendChild(list);
+
+        let timer = null;
+        let controller = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (!query) {
+                list.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(function () {
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                const url = input.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query);
+                fetch(url, { signal: controller.signal, credentials: 'same-origin' })
+                    .then(function (response) { return response.json(); })
+                    .then(function (data) {
+                        list.innerHTML = '';
+                        (data.suggestions || []).forEach(function (suggestion) {
+                            const option = document.createElement('option');
+                            option.value = suggestion.value;
+                            option.label = suggestion.type === 'title' ? suggestion.value : suggestion.type;
+                            list.appendChild(option);
+                        });
+                    })
+                    .catch(function () { /* aborted or offline: keep the last suggestions */ });
+            }, 150);
+        });
+    });
+});
@@ -0,0 +1,227 @@
+"""
+Test cases for the AI news fetcher.
+Feeds are served by local stub hosts and state goes to a temporary SQLite database.
+"""
+
+import pytest
+import sys
+import os
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the Python path to import the fetcher
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('feedparser')
+
+from benchmark_url_validation import StubHost
+
+
+def rss(items):
+    """RSS document for (title, link, description, age_days) items"""
+    now = datetime.now(timezone.utc)
+    entries = ''.join(
+        f"<item><title>{title}</title><link>{link}</link><description>{description}</description>"
+        f"<pubDate>{format_datetime(now - timedelta(days=age))}</pubDate></item>"
+        for title, link, description, age in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'.encode()
+
+
+# One distinct AI story per stub feed
+STORIES = [
+    ('Machine learning model predicts protein folding', 'Researchers trained it on known structures'),
+    ('Deep learning speeds up weather forecasts', 'Forecast agencies adopt neural methods'),
+    ('Generative AI designs new chips', 'Chipmakers use it for layout'),
+]
+
+
+@pytest.fixture
+def news(tmp_path, local_db):
+    """Fetcher over three slow stub feeds with an isolated state database"""
+    from ai_news_fetcher import AINewsFetcher
+
+    hosts = []
+    for n, (title, description) in enumerate(STORIES):
+        body = rss([(title, f'https://news{n}.example/ml', description, 1),
+                    (f'Gardening tips {n}', f'https://news{n}.example/garden', 'Tomatoes', 1),
+                    (f'Old neural network story {n}', f'https://news{n}.example/old', '', 30)])
+        hosts.append(StubHost(f'feed{n}', delay=0.3, etag=f'"v{n}"', body=body).start())
+
+    fetcher = AINewsFetcher(storage_file=str(tmp_path / 'articles.json'))
+    fetcher.domain_interval = 0
+    fetcher.rss_sources = [{'name': host.name, 'url': f"{host.base_url}/feed", 'priority': 1}
+                           for host in hosts]
+    yield fetcher, hosts
+    for host in hosts:
+        host.stop()
+
+
+class TestConcurrentFeeds:
+    """Feeds are fetched side by side and unchanged feeds are not re-parsed"""
+
+    def test_run_takes_about_the_slowest_feed(self, news):
+        fetcher, hosts = news
+
+        start = time.perf_counter()
+        articles = fetcher.fetch_all_articles()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.8  # sequentially 3 x 0.3s plus the old fixed sleeps
+        assert sorted(a['title'] for a in articles) == sorted(title for title, _ in STORIES)
+        assert all(stats['status'] == 'ok' for stats in fetcher.last_run_stats.values())
+
+    def test_unchanged_feeds_answer_304_and_reuse_articles(self, news):
+        fetcher, hosts = news
+        first = fetcher.fetch_all_articles()
+
+        again = fetcher.fetch_all_articles()
+        assert [s['status'] for s in fetcher.last_run_stats.values()] == ['not_modified'] * 3
+        assert sorted(a['id'] for a in again) == sorted(a['id'] for a in first)
+        assert all(host.requests == 2 for host in hosts)
+
+    def test_per_domain_limit_serialises_feeds_on_one_host(self, news):
+        fetcher, hosts = news
+        shared = hosts[0]
+        fetcher.rss_sources = [{'name': f'shared{n}', 'url': f"{shared.base_url}/feed/{n}", 'priority': 2}
+                               for n in range(3)]
+
+        fetcher.fetch_all_articles()
+        assert shared.requests == 3
+        assert shared.max_active == 1
+
+
+class TestRelevance:
+    """Keywords match whole words only and produce weighted scores used for ranking"""
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        from ai_news_fetcher import AINewsFetcher
+        return AINewsFetcher(storage_file=str(tmp_path / 'articles.json'))
+
+    def test_short_keywords_match_whole_words_only(self, fetcher):
+        assert not fetcher._is_ai_relevant('Email training for maintainers', 'Detailed html guide')
+        assert fetcher._is_ai_relevant('New AI-powered search', '')
+        assert fetcher.matcher.matches('Generative  AI and LLMs') == {'generative ai', 'llms'}
+
+    def test_scores_weight_title_hits_and_custom_weights(self, fetcher):
+        from ai_news_fetcher import AINewsFetcher
+
+        assert fetcher._relevance_score('Deep learning', 'deep learning') == 6.0
+        assert fetcher._relevance_score('Robotics', 'a new algorithm') == 2.5
+
+        custom = AINewsFetcher(keyword_weights={'robotics': 5})
+        assert custom._relevance_score('Robotics', '') == 10.0
+
+    def test_ranking_uses_score_then_priority_then_recency(self, fetcher):
+        now = time.time()
+        articles = [
+            {'id': 'a', 'title': 'AI update', 'priority': 1, 'score': 4.0, 'published_ts': now, 'source': 's'},
+            {'id': 'b', 'title': 'LLM release', 'priority': 3, 'score': 6.0, 'published_ts': now - 9, 'source': 's'},
+            {'id': 'c', 'title': 'AI news', 'priority': 1, 'score': 4.0, 'published_ts': now - 5, 'source': 's'},
+            {'id': 'd', 'title': 'AI news', 'priority': 2, 'score': 4.0, 'published_ts': now, 'source': 's'},
+            {'id': 'a', 'title': 'AI update', 'priority': 1, 'score': 4.0, 'published_ts': now, 'source': 's'},
+            {'id': 'e', 'title': 'Machine learning', 'priority': 1, 'source': 's',
+             'published_str': 'Mon, 01 Jan 2024 10:00:00 GMT'},
+        ]
+        top = fetcher.select_top_articles(articles, limit=4)
+        assert [a['id'] for a in top] == ['e', 'b', 'a', 'c']
+
+
+class TestArticleStore:
+    """Articles are merged into an indexed table and the digest is written only on change"""
+
+    @pytest.fixture
+    def store(self, local_db):
+        from news_article_store import NewsArticleStore
+        return NewsArticleStore()
+
+    def article(self, n, age_days=1, score=3.0, **extra):
+        article = {'id': f'id{n}', 'title': f'Story {n}', 'link': f'https://news.example/{n}',
+                   'source': 'Feed', 'priority': 2, 'score': score,
+                   'published_ts': time.time() - age_days * 86400}
+        article.update(extra)
+        return article
+
+    def test_incremental_merge_and_weekly_top(self, store):
+        articles = [self.article(n, score=n) for n in range(5)] + [self.article(9, age_days=30, score=99)]
+        assert store.add_articles(articles) == {'inserted': 6, 'updated': 0, 'unchanged': 0}
+
+        articles[1] = dict(articles[1], score=10)
+        articles.append(articles[0])  # duplicate within the batch
+        assert store.add_articles(articles) == {'inserted': 0, 'updated': 1, 'unchanged': 5}
+
+        top = store.top_articles(limit=3, days=7)
+        assert [a['id'] for a in top] == ['id1', 'id4', 'id3']
+        assert store.count_articles() == 6
+
+    def test_trim_is_opt_in_and_batched(self, store):
+        store.add_articles([self.article(n, age_days=40 + n) for n in range(5)] + [self.article(99)])
+        assert store.trim_expired() == 0  # no retention configured
+
+        store.trim_batch_size = 2
+        assert store.trim_expired(retention_days=30) == 5
+        assert store.count_articles() == 1
+
+    def test_digest_is_rewritten_only_on_change(self, store, tmp_path):
+        path = str(tmp_path / 'digest.json')
+        articles = [self.article(n) for n in range(3)]
+        assert store.write_digest(path, articles) is True
+        assert store.write_digest(path, [dict(a) for a in articles]) is False
+        assert store.write_digest(path, articles[:2]) is True
+
+    def test_run_fetch_serves_unchanged_feeds_from_the_store(self, news):
+        fetcher, hosts = news
+        first = fetcher.run_fetch(limit=2)
+        assert first['success'] and len(first['articles']) == 2
+        digest_mtime = os.stat(fetcher.storage_file).st_mtime_ns
+
+        second = fetcher.run_fetch(limit=2)
+        assert [s['status'] for s in fetcher.last_run_stats.values()] == ['not_modified'] * 3
+        assert [a['id'] for a in second['articles']] == [a['id'] for a in first['articles']]
+        assert os.stat(fetcher.storage_file).st_mtime_ns == digest_mtime
+        assert fetcher.load_articles() is fetcher.load_articles()
+
+
+class TestNearDuplicates:
+    """The same story from several outlets collapses to its highest-priority report"""
+
+    SAME_STORY = [
+        ('OpenAI releases GPT-5 with improved reasoning',
+         'OpenAI today released GPT-5, its newest large language model with improved reasoning and coding skills.',
+         'TechCrunch AI', 3),
+        ('OpenAI launches GPT-5, promising better reasoning',
+         'OpenAI released GPT-5, the newest large language model, promising improved reasoning and coding skills.',
+         'VentureBeat AI', 2),
+        ('GPT-5 is here: OpenAI releases its newest model',
+         'OpenAI has released GPT-5, a large language model with improved reasoning and coding skills.',
+         'The Verge AI', 3),
+    ]
+
+    def articles(self):
+        articles = [{'id': f'gpt{n}', 'title': title, 'description': description, 'source': source,
+                     'priority': priority, 'score': 6.0, 'published_ts': time.time()}
+                    for n, (title, description, source, priority) in enumerate(self.SAME_STORY)]
+        articles.append({'id': 'robots', 'title': 'Google DeepMind unveils robotics foundation model',
+                         'description': 'Robots learn manipulation tasks from video.', 'source': 'MIT Technology Review - AI',
+                         'priority': 1, 'score': 3.0, 'published_ts': time.time()})
+        return articles
+
+    def test_outlets_reporting_one_story_collapse(self, tmp_path):
+        from ai_news_fetcher import AINewsFetcher
+
+        top = AINewsFetcher(storage_file=str(tmp_path / 'articles.json')).select_top_articles(self.articles())
+        assert [a['id'] for a in top] == ['gpt1', 'robots']
+        assert top[0]['also_reported_by'] == ['TechCrunch AI', 'The Verge AI']
+        assert 'duplicate_count' not in top[1]
+
+    def test_synthetic_corpus_clusters_cleanly(self):
+        from benchmark_news_dedup import synthetic_articles, score_clusters
+        from news_dedup import NearDuplicateClusterer
+
+        articles, truth = synthetic_articles(stories=300, variants=4)
+        clusters = NearDuplicateClusterer().cluster(articles)
+        quality = score_clusters(clusters, truth)
+        assert quality['purity'] == 1.0
+        assert quality['completeness'] > 0.95
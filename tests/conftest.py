@@ -0,0 +1,69 @@
+"""
+Shared fixtures: an isolated local SQLite database per test, so no
+application data is touched.
+"""
+
+import pytest
+import sys
+import os
+import sqlite3
+
+# Add the parent directory to the Python path to import the application modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def local_db(tmp_path, monkeypatch):
+    """
+    Path of a temporary SQLite database with the full schema
+    DatabaseEnvironmentManager() connects to it (any Azure environment
+    markers are removed), and catalog snapshots are written next to it.
+    """
+    path = tmp_path / 'test.db'
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{path}")
+    monkeypatch.setenv('CATALOG_SNAPSHOT_DIR', str(tmp_path))
+    for var in ('ENV', 'ENVIRONMENT', 'WEBSITE_SITE_NAME', 'AZURE_WEBAPP_NAME'):
+        monkeypatch.delenv(var, raising=False)
+
+    from database_environment_manager import DatabaseEnvironmentManager
+
+    db = DatabaseEnvironmentManager()
+    db.connect()
+    db.create_schema()
+    db.disconnect()
+    return path
+
+
+@pytest.fixture
+def db_conn(local_db):
+    """Route-style connection (sqlite3.Row rows) to local_db"""
+    connection = sqlite3.connect(str(local_db))
+    connection.row_factory = sqlite3.Row
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def app_client(local_db, monkeypatch):
+    """
+    Flask test client on local_db, signed in as the user dict it is given
+    Usage: client = app_client({'id': 2, 'username': 'ada', 'is_admin': 0})
+    """
+    for var in ('AZURE_SQL_SERVER', 'AZURE_SQL_DATABASE', 'AZURE_SQL_USERNAME', 'AZURE_SQL_PASSWORD'):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv('DATABASE_PATH', str(local_db))
+    monkeypatch.setenv('JOB_WORKER_CONCURRENCY', '0')
+
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'DATABASE_PATH', str(local_db))
+
+    def signed_in(user):
+        monkeypatch.setattr(app_module, 'get_current_user', lambda: dict(user))
+        client = app_module.app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user['id']
+            session['username'] = user['username']
+        return client
+
+    return signed_in
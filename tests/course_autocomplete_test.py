@@ -0,0 +1,74 @@
+"""
+Test cases for the course autocomplete prefix index and its catalog-version
+driven rebuilds. Uses a temporary SQLite database.
+"""
+
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the index
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_autocomplete import KEY_LENGTH, PrefixIndex, normalize
+
+
+def values(suggestions):
+    return [(suggestion['type'], suggestion['value']) for suggestion in suggestions]
+
+
+class TestPrefixIndex:
+    """Normalization, grouping and ordering of completions"""
+
+    def test_normalize(self):
+        assert normalize('  Intro to  Café-ML: Part 1! ') == 'intro to cafe ml part 1'
+        assert normalize(None) == ''
+
+    def test_complete(self):
+        titles = [(1, 'Deep Learning Basics'), (2, 'Azure AI Fundamentals'), (3, 'Learning Azure DevOps'),
+                  (4, 'Azure AI Fundamentals'), (5, 'Prompt engineering for Azure OpenAI')]
+        index = PrefixIndex(titles, ['Microsoft Learn', 'Azure Academy'], ['Azure', 'NLP'], version=1)
+
+        assert values(index.complete('AZ')) == [
+            ('category', 'Azure'), ('provider', 'Azure Academy'),
+            ('title', 'Azure AI Fundamentals'), ('title', 'Azure AI Fundamentals'),
+            ('title', 'Learning Azure DevOps'), ('title', 'Prompt engineering for Azure OpenAI')]
+        assert [suggestion.get('id') for suggestion in index.complete('azure ai')] == [2, 4]
+        assert values(index.complete('learn')) == [
+            ('title', 'Learning Azure DevOps'), ('title', 'Deep Learning Basics')]
+        assert values(index.complete('learn', limit=1)) == [('title', 'Learning Azure DevOps')]
+        assert values(index.complete('microsoft l')) == [('provider', 'Microsoft Learn')]
+        assert index.complete('') == [] and index.complete('zzz') == []
+
+    def test_queries_longer_than_the_key(self):
+        long_title = 'Building retrieval augmented generation pipelines with vector databases'
+        index = PrefixIndex([(1, long_title), (2, long_title.replace('vector', 'graph'))], [], [], version=1)
+        assert len(normalize(long_title)) > KEY_LENGTH
+        assert [suggestion['id'] for suggestion in index.complete('retrieval augmented generation pipelines with')] == [1, 2]
+        assert [suggestion['id'] for suggestion in index.complete('retrieval augmented generation pipelines with v')] == [1]
+
+
+@pytest.fixture
+def conn(db_conn):
+    """Route-style connection to an isolated database with a small catalog"""
+    db_conn.execute("INSERT INTO courses (title, source, category) VALUES ('Python for AI', 'Coursera', 'Python')")
+    db_conn.commit()
+    return db_conn
+
+
+class TestCourseAutocomplete:
+    """The index follows the catalog snapshot"""
+
+    def test_rebuilt_on_catalog_version(self, conn):
+        from cache_versions import CATALOG, bump_version
+        from course_autocomplete import CourseAutocomplete
+
+        autocomplete = CourseAutocomplete()
+        assert values(autocomplete.complete('py', conn=conn)) == [('category', 'Python'), ('title', 'Python for AI')]
+        assert values(autocomplete.complete('cour', conn=conn)) == [('provider', 'Coursera')]
+
+        conn.execute("INSERT INTO courses (title, source) VALUES ('PyTorch in practice', 'Udemy')")
+        conn.commit()
+        assert len(autocomplete.complete('py', conn=conn)) == 2  # no bump yet: cached
+        bump_version(CATALOG, conn=conn)
+        assert values(autocomplete.complete('py', conn=conn))[-1] == ('title', 'PyTorch in practice')
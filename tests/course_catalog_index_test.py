@@ -0,0 +1,172 @@
+"""
+Test cases for the catalog bitmap index, the shared catalog snapshot file and
+the cache version counters. Uses a temporary SQLite database.
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to the Python path to import the index
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_catalog_cache import CatalogSnapshot, write_snapshot
+from course_catalog_index import CatalogIndex, bits_from_ordinals, ordinals_of
+
+
+class TestBitmaps:
+    """Ordinals, level bitmaps and pages over set bits"""
+
+    def test_bits_round_trip(self):
+        assert bits_from_ordinals([]) == 0
+        assert bits_from_ordinals([0, 3, 64, 200]) == (1 | 1 << 3 | 1 << 64 | 1 << 200)
+        assert ordinals_of(bits_from_ordinals([0, 3, 64, 200])).tolist() == [0, 3, 64, 200]
+        assert ordinals_of(0).tolist() == []
+
+    def test_uncompleted_by_level_and_page(self):
+        levels = ['Beginner', 'Intermediate', 'Beginner', None, 'Beginner', 'Advanced', 'Beginner']
+        index = CatalogIndex([(100 + n, level) for n, level in enumerate(levels)], version=1)
+        completed = index.bits_for([102, 105, 999])
+
+        assert index.page(index.uncompleted(completed)) == ([100, 101, 103, 104, 106], 5)
+        assert index.page(index.uncompleted(completed, 'Beginner'), page=1, per_page=2) == ([100, 104], 3)
+        assert index.page(index.uncompleted(completed, 'Beginner'), page=2, per_page=2) == ([106], 3)
+        assert index.page(index.uncompleted(completed, 'Expert')) == ([], 0)
+
+
+@pytest.fixture
+def conn(db_conn):
+    """Route-style connection (sqlite3.Row rows) to an isolated database with a small catalog"""
+    db_conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'ada', 'x')")
+    for n, level in enumerate(['Beginner', 'Intermediate', 'Beginner', 'Advanced']):
+        db_conn.execute("INSERT INTO courses (title, level, created_at) VALUES (?, ?, ?)",
+                        (f'Course {n}', level, f'2026-01-0{n + 1} 00:00:00'))
+    db_conn.commit()
+    return db_conn
+
+
+class TestIndexCache:
+    """Cached bitmaps are reused until a version counter moves"""
+
+    def test_completion_and_catalog_versions_invalidate(self, conn):
+        from cache_versions import CATALOG, bump_version, completions_key, get_versions
+        from course_catalog_index import CourseCatalogIndexCache
+
+        cache = CourseCatalogIndexCache()
+        assert cache.uncompleted_ids(1, conn=conn) == ([4, 3, 2, 1], 4)
+        assert cache.uncompleted_ids(1, 'Beginner', conn=conn) == ([3, 1], 2)
+
+        conn.execute("INSERT INTO user_courses (user_id, course_id, completed) VALUES (1, 3, 1)")
+        conn.commit()
+        assert cache.uncompleted_ids(1, 'Beginner', conn=conn) == ([3, 1], 2)  # no bump yet: cached
+        bump_version(completions_key(1), conn=conn)
+        assert cache.uncompleted_ids(1, 'Beginner', conn=conn) == ([1], 1)
+
+        conn.execute("INSERT INTO courses (title, level, created_at) VALUES ('Course 4', 'Beginner', '2026-02-01')")
+        conn.commit()
+        bump_version(CATALOG, conn=conn)
+        assert cache.uncompleted_ids(1, 'Beginner', page=1, per_page=1, conn=conn) == ([5], 2)
+        assert get_versions([CATALOG, completions_key(1), completions_key(2)], conn) == \
+            {CATALOG: 1, completions_key(1): 1, completions_key(2): 0}
+
+        courses, total = cache.uncompleted_courses(1, 'Beginner', conn=conn)
+        assert [course['title'] for course in courses] == ['Course 4', 'Course 0'] and total == 2
+
+
+class TestCatalogSnapshot:
+    """Read-through snapshot lookups and version-driven reloads"""
+
+    def test_lookups_and_reload(self, conn, tmp_path):
+        from cache_versions import CATALOG, bump_version
+        from course_catalog_cache import CourseCatalogCache
+
+        conn.execute("UPDATE courses SET source = 'Manual' WHERE id IN (1, 4)")
+        conn.commit()
+        cache = CourseCatalogCache(str(tmp_path / 'catalog.snap'))
+        snapshot = cache.snapshot(conn)
+        assert [course['id'] for course in snapshot.courses] == [4, 3, 2, 1]
+        assert cache.get(2, conn)['title'] == 'Course 1' and cache.get(42, conn) is None
+        assert [course['id'] for course in snapshot.at_level('Beginner')] == [3, 1]
+        assert [course['id'] for course in snapshot.from_source('Manual')] == [4, 1]
+        assert snapshot.levels() == ['Advanced', 'Beginner', 'Intermediate']
+        assert snapshot.sources() == ['Manual']
+
+        conn.execute("UPDATE courses SET title = 'Renamed' WHERE id = 2")
+        conn.commit()
+        assert cache.snapshot(conn) is snapshot  # unchanged until the counter moves
+        bump_version(CATALOG, conn=conn)
+        assert cache.get(2, conn)['title'] == 'Renamed'
+        assert cache.snapshot(conn).version == 1
+
+    def test_workers_share_one_file(self, conn, tmp_path):
+        from cache_versions import CATALOG, bump_version
+        from course_catalog_cache import CourseCatalogCache
+
+        path = str(tmp_path / 'shared.snap')
+        first = CourseCatalogCache(path).snapshot(conn)
+        conn.execute("UPDATE courses SET title = 'Unbumped' WHERE id = 1")
+        conn.commit()
+        # A second worker maps the file written by the first instead of querying courses
+        second = CourseCatalogCache(path).snapshot(conn)
+        assert second.get(1)['title'] == 'Course 0'
+        assert os.path.samefile(first.file_path, second.file_path)
+
+        bump_version(CATALOG, conn=conn)
+        rebuilt = CourseCatalogCache(path).snapshot(conn)
+        assert rebuilt.version == 1 and rebuilt.get(1)['title'] == 'Unbumped'
+        # Mappings of the replaced file stay readable until they are dropped
+        assert first.get(1)['title'] == 'Course 0'
+
+    def test_sql_server_reads_the_compatibility_view(self, conn, tmp_path):
+        from course_catalog_cache import CourseCatalogCache
+
+        class ServerConnection:
+            """Stands in for the Azure SQL connection wrapper"""
+            def execute(self, sql, params=()):
+                return conn.execute(sql, params)
+
+        conn.execute("ATTACH DATABASE ':memory:' AS dbo")
+        conn.execute("CREATE TABLE dbo.courses_app (id INTEGER, title TEXT, description TEXT, difficulty TEXT, "
+                     "duration_hours REAL, url TEXT, category TEXT, level TEXT, created_at TEXT, extra TEXT)")
+        conn.execute("INSERT INTO dbo.courses_app (id, title, url, level, created_at, extra) VALUES "
+                     "(7, 'From view', 'https://example.com', 'Beginner', '2026-03-01', 'x')")
+
+        snapshot = CourseCatalogCache(str(tmp_path / 'server.snap')).snapshot(ServerConnection(), version=0)
+        assert snapshot.columns == ['id', 'title', 'description', 'difficulty', 'duration_hours',
+                                    'url', 'category', 'level', 'created_at']
+        assert [course['title'] for course in snapshot.at_level('Beginner')] == ['From view']
+        # Columns the view does not provide read as missing rather than failing
+        assert snapshot.sources() == [] and len(snapshot.positions('url_status', 'Working')) == 0
+        assert snapshot.values('points') == [None]
+
+
+class TestSnapshotFile:
+    """Column encoding of the snapshot file"""
+
+    def test_round_trip_and_queries(self, tmp_path):
+        columns = ['id', 'title', 'description', 'level', 'points', 'rating', 'created_at']
+        levels = ['Beginner', 'Intermediate', None]
+        rows = [[n + 1, f'Course {n} – ML', None if n % 5 else 'Deep LEARNING basics', levels[n % 3],
+                 str(n * 10) if n % 7 else None, n / 4 if n % 2 else None, datetime(2026, 1, 1, 0, 0, n % 60)]
+                for n in range(100)]
+        rows[3][0] = 250  # sparse ids
+        path = write_snapshot(str(tmp_path / 'catalog.snap'), columns, rows, version=7)
+        snapshot = CatalogSnapshot(path)
+
+        assert snapshot.version == 7 and len(snapshot) == 100
+        assert snapshot._kinds == {'id': 'int', 'title': 'text', 'description': 'interned', 'level': 'interned',
+                                   'points': 'text', 'rating': 'float', 'created_at': 'interned'}
+        assert snapshot.get(250) == {'id': 250, 'title': 'Course 3 – ML', 'description': None,
+                                     'level': 'Beginner', 'points': '30', 'rating': 0.75,
+                                     'created_at': '2026-01-01 00:00:03'}
+        assert snapshot.get(4) is None and snapshot.get(9999) is None and snapshot.get(1)['rating'] is None
+
+        assert snapshot.levels() == ['Beginner', 'Intermediate']
+        assert snapshot.at_level('Intermediate').ids()[:3] == [2, 5, 8]
+        assert snapshot.select(search='learning').ids() == [1, 6, 11, 16, 21, 26, 31, 36, 41, 46, 51, 56, 61,
+                                                            66, 71, 76, 81, 86, 91, 96]
+        assert snapshot.select(search='COURSE 9', level='Beginner').ids() == [10, 91, 94, 97, 100]
+        assert snapshot.select(search='course 9', where={'points': lambda points: points is None}).ids() == [92, 99]
+        assert snapshot.select(search='nothing like this').ids() == []
+        assert [course['id'] for course in snapshot.rows_for_ids([3, 4, 250])] == [3, 250]
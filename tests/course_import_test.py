@@ -0,0 +1,161 @@
+"""
+Test cases for multi-format course imports.
+Every supported format must flow through the same validator and writer stages
+and produce the same persistent upload report.
+"""
+
+import json
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the upload modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from course_import_readers import detect_format, read_course_file
+
+ROWS = [
+    {'title': 'Intro to Prompting', 'url': 'https://example.com/prompting', 'source': 'Test', 'level': 'Beginner'},
+    {'title': 'Vector Databases', 'url': 'https://example.com/vectors', 'source': 'Test', 'level': 'Intermediate'},
+    {'title': '', 'url': 'https://example.com/missing-title', 'source': 'Test', 'level': 'Beginner'},
+    {'title': 'Intro to Prompting', 'url': 'https://example.com/prompting', 'source': 'Test', 'level': 'Beginner'},
+]
+
+
+def write_upload(tmp_path, file_format, name=None):
+    """Write ROWS in the given format and return the path"""
+    path = tmp_path / (name or f'courses.{file_format}')
+    df = pd.DataFrame(ROWS)
+    if file_format == 'xlsx':
+        df.to_excel(path, index=False)
+    elif file_format == 'csv':
+        df.to_csv(path, index=False)
+    elif file_format == 'jsonl':
+        path.write_text('\n'.join(json.dumps(row) for row in ROWS) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def upload_manager(local_db):
+    """Upload manager bound to an isolated SQLite database with the full schema"""
+    from database_environment_manager import DatabaseEnvironmentManager
+    from enhanced_excel_upload import ExcelUploadManager
+
+    setup = DatabaseEnvironmentManager()
+    setup.connect()
+    setup.create_initial_data()
+    setup.disconnect()
+
+    db_manager = DatabaseEnvironmentManager()
+    yield ExcelUploadManager(db_manager)
+    db_manager.disconnect()
+
+
+class TestFormatDetection:
+    """Formats are detected from file contents rather than trusted extensions"""
+
+    @pytest.mark.parametrize('file_format', ['xlsx', 'csv', 'jsonl'])
+    def test_detects_each_format(self, tmp_path, file_format):
+        path = write_upload(tmp_path, file_format, name='upload.bin')
+        assert detect_format(path) == file_format
+
+    def test_mislabelled_excel_is_still_read_as_excel(self, tmp_path):
+        path = write_upload(tmp_path, 'xlsx', name='courses.csv')
+        file_format, df = read_course_file(path)
+        assert file_format == 'xlsx'
+        assert len(df) == len(ROWS)
+
+    def test_empty_file_is_rejected(self, tmp_path):
+        path = tmp_path / 'empty.csv'
+        path.write_text('')
+        with pytest.raises(ValueError):
+            read_course_file(str(path))
+
+
+class TestSharedPipeline:
+    """All formats produce identical stats and reports"""
+
+    @pytest.mark.parametrize('file_format', ['xlsx', 'csv', 'jsonl'])
+    def test_format_produces_same_report(self, tmp_path, upload_manager, file_format):
+        path = write_upload(tmp_path, file_format)
+        response = upload_manager.process_saved_upload(
+            path, os.path.basename(path), {'id': 1, 'username': 'admin'}
+        )
+
+        assert response['success'] is True
+        assert response['summary']['file_info']['format'] == file_format
+        assert response['stats'] == {
+            'total_processed': 4, 'successful': 2, 'skipped': 1, 'errors': 1, 'warnings': 0
+        }
+        assert response['report_id']
+
+        cursor = upload_manager.db_manager.connection.cursor()
+        cursor.execute("SELECT success_count, error_count FROM excel_upload_reports WHERE id = ?",
+                       (response['report_id'],))
+        assert cursor.fetchone() == (2, 1)
+        cursor.execute("SELECT COUNT(*) FROM excel_upload_row_details WHERE report_id = ?",
+                       (response['report_id'],))
+        assert cursor.fetchone()[0] == 4
+        cursor.execute("SELECT COUNT(*) FROM background_jobs WHERE job_type = 'recommendation_update'")
+        assert cursor.fetchone()[0] == 1  # added courses queue a neighbour-table refresh
+
+
+class TestDryRun:
+    """Dry-run validation reports what an upload would do without writing"""
+
+    def test_parallel_dry_run_matches_sequential_and_writes_nothing(self, tmp_path, upload_manager, caplog):
+        from werkzeug.datastructures import FileStorage
+
+        rows = ROWS * 5 + [{'title': f'Course {i}', 'url': f'https://example.com/{i}',
+                            'source': 'Test', 'level': 'Advanced'} for i in range(10)]
+        path = tmp_path / 'bulk.csv'
+        pd.DataFrame(rows).to_csv(path, index=False)
+
+        upload_manager.validation_chunk_size = 4
+        upload_manager.validation_workers = 2
+        caplog.set_level('INFO', logger='enhanced_excel_upload')
+        with open(path, 'rb') as f:
+            response = upload_manager.dry_run_upload(
+                {'course_file': FileStorage(stream=f, filename='bulk.csv')},
+                {'id': 1, 'username': 'admin'}
+            )
+
+        assert response['success'] is True
+        assert response['dry_run'] is True
+        assert response['stats']['total_processed'] == len(rows)
+        assert response['stats']['successful'] == 12
+        assert response['stats']['errors'] == 5
+        assert response['stats']['skipped'] == 13
+        assert [r['row_number'] for r in response['row_results']] == list(range(2, len(rows) + 2))
+        assert 'report_id' not in response
+        assert 'across 2 processes' in caplog.text  # the spawned pool ran, not the in-process fallback
+
+        upload_manager.validation_chunk_size = len(rows)
+        sequential = upload_manager.validate_rows(pd.read_csv(path), upload_manager.get_existing_courses())
+        assert [r.status for r in sequential] == [r['status'] if r['status'] != 'success' else 'pending'
+                                                 for r in response['row_results']]
+
+        cursor = upload_manager.db_manager.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM courses WHERE source = 'Test'")
+        assert cursor.fetchone()[0] == 0
+
+    def test_spawned_workers_stay_out_of_the_app(self, tmp_path):
+        import subprocess
+
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # What a spawned validation worker imports: no Flask, job engine or recommender
+        check = ("import sys, course_row_validation; "
+                 "print(sorted({'flask', 'job_manager', 'course_recommender', 'app'} & set(sys.modules)))")
+        output = subprocess.run([sys.executable, '-c', check], cwd=root, capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == '[]'
+
+        # Importing the app (as a spawned child of `python app.py` does) neither initializes the database nor starts workers
+        env = dict(os.environ, DATABASE_PATH=str(tmp_path / 'app.db'), JOB_WORKER_CONCURRENCY='2')
+        for var in ('AZURE_SQL_SERVER', 'AZURE_SQL_DATABASE', 'AZURE_SQL_USERNAME', 'AZURE_SQL_PASSWORD'):
+            env.pop(var, None)
+        check = "import app, job_manager; print(len(job_manager.job_manager._workers))"
+        output = subprocess.run([sys.executable, '-c', check], cwd=root, env=env, capture_output=True, text=True,
+                                check=True)
+        assert output.stdout.strip().splitlines()[-1] == '0'
+        assert not (tmp_path / 'app.db').exists()
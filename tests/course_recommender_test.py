@@ -0,0 +1,211 @@
+"""
+Test cases for the content-based course recommender.
+Builds the neighbour table over a small catalog in a temporary SQLite database.
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to import the recommender
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATALOG = [
+    ('Deep Learning with PyTorch', 'Train neural networks in PyTorch', 'Deep Learning', 'Intermediate'),
+    ('Neural Networks from Scratch', 'Build neural networks and backpropagation by hand', 'Deep Learning', 'Intermediate'),
+    ('PyTorch for Computer Vision', 'Convolutional neural networks with PyTorch', 'Deep Learning', 'Advanced'),
+    ('Prompt Engineering Basics', 'Write prompts for large language models', 'Generative AI', 'Beginner'),
+    ('Building Chatbots with LLMs', 'Large language models, prompts and retrieval', 'Generative AI', 'Intermediate'),
+    ('Excel for Data Analysis', 'Pivot tables and charts in spreadsheets', 'Data', 'Beginner'),
+]
+
+
+def run(sql, params=()):
+    from database_environment_manager import DatabaseEnvironmentManager
+
+    db = DatabaseEnvironmentManager()
+    db.connect()
+    cursor = db.connection.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    db.connection.commit()
+    db.disconnect()
+    return rows
+
+
+def add_course(title, description, category, level):
+    run("INSERT INTO courses (title, description, category, level) VALUES (?, ?, ?, ?)",
+        (title, description, category, level))
+    return run("SELECT MAX(id) FROM courses")[0][0]
+
+
+@pytest.fixture
+def recommender(local_db):
+    """Recommender over a small catalog in an isolated database"""
+    from course_recommender import CourseRecommender
+
+    for course in CATALOG:
+        add_course(*course)
+    return CourseRecommender(top_k=3)
+
+
+def neighbours(course_id):
+    rows = run("SELECT neighbor_id FROM course_neighbors WHERE model = 'content' AND course_id = ? "
+               "ORDER BY neighbor_rank", (course_id,))
+    return [row[0] for row in rows]
+
+
+class TestTfidfIndex:
+    """Sparse scoring matches a dense cosine computation"""
+
+    def test_scores_match_dense_cosine(self):
+        from course_recommender import TfidfIndex, course_terms
+
+        courses = [{'id': n + 1, 'title': t, 'description': d, 'category': c, 'level': l}
+                   for n, (t, d, c, l) in enumerate(CATALOG * 30)]
+        courses += [{'id': 200 + n, 'title': f'Topic{n} workshop', 'description': f'unique{n}'} for n in range(20)]
+        index = TfidfIndex(courses)
+        assert index.dense.shape[1] > 0 and len(index.posting_rows) > 0
+
+        dense = np.zeros((len(index), len(index.vocabulary)))
+        rows = np.repeat(np.arange(len(index)), np.diff(index.indptr))
+        dense[rows, index.indices] = index.data
+        block = np.arange(0, len(index), 7)
+        assert np.allclose(index.scores(block), dense[block] @ dense.T, atol=1e-5)
+        assert 'level:beginner' in course_terms(courses[3])
+
+
+class TestRecommendations:
+    """Neighbour lists are precomputed and aggregated over a user's completions"""
+
+    def test_full_build_finds_related_courses(self, recommender):
+        result = recommender.update_index()
+        assert (result['mode'], result['courses']) == ('full', 6)
+        assert neighbours(1)[0] == 3  # PyTorch courses pair up
+        assert 6 not in neighbours(1)
+        assert recommender.update_index()['mode'] == 'unchanged'
+
+    def test_user_recommendations_exclude_completed(self, recommender):
+        recommender.update_index()
+        run("INSERT INTO users (id, username, password_hash) VALUES (7, 'ada', 'x'), (8, 'bob', 'x')")
+        run("INSERT INTO user_courses (user_id, course_id, completed) VALUES (7, 1, 1), (7, 4, 1)")
+
+        recommended = [course['id'] for course in recommender.recommended_courses(7, limit=3)]
+        assert set(recommended) == {2, 3, 5}
+        assert recommender.recommended_courses(8, limit=2)[0]['score'] == 0.0  # cold start: newest
+
+        rows = [{'id': n} for n in range(1, 7)]
+        assert [row['id'] for row in recommender.rank_courses(7, rows)][-1] == 6
+
+    def test_rank_courses_reuses_the_route_connection(self, recommender, db_conn, monkeypatch):
+        import course_recommender
+
+        recommender.update_index()
+        run("INSERT INTO users (id, username, password_hash) VALUES (7, 'ada', 'x')")
+        run("INSERT INTO user_courses (user_id, course_id, completed) VALUES (7, 1, 1)")
+        rows = [{'id': n} for n in range(1, 7)]
+        expected = [row['id'] for row in recommender.rank_courses(7, rows)]
+
+        monkeypatch.setattr(course_recommender, 'DatabaseEnvironmentManager', None)  # any new connection fails
+        assert [row['id'] for row in recommender.rank_courses(7, rows, conn=db_conn)] == expected
+        assert expected[0] == 3
+
+    def test_recommendations_endpoint_uses_the_session_user(self, recommender, app_client, monkeypatch):
+        import course_recommender
+
+        recommender.update_index()
+        run("INSERT INTO users (id, username, password_hash) VALUES (7, 'ada', 'x')")
+        run("INSERT INTO user_courses (user_id, course_id, completed) VALUES (7, 1, 1)")
+        monkeypatch.setattr(course_recommender, 'recommender', recommender)
+
+        response = app_client({'id': 7, 'username': 'ada', 'is_admin': 0}).get('/api/recommendations?limit=3')
+        assert response.status_code == 200
+        assert [course['id'] for course in response.get_json()['courses']] == \
+            [course['id'] for course in recommender.recommended_courses(7, limit=3)]
+
+    def test_new_courses_are_folded_in(self, recommender):
+        recommender.update_index()
+        recommender.rebuild_ratio = 1.0
+        new_id = add_course('Transformers in PyTorch', 'Attention based neural networks with PyTorch',
+                            'Deep Learning', 'Advanced')
+
+        result = recommender.update_index()
+        assert (result['mode'], result['new_courses']) == ('incremental', 1)
+        assert neighbours(new_id)[:2] and set(neighbours(new_id)[:2]) <= {1, 2, 3}
+        assert new_id in neighbours(3)
+        assert len(neighbours(3)) == 3
+
+        add_course('Spreadsheet Charts', 'Charts in Excel', 'Data', 'Beginner')
+        recommender.rebuild_ratio = 0.1
+        assert recommender.update_index()['mode'] == 'full'
+
+
+def complete(user_id, course_id, date='2026-01-01 10:00:00'):
+    from cache_versions import bump_completions
+
+    run("INSERT INTO user_courses (user_id, course_id, completed, completion_date) VALUES (?, ?, 1, ?)",
+        (user_id, course_id, date))
+    bump_completions(user_id)
+
+
+class TestCoCompletion:
+    """Courses completed by the same users become neighbours"""
+
+    def test_co_counts_match_dense_product(self):
+        from course_cofiltering import CompletionMatrix
+
+        rng = np.random.default_rng(3)
+        users, courses = rng.integers(0, 50, 400), rng.integers(100, 130, 400)
+        matrix = CompletionMatrix(users, courses)
+
+        dense = np.zeros((len(matrix.user_ids), len(matrix)))
+        dense[np.searchsorted(matrix.user_ids, users), np.searchsorted(matrix.course_ids, courses)] = 1
+        block = np.arange(0, len(matrix), 3)
+        assert np.array_equal(matrix.co_counts(block), (dense.T @ dense)[block])
+
+    def test_build_fold_in_and_blended_serving(self, recommender):
+        from course_cofiltering import CollaborativeRecommender
+
+        run("INSERT INTO users (username, password_hash) VALUES " +
+            ', '.join(f"('user{n}', 'x')" for n in range(1, 8)))
+        for user_id in (1, 2, 3):
+            complete(user_id, 4)
+            complete(user_id, 6)  # prompt engineering learners also take the Excel course
+        complete(4, 1)
+        collaborative = CollaborativeRecommender(top_k=3)
+        collaborative.rebuild_ratio = 10
+
+        assert collaborative.update_index()['mode'] == 'full'
+        rows = run("SELECT neighbor_id FROM course_neighbors WHERE model = 'collaborative' AND course_id = 4")
+        assert [row[0] for row in rows] == [6]
+        assert collaborative.update_index()['mode'] == 'unchanged'
+
+        complete(5, 1, '2026-02-01 09:00:00')
+        complete(5, 2, '2026-02-01 09:00:00')
+        complete(4, 2, '2026-02-01 09:05:00')
+        result = collaborative.update_index()
+        # Only the courses of users 4 and 5 are recomputed
+        assert (result['mode'], result['lists_written']) == ('incremental', 2)
+        rows = run("SELECT neighbor_id FROM course_neighbors WHERE model = 'collaborative' AND course_id = 1")
+        assert [row[0] for row in rows] == [2]
+
+        # Completion dates are user-editable and play no part in finding changes
+        run("UPDATE user_courses SET completion_date = '2030-01-01 00:00:00' WHERE user_id = 1")
+        assert collaborative.update_index()['mode'] == 'unchanged'
+        complete(6, 3, '2020-01-01 00:00:00')
+        complete(6, 5, None)
+        complete(4, 3, '2026-02-01 10:00:00')
+        complete(4, 5, '2026-02-01 10:00:00')
+        result = collaborative.update_index()
+        assert (result['mode'], result['lists_written']) == ('incremental', 4)
+        rows = run("SELECT neighbor_id FROM course_neighbors WHERE model = 'collaborative' AND course_id = 3")
+        assert [row[0] for row in rows] == [5]
+
+        # Content similarity alone would not suggest the Excel course after prompt engineering
+        recommender.update_index()
+        complete(7, 4, '2026-03-01 08:00:00')
+        assert 6 in [course for course, _ in recommender.recommend(7, limit=5)]
+        recommender.model_weights['collaborative'] = 0
+        assert 6 not in [course for course, _ in recommender.recommend(7, limit=5)]
@@ -0,0 +1,132 @@
+"""
+Test cases for the course search result cache and the per-user completion
+overlay applied after it. Uses a temporary SQLite database.
+"""
+
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_search_cache import SearchResultCache, normalize_query
+
+
+@pytest.fixture
+def conn(db_conn):
+    """Route-style connection to an isolated database with a small catalog"""
+    db_conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'ada', 'x')")
+    courses = [('Azure AI Fundamentals', 'Beginner', 'Microsoft Learn'),
+               ('Python for Data Science', 'Beginner', 'Coursera'),
+               ('Azure OpenAI in practice', 'Advanced', 'Microsoft Learn'),
+               ('GitHub Copilot for Python', 'Intermediate', 'Udemy')]
+    for n, (title, level, source) in enumerate(courses):
+        db_conn.execute("INSERT INTO courses (title, level, source, created_at) VALUES (?, ?, ?, ?)",
+                        (title, level, source, f'2026-01-0{n + 1} 00:00:00'))
+    db_conn.commit()
+    return db_conn
+
+
+def titles(rows):
+    return [course['title'] for course in rows]
+
+
+class TestSearchResultCache:
+    """Normalized keys, version invalidation and the byte cap"""
+
+    def test_normalized_queries_share_an_entry(self, conn):
+        from course_catalog_cache import catalog_cache
+
+        assert normalize_query('  AZURE   ai ') == 'azure ai' and normalize_query(None) == ''
+        cache = SearchResultCache()
+        snapshot = catalog_cache.snapshot(conn)
+        first = cache.select(snapshot, search='azure')
+        assert titles(first) == ['Azure OpenAI in practice', 'Azure AI Fundamentals']
+        assert titles(cache.select(snapshot, search=' Azure ')) == titles(first)
+        assert titles(cache.select(snapshot, search='python', level='Beginner')) == ['Python for Data Science']
+        assert titles(cache.select(snapshot, search='python', level='')) == \
+            ['GitHub Copilot for Python', 'Python for Data Science']
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 3
+
+    def test_where_needs_a_key(self, conn):
+        from course_catalog_cache import catalog_cache
+
+        cache = SearchResultCache()
+        snapshot = catalog_cache.snapshot(conn)
+        where = {'level': lambda level: level != 'Beginner'}
+        assert len(cache.select(snapshot, where=where)) == 2
+        assert cache.stats()['entries'] == 0 and cache.stats()['misses'] == 0  # not cached
+        cache.select(snapshot, where=where, where_key='not-beginner')
+        assert len(cache.select(snapshot, where=where, where_key='not-beginner')) == 2
+        assert cache.stats()['hits'] == 1
+
+    def test_catalog_version_purges_entries(self, conn):
+        from cache_versions import CATALOG, bump_version
+        from course_catalog_cache import catalog_cache
+
+        cache = SearchResultCache()
+        cache.select(catalog_cache.snapshot(conn), search='copilot')
+        conn.execute("INSERT INTO courses (title, created_at) VALUES ('Copilot for admins', '2026-02-01')")
+        conn.commit()
+        bump_version(CATALOG, conn=conn)
+        assert titles(cache.select(catalog_cache.snapshot(conn), search='copilot')) == \
+            ['Copilot for admins', 'GitHub Copilot for Python']
+        assert cache.stats()['entries'] == 1 and cache.stats()['misses'] == 2
+
+    def test_byte_cap_evicts_least_recent(self, conn):
+        from course_catalog_cache import catalog_cache
+
+        snapshot = catalog_cache.snapshot(conn)
+        probe = SearchResultCache()
+        probe.select(snapshot, search='azure')
+        probe.select(snapshot, search='cloud')
+        cache = SearchResultCache(max_bytes=probe.stats()['bytes'] + 1)  # room for two of the three
+        cache.select(snapshot, search='azure')
+        cache.select(snapshot, search='cloud')
+        cache.select(snapshot, search='azure')
+        cache.select(snapshot, search='agent')  # evicts 'cloud', the least recently used
+        stats = cache.stats()
+        assert stats['evictions'] == 1 and stats['entries'] == 2 and stats['bytes'] <= stats['max_bytes']
+        cache.select(snapshot, search='azure')
+        assert cache.stats()['hits'] == 2
+
+
+class TestCompletionOverlay:
+    """Cached rows are shared; completions are applied per user"""
+
+    def test_uncompleted_rows(self, conn):
+        from cache_versions import bump_version, completions_key
+        from course_catalog_cache import catalog_cache
+        from course_catalog_index import CourseCatalogIndexCache
+
+        cache = SearchResultCache()
+        index = CourseCatalogIndexCache()
+        conn.execute("INSERT INTO user_courses (user_id, course_id, completed) VALUES (1, 1, 1)")
+        conn.commit()
+        bump_version(completions_key(1), conn=conn)
+
+        matching = cache.select(catalog_cache.snapshot(conn), search='azure')
+        assert titles(index.uncompleted_rows(1, matching, conn=conn)) == ['Azure OpenAI in practice']
+        assert titles(index.uncompleted_rows(2, matching, conn=conn)) == \
+            ['Azure OpenAI in practice', 'Azure AI Fundamentals']
+        assert titles(matching) == ['Azure OpenAI in practice', 'Azure AI Fundamentals']
+
+
+class TestMyCoursesSearch:
+    """/my-courses applies the level filter with and without a search"""
+
+    def test_search_keeps_level_filter(self, conn, app_client, monkeypatch):
+        import app
+        import course_catalog_index
+        import course_search_cache
+        monkeypatch.setattr(course_catalog_index, 'catalog_index', course_catalog_index.CourseCatalogIndexCache())
+        monkeypatch.setattr(course_search_cache, 'search_cache', SearchResultCache())
+        rendered = {}
+        monkeypatch.setattr(app, 'render_template', lambda template, **context: rendered.update(context) or '')
+
+        client = app_client({'id': 1, 'username': 'ada', 'is_admin': 0})
+        client.get('/my-courses?level=Beginner')
+        assert sorted(titles(rendered['recommended_courses'])) == ['Azure AI Fundamentals', 'Python for Data Science']
+        client.get('/my-courses?level=Beginner&search=azure')
+        assert titles(rendered['recommended_courses']) == ['Azure AI Fundamentals']
@@ -0,0 +1,158 @@
+"""
+Test cases for the concurrent course fetcher, its source plugins and the
+incremental catalog sync. Uses in-process fake sources and a temporary SQLite database.
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add the parent directory to the Python path to import the fetcher
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_sources import CourseSource, SourcePage, SOURCES
+
+
+class FakeSource(CourseSource):
+    """Pages of generated courses, each page taking `delay` seconds"""
+
+    requests_per_second = 0
+
+    def __init__(self, name, pages=3, per_page=4, delay=0.1, timeout_seconds=10.0, fail=False):
+        self.name = name
+        self.pages = pages
+        self.per_page = per_page
+        self.delay = delay
+        self.timeout_seconds = timeout_seconds
+        self.fail = fail
+
+    def fetch_page(self, session, page_token, cursor, timeout, etag=None):
+        if self.fail:
+            raise ConnectionError('provider unavailable')
+        time.sleep(self.delay)
+        page = int(page_token or 0)
+        courses = [{'title': f'{self.name} course {page}-{i}', 'level': 'Beginner',
+                    'link': f'https://{self.name.lower()}.example/{page}/{i}', 'points': 10}
+                   for i in range(self.per_page)]
+        next_token = str(page + 1) if page + 1 < self.pages else None
+        return SourcePage(courses, next_token, cursor=str(page + 1))
+
+
+@pytest.fixture
+def fetcher(db_conn):
+    """Fetcher writing to an isolated SQLite catalog"""
+    from fast_course_fetcher import FastCourseFetcher
+
+    db_conn.execute("INSERT INTO courses (title, link) VALUES ('Alpha course 0-0', 'https://x.example/1')")
+    db_conn.commit()
+    return FastCourseFetcher(max_workers=4, write_batch_size=5)
+
+
+def course_count():
+    from database_environment_manager import DatabaseEnvironmentManager
+
+    db = DatabaseEnvironmentManager()
+    db.connect()
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM courses")
+    count = cursor.fetchone()[0]
+    db.disconnect()
+    return count
+
+
+class TestConcurrentFetch:
+    """Sources run side by side and feed one de-duplicating writer"""
+
+    def test_sources_overlap_instead_of_adding_up(self, fetcher):
+        sources = [FakeSource(name) for name in ('Alpha', 'Beta', 'Gamma', 'Delta')]
+
+        start = time.perf_counter()
+        result = fetcher.fetch_and_store(sources)
+        elapsed = time.perf_counter() - start
+
+        # Sequentially this would take 4 sources x 3 pages x 0.1s = 1.2s
+        assert elapsed < 0.8
+        assert result['apis_used'] == 4
+        assert result['courses_added'] == 47  # 48 fetched, one already in the catalog
+        assert result['sources']['Alpha']['cursor'] == '3'
+        assert result['sources']['Alpha']['unchanged'] == 0
+        assert course_count() == 48
+
+        again = fetcher.fetch_and_store(sources)
+        assert again['courses_added'] == 0
+        assert again['sources']['Beta']['unchanged'] == 12
+
+    def test_timeout_and_failure_are_isolated(self, fetcher):
+        sources = [
+            FakeSource('Slow', pages=10, delay=0.1, timeout_seconds=0.25),
+            FakeSource('Broken', fail=True),
+            FakeSource('Fine', pages=1, delay=0),
+        ]
+        result = fetcher.fetch_and_store(sources)
+        stats = result['sources']
+
+        assert stats['Slow']['status'] == 'timeout'
+        assert 1 <= stats['Slow']['pages'] < 10
+        assert stats['Broken']['status'] == 'error'
+        assert stats['Fine']['status'] == 'ok'
+        assert result['apis_used'] == 2
+        assert course_count() == 1 + result['courses_added']
+
+    def test_builtin_sources_are_registered(self):
+        assert {'Microsoft Learn', 'GitHub'} <= set(SOURCES)
+        pages = list(SOURCES['GitHub'].iter_pages(session=None, cursor='3'))
+        assert [len(page.courses) for page in pages] == [2]
+        assert pages[-1].cursor == '5'
+
+
+def query(sql, params=()):
+    from database_environment_manager import DatabaseEnvironmentManager
+
+    db = DatabaseEnvironmentManager()
+    db.connect()
+    cursor = db.connection.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    db.disconnect()
+    return rows
+
+
+class TestIncrementalSync:
+    """Repeat syncs skip unchanged sources and items and upsert what changed"""
+
+    def test_unchanged_source_is_not_refetched(self, fetcher):
+        from course_sources import GitHubSource
+
+        first = fetcher.fetch_and_store([GitHubSource()])
+        assert first['courses_added'] == 5
+        assert first['sources']['GitHub']['cursor'] == '5'
+
+        second = fetcher.fetch_and_store([GitHubSource()])
+        stats = second['sources']['GitHub']
+        assert stats['not_modified'] is True
+        assert stats['fetched'] == 0
+        assert second['courses_added'] == 0
+
+        state = query("SELECT last_cursor, items_tracked FROM course_sync_state WHERE source = 'GitHub'")
+        assert tuple(state[0]) == ('5', 5)
+
+    def test_course_list_changes_are_upserted(self, fetcher):
+        from course_sync import sync_course_list
+
+        courses = [{'title': f'Curated {i}', 'url': f'https://curated.example/{i}', 'points': 10}
+                   for i in range(4)]
+        courses.append({'title': 'Alpha course 0-0', 'url': 'https://curated.example/dup'})
+
+        first = sync_course_list('Curated', courses)
+        assert (first['added'], first['duplicates']) == (4, 1)
+        assert sync_course_list('Curated', courses)['unchanged_source'] is True
+
+        courses[2] = dict(courses[2], points=99)
+        courses.append({'title': 'Curated 4', 'url': 'https://curated.example/4'})
+        third = sync_course_list('Curated', courses)
+        assert (third['added'], third['updated'], third['unchanged']) == (1, 1, 4)
+
+        points = query("SELECT points FROM courses WHERE url = 'https://curated.example/2'")
+        assert [row[0] for row in points] == [99]
+        assert course_count() == 6
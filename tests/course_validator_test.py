@@ -0,0 +1,139 @@
+"""
+Test cases for the concurrent course URL validation engine.
+Runs against local stub hosts; no external network traffic.
+"""
+
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the validator
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_url_validation import StubHost
+from course_validator import CourseURLValidator, normalize_url
+
+
+@pytest.fixture
+def hosts():
+    """One slow healthy host and one failing host"""
+    started = [StubHost('slow', delay=0.05).start(), StubHost('failing', status=503).start()]
+    yield started
+    for host in started:
+        host.stop()
+
+
+class TestConcurrentValidation:
+    """Concurrency limits, de-duplication and status mapping"""
+
+    def test_limits_dedup_and_statuses(self, hosts):
+        slow, failing = hosts
+        urls = [f"{slow.base_url}/course/{i % 6}" for i in range(12)]
+        urls += [f"{slow.base_url}/missing/1", f"{failing.base_url}/course/1"]
+
+        validator = CourseURLValidator(max_concurrent=8, per_host_limit=3)
+        results = validator.check_urls(urls)
+
+        assert len(results) == 8
+        assert slow.requests == 7
+        assert slow.max_active == 3
+        assert slow.connections <= 3
+        assert results[f"{slow.base_url}/course/0"]['status'] == 'Working'
+        assert results[f"{slow.base_url}/missing/1"]['status'] == 'Not Working'
+        assert results[f"{failing.base_url}/course/1"]['error'] == 'Server error (503)'
+
+    def test_progress_callback_can_stop_dispatch(self, hosts):
+        slow, _ = hosts
+        urls = [f"{slow.base_url}/course/{i}" for i in range(20)]
+
+        validator = CourseURLValidator(max_concurrent=2, per_host_limit=2)
+        results = validator.check_urls(urls, progress_callback=lambda url, result: False)
+
+        # Only the checks already in flight when the first one finished complete
+        assert len(results) <= 2
+        assert slow.requests <= 2
+
+    def test_invalid_and_fragment_urls(self):
+        validator = CourseURLValidator()
+        assert validator.check_url('not a url')['error'] == 'Invalid URL format'
+        assert normalize_url(' https://example.com/a#section ') == 'https://example.com/a'
+
+
+@pytest.fixture
+def catalog_validator(db_conn, hosts):
+    """Validator over a small SQLite catalog pointing at the stub hosts"""
+    slow, failing = hosts
+    slow.etag = '"v1"'
+    links = [f"{slow.base_url}/course/{i}" for i in range(3)]
+    links += [f"{slow.base_url}/course/0#reviews", f"{failing.base_url}/course/1"]
+
+    db_conn.executemany("INSERT INTO courses (title, link, url_status) VALUES (?, ?, NULL)",
+                        [(f'Course {i}', link) for i, link in enumerate(links)])
+    db_conn.commit()
+    return CourseURLValidator(max_concurrent=4, per_host_limit=2)
+
+
+class TestRevalidationScheduler:
+    """Only due URLs are rechecked, failing ones first, with conditional requests"""
+
+    def make_all_due(self, validator):
+        db = validator.get_db_connection()
+        db.connection.execute("UPDATE url_validation_state SET next_check_at = '2000-01-01 00:00:00'")
+        db.connection.commit()
+        db.disconnect()
+
+    def test_first_run_checks_everything_then_nothing_is_due(self, catalog_validator, hosts):
+        first = catalog_validator.revalidate_due_urls(budget=10)
+        assert first['catalog_urls'] == 4
+        assert first['checked'] == 4
+        assert first['broken'] == 1
+
+        second = catalog_validator.revalidate_due_urls(budget=10)
+        assert second['due'] == 0
+        assert second['checked'] == 0
+
+    def test_budget_prefers_failing_urls_and_uses_conditional_requests(self, catalog_validator, hosts):
+        slow, failing = hosts
+        catalog_validator.revalidate_due_urls(budget=10)
+        self.make_all_due(catalog_validator)
+
+        plan = catalog_validator.plan_revalidation(budget=2)
+        assert plan['due'] == 4
+        assert plan['selected'][0] == f"{failing.base_url}/course/1"
+
+        summary = catalog_validator.revalidate_due_urls(budget=2)
+        assert summary['checked'] == 2
+        assert summary['deferred'] == 2
+        assert summary['not_modified'] == 1
+
+        state = catalog_validator.get_url_states()[f"{failing.base_url}/course/1"]
+        assert state['consecutive_failures'] == 2
+        assert catalog_validator.next_check_delay('Broken', 2).total_seconds() == 2 * 3600
+
+
+class TestResultWriteBack:
+    """Results are written in batches and the summary is kept current without re-counting"""
+
+    def test_batched_writes_keep_summary_in_step(self, catalog_validator, hosts):
+        catalog_validator.write_batch_size = 2
+        before = catalog_validator.get_validation_summary()
+        assert before['unchecked']['count'] == 5
+
+        results = catalog_validator.validate_course_urls()
+        assert results['unique_urls'] == 4
+        assert results['working'] == 4 and results['broken'] == 1
+
+        cached = catalog_validator.get_validation_summary()
+        assert cached['working']['count'] == 4
+        assert cached['broken']['count'] == 1
+        assert cached['unchecked']['count'] == 0
+        assert cached['recent_checks'] == 5
+        assert catalog_validator._count_summary() == {
+            'working': 4, 'not_working': 0, 'broken': 1, 'unchecked': 0, 'recent_checks': 5
+        }
+
+        broken = catalog_validator.get_courses_by_status('Broken')
+        assert [course['url_error'] for course in broken] == ['Server error (503)']
+        # the '#reviews' link shares the state row of its normalized URL
+        working = catalog_validator.get_courses_by_status('Working')
+        assert len(working) == 4 and {course['url_response_code'] for course in working} == {200}
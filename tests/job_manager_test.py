@@ -0,0 +1,198 @@
+"""
+Test cases for the persistent background job engine.
+Runs against a temporary SQLite database so no application data is touched.
+"""
+
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import job_manager
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_manager import JobManager, JobCancelled
+
+
+@pytest.fixture
+def manager(local_db):
+    """Job manager bound to an isolated SQLite database"""
+    jm = JobManager()
+    jm.progress_interval = 0
+    jm.retry_delay = 0
+    return jm
+
+
+class TestJobManager:
+    """Test job submission, execution, retries and cancellation"""
+
+    def test_successful_job_records_progress_and_result(self, manager):
+        def handler(ctx):
+            for i in range(1, 4):
+                ctx.update_progress(i, 3, f'step {i}')
+            return {'total': ctx.payload['value'] * 2}
+
+        manager.register('double', handler)
+        job_id = manager.submit('double', {'value': 21}, user_id=1)
+
+        assert manager.get_job(job_id)['status'] == 'queued'
+        assert manager.run_pending() == 1
+
+        job = manager.get_job(job_id)
+        assert job['status'] == 'succeeded'
+        assert job['result'] == {'total': 42}
+        assert job['progress_current'] == 3
+        assert job['percent'] == 100.0
+        assert job['is_finished'] is True
+
+    def test_failed_job_is_retried_then_marked_failed(self, manager):
+        calls = []
+
+        def handler(ctx):
+            calls.append(ctx.attempt)
+            ctx.save_checkpoint({'attempt': ctx.attempt})
+            raise RuntimeError('boom')
+
+        manager.register('flaky', handler, max_attempts=2)
+        job_id = manager.submit('flaky')
+
+        manager.run_pending()
+        job = manager.get_job(job_id)
+        assert calls == [1, 2]
+        assert job['status'] == 'failed'
+        assert job['attempts'] == 2
+        assert job['checkpoint'] == {'attempt': 2}
+        assert 'boom' in job['error_message']
+
+    def test_cancel_queued_and_running_jobs(self, manager):
+        def handler(ctx):
+            manager.cancel(ctx.job_id)
+            ctx.update_progress(1, 10)
+            ctx.raise_if_cancelled()
+            return {'unreachable': True}
+
+        manager.register('long', handler)
+        queued_id = manager.submit('long')
+        assert manager.cancel(queued_id) is True
+        assert manager.get_job(queued_id)['status'] == 'cancelled'
+
+        running_id = manager.submit('long')
+        manager.run_pending()
+        job = manager.get_job(running_id)
+        assert job['status'] == 'cancelled'
+        assert job['result'] is None
+
+        # Finished jobs cannot be cancelled again
+        assert manager.cancel(running_id) is False
+
+    def test_unknown_job_type_fails_and_list_filters(self, manager):
+        job_id = manager.submit('missing')
+        manager.run_pending()
+
+        job = manager.get_job(job_id)
+        assert job['status'] == 'failed'
+        assert "No handler registered" in job['error_message']
+
+        assert [j['job_id'] for j in manager.list_jobs(job_type='missing')] == [job_id]
+        assert manager.list_jobs(job_type='other') == []
+        assert manager.get_job('does-not-exist') is None
+
+    def test_coalesced_submits_share_the_queued_job(self, manager):
+        seen = []
+
+        def handler(ctx):
+            seen.append(ctx.job_id)
+            # Submitted while this one runs: queued anew, since the run may already have read its input
+            seen.append(manager.submit('refresh', {'full': False}, coalesce=True))
+
+        manager.register('refresh', handler)
+        first = manager.submit('refresh', {'full': False}, coalesce=True)
+        assert manager.submit('refresh', {'full': False}, coalesce=True) == first
+        assert manager.submit('refresh', {'full': True}, coalesce=True) != first
+
+        manager.run_pending(max_jobs=1)
+        assert seen[0] == first and seen[1] != first
+        assert manager.get_job(seen[1])['status'] == 'queued'
+        assert len(manager.list_jobs(job_type='refresh')) == 3
+
+    def test_silent_handler_keeps_its_heartbeat(self, manager):
+        import time
+
+        manager.stale_after = 0.3
+        manager.heartbeat_interval = 0.05
+        seen = []
+
+        def handler(ctx):
+            time.sleep(0.5)  # longer than the stale window, without reporting progress
+            manager._recover_stale_jobs()
+            seen.append(manager.get_job(ctx.job_id)['status'])
+            return {'ok': True}
+
+        manager.register('silent', handler, max_attempts=2)
+        job_id = manager.submit('silent')
+        assert manager.run_pending() == 1
+        assert seen == ['running']
+        assert manager.get_job(job_id)['attempts'] == 1
+
+    def test_worker_polls_on_one_connection(self, manager, monkeypatch):
+        import time
+
+        manager.poll_interval = 0.01
+        connects = []
+        real_connect = manager._connect
+        monkeypatch.setattr(manager, '_connect', lambda: connects.append(1) or real_connect())
+        manager.start_workers(1)
+        time.sleep(0.2)
+        manager.stop_workers()
+        assert len(connects) == 1
+
+    def test_job_bookkeeping_uses_the_worker_connection(self, manager, monkeypatch):
+        def handler(ctx):
+            for i in range(1, 4):
+                ctx.update_progress(i, 3, force=True)
+                ctx.save_checkpoint({'step': i})
+                ctx.raise_if_cancelled()
+            if ctx.attempt == 1:
+                raise RuntimeError('retry me')
+            return {'ok': True}
+
+        manager.register('chatty', handler, max_attempts=2)
+        job_id = manager.submit('chatty')
+        connects = []
+        real_connect = manager._connect
+        monkeypatch.setattr(manager, '_connect', lambda: connects.append(1) or real_connect())
+
+        assert manager.run_pending() == 2  # the retry is due at once (retry_delay = 0)
+        assert len(connects) == 1
+        job = manager.get_job(job_id)
+        assert job['status'] == 'succeeded' and job['checkpoint'] == {'step': 3}
+
+    def test_event_stream_emits_progress_and_resumes(self, manager):
+        manager.register('noop', lambda ctx: {'ok': True})
+        job_id = manager.submit('noop')
+        manager.run_pending()
+
+        events = list(manager.stream_events(job_id, poll_interval=0))
+        assert events[0].startswith('retry:')
+        assert 'event: progress' in events[1]
+        assert '"status": "succeeded"' in events[1]
+        assert 'event: end' in events[2]
+
+        # Reconnecting with the last seen id skips the state already delivered
+        last_id = events[1].split('\n')[0][len('id: '):]
+        resumed = list(manager.stream_events(job_id, last_event_id=last_id, poll_interval=0))
+        assert len(resumed) == 2
+        assert 'event: end' in resumed[1]
+
+    def test_event_stream_ends_at_max_duration_on_one_connection(self, manager, monkeypatch):
+        job_id = manager.submit('noop')  # stays queued: no handler runs it
+        connects = []
+        real_connect = manager._connect
+        monkeypatch.setattr(manager, '_connect', lambda: connects.append(1) or real_connect())
+
+        events = list(manager.stream_events(job_id, poll_interval=0.01, max_duration=0.1))
+        assert len(connects) == 1
+        assert 'event: progress' in events[1] and not any('event: end' in event for event in events)
+
+    def test_event_stream_for_missing_job(self, manager):
+        events = list(manager.stream_events('missing-job', poll_interval=0))
+        assert 'event: error' in events[-1]
@@ -0,0 +1,129 @@
+"""
+Test cases for the learnings feed: personal and global streams merged with
+keyset pagination and the shared global window. Uses a temporary SQLite database.
+"""
+
+import re
+import pytest
+import sys
+import os
+from html import unescape
+
+# Add the parent directory to the Python path to import the feed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def conn(db_conn):
+    """Route-style connection to an isolated database with two users' entries"""
+    db_conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'admin', 'x'), (2, 'ada', 'x'), "
+                    "(3, 'bob', 'x')")
+    # ids 1-10: admin's global entries on even days, ada's and bob's personal ones in between
+    for n in range(1, 11):
+        user_id, is_global = (1, 1) if n % 2 == 0 else (2 if n % 4 == 1 else 3, 0)
+        db_conn.execute("INSERT INTO learning_entries (id, user_id, title, date_added, is_global) "
+                        "VALUES (?, ?, ?, ?, ?)", (n, user_id, f'Entry {n}', f'2026-03-{n:02d} 09:00:00', is_global))
+    # same timestamp as entry 10: the id breaks the tie
+    db_conn.execute("INSERT INTO learning_entries (id, user_id, title, date_added, is_global) "
+                    "VALUES (11, 2, 'Entry 11', '2026-03-10 09:00:00', 0)")
+    db_conn.commit()
+    return db_conn
+
+
+def walk(feed, user_id, conn, per_page):
+    """Every page of the feed, as lists of ids"""
+    pages, cursor = [], None
+    while True:
+        entries, cursor = feed.page(user_id, cursor, per_page=per_page, conn=conn)
+        pages.append([entry['id'] for entry in entries])
+        if cursor is None:
+            return pages
+
+
+class TestLearningFeed:
+    """Merged streams, keyset pages and the cached global window"""
+
+    def test_pages_merge_both_streams(self, conn):
+        from learning_feed import LearningFeed
+
+        feed = LearningFeed()
+        assert walk(feed, 2, conn, 3) == [[11, 10, 9], [8, 6, 5], [4, 2, 1]]
+        assert walk(feed, 3, conn, 4) == [[10, 8, 7, 6], [4, 3, 2]]
+        # the admin's own global entries are not listed twice
+        assert walk(feed, 1, conn, 10) == [[10, 8, 6, 4, 2]]
+
+        entries, _ = feed.page(2, per_page=2, conn=conn)
+        assert [entry['entry_type'] for entry in entries] == ['Personal', 'Global']
+
+    def test_pages_without_a_route_connection(self, conn):
+        from learning_feed import LearningFeed
+
+        feed = LearningFeed()
+        entries, cursor = feed.page(2, per_page=3)  # opens its own connection: plain tuple rows
+        assert [entry['id'] for entry in entries] == [11, 10, 9]
+        assert entries[0]['entry_type'] == 'Personal'
+        assert [entry['id'] for entry in feed.page(2, cursor, per_page=3)[0]] == [8, 6, 5]
+
+    def test_azure_pages_by_created_at(self):
+        from learning_feed import LearningFeed
+
+        feed = LearningFeed()
+        feed._azure = True
+        sql = feed._stream_sql('user_id = ?', ('2026-03-05 09:00:00', 5), 4)
+        assert sql.startswith('SELECT TOP (4) ') and 'created_at AS feed_sort' in sql
+        assert 'created_at <= ? AND (created_at < ? OR id < ?)' in sql
+        assert sql.endswith('ORDER BY created_at DESC, id DESC')
+
+    def test_global_window_reused_until_bumped(self, conn):
+        from cache_versions import LEARNINGS_GLOBAL, bump_version
+        from learning_feed import LearningFeed
+
+        feed = LearningFeed()
+        assert walk(feed, 3, conn, 10) == [[10, 8, 7, 6, 4, 3, 2]]
+
+        conn.execute("UPDATE learning_entries SET title = 'Edited' WHERE id = 10")
+        conn.commit()
+        assert feed.page(3, per_page=1, conn=conn)[0][0]['title'] == 'Entry 10'  # no bump yet: cached
+        bump_version(LEARNINGS_GLOBAL, conn=conn)
+        assert feed.page(3, per_page=1, conn=conn)[0][0]['title'] == 'Edited'
+
+        # personal entries are read live and need no bump
+        conn.execute("DELETE FROM learning_entries WHERE id = 7")
+        conn.commit()
+        assert walk(feed, 3, conn, 10) == [[10, 8, 6, 4, 3, 2]]
+
+    def test_pages_past_the_window_use_the_union(self, conn):
+        from learning_feed import LearningFeed
+
+        feed = LearningFeed(global_window=2)
+        assert walk(feed, 2, conn, 3) == [[11, 10, 9], [8, 6, 5], [4, 2, 1]]
+        assert walk(feed, 1, conn, 2) == [[10, 8], [6, 4], [2]]
+
+
+def page_titles(html):
+    return re.findall(r'<h5 class="card-title">(.*?)</h5>', html)
+
+
+def older_link(html):
+    match = re.search(r'href="([^"]*before_id=[^"]*)"', html)
+    return unescape(match.group(1)) if match else None
+
+
+class TestLearningsPage:
+    """/learnings serves the feed one keyset page at a time"""
+
+    def test_pages_through_personal_and_global_entries(self, conn, app_client, monkeypatch):
+        import learning_feed
+        monkeypatch.setattr(learning_feed, 'learning_feed', learning_feed.LearningFeed(per_page=3))
+
+        client = app_client({'id': 2, 'username': 'ada', 'is_admin': 0})
+        html = client.get('/learnings').get_data(as_text=True)
+        assert page_titles(html) == ['Entry 11', 'Entry 10', 'Entry 9']
+
+        pages = []
+        link = older_link(html)
+        while link:
+            html = client.get(link).get_data(as_text=True)
+            pages.append(page_titles(html))
+            link = older_link(html)
+        assert pages == [['Entry 8', 'Entry 6', 'Entry 5'], ['Entry 4', 'Entry 2', 'Entry 1']]
@@ -0,0 +1,93 @@
+"""
+Test cases for learning entry search with the SQLite FTS5 engine and the
+in-process fallback index. Uses a temporary SQLite database.
+"""
+
+import re
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the search
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learning_search import ENGINE_MEMORY, LearningSearch, query_terms
+
+
+@pytest.fixture
+def conn(db_conn):
+    """Route-style connection to an isolated database with entries of two users and one global entry"""
+    db_conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'admin', 'x'), (2, 'ada', 'x'), "
+                    "(3, 'bob', 'x')")
+    db_conn.executemany("INSERT INTO learning_entries (id, user_id, title, description, tags, is_global) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", [
+                            (1, 1, 'Transformers explained', 'Attention is all you need', 'llm', 1),
+                            (2, 2, 'Retrieval basics', 'Notes on transformer retrieval pipelines', 'rag', 0),
+                            (3, 3, 'Transformer fine-tuning', 'LoRA adapters', 'llm, training', 0),
+                            (4, 2, 'Prompting', 'Few-shot prompts for transformers', 'prompting', 0),
+                        ])
+    db_conn.commit()
+    return db_conn
+
+
+def ids(result):
+    return [entry['id'] for entry in result[0]]
+
+
+@pytest.fixture(params=['fts5', ENGINE_MEMORY])
+def search(request):
+    """Each test runs against FTS5 (chosen automatically here) and the in-process index"""
+    search = LearningSearch(None if request.param == 'fts5' else ENGINE_MEMORY)
+    yield search
+    assert search.engine == request.param
+
+
+class TestLearningSearch:
+    """Ranking, prefixes, visibility, pages and write sync"""
+
+    def test_search_without_a_route_connection(self, conn, search):
+        # The module's own connection returns plain tuple rows
+        assert ids(search.search(2, 'transformer')) == [1, 4, 2]
+        assert search.search(3, 'abc') == ([], False)
+
+    def test_query_terms(self):
+        assert query_terms('  LLM, "fine-tuning"  llm ') == ['llm', 'fine', 'tuning']
+        assert query_terms('?!') == []
+
+    def test_ranked_prefix_search_is_scoped(self, conn, search):
+        # title matches outrank description matches; bob's entry 3 is not visible to ada
+        assert ids(search.search(2, 'transform', conn=conn)) == [1, 4, 2]
+        assert ids(search.search(3, 'transform', conn=conn)) == [3, 1]
+        assert ids(search.search(2, 'transf pipe', conn=conn)) == [2]
+        assert ids(search.search(2, 'rag nothing', conn=conn)) == []
+        assert search.search(2, '', conn=conn) == ([], False)
+
+        assert search.search(2, 'transform', page=1, per_page=2, conn=conn)[1] is True
+        assert search.search(2, 'transform', page=2, per_page=2, conn=conn) == \
+            search.search(2, 'retrieval', conn=conn)
+
+    def test_writes_are_searchable(self, conn, search):
+        from cache_versions import LEARNINGS, bump_version
+
+        assert ids(search.search(2, 'agents', conn=conn)) == []
+        conn.execute("UPDATE learning_entries SET tags = 'rag, agents' WHERE id = 2")
+        conn.execute("DELETE FROM learning_entries WHERE id = 1")
+        conn.commit()
+        bump_version(LEARNINGS, conn=conn)
+        assert ids(search.search(2, 'agent', conn=conn)) == [2]
+        assert ids(search.search(2, 'transform', conn=conn)) == [4, 2]
+
+
+class TestLearningsPageSearch:
+    """/learnings?q= serves ranked search results"""
+
+    def test_search_box_results(self, conn, search, app_client, monkeypatch):
+        import learning_search
+        monkeypatch.setattr(learning_search, 'learning_search', search)
+
+        client = app_client({'id': 2, 'username': 'ada', 'is_admin': 0})
+        html = client.get('/learnings?q=transform').get_data(as_text=True)
+        assert re.findall(r'<h5 class="card-title">(.*?)</h5>', html) == \
+            ['Transformers explained', 'Prompting', 'Retrieval basics']
+        assert 'value="transform"' in html and 'More results' not in html
+        assert 'No learning entries match' in client.get('/learnings?q=zebra').get_data(as_text=True)
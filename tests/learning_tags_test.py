@@ -0,0 +1,105 @@
+"""
+Test cases for the normalized learning tag index and tag frequency rollup.
+Uses a temporary SQLite database.
+"""
+
+import re
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the tag index
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learning_tags import LearningTagIndex, parse_tags
+
+
+@pytest.fixture
+def conn(db_conn):
+    """Route-style connection to an isolated database with tagged entries written before the index existed"""
+    db_conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'admin', 'x'), (2, 'ada', 'x'), "
+                    "(3, 'bob', 'x')")
+    db_conn.executemany("INSERT INTO learning_entries (id, user_id, title, tags, date_added, is_global) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", [
+                            (1, 1, 'Global', 'LLM, Prompting', '2026-03-01 09:00:00', 1),
+                            (2, 2, 'Ada 1', 'llm,  rag ,RAG', '2026-03-02 09:00:00', 0),
+                            (3, 3, 'Bob 1', 'llm', '2026-03-03 09:00:00', 0),
+                            (4, 2, 'Ada 2', '', '2026-03-04 09:00:00', 0),
+                        ])
+    db_conn.commit()
+    return db_conn
+
+
+def ids(page):
+    return [entry['id'] for entry in page[0]]
+
+
+class TestLearningTags:
+    """Backfill, write maintenance and visibility-scoped lookups"""
+
+    def test_parse_tags(self):
+        assert parse_tags(' Machine   Learning, LLM,llm ,, ') == ['machine learning', 'llm']
+        assert parse_tags(None) == [] and parse_tags('') == []
+
+    def test_backfill_and_lookups(self, conn):
+        tags = LearningTagIndex()
+        assert tags.tag_counts(2, conn=conn) == []  # workers never backfill on their own
+        assert tags.backfill_if_empty(conn)['tags'] == 5
+        conn.commit()
+        assert tags.backfill_if_empty(conn) is None
+        assert tags.tag_counts(2, conn=conn) == [('llm', 2), ('prompting', 1), ('rag', 1)]
+        assert tags.tag_counts(3, conn=conn) == [('llm', 2), ('prompting', 1)]
+        assert ids(tags.tagged_page(2, 'LLM', conn=conn)) == [2, 1]
+        assert ids(tags.tagged_page(3, 'rag', conn=conn)) == []
+
+        first = tags.tagged_page(2, 'llm', per_page=1, conn=conn)
+        assert ids(first) == [2] and ids(tags.tagged_page(2, 'llm', first[1], per_page=1, conn=conn)) == [1]
+
+        # Without a route connection the module reads plain tuple rows
+        assert ids(tags.tagged_page(2, 'llm')) == [2, 1]
+        assert tags.tag_counts(3) == [('llm', 2), ('prompting', 1)]
+
+    def test_writes_keep_index_and_counts_in_step(self, conn):
+        tags = LearningTagIndex()
+        tags.rebuild(conn)
+        conn.commit()
+
+        conn.execute("UPDATE learning_entries SET tags = 'rag, agents' WHERE id = 2")
+        conn.commit()
+        tags.sync_entry(conn, 2)
+        cursor = conn.execute("INSERT INTO learning_entries (user_id, title, tags, is_global) "
+                              "VALUES (2, 'Ada 3', 'Agents', 0)")
+        conn.commit()
+        tags.sync_entry(conn, cursor.lastrowid)
+        assert tags.tag_counts(2, conn=conn) == [('agents', 2), ('llm', 1), ('prompting', 1), ('rag', 1)]
+
+        tags.remove_entry(conn, 1)
+        conn.execute("DELETE FROM learning_entries WHERE id = 1")
+        tags.remove_user(conn, 2)
+        conn.execute("DELETE FROM learning_entries WHERE user_id = 2")
+        conn.commit()
+        assert tags.tag_counts(3, conn=conn) == [('llm', 1)]
+        assert conn.execute("SELECT COUNT(*) FROM learning_tags").fetchone()[0] == 1
+
+        # the incrementally maintained rollup matches a rebuild from scratch
+        before = sorted(tuple(row) for row in conn.execute("SELECT owner_id, tag, entries FROM learning_tag_counts"))
+        tags.rebuild(conn)
+        conn.commit()
+        assert sorted(tuple(row) for row in conn.execute("SELECT owner_id, tag, entries FROM learning_tag_counts")) == before
+
+
+class TestLearningsPageTags:
+    """/learnings filters by ?tag= and shows the user's tag cloud"""
+
+    def test_tag_filter_and_cloud(self, conn, app_client, monkeypatch):
+        import learning_tags
+        monkeypatch.setattr(learning_tags, 'tag_index', LearningTagIndex())
+        learning_tags.tag_index.backfill_if_empty(conn)
+        conn.commit()
+
+        client = app_client({'id': 2, 'username': 'ada', 'is_admin': 0})
+        html = client.get('/learnings?tag=LLM').get_data(as_text=True)
+        assert re.findall(r'<h5 class="card-title">(.*?)</h5>', html) == ['Ada 1', 'Global']
+        assert re.findall(r'>(\w+) <span class="text-muted">(\d+)</span>', html) == \
+            [('llm', '2'), ('prompting', '1'), ('rag', '1')]
+        assert 'Clear tag filter' in html
@@ -0,0 +1,179 @@
+"""
+Test cases for upload report storage and paginated drilldown.
+Runs against a temporary SQLite database so no application data is touched.
+"""
+
+import pytest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the reports manager
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def reports(local_db):
+    """Reports manager bound to an isolated SQLite database with a 25-row report"""
+    from database_environment_manager import DatabaseEnvironmentManager
+    from upload_reports_manager import UploadReportsManager
+
+    setup = DatabaseEnvironmentManager()
+    setup.connect()
+    setup.create_initial_data()
+    setup.disconnect()
+
+    manager = UploadReportsManager()
+    report_id = manager.create_upload_report(1, 'courses.csv', 25, 25, 15, 5, 0)
+    for row_number in range(2, 27):
+        status = 'ERROR' if row_number % 5 == 0 else 'SUCCESS' if row_number % 5 < 4 else 'SKIPPED'
+        manager.add_row_detail(report_id, row_number, status, 'msg', f'Course {row_number}')
+    return manager, report_id
+
+
+class TestReportPagination:
+    """Row details are counted and paged in SQL rather than loaded whole"""
+
+    def test_status_counts(self, reports):
+        manager, report_id = reports
+        counts = manager.get_report_status_counts(report_id)
+        assert counts == {'SUCCESS': 15, 'ERROR': 5, 'SKIPPED': 5, 'TOTAL': 25}
+
+    def test_pages_follow_cursor_without_gaps(self, reports):
+        from upload_reports_manager import parse_details_cursor
+
+        manager, report_id = reports
+        seen, after = [], None
+        while True:
+            page = manager.get_report_details_page(report_id, after=after, limit=10)
+            assert len(page['items']) <= 10
+            seen.extend(item['row_number'] for item in page['items'])
+            if not page['has_more']:
+                assert page['next_cursor'] is None
+                break
+            after = parse_details_cursor(page['next_cursor'])
+
+        assert seen == list(range(2, 27))
+
+    def test_status_filter_and_iterator(self, reports):
+        manager, report_id = reports
+        page = manager.get_report_details_page(report_id, status='error', limit=3)
+        assert [item['row_number'] for item in page['items']] == [5, 10, 15]
+        assert page['has_more'] is True
+
+        errors = list(manager.iter_report_details(report_id, status='ERROR', batch_size=2))
+        assert [item['row_number'] for item in errors] == [5, 10, 15, 20, 25]
+
+    def test_iterator_fails_loudly_on_database_errors(self, reports, monkeypatch):
+        manager, report_id = reports
+        rows = []
+        with pytest.raises(Exception):
+            for item in manager.iter_report_details(report_id, batch_size=10):
+                rows.append(item)
+                monkeypatch.setattr(manager.db_manager, 'is_azure_sql', lambda: True)  # next page's SQL fails
+        assert len(rows) == 10  # an error, not a silently truncated export
+
+    def test_missing_composite_indexes_are_created(self, reports, monkeypatch):
+        import upload_reports_manager
+
+        manager, report_id = reports
+        manager.db_manager.connect()
+        manager.db_manager.connection.execute("DROP INDEX idx_excel_row_details_report_status")
+        manager.db_manager.connection.commit()
+        manager.db_manager.disconnect()
+
+        monkeypatch.setattr(upload_reports_manager, '_detail_indexes_ready', False)
+        manager.get_report_details_page(report_id, status='error', limit=3)
+        manager.db_manager.connect()
+        names = [row[0] for row in manager.db_manager.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'excel_upload_row_details'")]
+        manager.db_manager.disconnect()
+        assert 'idx_excel_row_details_report_status' in names
+
+    def test_malformed_cursor_is_ignored(self):
+        from upload_reports_manager import parse_details_cursor
+
+        assert parse_details_cursor('12:345') == (12, 345)
+        assert parse_details_cursor('garbage') is None
+        assert parse_details_cursor(None) is None
+
+
+    def test_detail_routes_are_served_for_admins(self, reports, app_client):
+        from flask import url_for
+        import app as app_module
+
+        manager, report_id = reports
+        with app_module.app.test_request_context():
+            details_url = url_for('admin_reports.api_report_details', report_id=report_id)
+        assert details_url == f'/admin/reports/api/details/{report_id}'
+
+        client = app_client({'id': 1, 'username': 'admin', 'is_admin': 1})
+        page = client.get(f'{details_url}?status=error&limit=3').get_json()
+        assert [item['row_number'] for item in page['items']] == [5, 10, 15]
+        assert page['counts']['TOTAL'] == 25
+        response = client.get(f'/admin/reports/export/{report_id}/ndjson')
+        assert response.status_code == 200 and len(response.data.splitlines()) == 25
+
+        denied = app_client({'id': 2, 'username': 'ada', 'is_admin': 0}).get(details_url)
+        assert denied.status_code == 302
+
+
+class TestPurgeEngine:
+    """Expired reports are purged in bounded, resumable batches"""
+
+    @pytest.fixture
+    def expired(self, reports):
+        """Seven expired reports (three rows each) alongside the fresh 25-row report"""
+        manager, fresh_id = reports
+        for n in range(7):
+            report_id = manager.create_upload_report(1, f'old{n}.csv', 3, 3, 3, 0, 0)
+            for row_number in range(2, 5):
+                manager.add_row_detail(report_id, row_number, 'SUCCESS', 'msg')
+
+        manager.db_manager.connect()
+        cursor = manager.db_manager.connection.cursor()
+        cursor.execute("UPDATE excel_upload_reports SET upload_timestamp = '2000-01-01 00:00:00' WHERE id != ?",
+                       (fresh_id,))
+        manager.db_manager.connection.commit()
+        manager.db_manager.disconnect()
+        return manager, fresh_id
+
+    def remaining(self, manager):
+        manager.db_manager.connect()
+        cursor = manager.db_manager.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM excel_upload_reports")
+        reports = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM excel_upload_row_details")
+        details = cursor.fetchone()[0]
+        manager.db_manager.disconnect()
+        return reports, details
+
+    def test_dry_run_matches_live_purge(self, expired):
+        manager, _ = expired
+        dry = manager.purge_old_reports(30, dry_run=True, batch_size=3, detail_batch_size=2)
+        assert (dry['reports_purged'], dry['details_purged']) == (7, 21)
+        assert dry['complete'] is True
+        assert dry['rows_per_second'] > 0
+        assert self.remaining(manager) == (8, 46)
+
+        live = manager.purge_old_reports(30, batch_size=3, detail_batch_size=2)
+        assert (live['reports_purged'], live['details_purged']) == (7, 21)
+        assert live['batches'] == 3
+        assert live['checkpoint'] is None
+        assert self.remaining(manager) == (1, 25)
+
+    def test_time_budget_stops_and_resume_finishes(self, expired):
+        manager, _ = expired
+        checkpoints = []
+        first = manager.purge_old_reports(30, batch_size=2, time_budget_seconds=1e-9,
+                                          checkpoint_callback=checkpoints.append)
+        assert first['complete'] is False
+        assert first['batches'] == 1
+        assert first['checkpoint'] == checkpoints[-1]
+        assert self.remaining(manager) == (6, 40)
+
+        assert first['planned_reports'] is None  # totals are only counted on request
+
+        rest = manager.purge_old_reports(30, batch_size=2, resume_from=first['checkpoint'], plan=True)
+        assert rest['complete'] is True
+        assert (rest['planned_reports'], rest['planned_details']) == (5, 15)
+        assert self.remaining(manager) == (1, 25)
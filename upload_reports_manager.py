@@ -3,19 +3,35 @@ Upload Reports Manager - Persistent upload/audit reporting and management
 Provides CRUD operations for upload reports, row details, and automatic purging
 """
 
+import os
+import time
 import logging
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from database_environment_manager import DatabaseEnvironmentManager
 
 logger = logging.getLogger(__name__)
 
+# Databases created before the composite row-detail indexes get them on first use in each process
+_detail_indexes_ready = False
+
 class UploadReportsManager:
     """Manages persistent upload reports and audit trails"""
     
     def __init__(self):
         self.db_manager = DatabaseEnvironmentManager()
+        self.purge_batch_size = int(os.getenv('PURGE_BATCH_SIZE', '200'))
+        self.purge_detail_batch_size = int(os.getenv('PURGE_DETAIL_BATCH_SIZE', '5000'))
+        self.purge_time_budget_seconds = float(os.getenv('PURGE_TIME_BUDGET_SECONDS', '0'))
+    
+    def _connect_for_details(self):
+        """Connect, making sure the row-detail indexes the paged queries rely on exist"""
+        global _detail_indexes_ready
+        self.db_manager.connect()
+        if not _detail_indexes_ready:
+            self.db_manager.ensure_tables('excel_upload_row_details')
+            _detail_indexes_ready = True
     
     def create_upload_report(self, user_id: int, filename: str, 
                            total_rows: int, processed_rows: int, 
@@ -206,6 +222,59 @@ class UploadReportsManager:
         finally:
             self.db_manager.disconnect()
     
+    def _fetch_report_summary(self, cursor, report_id: int) -> Optional[Dict]:
+        """Load a report summary row using an open cursor"""
+        sql = """
+        SELECT r.id, r.user_id, u.username, r.filename, r.upload_timestamp,
+               r.total_rows, r.processed_rows, r.success_count, 
+               r.error_count, r.warnings_count
+        FROM excel_upload_reports r
+        JOIN users u ON r.user_id = u.id
+        WHERE r.id = ?
+        """
+        cursor.execute(sql, (report_id,))
+        report_row = cursor.fetchone()
+        
+        if not report_row:
+            return None
+        
+        # Convert timestamp string to datetime object
+        timestamp_str = report_row[4]
+        try:
+            if isinstance(timestamp_str, str):
+                # Parse SQLite timestamp string
+                upload_timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
+            else:
+                upload_timestamp = timestamp_str
+        except (ValueError, TypeError):
+            # Fallback to current time if parsing fails
+            upload_timestamp = datetime.now()
+
+        report_summary = {
+            'id': report_row[0],
+            'user_id': report_row[1],
+            'username': report_row[2],
+            'filename': report_row[3],
+            'upload_timestamp': upload_timestamp,
+            'total_rows': report_row[5],
+            'processed_rows': report_row[6],
+            'success_count': report_row[7],
+            'error_count': report_row[8],
+            'warnings_count': report_row[9]
+        }
+        return report_summary
+    
+    def get_report_summary(self, report_id: int) -> Optional[Dict]:
+        """Get a report summary without loading its row details"""
+        try:
+            self.db_manager.connect()
+            return self._fetch_report_summary(self.db_manager.connection.cursor(), report_id)
+        except Exception as e:
+            logger.error(f"❌ Error getting report summary: {e}")
+            return None
+        finally:
+            self.db_manager.disconnect()
+    
     def get_report_details(self, report_id: int) -> Tuple[Dict, List[Dict]]:
         """
         Get full report with row-by-row details
@@ -215,45 +284,11 @@ class UploadReportsManager:
             self.db_manager.connect()
             cursor = self.db_manager.connection.cursor()
             
-            # Get report summary
-            sql = """
-            SELECT r.id, r.user_id, u.username, r.filename, r.upload_timestamp,
-                   r.total_rows, r.processed_rows, r.success_count, 
-                   r.error_count, r.warnings_count
-            FROM excel_upload_reports r
-            JOIN users u ON r.user_id = u.id
-            WHERE r.id = ?
-            """
-            cursor.execute(sql, (report_id,))
-            report_row = cursor.fetchone()
-            
-            if not report_row:
+            report_summary = self._fetch_report_summary(cursor, report_id)
+            if not report_summary:
                 return None, []
             
-            # Convert timestamp string to datetime object
-            timestamp_str = report_row[4]
-            try:
-                if isinstance(timestamp_str, str):
-                    # Parse SQLite timestamp string
-                    upload_timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                else:
-                    upload_timestamp = timestamp_str
-            except (ValueError, TypeError):
-                # Fallback to current time if parsing fails
-                upload_timestamp = datetime.now()
-
-            report_summary = {
-                'id': report_row[0],
-                'user_id': report_row[1],
-                'username': report_row[2],
-                'filename': report_row[3],
-                'upload_timestamp': upload_timestamp,
-                'total_rows': report_row[5],
-                'processed_rows': report_row[6],
-                'success_count': report_row[7],
-                'error_count': report_row[8],
-                'warnings_count': report_row[9]
-            }            # Get row details
+            # Get row details
             sql = """
             SELECT row_number, status, message, course_title, course_url
             FROM excel_upload_row_details
@@ -281,57 +316,279 @@ class UploadReportsManager:
         finally:
             self.db_manager.disconnect()
     
-    def purge_old_reports(self, days_to_keep: int = 90) -> Dict[str, int]:
+    def get_report_status_counts(self, report_id: int) -> Dict[str, int]:
+        """Count row details per status with a single aggregate query"""
+        try:
+            self._connect_for_details()
+            cursor = self.db_manager.connection.cursor()
+            cursor.execute("""
+                SELECT status, COUNT(*)
+                FROM excel_upload_row_details
+                WHERE report_id = ?
+                GROUP BY status
+            """, (report_id,))
+            
+            counts = {row[0]: row[1] for row in cursor.fetchall()}
+            counts['TOTAL'] = sum(counts.values())
+            return counts
+            
+        except Exception as e:
+            logger.error(f"❌ Error counting report details: {e}")
+            return {'TOTAL': 0}
+        finally:
+            self.db_manager.disconnect()
+    
+    def get_report_details_page(self, report_id: int, status: str = None,
+                                after: Tuple[int, int] = None, limit: int = 100) -> Dict:
         """
-        Purge old upload reports and their details
-        Returns counts of purged records
+        Get one page of row details using keyset pagination on (row_number, id)
+        Pass the returned next_cursor as `after` to fetch the following page.
+        Database errors propagate so exports fail instead of ending early.
         """
         try:
-            self.db_manager.connect()
+            self._connect_for_details()
             cursor = self.db_manager.connection.cursor()
             
-            cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            conditions = ["report_id = ?"]
+            params: List = [report_id]
             
-            # Get reports to be purged for counting
-            cursor.execute("""
-                SELECT id FROM excel_upload_reports 
-                WHERE upload_timestamp < ?
-            """, (cutoff_date,))
-            report_ids = [row[0] for row in cursor.fetchall()]
+            if status:
+                conditions.append("status = ?")
+                params.append(status.upper())
             
-            if not report_ids:
-                return {'reports_purged': 0, 'details_purged': 0}
+            if after:
+                conditions.append("(row_number > ? OR (row_number = ? AND id > ?))")
+                params.extend([after[0], after[0], after[1]])
             
-            # Delete row details first (foreign key constraint)
+            # Fetch one extra row to know whether another page exists
+            where = ' AND '.join(conditions)
             if self.db_manager.is_azure_sql():
-                # SQL Server supports IN with placeholders differently
-                placeholders = ','.join(['?' for _ in report_ids])
-                sql = f"DELETE FROM excel_upload_row_details WHERE report_id IN ({placeholders})"
-                cursor.execute(sql, report_ids)
+                sql = f"""
+                SELECT TOP {int(limit) + 1} id, row_number, status, message, course_title, course_url
+                FROM excel_upload_row_details
+                WHERE {where}
+                ORDER BY row_number, id
+                """
             else:
-                # SQLite
-                placeholders = ','.join(['?' for _ in report_ids])
-                sql = f"DELETE FROM excel_upload_row_details WHERE report_id IN ({placeholders})"
-                cursor.execute(sql, report_ids)
+                sql = f"""
+                SELECT id, row_number, status, message, course_title, course_url
+                FROM excel_upload_row_details
+                WHERE {where}
+                ORDER BY row_number, id
+                LIMIT {int(limit) + 1}
+                """
+            
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            items = [{
+                'row_number': row[1],
+                'status': row[2],
+                'message': row[3],
+                'course_title': row[4],
+                'course_url': row[5]
+            } for row in rows]
             
-            details_purged = cursor.rowcount
+            next_cursor = f"{rows[-1][1]}:{rows[-1][0]}" if has_more else None
+            return {'items': items, 'next_cursor': next_cursor, 'has_more': has_more}
+            
+        finally:
+            self.db_manager.disconnect()
+    
+    def iter_report_details(self, report_id: int, status: str = None,
+                            batch_size: int = 1000) -> Iterator[Dict]:
+        """Yield every row detail page by page without loading the full set"""
+        after = None
+        while True:
+            page = self.get_report_details_page(report_id, status, after, batch_size)
+            yield from page['items']
+            if not page['next_cursor']:
+                return
+            after = parse_details_cursor(page['next_cursor'])
+    
+    def plan_purge(self, days_to_keep: int = 90, resume_from: Dict = None) -> Dict:
+        """
+        Work out what a purge would remove, counting via the upload_timestamp index
+        A checkpoint from an earlier run keeps its original cutoff so resumed runs stay consistent
+        """
+        cutoff_date, after_id = self._purge_window(days_to_keep, resume_from)
+        
+        try:
+            self.db_manager.connect()
+            cursor = self.db_manager.connection.cursor()
             
-            # Delete reports
             cursor.execute("""
-                DELETE FROM excel_upload_reports 
-                WHERE upload_timestamp < ?
-            """, (cutoff_date,))
-            reports_purged = cursor.rowcount
+                SELECT COUNT(*) FROM excel_upload_reports
+                WHERE upload_timestamp < ? AND id > ?
+            """, (cutoff_date, after_id))
+            reports = cursor.fetchone()[0]
             
-            self.db_manager.connection.commit()
+            cursor.execute("""
+                SELECT COUNT(*) FROM excel_upload_row_details d
+                JOIN excel_upload_reports r ON r.id = d.report_id
+                WHERE r.upload_timestamp < ? AND r.id > ?
+            """, (cutoff_date, after_id))
+            details = cursor.fetchone()[0]
             
-            result = {
-                'reports_purged': reports_purged,
-                'details_purged': details_purged
+            return {
+                'cutoff': cutoff_date.isoformat(),
+                'after_id': after_id,
+                'planned_reports': reports,
+                'planned_details': details
             }
+        finally:
+            self.db_manager.disconnect()
+    
+    @staticmethod
+    def _purge_window(days_to_keep: int, resume_from: Dict = None) -> Tuple[datetime, int]:
+        """Cutoff and starting report id of a purge, taken from the checkpoint when resuming"""
+        if resume_from:
+            return datetime.fromisoformat(resume_from['cutoff']), resume_from.get('after_id', 0)
+        return datetime.now() - timedelta(days=days_to_keep), 0
+    
+    def _next_purge_batch(self, cursor, cutoff_date: datetime, after_id: int, limit: int) -> List[int]:
+        """Ids of the next batch of expired reports, walked in id order"""
+        if self.db_manager.is_azure_sql():
+            sql = f"""
+            SELECT TOP {int(limit)} id FROM excel_upload_reports
+            WHERE upload_timestamp < ? AND id > ?
+            ORDER BY id
+            """
+        else:
+            sql = f"""
+            SELECT id FROM excel_upload_reports
+            WHERE upload_timestamp < ? AND id > ?
+            ORDER BY id
+            LIMIT {int(limit)}
+            """
+        cursor.execute(sql, (cutoff_date, after_id))
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _delete_detail_chunk(self, cursor, batch_params: Tuple, limit: int) -> int:
+        """
+        Delete at most `limit` row details belonging to one report batch
+        The batch is addressed by an id range subquery, so the statement never
+        carries more than a handful of parameters regardless of batch size
+        """
+        if self.db_manager.is_azure_sql():
+            sql = f"""
+            DELETE TOP ({int(limit)}) FROM excel_upload_row_details
+            WHERE report_id IN (
+                SELECT id FROM excel_upload_reports
+                WHERE upload_timestamp < ? AND id > ? AND id <= ?
+            )
+            """
+        else:
+            sql = f"""
+            DELETE FROM excel_upload_row_details
+            WHERE id IN (
+                SELECT id FROM excel_upload_row_details
+                WHERE report_id IN (
+                    SELECT id FROM excel_upload_reports
+                    WHERE upload_timestamp < ? AND id > ? AND id <= ?
+                )
+                LIMIT {int(limit)}
+            )
+            """
+        cursor.execute(sql, batch_params)
+        return cursor.rowcount
+    
+    def purge_old_reports(self, days_to_keep: int = 90, dry_run: bool = False,
+                          batch_size: int = None, detail_batch_size: int = None,
+                          time_budget_seconds: float = None, resume_from: Dict = None,
+                          checkpoint_callback=None, plan: bool = False) -> Dict:
+        """
+        Purge old upload reports and their details in bounded batches
+        
+        Reports are walked in id order in batches of `batch_size`. Details for each
+        batch are deleted `detail_batch_size` rows at a time, committing after every
+        chunk so locks stay short. The run stops cleanly once `time_budget_seconds`
+        is spent; pass the returned checkpoint as `resume_from` to continue.
+        A dry run walks exactly the same batches and only counts, one batch at a time.
+        The full up-front totals (see plan_purge) are only counted when `plan` is set;
+        that count runs inside the time budget.
+        
+        Returns counts of purged records, throughput and the resume checkpoint
+        """
+        start = time.monotonic()
+        batch_size = batch_size or self.purge_batch_size
+        detail_batch_size = detail_batch_size or self.purge_detail_batch_size
+        if time_budget_seconds is None:
+            time_budget_seconds = self.purge_time_budget_seconds
+        deadline = start + time_budget_seconds if time_budget_seconds else None
+        
+        totals = self.plan_purge(days_to_keep, resume_from) if plan else {}
+        cutoff_date, after_id = self._purge_window(days_to_keep, resume_from)
+        if totals:
+            cutoff_date = datetime.fromisoformat(totals['cutoff'])
+        checkpoint = {
+            'cutoff': cutoff_date.isoformat(),
+            'after_id': after_id,
+            'reports_purged': (resume_from or {}).get('reports_purged', 0),
+            'details_purged': (resume_from or {}).get('details_purged', 0)
+        }
+        
+        reports_done = details_done = batches = 0
+        complete = False
+        
+        try:
+            self.db_manager.connect()
+            cursor = self.db_manager.connection.cursor()
             
-            logger.info(f"🧹 Purged {reports_purged} reports and {details_purged} details older than {days_to_keep} days")
-            return result
+            while True:
+                # Always finish at least one batch so every run makes progress
+                if deadline and batches and time.monotonic() >= deadline:
+                    break
+                
+                report_ids = self._next_purge_batch(cursor, cutoff_date, checkpoint['after_id'], batch_size)
+                if not report_ids:
+                    complete = True
+                    break
+                
+                batch_params = (cutoff_date, checkpoint['after_id'], report_ids[-1])
+                
+                if dry_run:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM excel_upload_row_details
+                        WHERE report_id IN (
+                            SELECT id FROM excel_upload_reports
+                            WHERE upload_timestamp < ? AND id > ? AND id <= ?
+                        )
+                    """, batch_params)
+                    details_done += cursor.fetchone()[0]
+                    reports_done += len(report_ids)
+                else:
+                    # Delete details first (foreign key constraint), one bounded chunk at a time
+                    batch_finished = True
+                    while True:
+                        deleted = self._delete_detail_chunk(cursor, batch_params, detail_batch_size)
+                        self.db_manager.connection.commit()
+                        details_done += deleted
+                        checkpoint['details_purged'] += deleted
+                        if deleted < detail_batch_size:
+                            break
+                        if deadline and time.monotonic() >= deadline:
+                            batch_finished = False
+                            break
+                    
+                    if not batch_finished:
+                        # The batch is retried from its start on the next run
+                        break
+                    
+                    cursor.execute("""
+                        DELETE FROM excel_upload_reports
+                        WHERE upload_timestamp < ? AND id > ? AND id <= ?
+                    """, batch_params)
+                    reports_done += cursor.rowcount
+                    checkpoint['reports_purged'] += cursor.rowcount
+                    self.db_manager.connection.commit()
+                
+                checkpoint['after_id'] = report_ids[-1]
+                batches += 1
+                if checkpoint_callback and not dry_run:
+                    checkpoint_callback(dict(checkpoint))
             
         except Exception as e:
             logger.error(f"❌ Error purging old reports: {e}")
@@ -340,6 +597,29 @@ class UploadReportsManager:
             raise
         finally:
             self.db_manager.disconnect()
+        
+        elapsed = time.monotonic() - start
+        rows = reports_done + details_done
+        result = {
+            'reports_purged': reports_done,
+            'details_purged': details_done,
+            'planned_reports': totals.get('planned_reports'),
+            'planned_details': totals.get('planned_details'),
+            'dry_run': dry_run,
+            'complete': complete,
+            'batches': batches,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else float(rows),
+            'checkpoint': None if complete or dry_run else checkpoint
+        }
+        
+        mode = 'Would purge' if dry_run else 'Purged'
+        logger.info(
+            f"🧹 {mode} {reports_done} reports and {details_done} details older than {checkpoint['cutoff']} "
+            f"in {batches} batches ({result['rows_per_second']} rows/sec)"
+            + ('' if complete else ' - time budget reached, resume to continue')
+        )
+        return result
     
     def get_upload_statistics(self, days_back: int = 30) -> Dict:
         """Get upload statistics for dashboard/admin overview"""
@@ -379,6 +659,14 @@ class UploadReportsManager:
         finally:
             self.db_manager.disconnect()
 
+def parse_details_cursor(cursor: str) -> Optional[Tuple[int, int]]:
+    """Parse a 'row_number:id' pagination cursor; returns None when missing or malformed"""
+    try:
+        row_number, detail_id = cursor.split(':', 1)
+        return int(row_number), int(detail_id)
+    except (AttributeError, ValueError):
+        return None
+
 # Convenience functions for use in Flask routes
 def create_upload_report(user_id: int, filename: str, total_rows: int, 
                         processed_rows: int, success_count: int, 
@@ -407,7 +695,7 @@ def get_report_details(report_id: int) -> Tuple[Dict, List[Dict]]:
     manager = UploadReportsManager()
     return manager.get_report_details(report_id)
 
-def purge_old_reports(days_to_keep: int = 90) -> Dict[str, int]:
-    """Convenience function to purge old reports"""
+def purge_old_reports(days_to_keep: int = 90, **options) -> Dict:
+    """Convenience function to purge old reports (see UploadReportsManager.purge_old_reports)"""
     manager = UploadReportsManager()
-    return manager.purge_old_reports(days_to_keep)
+    return manager.purge_old_reports(days_to_keep, **options)
@@ -27,8 +27,9 @@ logger.info(f"Environment: {os.environ.get('FLASK_ENV')}")
 try:
     # Import the Flask application
     logger.info("Attempting to import Flask app...")
-    from app import app
+    from app import app, start_background_services
     logger.info("✅ Flask app imported successfully")
+    start_background_services()
 
     # Configure the application for WSGI deployment
     application = app